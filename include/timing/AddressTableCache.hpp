@@ -0,0 +1,108 @@
+/**
+ * @file AddressTableCache.hpp
+ *
+ * AddressTableCache compiles uhal address tables and their modules
+ * into single resolved files, cached on disk.
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#ifndef TIMING_INCLUDE_TIMING_ADDRESSTABLECACHE_HPP_
+#define TIMING_INCLUDE_TIMING_ADDRESSTABLECACHE_HPP_
+
+#include "ers/Issue.hpp"
+
+#include <boost/property_tree/ptree.hpp>
+
+#include <cstdint>
+#include <map>
+#include <string>
+#include <utility>
+#include <vector>
+
+namespace dunedaq {
+ERS_DECLARE_ISSUE(timing,                                                               ///< Namespace
+                  AddressTableCacheError,                                               ///< Issue class name
+                  " Failed to compile address table " << path << ": " << message,       ///< Message
+                  ((std::string)path)((std::string)message)                             ///< Message parameters
+)
+namespace timing {
+
+/**
+ * @brief      On-disk cache of compiled address tables.
+ *
+ * An address table and the modules it pulls in, recursively, are compiled into a single
+ * table: each module reference is replaced by the top node of the module, with the
+ * attributes of the reference (id, address, class, parameters, ...) taking precedence.
+ * uhal then reads one file per design instead of resolving and parsing each module.
+ *
+ * Compiled tables are named after a hash of the content of the files they were built from,
+ * so that identical sets share them. A manifest per top file records the modification time
+ * and size of each file of the set: while none changes, finding the compiled table takes one
+ * manifest read and a stat per file.
+ *
+ * The cache directory is taken from TIMING_ADDRTAB_CACHE, or defaults to
+ * ~/.cache/timing/addrtab.
+ */
+class AddressTableCache
+{
+public:
+  /**
+   * @brief      Compiled table of an address table, built if missing or out of date.
+   *
+   * @param[in]  address_table  Path of the top address table, "file://" prefix and shell variables allowed
+   *
+   * @return     Path of the compiled table
+   */
+  static std::string compile(const std::string& address_table);
+
+  /**
+   * @brief      Connection files using the compiled tables, built if missing or out of date.
+   *
+   * @param[in]  connections  uhal connection string: ';' separated paths, "file://" prefix,
+   *                          shell variables and wildcards allowed
+   *
+   * @return     uhal connection string of the compiled connection files
+   */
+  static std::string compile_connections(const std::string& connections);
+
+  /**
+   * @brief      Directory holding the compiled tables.
+   */
+  static std::string get_cache_directory();
+
+  //! Format version of the compiled tables, part of their names
+  static const int kFormatVersion;
+
+private:
+  typedef boost::property_tree::ptree Tree;
+
+  static std::string resolve_path(const std::string& path, const std::string& base_directory);
+  static std::string manifest_path(const std::string& canonical_path);
+  static bool read_manifest(const std::string& manifest, std::string& compiled_path);
+  static void write_file(const std::string& path, const std::string& content);
+
+  /**
+   * @brief      Replace the module references under node by the module top nodes, recursively.
+   *
+   * @param      files  Files read so far and their content, in reading order
+   */
+  static void resolve_modules(Tree& node,
+                              const std::string& directory,
+                              std::vector<std::pair<std::string, std::string>>& files,
+                              std::map<std::string, Tree>& modules,
+                              size_t depth);
+
+  static Tree read_table(const std::string& path,
+                         std::vector<std::pair<std::string, std::string>>& files,
+                         std::map<std::string, Tree>& modules);
+
+  static uint64_t hash_content(const std::vector<std::pair<std::string, std::string>>& files); // NOLINT(build/unsigned)
+};
+
+} // namespace timing
+} // namespace dunedaq
+
+#endif // TIMING_INCLUDE_TIMING_ADDRESSTABLECACHE_HPP_
@@ -51,9 +51,9 @@ public:
   void configure() const override;
 
   /**
-   * @brief    Give info to collector.
-   */  
-  void get_info(opmonlib::InfoCollector& ci, int level) const override;
+   * @brief    Add the monitoring information of the design sub-nodes to a monitoring plan.
+   */
+  void add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const override;
 };
 
 } // namespace timing
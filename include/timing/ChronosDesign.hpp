@@ -66,9 +66,9 @@ public:
   void validate_firmware_version() const override {} // current chronos firmware does not store firmware version
   
   /**
-   * @brief    Give info to collector.
-   */  
-  void get_info(opmonlib::InfoCollector& ci, int level) const override;
+   * @brief    Add the monitoring information of the design sub-nodes to a monitoring plan.
+   */
+  void add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const override;
 };
 
 } // namespace timing
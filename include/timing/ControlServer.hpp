@@ -0,0 +1,170 @@
+/**
+ * @file ControlServer.hpp
+ *
+ * ControlServer is a class serving the timing devices to local
+ * clients over a Unix domain socket.
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#ifndef TIMING_INCLUDE_TIMING_CONTROLSERVER_HPP_
+#define TIMING_INCLUDE_TIMING_CONTROLSERVER_HPP_
+
+// PDT Headers
+#include "TimingIssues.hpp"
+#include "timing/TopDesignInterface.hpp"
+
+// uHal Headers
+#include "uhal/ConnectionManager.hpp"
+#include "uhal/HwInterface.hpp"
+
+#include <nlohmann/json.hpp>
+
+#include <boost/noncopyable.hpp>
+
+// C++ Headers
+#include <atomic>
+#include <chrono>
+#include <functional>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <vector>
+
+namespace dunedaq {
+namespace timing {
+
+/**
+ * @brief      Local control server of the timing devices.
+ *
+ * The server owns the uhal connection manager and the hardware interface of each device,
+ * opened on first use and kept afterwards, so that the address tables, the cached hardware
+ * identities, the monitoring plans and their background samplers outlive the clients.
+ *
+ * Clients connect to a Unix domain socket and send requests as JSON objects, one per line;
+ * each request gets one JSON line in reply, in order:
+ *
+ *   {"id": 1, "method": "read", "params": {"device": "MST", "nodes": ["master.global.version"]}}
+ *   {"id": 1, "result": {"master.global.version": 393216}}
+ *
+ * Failed requests are answered with {"id": ..., "error": {"type": ..., "message": ...}}.
+ * Each client is served by its own thread; the requests on a device are serialized.
+ */
+class ControlServer : boost::noncopyable
+{
+public:
+  typedef std::function<nlohmann::json(const nlohmann::json&)> Method;
+
+  /**
+   * @param[in]  connections  uhal connection file(s)
+   * @param[in]  socket_path  Path of the Unix domain socket
+   */
+  ControlServer(const std::string& connections, const std::string& socket_path);
+  virtual ~ControlServer();
+
+  /**
+   * @brief      Open the socket and serve the clients until stop is called.
+   */
+  void run();
+
+  /**
+   * @brief      Make run return, after disconnecting the clients. Async-signal-safe.
+   */
+  void stop();
+
+  /**
+   * @brief      Set the IPbus timeout of the devices opened from now on.
+   */
+  void set_timeout(std::chrono::milliseconds timeout) { m_timeout = timeout; }
+
+  /**
+   * @brief      Start the clock frequency samplers of all the devices opened from now on.
+   */
+  void set_sample_frequencies(bool sample_frequencies) { m_sample_frequencies = sample_frequencies; }
+
+  /**
+   * @brief      Open a device, read its identity and, for a positive level, build its monitoring plan.
+   *
+   * The clock frequency samplers of the design are started with the monitoring samplers, or
+   * on their own if sample_frequencies is set, so that the status requests do not wait for
+   * the frequency counters.
+   */
+  void open_device(const std::string& device, int monitoring_level = 0, bool sample_frequencies = false);
+
+  /**
+   * @brief      Handle a request, the way a client request is; errors are returned in the reply.
+   */
+  nlohmann::json handle_request(const nlohmann::json& request);
+
+  /**
+   * @brief      Socket path from TIMING_GUARDIAN_SOCKET, or /tmp/pdtguardian-<uid>.sock.
+   */
+  static std::string get_default_socket_path();
+
+  //! Version of the request protocol, reported by ping
+  static const int kProtocolVersion;
+  //! Longest request accepted, in bytes
+  static const size_t kMaxRequestSize;
+
+private:
+  struct Device
+  {
+    explicit Device(const uhal::HwInterface& hw_interface)
+      : hw(hw_interface)
+    {}
+
+    uhal::HwInterface hw;
+    std::mutex mutex;
+  };
+
+  struct Client
+  {
+    int fd;
+    std::thread thread;
+    std::atomic<bool> done;
+  };
+
+  void register_methods();
+  void add_device_method(const std::string& name,
+                         std::function<nlohmann::json(Device&, const nlohmann::json&)> method);
+
+  std::shared_ptr<Device> get_device(const std::string& id);
+  void close_device(const std::string& id);
+
+  void open_socket();
+  void close_socket();
+  void serve_client(Client& client);
+  void reap_clients(bool all);
+
+  static const TopDesignInterface& get_top_design(Device& device);
+  static nlohmann::json format_identity(const HardwareIdentity& identity);
+
+  std::string m_socket_path;
+  std::chrono::milliseconds m_timeout;
+  bool m_sample_frequencies;
+  std::chrono::steady_clock::time_point m_start_time;
+
+  //! Guards m_connection_manager and m_devices; uhal's connection manager is not thread-safe
+  std::mutex m_devices_mutex;
+  uhal::ConnectionManager m_connection_manager;
+  std::map<std::string, std::shared_ptr<Device>> m_devices;
+
+  std::map<std::string, Method> m_methods;
+
+  int m_listen_fd;
+  //! Self-pipe waking the accept loop up on stop
+  int m_wake_fds[2];
+  std::atomic<bool> m_stop_requested;
+
+  std::mutex m_clients_mutex;
+  std::vector<std::unique_ptr<Client>> m_clients;
+};
+
+} // namespace timing
+} // namespace dunedaq
+
+#endif // TIMING_INCLUDE_TIMING_CONTROLSERVER_HPP_
@@ -18,6 +18,7 @@
 // uHal Headers
 #include "uhal/DerivedNode.hpp"
 
+#include <chrono>
 #include <string>
 
 namespace dunedaq {
@@ -40,6 +41,10 @@ public:
    */
   uint64_t send_echo_and_measure_delay(int64_t timeout = 500) const; // NOLINT(build/unsigned)
 
+  //! Polling of the echo status
+  static const std::chrono::microseconds kEchoFirstInterval;
+  static const std::chrono::microseconds kEchoMaxInterval;
+
   /**
    * @brief     Get status string, optionally print.
    */
@@ -60,6 +60,19 @@ public:
     std::string regex_string = "endpoint[0-9]+";
     return uhal::Node::getNodes(regex_string).size();
   }
+
+  /**
+   * @brief      Start the background samplers of the clock frequencies of the IO and endpoint nodes.
+   */
+  void start_frequency_samplers() const override
+  {
+    TopDesignInterface::start_frequency_samplers();
+    for (uint32_t i = 0; i < get_number_of_endpoint_nodes(); ++i) { // NOLINT(build/unsigned)
+      auto endpoint = dynamic_cast<const EndpointNode*>(get_endpoint_node_plain(i));
+      if (endpoint)
+        endpoint->start_clock_frequency_sampler();
+    }
+  }
 };
 
 /**
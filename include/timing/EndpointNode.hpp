@@ -27,6 +27,7 @@
 
 // C++ Headers
 #include <chrono>
+#include <functional>
 #include <string>
 
 namespace dunedaq {
@@ -97,12 +98,26 @@ public:
   virtual std::string get_data_buffer_table(bool read_all = false, bool print_out = false) const;
 
   /**
-   * @brief      Read the endpoint clock frequency.
+   * @brief      Read the endpoint clock frequency, from the frequency counter sampler cache
+   *             if the sampler of the freq node is running, measured otherwise.
    *
    * @return     { description_of_the_return_value }
    */
   virtual double read_clock_frequency() const;
 
+  /**
+   * @brief      Measure the endpoint clock frequency, waiting for the counter.
+   *
+   * @return     { description_of_the_return_value }
+   */
+  virtual double measure_clock_frequency() const;
+
+  /**
+   * @brief      Start the background sampler of the endpoint clock frequency, so that
+   *             read_clock_frequency serves it without waiting for the counter.
+   */
+  virtual void start_clock_frequency_sampler() const;
+
   /**
    * @brief      Read the endpoint wrapper version
    *
@@ -120,6 +135,17 @@ public:
    * @brief    Give info to collector.
    */
   void get_info(opmonlib::InfoCollector& ci, int level) const override;
+
+  /**
+   * @brief    Add the monitoring reads to a monitoring plan.
+   */
+  void add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const override;
+
+private:
+  /**
+   * @brief     Queue the reads of the monitoring structure; the returned function fills it once dispatched.
+   */
+  std::function<void()> queue_info(timingendpointinfo::TimingEndpointInfo& mon_data) const;
 };
 
 } // namespace timing
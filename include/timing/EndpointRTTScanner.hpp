@@ -0,0 +1,157 @@
+/**
+ * @file EndpointRTTScanner.hpp
+ *
+ * EndpointRTTScanner is a class measuring the round trip time of
+ * a list of endpoints in a single pass.
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#ifndef TIMING_INCLUDE_TIMING_ENDPOINTRTTSCANNER_HPP_
+#define TIMING_INCLUDE_TIMING_ENDPOINTRTTSCANNER_HPP_
+
+// PDT Headers
+#include "timing/EchoMonitorNode.hpp"
+#include "timing/GlobalNode.hpp"
+
+#include <boost/noncopyable.hpp>
+
+// C++ Headers
+#include <chrono>
+#include <string>
+#include <vector>
+
+namespace dunedaq {
+namespace timing {
+
+class MasterDesignInterface;
+class MuxDesignInterface;
+
+/**
+ * @brief      Endpoint to measure: address and, on mux designs, SFP mux channel (-1 for none).
+ */
+struct EndpointRTTTarget
+{
+  uint32_t address; // NOLINT(build/unsigned)
+  int sfp_mux;
+
+  explicit EndpointRTTTarget(uint32_t aAddress = 0, int aSFPMux = -1) // NOLINT(build/unsigned)
+    : address(aAddress)
+    , sfp_mux(aSFPMux)
+  {}
+};
+
+/**
+ * @brief      Polling, timeout and retry settings of an RTT scan.
+ *
+ * Status polls start at first_poll_interval and double after each unsuccessful poll, up to
+ * max_poll_interval; the first poll is issued right after the command it waits for.
+ */
+struct EndpointRTTScanConfig
+{
+  std::chrono::microseconds first_poll_interval = std::chrono::microseconds(20);
+  std::chrono::microseconds max_poll_interval = std::chrono::microseconds(20000);
+  //! time given to the upstream endpoint to lock, SFP switching included
+  std::chrono::milliseconds lock_timeout = std::chrono::milliseconds(1000);
+  std::chrono::milliseconds echo_timeout = std::chrono::milliseconds(500);
+  //! measurements per endpoint before giving up on it
+  uint32_t max_attempts = 3; // NOLINT(build/unsigned)
+  //! switch the endpoint SFP tx on for the measurement, and off afterwards
+  bool control_sfp = true;
+};
+
+/**
+ * @brief      Outcome of the RTT measurement of an endpoint.
+ */
+struct EndpointRTTMeasurement
+{
+  uint32_t address; // NOLINT(build/unsigned)
+  int sfp_mux;
+  bool success;
+  uint32_t rtt;        // NOLINT(build/unsigned)
+  uint32_t attempts;   // NOLINT(build/unsigned)
+  uint32_t lock_polls; // NOLINT(build/unsigned)
+  uint32_t echo_polls; // NOLINT(build/unsigned)
+  double lock_time;    // seconds, last attempt
+  double echo_time;    // seconds, last attempt
+  double total_time;   // seconds, all attempts and SFP/mux switching included
+  std::string error;   // last error, empty on success
+};
+
+/**
+ * @brief      Measurements and timing statistics of an RTT scan.
+ */
+struct EndpointRTTScanReport
+{
+  //! in scan order
+  std::vector<EndpointRTTMeasurement> measurements;
+  uint32_t succeeded;    // NOLINT(build/unsigned)
+  uint32_t failed;       // NOLINT(build/unsigned)
+  uint32_t retries;      // NOLINT(build/unsigned)
+  uint32_t mux_switches; // NOLINT(build/unsigned)
+  uint32_t min_rtt;      // NOLINT(build/unsigned)
+  uint32_t max_rtt;      // NOLINT(build/unsigned)
+  double mean_rtt;
+  double elapsed;            // seconds
+  double mean_lock_time;     // seconds
+  double max_lock_time;      // seconds
+  double mean_echo_time;     // seconds
+  double max_echo_time;      // seconds
+  double mean_endpoint_time; // seconds
+  double max_endpoint_time;  // seconds
+};
+
+/**
+ * @brief      Measures the round trip time of a list of endpoints.
+ *
+ * The upstream endpoint lock and the echo are waited for with adaptive polling rather than
+ * fixed sleeps; the echo timestamps are read together with its status, so that a prompt
+ * echo costs a single dispatch. On mux designs, endpoints are grouped by SFP mux channel,
+ * starting with the active one, so that each channel is switched to at most once.
+ * An endpoint failing to lock or echo is retried on its own, and the scan goes on.
+ */
+class EndpointRTTScanner : boost::noncopyable
+{
+public:
+  explicit EndpointRTTScanner(const MasterDesignInterface& design,
+                              const EndpointRTTScanConfig& config = EndpointRTTScanConfig());
+  virtual ~EndpointRTTScanner();
+
+  /**
+   * @brief      Measure the RTT of all targets.
+   */
+  EndpointRTTScanReport scan(const std::vector<EndpointRTTTarget>& targets) const;
+
+  /**
+   * @brief      Order targets by SFP mux channel, starting with active_sfp_mux; the order
+   *             within a channel is kept.
+   */
+  static std::vector<EndpointRTTTarget> order_targets(const std::vector<EndpointRTTTarget>& targets,
+                                                      int active_sfp_mux = -1);
+
+  /**
+   * @brief      Format a scan report as tables.
+   */
+  static std::string format_report(const EndpointRTTScanReport& report, bool print_out = false);
+
+  const EndpointRTTScanConfig& get_config() const { return m_config; }
+
+private:
+  void measure(const EndpointRTTTarget& target, EndpointRTTMeasurement& measurement) const;
+  void wait_for_lock(EndpointRTTMeasurement& measurement) const;
+  void send_echo(EndpointRTTMeasurement& measurement) const;
+
+  const MasterDesignInterface& m_design;
+  const MuxDesignInterface* m_mux_design;
+  const EndpointRTTScanConfig m_config;
+
+  const GlobalNode& m_global;
+  const EchoMonitorNode& m_echo;
+};
+
+} // namespace timing
+} // namespace dunedaq
+
+#endif // TIMING_INCLUDE_TIMING_ENDPOINTRTTSCANNER_HPP_
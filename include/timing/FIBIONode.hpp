@@ -79,6 +79,11 @@ public:
      */
     void switch_sfp_soft_tx_control_bit(uint32_t sfp_id, bool turn_on) const override; // NOLINT(build/unsigned)
 
+    /**
+     * @brief      Read the status of the 8 fanout SFPs in one pass.
+     */
+    std::vector<SFPSweepResult> sweep_sfps(bool skip_lost=true) const override;
+
     /**
      * @brief      reset on-board PLL using I2C IO expanders
      */
@@ -72,6 +72,11 @@ public:
    * @brief    Give info to collector.
    */
   void get_info(opmonlib::InfoCollector& ic, int level) const override;
+
+  /**
+   * @brief    Add the monitoring reads to a monitoring plan.
+   */
+  void add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const override;
 };
 
 } // namespace timing
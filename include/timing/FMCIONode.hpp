@@ -71,6 +71,11 @@ public:
    * @brief    Give info to collector.
    */
   void get_info(opmonlib::InfoCollector& ci, int level) const override;
+
+  /**
+   * @brief    Add the monitoring information to a monitoring plan, I2C data as sampled steps.
+   */
+  void add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const override;
 };
 
 } // namespace timing
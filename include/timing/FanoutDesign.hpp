@@ -47,9 +47,9 @@ public:
   std::string get_status(bool print_out = false) const override;
 
   /**
-   * @brief    Give info to collector.
-   */  
-  void get_info(opmonlib::InfoCollector& ci, int level) const override;
+   * @brief    Add the monitoring information of the design sub-nodes to a monitoring plan.
+   */
+  void add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const override;
 
   /**
    * @brief      Prepare the timing fanout for data taking.
@@ -14,6 +14,7 @@
 
 // PDT Headers
 #include "TimingIssues.hpp"
+#include "timing/I2CMultiBusExecutor.hpp"
 #include "timing/IONode.hpp"
 
 // uHal Headers
@@ -27,6 +28,24 @@
 namespace dunedaq {
 namespace timing {
 
+/**
+ * @brief      Result of an SFP sweep for one SFP position.
+ */
+struct SFPSweepResult
+{
+  //! SFP id, as used by get_sfp_status
+  uint32_t sfp_id; // NOLINT(build/unsigned)
+  std::string label;
+  //! loss of signal flag, positions flagged are not read when skipping lost SFPs
+  bool los;
+  bool read;
+  bool reachable;
+  bool ddm_valid;
+  SFPStaticInfo static_info;
+  SFPDDMSnapshot ddm;
+  std::string error;
+};
+
 /**
  * @brief      Base class for the fanout boards.
  */
@@ -51,6 +70,35 @@ public:
    * @brief     Read the active SFP mux channel
    */
   virtual uint32_t read_active_sfp_mux_channel() const = 0; // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Read the status of all the SFPs of the board in one pass.
+   *
+   * @param[in]  skip_lost  Do not read SFP positions whose loss of signal flag is set
+   */
+  virtual std::vector<SFPSweepResult> sweep_sfps(bool skip_lost = true) const = 0;
+
+  /**
+   * @brief      Format an SFP sweep as a table.
+   */
+  static std::string format_sfp_sweep(const std::vector<SFPSweepResult>& results);
+
+  /**
+   * @brief      Sweep all SFPs and format the results, optionally print.
+   */
+  std::string get_sfp_sweep_status(bool skip_lost = true, bool print_out = false) const;
+
+protected:
+  /**
+   * @brief      Read the static data and diagnostics of the SFP currently reachable on an I2C bus.
+   */
+  void read_sfp_sweep_entry(const std::string& i2c_bus_name, SFPSweepResult& result) const;
+
+  /**
+   * @brief      Read the SFPs of several I2C buses, the buses working concurrently.
+   */
+  void read_sfp_sweep_entries(const std::vector<std::string>& i2c_bus_names,
+                              const std::vector<SFPSweepResult*>& results) const;
 };
 
 } // namespace timing
@@ -21,6 +21,9 @@
 
 // C++ Headers
 #include <chrono>
+#include <condition_variable>
+#include <memory>
+#include <mutex>
 #include <string>
 #include <thread>
 #include <vector>
@@ -29,13 +32,23 @@ namespace dunedaq {
 namespace timing {
 
 /**
- * @brief      Base class for timing IO nodes.
+ * @brief      Interface to the frequency counter firmware block.
+ *
+ * Frequencies can either be measured on demand (measure_frequencies), which takes
+ * kMeasurementTime per channel, or served from a background sampler, started and stopped
+ * explicitly, that cycles over the channels and caches the latest measurement of each
+ * one (read_frequencies).
+ *
+ * Measurements, on demand or by the sampler, take turns on the counter: the channel
+ * selection is reserved for the duration of a measurement, while the counter registers
+ * are only locked around their accesses.
  */
 class FrequencyCounterNode : public TimingNode
 {
   UHAL_DERIVEDNODE(FrequencyCounterNode)
 public:
   explicit FrequencyCounterNode(const uhal::Node& node);
+  FrequencyCounterNode(const FrequencyCounterNode& node);
   virtual ~FrequencyCounterNode();
 
   /**
@@ -49,6 +62,102 @@ public:
    * @return     { description_of_the_return_value }
    */
   std::vector<double> measure_frequencies(uint8_t number_of_clocks) const; // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Read clock frequencies from the background sampler cache.
+   *
+   * Channels without a valid sample younger than max_age, e.g. not yet sampled or not
+   * covered by the sampler, are reported as -1. While the sampler is not running, the
+   * frequencies are measured on demand instead.
+   *
+   * @param[in]  number_of_clocks  Number of channels to read
+   * @param[in]  max_age           Staleness bound [ms], 0 for twice the sampler cycle
+   */
+  std::vector<double> read_frequencies(uint8_t number_of_clocks, // NOLINT(build/unsigned)
+                                       uint32_t max_age = 0) const; // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Start the background sampler over the first number_of_clocks channels,
+   *             or extend the running sampler to cover them.
+   */
+  void start_sampler(uint8_t number_of_clocks) const; // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Stop the background sampler and drop the cached samples.
+   */
+  void stop_sampler() const;
+
+  /**
+   * @brief      Whether the background sampler is running.
+   */
+  bool is_sampler_running() const;
+
+  //! Time needed by the firmware to measure the selected channel
+  static const std::chrono::milliseconds kMeasurementTime;
+
+private:
+  void select_channel(uint8_t channel) const; // NOLINT(build/unsigned)
+  double read_selected_frequency() const;
+
+  /**
+   * @brief      Select a channel and reserve the counter, once the measurement in progress, if any, is over.
+   *
+   * On-demand measurements go before the sampler ones.
+   */
+  void start_measurement(uint8_t channel) const; // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Select a channel and reserve the counter, unless it is in use or awaited by an on-demand measurement.
+   *
+   * @return     Zero if the measurement started, otherwise the time to wait before trying again
+   */
+  std::chrono::steady_clock::duration try_start_measurement(uint8_t channel) const; // NOLINT(build/unsigned)
+
+  void begin_measurement(uint8_t channel) const; // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Read the frequency of the started measurement, kMeasurementTime after its start, and release the counter.
+   */
+  double finish_measurement() const;
+
+  /**
+   * @brief      Release the counter without reading the started measurement.
+   */
+  void cancel_measurement() const;
+
+  void run_sampler() const;
+
+  struct FrequencySample
+  {
+    double frequency = -1;
+    std::chrono::steady_clock::time_point timestamp;
+    bool valid = false;
+  };
+
+  struct SamplerState
+  {
+    //! Held while the counter registers are accessed, shared with measure_frequencies
+    std::mutex hardware_mutex;
+    //! A measurement is in progress, until measurement_end, and on-demand measurements
+    //! are waiting for the counter; guarded by hardware_mutex
+    bool measuring = false;
+    std::chrono::steady_clock::time_point measurement_end;
+    uint32_t waiting_measurements = 0; // NOLINT(build/unsigned)
+    std::condition_variable hardware_condition;
+    //! Guards the members below
+    std::mutex mutex;
+    std::condition_variable condition;
+    std::thread thread;
+    bool running = false;
+    bool stop_requested = false;
+    uint8_t number_of_clocks = 0; // NOLINT(build/unsigned)
+    std::vector<FrequencySample> samples;
+  };
+
+  std::unique_ptr<SamplerState> m_sampler;
+
+  //! Shortest wait before trying again to start a measurement
+  static const std::chrono::milliseconds kMeasurementRetryInterval;
 };
 
 } // namespace timing
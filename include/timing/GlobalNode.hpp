@@ -18,6 +18,7 @@
 // uHal Headers
 #include "uhal/DerivedNode.hpp"
 
+#include <chrono>
 #include <string>
 
 namespace dunedaq {
@@ -47,6 +48,10 @@ public:
    */
   void enable_upstream_endpoint(uint32_t timeout = 500); // NOLINT(build/unsigned)
 
+  //! Polling of the upstream endpoint lock
+  static const std::chrono::microseconds kUpstreamLockFirstInterval;
+  static const std::chrono::microseconds kUpstreamLockMaxInterval;
+
   /**
    * @brief     Get status string, optionally print.
    */
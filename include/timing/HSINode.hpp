@@ -25,7 +25,9 @@
 
 // C++ Headers
 #include <chrono>
+#include <functional>
 #include <string>
+#include <vector>
 
 namespace dunedaq {
 namespace timing {
@@ -84,6 +86,17 @@ public:
   uhal::ValVector<uint32_t> read_data_buffer(bool read_all = false, // NOLINT(build/unsigned)
                                              bool fail_on_error = false) const;
 
+  /**
+   * @brief      Read n_words words from the data buffer and, in the same dispatch, the buffer state
+   *             left after the read.
+   *
+   * n_words must not exceed the number of words known to be in the buffer.
+   *
+   * @return     Buffer state, packed as by read_buffer_state
+   */
+  uint32_t read_data_buffer_and_state(std::vector<uint32_t>& data,  // NOLINT(build/unsigned)
+                                      uint32_t n_words) const;     // NOLINT(build/unsigned)
+
   /**
    * @brief      Print the contents of the endpoint data buffer.
    *
@@ -149,7 +162,17 @@ public:
    * @brief    Give info to collector.
    */
   void get_info(opmonlib::InfoCollector& ci, int level) const override;
-  
+
+  /**
+   * @brief    Add the monitoring reads to a monitoring plan.
+   */
+  void add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const override;
+
+private:
+  /**
+   * @brief     Queue the reads of the monitoring structure; the returned function fills it once dispatched.
+   */
+  std::function<void()> queue_info(timingfirmwareinfo::HSIFirmwareMonitorData& mon_data) const;
 };
 
 } // namespace timing
@@ -0,0 +1,171 @@
+/**
+ * @file HSIStreamReader.hpp
+ *
+ * HSIStreamReader is a class continuously draining the HSI
+ * data buffer into a queue of decoded events.
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#ifndef TIMING_INCLUDE_TIMING_HSISTREAMREADER_HPP_
+#define TIMING_INCLUDE_TIMING_HSISTREAMREADER_HPP_
+
+// PDT Headers
+#include "timing/HSINode.hpp"
+#include "timing/RingBuffer.hpp"
+
+#include <boost/noncopyable.hpp>
+
+// C++ Headers
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <functional>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+namespace dunedaq {
+namespace timing {
+
+/**
+ * @brief      Decoded HSI event, made of g_hsi_event_size buffer words.
+ */
+struct HSIEvent
+{
+  uint32_t header;     // NOLINT(build/unsigned)
+  uint64_t timestamp;  // NOLINT(build/unsigned)
+  uint32_t signal_map; // NOLINT(build/unsigned)
+  uint32_t counter;    // NOLINT(build/unsigned)
+};
+
+/**
+ * @brief      Counters of an HSI stream.
+ */
+struct HSIStreamStats
+{
+  uint64_t events;           // NOLINT(build/unsigned)
+  uint64_t words;            // NOLINT(build/unsigned)
+  uint64_t dispatches;       // NOLINT(build/unsigned)
+  uint64_t empty_polls;      // NOLINT(build/unsigned)
+  uint64_t buffer_warnings;  // NOLINT(build/unsigned)
+  uint64_t buffer_errors;    // NOLINT(build/unsigned)
+  uint64_t buffer_overflows; // NOLINT(build/unsigned)
+  uint64_t dropped_events;   // NOLINT(build/unsigned)
+  uint64_t read_failures;    // NOLINT(build/unsigned)
+};
+
+/**
+ * @brief      Streaming reader of the HSI data buffer.
+ *
+ * A reader thread polls the HSI buffer, reading the words known to be available
+ * together with the new buffer state in a single dispatch. Complete events are decoded
+ * and pushed into a lock-free ring buffer, from which consumers pop them, either
+ * directly or through a callback run on a dedicated thread. The polling interval
+ * shrinks to zero while data is flowing and backs off exponentially when idle.
+ *
+ * Buffer warning, error and overflow flags, as well as events dropped because the ring
+ * buffer was full, are counted in the stream statistics.
+ */
+class HSIStreamReader : boost::noncopyable
+{
+public:
+  typedef std::function<void(const HSIEvent&)> EventCallback;
+
+  explicit HSIStreamReader(const HSINode& node, size_t capacity = kDefaultCapacity);
+  virtual ~HSIStreamReader();
+
+  /**
+   * @brief      Start the reader thread.
+   *
+   * @param[in]  callback  If set, called from a consumer thread for every event
+   */
+  void start(EventCallback callback = nullptr);
+
+  /**
+   * @brief      Stop the reader thread, and the consumer thread if any.
+   *
+   * Events already in the ring buffer stay available to pop.
+   */
+  void stop();
+
+  bool is_running() const { return m_running; }
+
+  /**
+   * @brief      Pop the oldest event; returns false if none is queued.
+   */
+  bool pop(HSIEvent& event);
+
+  /**
+   * @brief      Pop up to max_events events (0 for all) and append them to events.
+   *
+   * @return     Number of events popped
+   */
+  size_t pop_events(std::vector<HSIEvent>& events, size_t max_events = 0);
+
+  /**
+   * @brief      Wait until events are queued, the reader stops, or the timeout expires.
+   *
+   * @return     Whether events are queued
+   */
+  bool wait_for_events(std::chrono::milliseconds timeout);
+
+  /**
+   * @brief      Number of queued events.
+   */
+  size_t size() const { return m_events.size(); }
+
+  /**
+   * @brief      Snapshot of the stream counters.
+   */
+  HSIStreamStats get_stats() const;
+
+  /**
+   * @brief      Decode the g_hsi_event_size words of an event.
+   */
+  static HSIEvent decode_event(const uint32_t* words); // NOLINT(build/unsigned)
+
+  static const size_t kDefaultCapacity;
+  //! Depth of the HSI firmware buffer, in words
+  static const uint32_t kBufferDepth; // NOLINT(build/unsigned)
+  static const std::chrono::microseconds kMinPollInterval;
+  static const std::chrono::microseconds kMaxPollInterval;
+
+private:
+  void run_reader();
+  void run_consumer(EventCallback callback);
+  void notify_consumers();
+
+  const HSINode& m_node;
+  RingBuffer<HSIEvent> m_events;
+
+  std::atomic<bool> m_running;
+  std::atomic<bool> m_stop_requested;
+  std::atomic<bool> m_reader_done;
+  std::thread m_reader_thread;
+  std::thread m_consumer_thread;
+
+  //! Serialises the consumers, the ring buffer only supports one at a time
+  std::mutex m_consumer_mutex;
+  //! Wakes up consumers and interrupts the reader back-off
+  std::mutex m_wait_mutex;
+  std::condition_variable m_events_condition;
+  std::condition_variable m_stop_condition;
+
+  std::atomic<uint64_t> m_n_events;           // NOLINT(build/unsigned)
+  std::atomic<uint64_t> m_n_words;            // NOLINT(build/unsigned)
+  std::atomic<uint64_t> m_n_dispatches;       // NOLINT(build/unsigned)
+  std::atomic<uint64_t> m_n_empty_polls;      // NOLINT(build/unsigned)
+  std::atomic<uint64_t> m_n_buffer_warnings;  // NOLINT(build/unsigned)
+  std::atomic<uint64_t> m_n_buffer_errors;    // NOLINT(build/unsigned)
+  std::atomic<uint64_t> m_n_buffer_overflows; // NOLINT(build/unsigned)
+  std::atomic<uint64_t> m_n_dropped_events;   // NOLINT(build/unsigned)
+  std::atomic<uint64_t> m_n_read_failures;    // NOLINT(build/unsigned)
+};
+
+} // namespace timing
+} // namespace dunedaq
+
+#endif // TIMING_INCLUDE_TIMING_HSISTREAMREADER_HPP_
@@ -0,0 +1,88 @@
+/**
+ * @file HardwareIdentity.hpp
+ *
+ * HardwareIdentity is a record of the board, carrier, firmware design
+ * and firmware configuration of a timing device.
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#ifndef TIMING_INCLUDE_TIMING_HARDWAREIDENTITY_HPP_
+#define TIMING_INCLUDE_TIMING_HARDWAREIDENTITY_HPP_
+
+// C++ Headers
+#include <map>
+#include <memory>
+#include <mutex>
+#include <string>
+
+namespace dunedaq {
+namespace timing {
+
+/**
+ * @brief      Identity of a timing device: what the board is and what firmware it runs.
+ *
+ * The io.config words are always present. The board UID, read over I2C, is only filled in
+ * when first needed (board_uid_valid), and the firmware version and generics only when the
+ * record is fetched through the top design (firmware_info_valid).
+ */
+struct HardwareIdentity
+{
+  uint32_t board_type;         // NOLINT(build/unsigned)
+  uint32_t carrier_type;       // NOLINT(build/unsigned)
+  uint32_t design_type;        // NOLINT(build/unsigned)
+  uint32_t firmware_frequency; // NOLINT(build/unsigned) Hz
+
+  bool board_uid_valid;
+  uint64_t board_uid; // NOLINT(build/unsigned)
+
+  bool firmware_info_valid;
+  uint32_t firmware_version; // NOLINT(build/unsigned)
+  //! firmware generics, e.g. the fields of master global.config
+  std::map<std::string, uint32_t> generics; // NOLINT(build/unsigned)
+
+  HardwareIdentity()
+    : board_type(0)
+    , carrier_type(0)
+    , design_type(0)
+    , firmware_frequency(0)
+    , board_uid_valid(false)
+    , board_uid(0)
+    , firmware_info_valid(false)
+    , firmware_version(0)
+  {}
+};
+
+/**
+ * @brief      Holder of the cached identity of a device.
+ *
+ * Records are immutable once stored; updates replace them. Copies of the holder start empty,
+ * so that nodes cloned from an address table do not share the identity of another device.
+ */
+class HardwareIdentityCache
+{
+public:
+  HardwareIdentityCache() {}
+  HardwareIdentityCache(const HardwareIdentityCache&) {}
+  HardwareIdentityCache& operator=(const HardwareIdentityCache&) { return *this; }
+
+  /**
+   * @brief      Cached record, nullptr if none.
+   */
+  std::shared_ptr<const HardwareIdentity> get() const;
+
+  void store(std::shared_ptr<const HardwareIdentity> identity);
+
+  void clear();
+
+private:
+  mutable std::mutex m_mutex;
+  std::shared_ptr<const HardwareIdentity> m_identity;
+};
+
+} // namespace timing
+} // namespace dunedaq
+
+#endif // TIMING_INCLUDE_TIMING_HARDWAREIDENTITY_HPP_
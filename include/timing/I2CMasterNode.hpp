@@ -28,8 +28,16 @@
 #include "ers/Issue.hpp"
 #include "uhal/DerivedNode.hpp"
 
+#include <boost/core/noncopyable.hpp>
+
+#include <atomic>
+#include <chrono>
+#include <memory>
+#include <mutex>
 #include <string>
+#include <thread>
 #include <unordered_map>
+#include <utility>
 #include <vector>
 
 namespace dunedaq {
@@ -54,6 +62,25 @@ public:
 
   void reset() const;
 
+  /**
+   * @brief      Check whether a bus session is currently open on this master.
+   */
+  bool in_session() const { return get_bus_state().session_depth > 0; }
+
+  /**
+   * @brief      Generation of the bus, changed by bus errors, reconfigurations of the core and device resets.
+   *
+   * State cached from the devices on the bus (e.g. the page of a paged device) is valid while
+   * the generation it was read at is current. The routine reset done when a session is opened
+   * leaves the devices untouched, and keeps the generation.
+   */
+  uint64_t get_bus_generation() const; // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Start a new bus generation, after the devices on the bus were reset by other means.
+   */
+  void invalidate_device_state() const;
+
   /// commodity functions
   virtual uint8_t read_i2c(uint8_t i2c_device_address, uint32_t i2c_reg_address) const; // NOLINT(build/unsigned)
   virtual void write_i2c(uint8_t i2c_device_address,                                    // NOLINT(build/unsigned)
@@ -75,6 +102,25 @@ public:
                                   const std::vector<uint8_t>& data,               // NOLINT(build/unsigned)
                                   bool send_stop = true) const;
 
+  /// List of (register address, payload) pairs, each sent as an independent write transfer
+  typedef std::vector<std::pair<uint32_t, std::vector<uint8_t>>> RegisterWriteList; // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Write a list of register blocks to a single device, with the batched
+   *             transaction engine if enabled.
+   *
+   * @param      n_written  If set, updated with the number of blocks written, also when throwing
+   */
+  virtual void write_i2cArrays(uint8_t i2c_device_address, // NOLINT(build/unsigned)
+                               const RegisterWriteList& writes,
+                               size_t* n_written = nullptr) const;
+
+  /**
+   * @brief      Enable or disable the batched transaction engine (enabled by default).
+   */
+  void set_batched_transactions(bool enable) const { m_batched_transactions = enable; }
+  bool get_batched_transactions() const { return m_batched_transactions; }
+
   bool ping(uint8_t i2c_device_address) const; // NOLINT(build/unsigned)
 
   std::vector<uint8_t> scan() const; // NOLINT(build/unsigned)
@@ -90,13 +136,91 @@ protected:
   uint8_t send_i2c_command_and_read_data(uint8_t command) const;             // NOLINT(build/unsigned)
   void send_i2c_command_and_write_data(uint8_t command, uint8_t data) const; // NOLINT(build/unsigned)
 
+  // step-by-step i2c functions, one dispatch per bus operation, no bus reset
+  std::vector<uint8_t> read_block_i2c_stepwise(uint8_t i2c_device_address,      // NOLINT(build/unsigned)
+                                               uint32_t number_of_bytes) const; // NOLINT(build/unsigned)
+  void write_block_i2c_stepwise(uint8_t i2c_device_address,                     // NOLINT(build/unsigned)
+                                const std::vector<uint8_t>& data,               // NOLINT(build/unsigned)
+                                bool send_stop = true) const;
+
+  /// Single byte-level bus operation of a batched transfer
+  struct I2CByteOp
+  {
+    uint8_t command; // NOLINT(build/unsigned)
+    uint8_t data;    // NOLINT(build/unsigned)
+  };
+  typedef std::vector<I2CByteOp> I2CTransfer;
+
+  I2CTransfer build_write_transfer(uint8_t i2c_device_address,       // NOLINT(build/unsigned)
+                                   const std::vector<uint8_t>& data, // NOLINT(build/unsigned)
+                                   bool send_stop) const;
+  I2CTransfer build_read_transfer(uint8_t i2c_device_address,      // NOLINT(build/unsigned)
+                                  uint32_t number_of_bytes) const; // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Core clock cycles a bus operation takes on the bus, from the clock prescale.
+   */
+  uint64_t get_operation_cycles(const I2CByteOp& op) const; // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Time a bus operation takes on the bus, from the clock prescale.
+   */
+  std::chrono::microseconds get_operation_duration(const I2CByteOp& op) const;
+
+  /**
+   * @brief      Number of status reads queued after a bus operation to wait for its completion.
+   *
+   * The core runs on the IPbus clock, which executes at most one read per cycle: a train with
+   * one read per cycle of the operation lasts at least as long as the operation.
+   */
+  uint32_t get_status_train_length(const I2CByteOp& op) const; // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Run the transfers, one dispatch each, stopping at the first failure.
+   *
+   * The bus operations of a transfer are separated by trains of status reads; a transfer fails
+   * if an operation is not seen complete and successful by the end of its train.
+   *
+   * @return     Number of leading transfers that completed successfully. Data read back by those
+   *             transfers is stored in read_data.
+   */
+  size_t execute_batched_transfers(const std::vector<I2CTransfer>& transfers,
+                                   std::vector<std::vector<uint8_t>>& read_data) const; // NOLINT(build/unsigned)
+
   //! Slaves
   std::unordered_map<std::string, uint8_t> m_i2c_device_addresses; // NOLINT(build/unsigned)
 
 private:
+  /**
+   * @brief      State of an I2C core, shared by all the nodes driving it in the process.
+   *
+   * Node trees are cloned by uhal, and several trees can be built for the same device:
+   * the state is looked up by client URI and node path, so that all the copies of a master
+   * serialise their transfers on the same mutex.
+   */
+  struct BusState
+  {
+    //! held for the duration of each transfer and bus session
+    std::recursive_mutex mutex;
+    //! number of open bus sessions, modified with the mutex held
+    std::atomic<uint32_t> session_depth; // NOLINT(build/unsigned)
+    //! a bus error occurred since the last reset, guarded by the mutex
+    bool reset_pending;
+    //! bus generation, guarded by the mutex
+    uint64_t generation; // NOLINT(build/unsigned)
+  };
+
   ///
   void constructor();
 
+  BusState& get_bus_state() const;
+
+  // reset the bus if an error occurred since the last reset; called with a session open
+  void prepare_bus() const;
+
+  // record a bus error: the bus is reset before the next transfer, and a new generation started
+  void mark_bus_error() const;
+
   // low level i2c functions
   void wait_until_finished(bool require_acknowledgement = true, bool require_bus_idle_at_end = false) const;
 
@@ -122,14 +246,70 @@ private:
   static const uint8_t kInProgressBit;      // inprogress = 0x1 << 1 // NOLINT(build/unsigned)
   static const uint8_t kInterruptBit;       // interrupt = 0x1       // NOLINT(build/unsigned)
 
+  //! Frequency of the clock of the I2C core, the IPbus clock
+  static const uint32_t kCoreClockFrequency; // NOLINT(build/unsigned)
+  //! Status polling of a step-by-step bus operation
+  static const std::chrono::microseconds kTransferWaitFirstInterval;
+  static const std::chrono::microseconds kTransferWaitMaxInterval;
+  static const uint32_t kTransferWaitMaxPolls; // NOLINT(build/unsigned)
+
   //! clock prescale factor
   uint16_t m_clock_prescale; // NOLINT(build/unsigned)
 
-  //! I2C slaves attached to this node
-  std::unordered_map<std::string, I2CSlave*>
+  //! batched transaction engine switch
+  mutable std::atomic<bool> m_batched_transactions;
+
+  //! shared bus state, looked up on first use as the client is not set at construction
+  mutable std::shared_ptr<BusState> m_bus_state;
+  mutable std::once_flag m_bus_state_flag;
+
+  //! I2C slaves attached to this node, created on first use by get_slave
+  mutable std::unordered_map<std::string, I2CSlave*>
     m_i2c_devices; // TODO, Eric Flumerfelt <eflumerf@fnal.gov> May-21-2021: Consider using smart pointers
+  mutable std::mutex m_i2c_devices_mutex;
 
   friend class I2CSlave;
+  friend class I2CBusSession;
+  friend class I2CMultiBusExecutor;
+};
+
+/**
+ * @class      I2CBusSession
+ *
+ * @brief      Scoped I2C bus session.
+ *
+ * The session holds the lock of the bus, shared by all the nodes driving the same I2C
+ * core in the process, so that the transfers of other threads wait for it to be closed.
+ * Every transfer runs in a session of its own, sequences of transfers which must not be
+ * interleaved with others (e.g. a mux selection and the access it routes) run in an
+ * enclosing one. Sessions can be nested, and must be closed by the thread opening them:
+ * closing a session from another thread throws, destroying it there reports an error and
+ * leaves the bus locked, as the lock can only be released by its owner.
+ *
+ * The bus is reset and the core configured once when the outermost session is opened.
+ * Transfers issued while the session is open skip the per-transfer bus reset,
+ * unless a bus error occurred since the last reset.
+ */
+class I2CBusSession : boost::noncopyable
+{
+public:
+  explicit I2CBusSession(const I2CMasterNode& i2c_master);
+  ~I2CBusSession();
+
+  /**
+   * @brief      Close the session before the end of its scope.
+   *
+   * @throws     I2CBusSessionWrongThread if called by a thread other than the opening one
+   */
+  void close();
+
+  bool is_open() const { return m_open; }
+
+private:
+  const I2CMasterNode& m_i2c_master;
+  std::unique_lock<std::recursive_mutex> m_lock;
+  std::thread::id m_owner;
+  bool m_open;
 };
 
 } // namespace timing
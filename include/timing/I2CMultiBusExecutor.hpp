@@ -0,0 +1,131 @@
+/**
+ * @file I2CMultiBusExecutor.hpp
+ *
+ * I2CMultiBusExecutor is a class running I2C transfers on several
+ * I2C master cores concurrently, sharing IPbus dispatches.
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#ifndef TIMING_INCLUDE_TIMING_I2CMULTIBUSEXECUTOR_HPP_
+#define TIMING_INCLUDE_TIMING_I2CMULTIBUSEXECUTOR_HPP_
+
+// PDT Headers
+#include "TimingIssues.hpp"
+#include "timing/I2CMasterNode.hpp"
+#include "timing/I2CSlave.hpp"
+
+#include "ers/Issue.hpp"
+
+#include <boost/noncopyable.hpp>
+
+// C++ Headers
+#include <string>
+#include <vector>
+
+namespace dunedaq {
+ERS_DECLARE_ISSUE(timing,                                                                     ///< Namespace
+                  I2CMultiBusClientMismatch,                                                  ///< Issue class name
+                  " I2C bus " << bus_id << " is not on the same IPbus client as the other buses", ///< Message
+                  ((std::string)bus_id)                                                       ///< Message parameters
+)
+namespace timing {
+
+/**
+ * @brief      Runs I2C jobs on several I2C master cores of the same device concurrently.
+ *
+ * Jobs are queued per I2C master and run in order on their bus; jobs on different buses
+ * progress together. Each dispatch issues the next bus operation of every bus, then the
+ * statuses of all the buses are polled until the operations are complete: a bus gets its
+ * next operation only once the core has finished the previous one, and a dispatch lasts
+ * about as long as one operation on the bus.
+ *
+ * A job failing in batched mode is not run further in batched mode: it is replayed step by
+ * step from the failed transfer, or from the register address write preceding a failed read,
+ * as done by I2CMasterNode. If that fails too, the job is marked as failed and the other jobs
+ * go on.
+ */
+class I2CMultiBusExecutor : boost::noncopyable
+{
+public:
+  typedef size_t JobId;
+
+  I2CMultiBusExecutor();
+  virtual ~I2CMultiBusExecutor();
+
+  /**
+   * @brief      Queue a register block read: register address write, then block read.
+   */
+  JobId add_read(const I2CMasterNode& master,
+                 uint8_t i2c_device_address,      // NOLINT(build/unsigned)
+                 uint32_t i2c_reg_address,        // NOLINT(build/unsigned)
+                 uint32_t number_of_bytes);       // NOLINT(build/unsigned)
+  JobId add_read(const I2CSlave& slave,
+                 uint32_t i2c_reg_address,        // NOLINT(build/unsigned)
+                 uint32_t number_of_bytes);       // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Queue register block writes to a single device, one transfer per block.
+   */
+  JobId add_writes(const I2CMasterNode& master,
+                   uint8_t i2c_device_address, // NOLINT(build/unsigned)
+                   const I2CMasterNode::RegisterWriteList& writes);
+  JobId add_writes(const I2CSlave& slave, const I2CMasterNode::RegisterWriteList& writes);
+
+  /**
+   * @brief      Run all queued jobs.
+   */
+  void execute();
+
+  /**
+   * @brief      Forget all jobs.
+   */
+  void clear();
+
+  size_t get_number_of_jobs() const { return m_jobs.size(); }
+
+  bool succeeded(JobId job) const { return m_jobs.at(job).done && m_jobs.at(job).error.empty(); }
+  const std::string& get_error(JobId job) const { return m_jobs.at(job).error; }
+
+  /**
+   * @brief      Bytes read by a job.
+   */
+  const std::vector<uint8_t>& get_data(JobId job) const { return m_jobs.at(job).data; } // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Number of dispatches issued by the last execution.
+   */
+  uint32_t get_number_of_dispatches() const { return m_dispatches; } // NOLINT(build/unsigned)
+
+private:
+  struct Job
+  {
+    const I2CMasterNode* master;
+    uint8_t i2c_device_address; // NOLINT(build/unsigned)
+    std::vector<I2CMasterNode::I2CTransfer> transfers;
+    //! payload of each write transfer, or number of bytes of each read transfer, for step-by-step replays
+    std::vector<std::vector<uint8_t>> write_blocks; // NOLINT(build/unsigned)
+    std::vector<uint32_t> read_sizes;               // NOLINT(build/unsigned)
+
+    bool done;
+    std::string error;
+    std::vector<uint8_t> data; // NOLINT(build/unsigned)
+  };
+
+  struct Lane;
+
+  JobId add_job(Job&& job);
+  void reset_buses(const std::vector<Lane>& lanes) const;
+  void run_step_by_step(Job& job, size_t first_transfer) const;
+
+  std::vector<Job> m_jobs;
+
+  uint32_t m_dispatches; // NOLINT(build/unsigned)
+};
+
+} // namespace timing
+} // namespace dunedaq
+
+#endif // TIMING_INCLUDE_TIMING_I2CMULTIBUSEXECUTOR_HPP_
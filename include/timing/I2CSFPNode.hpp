@@ -22,6 +22,7 @@
 #include "ers/Issue.hpp"
 
 #include <map>
+#include <mutex>
 #include <string>
 #include <utility>
 #include <vector>
@@ -29,6 +30,44 @@
 namespace dunedaq {
 namespace timing {
 
+/**
+ * @brief      Static SFP data, from the A0h ID page and the A2h calibration constants.
+ */
+struct SFPStaticInfo
+{
+  std::string vendor_name;
+  std::string vendor_pn;
+  std::string serial_number;
+  bool ddm_supported;
+  bool address_swap_required;
+  bool soft_tx_control_supported;
+
+  //! (slope, offset) pairs of laser current, tx power, temperature and voltage
+  std::vector<std::pair<double, double>> calibration_pairs;
+  //! rx power polynomial coefficients, lowest order first
+  std::vector<double> rx_power_coefficients;
+};
+
+/**
+ * @brief      Decoded SFP digital diagnostic monitoring (DDM) values.
+ */
+struct SFPDDMSnapshot
+{
+  double temperature_raw;
+  double voltage_raw;
+  double current_raw;
+  double tx_power_raw;
+  double rx_power_raw;
+
+  double temperature;    // C
+  double voltage;        // V
+  double current;        // uA
+  double tx_power;       // uW
+  double rx_power;       // uW
+  bool tx_disable_sw;
+  bool tx_disable_hw;
+};
+
 /**
  * @class      I2CSFPSlave
  *
@@ -177,6 +216,67 @@ public:
    */
   void switch_soft_tx_control_bit(bool turn_on) const;
 
+  /**
+   * @brief      Read the static SFP data.
+   *
+   * Only the serial number is read when the SFP is already known, the rest comes from a
+   * process-wide cache keyed by serial number. Otherwise the A0h ID fields and the A2h
+   * calibration constants are each read in a single block transfer.
+   */
+  SFPStaticInfo read_static_info() const;
+
+  /**
+   * @brief      Read and decode all DDM values from a single A2h block transfer.
+   */
+  SFPDDMSnapshot read_ddm_snapshot(const SFPStaticInfo& static_info) const;
+
+  /**
+   * @brief      Decode the DDM values of an A2h diagnostics block, starting at kDDMValuesAddress.
+   */
+  static SFPDDMSnapshot decode_ddm_snapshot(const std::vector<uint8_t>& ddm_values, // NOLINT(build/unsigned)
+                                            const SFPStaticInfo& static_info);
+
+  /**
+   * @brief      Decode the static data of an A0h ID block, starting at kIDBlockAddress.
+   */
+  static SFPStaticInfo decode_id_block(const std::vector<uint8_t>& id_block); // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Decode the calibration constants of an A2h calibration block, starting at kCalibrationBlockAddress.
+   */
+  void decode_calibration_block(const std::vector<uint8_t>& calibration_block, // NOLINT(build/unsigned)
+                                SFPStaticInfo& static_info) const;
+
+  /**
+   * @brief      Look up the cached static data of an SFP.
+   */
+  static bool find_static_info(const std::string& serial_number, SFPStaticInfo& static_info);
+
+  /**
+   * @brief      Cache the static data of an SFP, unless its serial number is blank.
+   */
+  static void store_static_info(const SFPStaticInfo& static_info);
+
+  /**
+   * @brief      Forget the static data of all SFPs.
+   */
+  static void clear_static_info_cache();
+
+  //! I2C address of the A2h diagnostics page
+  static const uint8_t kDDMI2CAddress; // NOLINT(build/unsigned)
+  //! A0h serial number
+  static const uint32_t kSerialNumberAddress; // NOLINT(build/unsigned)
+  static const uint32_t kSerialNumberSize;    // NOLINT(build/unsigned)
+  //! A0h ID block, vendor name up to enhanced options
+  static const uint32_t kIDBlockAddress; // NOLINT(build/unsigned)
+  static const uint32_t kIDBlockSize;    // NOLINT(build/unsigned)
+  //! A2h calibration constants block
+  static const uint32_t kCalibrationBlockAddress; // NOLINT(build/unsigned)
+  static const uint32_t kCalibrationBlockSize;    // NOLINT(build/unsigned)
+  //! A2h DDM values block, temperature up to optional status/control
+  static const uint32_t kDDMValuesAddress; // NOLINT(build/unsigned)
+  static const uint32_t kDDMValuesSize;    // NOLINT(build/unsigned)
+
   /**
    * @brief      Get SFP status
    */
@@ -194,6 +294,14 @@ public:
 
 protected:
   const std::vector<uint32_t> m_calibration_parameter_start_addresses; // NOLINT(build/unsigned)
+
+private:
+  static std::pair<double, double> decode_calibration_pair(const uint8_t* bytes); // NOLINT(build/unsigned)
+  static double decode_float(const uint8_t* bytes);                                // NOLINT(build/unsigned)
+  static std::string decode_text(const std::vector<uint8_t>& bytes, size_t start, size_t length); // NOLINT(build/unsigned)
+
+  static std::map<std::string, SFPStaticInfo> s_static_info_cache;
+  static std::mutex s_static_info_mutex;
 };
 
 /**
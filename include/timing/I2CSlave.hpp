@@ -32,6 +32,7 @@
 #include <boost/core/noncopyable.hpp>
 
 #include <string>
+#include <utility>
 #include <vector>
 
 namespace dunedaq {
@@ -71,6 +72,9 @@ public:
                       std::vector<uint8_t> data, // NOLINT(build/unsigned)
                       bool send_stop = true) const;
 
+  void write_i2cArrays(const std::vector<std::pair<uint32_t, std::vector<uint8_t>>>& writes, // NOLINT(build/unsigned)
+                       size_t* n_written = nullptr) const;
+
   std::vector<uint8_t> read_i2cPrimitive(uint32_t number_of_bytes) const;                 // NOLINT(build/unsigned)
   void write_i2cPrimitive(const std::vector<uint8_t>& data, bool send_stop = true) const; // NOLINT(build/unsigned)
 
@@ -78,6 +82,8 @@ public:
 
   std::string get_master_id() const;
 
+  const I2CMasterNode& get_master() const { return *m_i2c_master; }
+
   /**
    * @brief    Give info to collector.
    */
@@ -19,6 +19,7 @@
 
 #include "timing/DACNode.hpp"
 #include "timing/FrequencyCounterNode.hpp"
+#include "timing/HardwareIdentity.hpp"
 #include "timing/I2CExpanderNode.hpp"
 #include "timing/I2CMasterNode.hpp"
 #include "timing/I2CSFPNode.hpp"
@@ -30,6 +31,7 @@
 
 // C++ Headers
 #include <chrono>
+#include <functional>
 #include <memory>
 #include <string>
 #include <vector>
@@ -59,6 +61,25 @@ public:
    */
   virtual std::string get_uid_address_parameter_name() const = 0;
 
+  /**
+   * @brief      Queue the reads of the firmware part of a hardware identity, returning the function filling it after dispatch.
+   */
+  typedef std::function<std::function<void()>(HardwareIdentity&)> FirmwareIdentityQueue;
+
+  /**
+   * @brief      Get the hardware identity of the device, reading it on first use.
+   *
+   * The io.config words, and the firmware words queued by queue_firmware if given, are read
+   * in a single dispatch; the record is then kept until the next reset or invalidation.
+   * The board UID is not part of the read, see read_board_uid.
+   */
+  HardwareIdentity get_hardware_identity(const FirmwareIdentityQueue& queue_firmware = nullptr) const;
+
+  /**
+   * @brief      Forget the cached hardware identity, e.g. after reprogramming the FPGA.
+   */
+  void invalidate_hardware_identity() const;
+
   /**
    * @brief      Read the word identifying the timing board.
    *
@@ -88,7 +109,7 @@ public:
   virtual uint32_t read_firmware_frequency() const; // NOLINT(build/unsigned)
 
   /**
-   * @brief      Read the word containing the timing board UID.
+   * @brief      Read the word containing the timing board UID, with an I2C read on first use.
    *
    * @return     { description_of_the_return_value }
    */
@@ -134,10 +155,32 @@ public:
   virtual void configure_pll(const std::string& clock_config_file = "") const;
 
   /**
-   * @brief      Read frequencies of on-board clocks.
+   * @brief      Check whether the clock chip is locked and runs the design of the configuration file.
+   */
+  virtual bool is_pll_configured(const std::string& clock_config_file) const;
+
+  /**
+   * @brief      Configure clock chip, writing only the registers that differ from the configuration file.
+   */
+  virtual void configure_pll_incremental(const std::string& clock_config_file) const;
+
+  /**
+   * @brief      Read frequencies of on-board clocks, from the frequency counter sampler cache
+   *             if the sampler of the freq node is running, measured otherwise.
    */
   virtual std::vector<double> read_clock_frequencies() const;
 
+  /**
+   * @brief      Measure frequencies of on-board clocks, one channel after the other.
+   */
+  virtual std::vector<double> measure_clock_frequencies() const;
+
+  /**
+   * @brief      Start the background sampler of the on-board clock frequencies, so that
+   *             read_clock_frequencies serves them without waiting for the counter.
+   */
+  virtual void start_clock_frequency_sampler() const;
+
   /**
    * @brief      Print frequencies of on-board clocks.
    */
@@ -182,9 +225,39 @@ protected:
   const std::vector<std::string> m_sfp_i2c_buses;
 
   /**
-   * @brief      Write soft reset register.
+   * @brief      Write soft reset register, dropping the cached hardware identity.
    */
   virtual void write_soft_reset_register() const;
+
+  /**
+   * @brief      Forget the state cached from the devices on the PLL I2C bus (e.g. the PLL page), after they were reset.
+   */
+  void invalidate_pll_state() const;
+
+  /**
+   * @brief      Read the timing board UID from the UID PROM.
+   */
+  virtual uint64_t fetch_board_uid() const; // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Queue the reads of the io.config words of a hardware identity.
+   */
+  std::function<void()> queue_board_identity(HardwareIdentity& identity) const;
+
+  /**
+   * @brief      Read the PLL monitoring data, for a monitoring plan sampled step.
+   */
+  MonitoringPlan::FillFunction sample_pll_info() const;
+
+  /**
+   * @brief      Read the monitoring data of the SFP on an I2C bus, for a monitoring plan sampled step.
+   *
+   * @return     Function adding the data to a collector, or nullptr if the SFP is unreachable
+   */
+  MonitoringPlan::FillFunction sample_sfp_info(const std::string& i2c_bus_name) const;
+
+private:
+  mutable HardwareIdentityCache m_hardware_identity;
 };
 
 } // namespace timing
@@ -0,0 +1,139 @@
+/**
+ * @file IPbusProfiler.hpp
+ *
+ * IPbusProfiler records the IPbus traffic and the duration of the
+ * high-level operations of the timing nodes.
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#ifndef TIMING_INCLUDE_TIMING_IPBUSPROFILER_HPP_
+#define TIMING_INCLUDE_TIMING_IPBUSPROFILER_HPP_
+
+// uHal Headers
+#include "uhal/uhal.hpp"
+
+#include "opmonlib/InfoCollector.hpp"
+
+#include <boost/noncopyable.hpp>
+
+// C++ Headers
+#include <atomic>
+#include <chrono>
+#include <map>
+#include <mutex>
+#include <string>
+#include <vector>
+
+namespace dunedaq {
+namespace timing {
+
+/**
+ * @brief      IPbus traffic and duration statistics of an operation.
+ *
+ * Counts are inclusive: the traffic of an operation run from within another one is
+ * counted in both. buckets[i] counts the calls that lasted less than
+ * IPbusProfiler::kLatencyBucketEdges[i]; the last bucket counts the longer ones.
+ */
+struct IPbusOperationStats
+{
+  uint64_t calls;                // NOLINT(build/unsigned)
+  uint64_t failures;             // NOLINT(build/unsigned) calls left by an exception
+  uint64_t dispatches;           // NOLINT(build/unsigned)
+  uint64_t words_read;           // NOLINT(build/unsigned)
+  uint64_t words_written;        // NOLINT(build/unsigned)
+  double total_time;             // seconds
+  double dispatch_time;          // seconds, spent waiting for IPbus replies
+  double max_time;               // seconds
+  std::vector<uint64_t> buckets; // NOLINT(build/unsigned)
+};
+
+/**
+ * @brief      Per-operation IPbus round trip instrumentation.
+ *
+ * Operations are delimited by Scope objects; IPbus transactions are dispatched through
+ * IPbusProfiler::dispatch, which counts them against the scopes open on the calling thread.
+ * Words are counted where they are queued in groups: block transfers, the TimingNode
+ * register helpers and waits, and the I2C batches; isolated register accesses are not.
+ *
+ * Profiling is off by default, or on if TIMING_IPBUS_PROFILING is set to 1 in the
+ * environment. When off, scopes only test a flag, and dispatches find no open scope.
+ */
+class IPbusProfiler : boost::noncopyable
+{
+public:
+  /**
+   * @brief      Profiling scope of an operation, from construction to destruction.
+   *
+   * The operation name must outlive the scope; string literals are expected.
+   */
+  class Scope : boost::noncopyable
+  {
+  public:
+    explicit Scope(const char* operation);
+    ~Scope();
+
+  private:
+    friend class IPbusProfiler;
+
+    const char* m_operation;
+    bool m_active;
+    Scope* m_parent;
+    int m_uncaught_exceptions;
+    std::chrono::steady_clock::time_point m_start;
+
+    uint64_t m_dispatches;    // NOLINT(build/unsigned)
+    uint64_t m_words_read;    // NOLINT(build/unsigned)
+    uint64_t m_words_written; // NOLINT(build/unsigned)
+    double m_dispatch_time;
+  };
+
+  static void enable(bool enable = true);
+  static bool is_enabled() { return s_enabled.load(std::memory_order_relaxed); }
+
+  /**
+   * @brief      Dispatch the transactions queued on a client, counting them when profiling.
+   */
+  static void dispatch(uhal::ClientInterface& client);
+
+  /**
+   * @brief      Count words queued for the next dispatch.
+   */
+  static void count_words(uint64_t words_read, uint64_t words_written); // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Snapshot of the operation statistics, by operation.
+   */
+  static std::map<std::string, IPbusOperationStats> get_operation_stats();
+
+  static void reset();
+
+  /**
+   * @brief      Format the operation statistics as a table, one row per operation.
+   */
+  static std::string format_operation_stats(bool print_out = false);
+
+  /**
+   * @brief      Give the operation statistics to a collector, one child collector per operation.
+   */
+  static void get_info(opmonlib::InfoCollector& ic);
+
+  //! Upper edges of the operation duration histogram buckets
+  static const std::vector<std::chrono::microseconds> kLatencyBucketEdges;
+
+private:
+  static void record(const Scope& scope, double elapsed, bool failed);
+
+  static std::atomic<bool> s_enabled;
+  static thread_local Scope* s_current_scope;
+
+  static std::map<std::string, IPbusOperationStats> s_operation_stats;
+  static std::mutex s_operation_stats_mutex;
+};
+
+} // namespace timing
+} // namespace dunedaq
+
+#endif // TIMING_INCLUDE_TIMING_IPBUSPROFILER_HPP_
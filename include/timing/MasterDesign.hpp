@@ -126,9 +126,15 @@ public:
   void validate_firmware_version() const override;
 
   /**
-   * @brief    Give info to collector.
-   */  
-  void get_info(opmonlib::InfoCollector& ci, int level) const override;
+   * @brief    Add the monitoring information of the design sub-nodes to a monitoring plan.
+   */
+  void add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const override;
+
+protected:
+  /**
+   * @brief      Queue the reads of the master firmware version and generics (global.config).
+   */
+  std::function<void()> queue_firmware_identity(HardwareIdentity& identity) const override;
 };
 
 } // namespace timing
@@ -13,6 +13,7 @@
 #define TIMING_INCLUDE_TIMING_MASTERDESIGNINTERFACE_HPP_
 
 // PDT Headers
+#include "timing/EndpointRTTScanner.hpp"
 #include "timing/TopDesign.hpp"
 #include "timing/MasterNode.hpp"
 
@@ -23,6 +24,7 @@
 #include <chrono>
 #include <sstream>
 #include <string>
+#include <vector>
 
 namespace dunedaq {
 namespace timing {
@@ -60,6 +62,16 @@ public:
   virtual uint32_t measure_endpoint_rtt(uint32_t address, // NOLINT(build/unsigned)
                                         bool control_sfp = true,
                                         int sfp_mux = -1) const = 0;
+
+  /**
+   * @brief      Measure the round trip time of a list of endpoints, see EndpointRTTScanner.
+   */
+  virtual EndpointRTTScanReport scan_endpoint_rtts(const std::vector<EndpointRTTTarget>& targets,
+                                                   const EndpointRTTScanConfig& config = EndpointRTTScanConfig()) const
+  {
+    return EndpointRTTScanner(*this, config).scan(targets);
+  }
+
   /**
    * @brief      Apply delay to endpoint
    */
@@ -0,0 +1,295 @@
+/**
+ * @file MonitoringPlan.hpp
+ *
+ * MonitoringPlan is a class collecting the monitoring information
+ * of a tree of timing nodes with a single dispatch.
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#ifndef TIMING_INCLUDE_TIMING_MONITORINGPLAN_HPP_
+#define TIMING_INCLUDE_TIMING_MONITORINGPLAN_HPP_
+
+// uHal Headers
+#include "opmonlib/InfoCollector.hpp"
+#include "uhal/Node.hpp"
+
+#include <boost/noncopyable.hpp>
+
+// C++ Headers
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <functional>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <utility>
+#include <vector>
+
+namespace dunedaq {
+namespace timing {
+
+/**
+ * @brief      Precomputed list of the reads needed to fill the monitoring information of a node tree.
+ *
+ * Nodes add entries to the plan, each attached to a path of nested collectors. Read entries
+ * queue their register reads and return the function filling their collector from the read
+ * values: at every collection all reads are queued, sent in a single dispatch, and the
+ * collectors filled. Step entries, for information that cannot be read in one go (e.g. over
+ * I2C), fill their collector on their own after the planned reads.
+ *
+ * Sampled step entries, for slow information, are run by a background MonitoringSampler on the
+ * cadence of their tier, each tier running its steps for a bounded time per sampler tick.
+ * Collections serve their last sample, together with its age in a TimingMonitoringSampleInfo
+ * structure per collector. While the sampler is not running, sampled steps are run at every
+ * collection like plain steps.
+ */
+class MonitoringSampler;
+
+class MonitoringPlan : boost::noncopyable
+{
+public:
+  typedef std::vector<std::string> Path;
+  typedef std::function<void(opmonlib::InfoCollector&)> FillFunction;
+  typedef std::function<FillFunction()> QueueFunction;
+  typedef std::function<FillFunction()> SampleFunction;
+
+  /**
+   * @brief      Sampling cadence of a tier of sampled steps.
+   */
+  struct Tier
+  {
+    //! Time between the starts of two sampling rounds
+    std::chrono::milliseconds interval;
+    //! Time the tier may spend sampling per sampler tick
+    std::chrono::milliseconds budget;
+  };
+
+  /**
+   * @param[in]  node  Node whose client is used for the dispatch
+   */
+  explicit MonitoringPlan(const uhal::Node& node);
+
+  /**
+   * @param[in]  sampler  Sampler of the sampled steps, shared with the other plans of the node
+   */
+  MonitoringPlan(const uhal::Node& node, std::shared_ptr<MonitoringSampler> sampler);
+  virtual ~MonitoringPlan();
+
+  /**
+   * @brief      Add reads queued before the plan dispatch.
+   *
+   * @param[in]  path   Collector path, relative to the top collector
+   * @param[in]  queue  Queues the reads, returns the function filling the collector
+   */
+  void add_reads(const Path& path, QueueFunction queue);
+
+  /**
+   * @brief      Add a step filling its collector with its own dispatches, after the planned reads.
+   */
+  void add_step(const Path& path, FillFunction fill);
+
+  /**
+   * @brief      Add reads filling a monitoring structure, added to the collector once filled.
+   *
+   * @param[in]  queue  Called with the structure to fill, queues the reads and returns
+   *                    the function filling the structure from the read values
+   */
+  template<class DATA, class QUEUE>
+  void add_data(const Path& path, QUEUE queue);
+
+  /**
+   * @brief      Add a step sampled in the background on the cadence of a tier.
+   *
+   * @param[in]  tier    Name of the tier, kDefaultTier settings are used for unknown tiers
+   * @param[in]  sample  Reads the data, returns the function filling the collector with it
+   */
+  void add_sampled_step(const Path& path, const std::string& tier, SampleFunction sample);
+
+  /**
+   * @brief      Set the cadence of a tier; it applies from the next sampler tick.
+   */
+  void set_tier(const std::string& name, const Tier& tier);
+
+  Tier get_tier(const std::string& name) const;
+
+  /**
+   * @brief      Start the background sampling of the sampled steps, if any.
+   *
+   * The sampler is shared with the other plans of the node, stopping it stops their sampling too.
+   */
+  void start_sampling();
+
+  void stop_sampling();
+
+  bool is_sampling() const;
+
+  /**
+   * @brief      Collect the monitoring information.
+   *
+   * Entries with an empty path fill ic directly.
+   */
+  void collect(opmonlib::InfoCollector& ic) const;
+
+  size_t get_number_of_reads() const { return m_reads.size(); }
+  size_t get_number_of_steps() const { return m_steps.size(); }
+  size_t get_number_of_sampled_steps() const { return m_sampled_steps.size(); }
+
+  /**
+   * @brief      Path of a child collector.
+   */
+  static Path extend(const Path& path, const std::string& name);
+
+  //! Tier of the data read over I2C: PLL, SFPs
+  static const std::string kI2CTier;
+  static const Tier kDefaultTier;
+  static const std::chrono::milliseconds kSamplerTick;
+
+private:
+  const uhal::Node& m_node;
+  std::vector<std::pair<Path, QueueFunction>> m_reads;
+  std::vector<std::pair<Path, FillFunction>> m_steps;
+
+  //! Sampler of the sampled steps, and the indices of the plan steps in it
+  std::shared_ptr<MonitoringSampler> m_sampler;
+  std::vector<size_t> m_sampled_steps;
+  //! Number of sampled steps of the plan per collector path
+  std::map<Path, size_t> m_sampled_step_ranks;
+};
+
+/**
+ * @brief      Background sampler of the sampled steps of the monitoring plans of a node.
+ *
+ * The plans of the different monitoring levels of a node share its sampler, so that a step
+ * included in several plans is sampled once and the node is sampled by a single thread.
+ * Steps are matched by their collector path and their rank among the plan steps at that path.
+ */
+class MonitoringSampler : boost::noncopyable
+{
+public:
+  /**
+   * @brief      Sampled step and its last sample.
+   */
+  struct Step
+  {
+    MonitoringPlan::Path path;
+    std::string tier;
+    MonitoringPlan::SampleFunction sample;
+    //! Fill function of the last successful sample
+    MonitoringPlan::FillFunction fill;
+    std::chrono::steady_clock::time_point sample_time;
+    uint64_t samples;  // NOLINT(build/unsigned)
+    uint64_t failures; // NOLINT(build/unsigned)
+  };
+
+  MonitoringSampler();
+  virtual ~MonitoringSampler();
+
+  /**
+   * @brief      Add a step, or find the matching step added by another plan.
+   *
+   * Steps added while the sampler runs are sampled from the next sampler tick.
+   *
+   * @param[in]  rank  Rank of the step among the steps of its plan with the same path
+   *
+   * @return     Index of the step
+   */
+  size_t add_step(const MonitoringPlan::Path& path,
+                  size_t rank,
+                  const std::string& tier,
+                  MonitoringPlan::SampleFunction sample);
+
+  /**
+   * @brief      Set the cadence of a tier; it applies from the next sampler tick.
+   */
+  void set_tier(const std::string& name, const MonitoringPlan::Tier& tier);
+
+  MonitoringPlan::Tier get_tier(const std::string& name) const;
+
+  /**
+   * @brief      Start the sampler thread, if there are steps to sample.
+   */
+  void start();
+
+  void stop();
+
+  bool is_running() const { return m_running; }
+
+  /**
+   * @brief      Copies of steps, taken together.
+   */
+  std::vector<Step> get_steps(const std::vector<size_t>& indices) const;
+
+  size_t get_number_of_steps() const;
+
+private:
+  struct TierState
+  {
+    std::vector<size_t> steps;
+    //! Next step of the current round
+    size_t cursor;
+    std::chrono::steady_clock::time_point round_start;
+    std::chrono::steady_clock::time_point next_round;
+  };
+
+  void run();
+  MonitoringPlan::Tier find_tier(const std::string& name) const;
+
+  //! Steps, tiers and sampler state, guarded by m_mutex
+  std::vector<Step> m_steps;
+  std::map<std::pair<MonitoringPlan::Path, size_t>, size_t> m_step_indices;
+  std::map<std::string, MonitoringPlan::Tier> m_tiers;
+  std::map<std::string, TierState> m_tier_states;
+  mutable std::mutex m_mutex;
+  std::condition_variable m_condition;
+  std::atomic<bool> m_running;
+  bool m_stop_requested;
+  std::thread m_thread;
+};
+
+/**
+ * @brief      Monitoring plans of a node, one per monitoring level, built on first use.
+ *
+ * The plans share a single sampler, which samples their sampled steps in the background as
+ * soon as they are built. Plans refer to the nodes of the tree they were built from, so copies of the cache,
+ * made when uhal clones a node tree, start empty.
+ */
+class MonitoringPlanCache
+{
+public:
+  typedef std::function<void(MonitoringPlan&, int)> BuildFunction;
+
+  MonitoringPlanCache() {}
+  MonitoringPlanCache(const MonitoringPlanCache&) {}
+  MonitoringPlanCache& operator=(const MonitoringPlanCache&) { return *this; }
+
+  /**
+   * @brief      Plan for a level, built with build the first time it is requested.
+   */
+  std::shared_ptr<const MonitoringPlan> get(const uhal::Node& node, int level, const BuildFunction& build);
+
+  /**
+   * @brief      Set the cadence of a sampling tier, for the current and future plans.
+   */
+  void set_tier(const std::string& name, const MonitoringPlan::Tier& tier);
+
+  void clear();
+
+private:
+  std::mutex m_mutex;
+  std::map<int, std::shared_ptr<MonitoringPlan>> m_plans;
+  std::shared_ptr<MonitoringSampler> m_sampler;
+  std::map<std::string, MonitoringPlan::Tier> m_tiers;
+};
+
+} // namespace timing
+} // namespace dunedaq
+
+#include "timing/detail/MonitoringPlan.hxx"
+
+#endif // TIMING_INCLUDE_TIMING_MONITORINGPLAN_HPP_
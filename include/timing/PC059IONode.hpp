@@ -77,6 +77,12 @@ public:
    */
   void switch_sfp_i2c_mux_channel(uint32_t sfp_id) const; // NOLINT(build/unsigned)
 
+  /**
+   * @brief     Select the SFP I2C mux channel, only resetting the mux if the current selection is unknown or
+   *            the selection write fails
+   */
+  void select_sfp_i2c_mux_channel(uint32_t sfp_id) const; // NOLINT(build/unsigned)
+
   /**
    * @brief      Print status of on-board SFP.
    */
@@ -87,6 +93,11 @@ public:
    */
   void switch_sfp_soft_tx_control_bit(uint32_t sfp_id, bool turn_on) const override; // NOLINT(build/unsigned)
 
+  /**
+   * @brief      Read the status of the upstream SFP (id 0) and of the 8 fanout SFPs (ids 1-8) in one pass.
+   */
+  std::vector<SFPSweepResult> sweep_sfps(bool skip_lost = true) const override;
+
   /**
    * @brief      Fill hardware monitoring structure.
    */
@@ -96,6 +107,18 @@ public:
    * @brief    Give info to collector.
    */
   void get_info(opmonlib::InfoCollector& ci, int level) const override;
+
+  /**
+   * @brief    Add the monitoring information to a monitoring plan, I2C data as sampled steps.
+   */
+  void add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const override;
+
+private:
+  //! Fanout SFP currently selected on the I2C mux, kUnknownSFPI2CMuxChannel if unknown;
+  //! guarded by the lock of the main I2C bus
+  mutable int32_t m_sfp_i2c_mux_channel;
+
+  static const int32_t kUnknownSFPI2CMuxChannel;
 };
 
 } // namespace timing
@@ -26,6 +26,7 @@
 
 // C++ Headers
 #include <chrono>
+#include <functional>
 #include <string>
 
 namespace dunedaq {
@@ -126,6 +127,17 @@ public:
    * @brief    Give info to collector.
    */
   void get_info(opmonlib::InfoCollector& ic, int level) const override;
+
+  /**
+   * @brief    Add the monitoring reads to a monitoring plan.
+   */
+  void add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const override;
+
+private:
+  /**
+   * @brief     Queue the reads of the monitoring structure; the returned function fills it once dispatched.
+   */
+  std::function<void()> queue_info(timingfirmwareinfo::PDIMasterMonitorData& mon_data) const;
 };
 
 } // namespace timing
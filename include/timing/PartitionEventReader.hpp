@@ -0,0 +1,150 @@
+/**
+ * @file PartitionEventReader.hpp
+ *
+ * PartitionEventReader is a class reading out and validating the
+ * events of a master partition readout buffer in batches.
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#ifndef TIMING_INCLUDE_TIMING_PARTITIONEVENTREADER_HPP_
+#define TIMING_INCLUDE_TIMING_PARTITIONEVENTREADER_HPP_
+
+// PDT Headers
+#include "timing/PartitionNode.hpp"
+
+#include <boost/noncopyable.hpp>
+
+// C++ Headers
+#include <chrono>
+#include <string>
+#include <vector>
+
+namespace dunedaq {
+namespace timing {
+
+/**
+ * @brief      Decoded partition readout buffer event.
+ *
+ * Buffer layout, kWordsPerEvent words per event:
+ *   0: header (0xaa000600), 1: scmd, 2-3: timestamp (low, high), 4: event counter, 5: checksum
+ */
+struct PartitionEvent
+{
+  uint32_t scmd;      // NOLINT(build/unsigned)
+  uint64_t timestamp; // NOLINT(build/unsigned)
+  uint32_t counter;   // NOLINT(build/unsigned)
+};
+
+/**
+ * @brief      Throughput and latency report of a partition readout.
+ */
+struct PartitionReadoutReport
+{
+  uint64_t events;         // NOLINT(build/unsigned)
+  uint64_t words;          // NOLINT(build/unsigned)
+  uint64_t dispatches;     // NOLINT(build/unsigned)
+  uint64_t empty_reads;    // NOLINT(build/unsigned)
+  uint64_t invalid_events; // NOLINT(build/unsigned)
+  uint64_t skipped_words;  // NOLINT(build/unsigned)
+  uint64_t counter_gaps;   // NOLINT(build/unsigned)
+  uint32_t max_occupancy;  // NOLINT(build/unsigned)
+  double elapsed;          // seconds since the first read
+  double event_rate;       // Hz
+  double mean_latency;     // seconds per dispatch
+  double max_latency;      // seconds
+};
+
+/**
+ * @brief      Batched reader of a partition readout buffer.
+ *
+ * Each read fetches, in a single dispatch, the complete events known to be in the buffer
+ * (or, with read_all, all the words known to be in it) and the new buffer word count,
+ * which tells how much the next read can fetch. Events are validated and decoded into a
+ * buffer reused from one batch to the next; the words of an incomplete event are kept
+ * until the next read completes it.
+ *
+ * Events with a bad header or scmd word are dropped and counted, and the reader
+ * resynchronises on the next header word; discontinuities in the event counter are
+ * counted but the events are kept.
+ */
+class PartitionEventReader : boost::noncopyable
+{
+public:
+  explicit PartitionEventReader(const PartitionNode& node,
+                                uint32_t max_batch_events = kDefaultMaxBatchEvents, // NOLINT(build/unsigned)
+                                bool read_all = false);
+  virtual ~PartitionEventReader();
+
+  /**
+   * @brief      Read the next batch of events, possibly empty.
+   *
+   * @return     Decoded events, valid until the next read
+   */
+  const std::vector<PartitionEvent>& read_batch();
+
+  /**
+   * @brief      Read batches until one is not empty or the timeout expires.
+   *
+   * @return     Decoded events, valid until the next read
+   */
+  const std::vector<PartitionEvent>& next_batch(std::chrono::milliseconds timeout,
+                                                std::chrono::microseconds poll_interval = kDefaultPollInterval);
+
+  /**
+   * @brief      Raw words of the last batch.
+   */
+  const std::vector<uint32_t>& get_raw_words() const { return m_words; } // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Throughput and latency figures since construction or the last reset.
+   */
+  PartitionReadoutReport get_report() const;
+
+  /**
+   * @brief      Format the report as a table.
+   */
+  std::string get_report_table(bool print_out = false) const;
+
+  void reset_report();
+
+  /**
+   * @brief      Validate and decode the kWordsPerEvent words of an event.
+   *
+   * @return     Whether the event is valid
+   */
+  static bool decode_event(const uint32_t* words, PartitionEvent& event); // NOLINT(build/unsigned)
+
+  static const uint32_t kEventHeader;           // NOLINT(build/unsigned)
+  static const uint32_t kDefaultMaxBatchEvents; // NOLINT(build/unsigned)
+  static const std::chrono::microseconds kDefaultPollInterval;
+
+private:
+  const PartitionNode& m_node;
+  const uint32_t m_max_batch_words; // NOLINT(build/unsigned)
+  //! Read all the words in the buffer, not only the complete events
+  const bool m_read_all;
+
+  //! Words in the buffer at the end of the last read, not read yet
+  uint32_t m_words_available; // NOLINT(build/unsigned)
+
+  std::vector<uint32_t> m_words; // NOLINT(build/unsigned)
+  std::vector<PartitionEvent> m_events;
+
+  //! Words of the last batch not decoded yet, the start of an incomplete event
+  std::vector<uint32_t> m_pending_words; // NOLINT(build/unsigned)
+
+  bool m_has_last_counter;
+  uint32_t m_last_counter; // NOLINT(build/unsigned)
+
+  PartitionReadoutReport m_report;
+  std::chrono::steady_clock::time_point m_first_read;
+  double m_total_latency;
+};
+
+} // namespace timing
+} // namespace dunedaq
+
+#endif // TIMING_INCLUDE_TIMING_PARTITIONEVENTREADER_HPP_
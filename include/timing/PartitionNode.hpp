@@ -24,6 +24,7 @@
 
 // C++ Headers
 #include <chrono>
+#include <functional>
 #include <string>
 #include <vector>
 
@@ -58,6 +59,9 @@ public:
   virtual ~PartitionNode();
 
   static const uint32_t kWordsPerEvent; // NOLINT(build/unsigned)
+  //! Polling of the run request acknowledgement
+  static const std::chrono::microseconds kRunWaitFirstInterval;
+  static const std::chrono::microseconds kRunWaitMaxInterval;
 
   /**
    * @brief      Reads a command mask.
@@ -103,6 +107,19 @@ public:
    */
   std::vector<uint32_t> read_events(size_t number_of_events = 0) const; // NOLINT(build/unsigned)
 
+  /**
+   * @brief      Read n_words words from the rob and, in the same dispatch, the number of words
+   *             left in it.
+   *
+   * n_words must not exceed the number of words known to be in the buffer.
+   *
+   * @param      data     Buffer receiving the words, its capacity is reused
+   *
+   * @return     Number of words left in the buffer after the read
+   */
+  uint32_t read_buffer_and_word_count(std::vector<uint32_t>& data, // NOLINT(build/unsigned)
+                                      uint32_t n_words) const;      // NOLINT(build/unsigned)
+
   /**
    * @brief      Enables the partition now.
    *
@@ -183,6 +200,17 @@ public:
    * @brief    Give info to collector.
    */
   void get_info(opmonlib::InfoCollector& ic, int level) const override;
+
+  /**
+   * @brief    Add the monitoring reads to a monitoring plan.
+   */
+  void add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const override;
+
+private:
+  /**
+   * @brief     Queue the reads of the monitoring structure; the returned function fills it once dispatched.
+   */
+  std::function<void()> queue_info(timingfirmwareinfo::TimingPartitionMonitorData& mon_data) const;
 };
 
 } // namespace timing
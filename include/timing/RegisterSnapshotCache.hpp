@@ -0,0 +1,124 @@
+/**
+ * @file RegisterSnapshotCache.hpp
+ *
+ * RegisterSnapshotCache is a class sharing recent reads of register
+ * groups between the status, monitoring and CLI code of a device.
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#ifndef TIMING_INCLUDE_TIMING_REGISTERSNAPSHOTCACHE_HPP_
+#define TIMING_INCLUDE_TIMING_REGISTERSNAPSHOTCACHE_HPP_
+
+// uHal Headers
+#include "uhal/Node.hpp"
+
+// C++ Headers
+#include <chrono>
+#include <map>
+#include <mutex>
+#include <string>
+
+namespace dunedaq {
+namespace timing {
+
+/**
+ * @brief      Counters of a register snapshot cache.
+ */
+struct RegisterSnapshotCacheStats
+{
+  uint64_t hits;          // NOLINT(build/unsigned)
+  uint64_t misses;        // NOLINT(build/unsigned)
+  uint64_t invalidations; // NOLINT(build/unsigned)
+  size_t entries;
+};
+
+/**
+ * @brief      Opt-in, short-lived cache of register group reads, per client.
+ *
+ * Reads of all the sub-nodes of a node (TimingNode::read_sub_nodes, snapshot) are kept
+ * for a configurable time-to-live, so that status prints, monitoring and watch loops
+ * running close together share the same IPbus reads. Caching is disabled by default, and
+ * is enabled per client URI or for all clients.
+ *
+ * Cached reads are invalidated when the timing nodes write to the same node subtree, and
+ * can be invalidated explicitly after writes made directly through uhal.
+ */
+class RegisterSnapshotCache
+{
+public:
+  typedef std::map<std::string, uhal::ValWord<uint32_t>> Registers; // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Enable caching for the client of node, with the given time-to-live.
+   */
+  static void enable(const uhal::Node& node, std::chrono::milliseconds ttl);
+
+  /**
+   * @brief      Enable caching for all clients without their own setting; a zero ttl disables it.
+   */
+  static void enable_all(std::chrono::milliseconds ttl);
+
+  /**
+   * @brief      Disable caching for the client of node, and drop its entries.
+   */
+  static void disable(const uhal::Node& node);
+
+  /**
+   * @brief      Disable caching for all clients, and drop all entries.
+   */
+  static void disable_all();
+
+  /**
+   * @brief      Time-to-live in use for the client of node, zero if disabled.
+   */
+  static std::chrono::milliseconds get_ttl(const uhal::Node& node);
+
+  /**
+   * @brief      Cached reads of the sub-nodes of node matching regex (all if empty), if fresh.
+   *
+   * @return     Whether fresh reads were found
+   */
+  static bool lookup(const uhal::Node& node, const std::string& regex, Registers& registers);
+
+  /**
+   * @brief      Store reads of the sub-nodes of node, possibly not dispatched yet.
+   */
+  static void store(const uhal::Node& node, const std::string& regex, const Registers& registers);
+
+  /**
+   * @brief      Drop the cached reads of node, its sub-nodes and its parents.
+   */
+  static void invalidate(const uhal::Node& node);
+
+  static RegisterSnapshotCacheStats get_stats(const uhal::Node& node);
+
+private:
+  struct Entry
+  {
+    std::chrono::steady_clock::time_point time;
+    Registers registers;
+  };
+
+  struct ClientCache
+  {
+    std::chrono::milliseconds ttl;
+    std::map<std::string, Entry> entries;
+    RegisterSnapshotCacheStats stats;
+  };
+
+  static ClientCache* find_client(const uhal::Node& node, bool create);
+  static std::chrono::milliseconds client_ttl(const ClientCache* client);
+
+  //! Caches keyed by client URI; a negative ttl falls back to s_default_ttl
+  static std::map<std::string, ClientCache> s_clients;
+  static std::chrono::milliseconds s_default_ttl;
+  static std::mutex s_mutex;
+};
+
+} // namespace timing
+} // namespace dunedaq
+
+#endif // TIMING_INCLUDE_TIMING_REGISTERSNAPSHOTCACHE_HPP_
@@ -0,0 +1,64 @@
+/**
+ * @file RingBuffer.hpp
+ *
+ * RingBuffer is a fixed-capacity, lock-free, single-producer
+ * single-consumer queue.
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#ifndef TIMING_INCLUDE_TIMING_RINGBUFFER_HPP_
+#define TIMING_INCLUDE_TIMING_RINGBUFFER_HPP_
+
+#include <boost/noncopyable.hpp>
+
+#include <atomic>
+#include <cstddef>
+#include <vector>
+
+namespace dunedaq {
+namespace timing {
+
+/**
+ * @brief      Lock-free single-producer single-consumer ring buffer.
+ *
+ * The capacity is rounded up to a power of two. push must only be called from one
+ * thread and pop from one (possibly different) thread.
+ */
+template<typename T>
+class RingBuffer : boost::noncopyable
+{
+public:
+  explicit RingBuffer(size_t capacity);
+
+  /**
+   * @brief      Append an element; returns false, leaving the buffer untouched, if it is full.
+   */
+  bool push(const T& element);
+
+  /**
+   * @brief      Remove the oldest element; returns false if the buffer is empty.
+   */
+  bool pop(T& element);
+
+  size_t size() const;
+  size_t capacity() const { return m_buffer.size(); }
+  bool empty() const { return size() == 0; }
+
+private:
+  std::vector<T> m_buffer;
+  const size_t m_mask;
+
+  //! Positions only ever increase; kept on separate cache lines to avoid false sharing
+  alignas(64) std::atomic<size_t> m_head; // next element to pop
+  alignas(64) std::atomic<size_t> m_tail; // next free slot
+};
+
+} // namespace timing
+} // namespace dunedaq
+
+#include "timing/detail/RingBuffer.hxx"
+
+#endif // TIMING_INCLUDE_TIMING_RINGBUFFER_HPP_
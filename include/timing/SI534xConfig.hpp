@@ -0,0 +1,117 @@
+/**
+ * @file SI534xConfig.hpp
+ *
+ * SI534xConfig is a class holding the register settings of a
+ * ClockBuilder register export, with an on-disk pre-parsed cache.
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#ifndef TIMING_INCLUDE_TIMING_SI534XCONFIG_HPP_
+#define TIMING_INCLUDE_TIMING_SI534XCONFIG_HPP_
+
+#include "ers/Issue.hpp"
+
+#include <boost/tuple/tuple.hpp>
+
+#include <fstream>
+#include <string>
+#include <vector>
+
+namespace dunedaq {
+ERS_DECLARE_ISSUE(timing,                            ///< Namespace
+                  SI534xConfigError,                 ///< Issue class name
+                  " SI534xConfigError: " << message, ///< Message
+                  ((std::string)message)             ///< Message parameters
+)
+ERS_DECLARE_ISSUE(timing,                                    ///< Namespace
+                  SI534xMissingConfigSectionError,           ///< Issue class name
+                  " Missing configuration section: " << tag, ///< Message
+                  ((std::string)tag)                         ///< Message parameters
+)
+ERS_DECLARE_ISSUE(timing,                                                               ///< Namespace
+                  SI534xConfigCacheError,                                               ///< Issue class name
+                  " Failed to use clock configuration cache " << path << ": " << message, ///< Message
+                  ((std::string)path)((std::string)message)                             ///< Message parameters
+)
+namespace timing {
+
+/**
+ * @class      SI534xConfig
+ *
+ * @brief      Register settings of a SI534x ClockBuilder export.
+ *
+ * Parsed text files are compiled into a compact binary image made of the design ID,
+ * a hash of the file content and, for each section, the list of runs of contiguous
+ * registers on the same page. The images are cached on disk, keyed by file path and
+ * modification time, and memory-mapped when loaded.
+ *
+ * The cache directory is taken from TIMING_CLOCK_CONFIG_CACHE, or defaults to
+ * ~/.cache/timing/clock.
+ */
+class SI534xConfig
+{
+public:
+  typedef boost::tuple<uint16_t, uint8_t> RegisterSetting_t; // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Load a configuration file, from the cache when an up-to-date image exists.
+   *
+   * @param[in]  filename   Path of the ClockBuilder export
+   * @param[in]  use_cache  Look up and refresh the on-disk cache
+   */
+  static SI534xConfig load(const std::string& filename, bool use_cache = true);
+
+  /**
+   * @brief      Parse a configuration file and (re)write its cache image.
+   *
+   * @return     Path of the cache image
+   */
+  static std::string compile(const std::string& filename);
+
+  /**
+   * @brief      Path of the cache image for the current version of a configuration file.
+   */
+  static std::string get_cache_path(const std::string& filename);
+
+  /**
+   * @brief      Directory holding the cache images.
+   */
+  static std::string get_cache_directory();
+
+  const std::string& get_design_id() const { return m_design_id; }
+  uint64_t get_content_hash() const { return m_content_hash; } // NOLINT(build/unsigned)
+
+  const std::vector<RegisterSetting_t>& get_preamble() const { return m_preamble; }
+  const std::vector<RegisterSetting_t>& get_registers() const { return m_registers; }
+  const std::vector<RegisterSetting_t>& get_postamble() const { return m_postamble; }
+
+private:
+  SI534xConfig();
+
+  void parse(const std::string& filename);
+  bool read_image(const std::string& cache_path);
+  void write_image(const std::string& cache_path) const;
+
+  static std::string seek_header(std::ifstream& file);
+  static std::vector<RegisterSetting_t> read_config_section(std::ifstream& file, std::string tag);
+  static uint64_t hash_file(const std::string& filename); // NOLINT(build/unsigned)
+
+  //! Binary image magic word and format version
+  static const uint32_t kImageMagic;   // NOLINT(build/unsigned)
+  static const uint32_t kImageVersion; // NOLINT(build/unsigned)
+
+  std::string m_design_id;
+  uint64_t m_content_hash; // NOLINT(build/unsigned)
+
+  std::vector<RegisterSetting_t> m_preamble;
+  std::vector<RegisterSetting_t> m_registers;
+  std::vector<RegisterSetting_t> m_postamble;
+};
+
+} // namespace timing
+} // namespace dunedaq
+
+#endif // TIMING_INCLUDE_TIMING_SI534XCONFIG_HPP_
@@ -13,26 +13,18 @@
 #define TIMING_INCLUDE_TIMING_SI534XNODE_HPP_
 
 #include "timing/I2CMasterNode.hpp"
+#include "timing/SI534xConfig.hpp"
 #include "timing/SIChipSlave.hpp"
 #include "timing/timinghardwareinfo/InfoStructs.hpp"
 
 #include "ers/Issue.hpp"
 
 #include <map>
+#include <set>
 #include <string>
 #include <vector>
 
 namespace dunedaq {
-ERS_DECLARE_ISSUE(timing,                            ///< Namespace
-                  SI534xConfigError,                 ///< Issue class name
-                  " SI534xConfigError: " << message, ///< Message
-                  ((std::string)message)             ///< Message parameters
-)
-ERS_DECLARE_ISSUE(timing,                                    ///< Namespace
-                  SI534xMissingConfigSectionError,           ///< Issue class name
-                  " Missing configuration section: " << tag, ///< Message
-                  ((std::string)tag)                         ///< Message parameters
-)
 ERS_DECLARE_ISSUE(timing,                                                          ///< Namespace
                   SI534xRegWriteFailed,                                            ///< Issue class name
                   " Failed to write Si53xx reg: " << reg << "with data: " << data, ///< Message
@@ -58,7 +50,19 @@ public:
   SI534xSlave(const I2CMasterNode* i2c_master, uint8_t i2c_device_address); // NOLINT(build/unsigned)
   virtual ~SI534xSlave();
 
-  void configure(const std::string& filename) const;
+  /**
+   * @brief      Configure the PLL from a ClockBuilder register export.
+   *
+   * In incremental mode, if the chip already runs the design of the file and is locked,
+   * only the registers that differ from the file are written. The preamble/postamble
+   * calibration sequence is run only if the differences are not limited to output settings.
+   */
+  void configure(const std::string& filename, bool incremental = false) const;
+
+  /**
+   * @brief      Check whether the chip runs the design of the configuration file and is locked.
+   */
+  bool is_configured(const std::string& filename) const;
 
   std::map<uint16_t, uint8_t> registers() const; // NOLINT(build/unsigned)
 
@@ -67,12 +71,22 @@ public:
   void get_info(timinghardwareinfo::TimingPLLMonitorData& mon_data) const;
 
 private:
-  typedef boost::tuple<uint16_t, uint8_t> RegisterSetting_t; // NOLINT(build/unsigned)
+  typedef SI534xConfig::RegisterSetting_t RegisterSetting_t;
 
-  std::string seek_header(std::ifstream& file) const;
-  std::vector<RegisterSetting_t> read_config_section(std::ifstream& file, std::string tag) const;
+  void read_config(const std::string& filename,
+                   std::string& design_id,
+                   std::vector<RegisterSetting_t>& preamble,
+                   std::vector<RegisterSetting_t>& registers,
+                   std::vector<RegisterSetting_t>& postamble) const;
 
   void upload_config(const std::vector<SI534xSlave::RegisterSetting_t>& config) const;
+
+  bool read_loss_of_lock() const;
+
+  //! Write-strobe registers, not expected to read back as written
+  static const std::set<uint16_t> kSelfClearingRegisters; // NOLINT(build/unsigned)
+  //! Pages whose registers can be changed without the calibration sequence
+  static const std::set<uint8_t> kHitlessPages; // NOLINT(build/unsigned)
 };
 
 /**
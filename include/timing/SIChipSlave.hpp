@@ -17,6 +17,8 @@
 #include "ers/Issue.hpp"
 
 #include <map>
+#include <utility>
+#include <vector>
 
 namespace dunedaq {
 namespace timing {
@@ -27,6 +29,11 @@ namespace timing {
  * @brief      Utility class to interface to SI chips.
  * @author     Alessandro Thea
  * @date       May 2018
+ *
+ * The register accesses run in bus sessions, so that a page switch and the accesses it
+ * prepares are not interleaved with other transfers on the bus. The current page is cached
+ * for the bus generation it was read at, so it is dropped by bus errors, reconfigurations
+ * of the I2C core and device resets, and kept from one session to the next otherwise.
  */
 class SIChipSlave : public I2CSlave
 {
@@ -71,6 +78,60 @@ public:
    * @param[in]  data  A data
    */
   void write_clock_register(uint16_t address, uint8_t data) const; // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Writes a list of clock registers.
+   *
+   * Consecutive settings on the same page with contiguous addresses are
+   * merged into a single auto-increment transfer. The order of the list is preserved.
+   *
+   * @param[in]  settings  List of (address, data) pairs
+   * @param      n_written  If set, updated with the number of leading settings known to be
+   *                        written, also when throwing: the transfer which failed starts there
+   */
+  void write_clock_registers(const std::vector<std::pair<uint16_t, uint8_t>>& settings, // NOLINT(build/unsigned)
+                             size_t* n_written = nullptr) const;
+
+  /**
+   * @brief      Reads a list of clock registers.
+   *
+   * Addresses on the same page that are close to each other are read
+   * with a single auto-increment transfer.
+   *
+   * @param[in]  addresses  List of register addresses
+   *
+   * @return     Map of register address to value
+   */
+  std::map<uint16_t, uint8_t> read_clock_registers(const std::vector<uint16_t>& addresses) const; // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Forget the cached page, forcing a page read before the next register access.
+   */
+  void invalidate_page_cache() const { m_page_cache_valid = false; }
+
+private:
+  /**
+   * @brief      Make sure the chip is on the requested page, using the page cache when valid.
+   */
+  void select_page(uint8_t page) const; // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Whether the cached page was read or written in the current bus generation.
+   */
+  bool is_page_cache_valid() const;
+
+  void set_cached_page(uint8_t page) const; // NOLINT(build/unsigned)
+
+  //! Largest gap between two addresses merged into the same burst read
+  static const uint16_t kMaxBurstReadGap; // NOLINT(build/unsigned)
+  //! Maximum length of a burst read
+  static const uint16_t kMaxBurstReadLength; // NOLINT(build/unsigned)
+
+  //! Page cache, valid only if no error occurred since the last page read or write,
+  //! and the bus generation is still the one it was read or written at
+  mutable bool m_page_cache_valid;
+  mutable uint8_t m_cached_page;       // NOLINT(build/unsigned)
+  mutable uint64_t m_cache_generation; // NOLINT(build/unsigned)
 };
 
 } // namespace timing
@@ -73,13 +73,6 @@ public:
   void reset(int32_t fanout_mode = -1, // NOLINT(build/unsigned)
                      const std::string& clock_config_file = "") const override;
 
-  /**
-   * @brief      Read the word containing the timing board UID.
-   *
-   * @return     { description_of_the_return_value }
-   */
-  uint64_t read_board_uid() const override; // NOLINT(build/unsigned)
-
   /**
    * @brief      Configure clock chip.
    */
@@ -90,6 +83,16 @@ public:
    */
   std::vector<double> read_clock_frequencies() const override;
 
+  /**
+   * @brief      Measure frequencies of on-board clocks.
+   */
+  std::vector<double> measure_clock_frequencies() const override;
+
+  /**
+   * @brief      Start the background sampler of the on-board clock frequencies.
+   */
+  void start_clock_frequency_sampler() const override;
+
   /**
    * @brief      Print frequencies of on-board clocks.
    */
@@ -109,6 +112,12 @@ public:
    * @brief      Control tx laser of on-board SFP softly (I2C command)
    */
   void switch_sfp_soft_tx_control_bit(uint32_t sfp_id, bool turn_on) const override; // NOLINT(build/unsigned)
+
+protected:
+  /**
+   * @brief      Read the timing board UID; the simulation has none.
+   */
+  uint64_t fetch_board_uid() const override; // NOLINT(build/unsigned)
 };
 
 } // namespace timing
@@ -87,6 +87,11 @@ public:
    */
   void get_info(opmonlib::InfoCollector& ci, int level) const override;
 
+  /**
+   * @brief    Add the monitoring information to a monitoring plan, I2C data as sampled steps.
+   */
+  void add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const override;
+
 protected:
   const std::vector<std::string> m_dac_devices;
 };
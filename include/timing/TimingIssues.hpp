@@ -95,6 +95,15 @@ ERS_DECLARE_ISSUE_BASE(timing,                          ///< Namespace
                        ERS_EMPTY                                                       ///< Attribute of this class
 )
 
+ERS_DECLARE_ISSUE_BASE(timing,                   ///< Namespace
+                       I2CBusSessionWrongThread, ///< Issue class name
+                       I2CException,             ///< Base class of the issue
+                       " I2C bus: " << bus_id
+                                    << " session closed by a thread other than the one which opened it", ///< Log Message from the issue
+                       ((std::string)bus_id), ///< Base class attributes
+                       ERS_EMPTY              ///< Attribute of this class
+)
+
 ERS_DECLARE_ISSUE(timing,                                ///< Namespace
                   UnknownBoardType,                      ///< Issue class name
                   " Unknown board type: " << board_type, ///< Message
@@ -269,6 +278,18 @@ ERS_DECLARE_ISSUE(timing,
                   FailedToUpdateHSIRandomRate,                                                  ///< Issue class name
                   "  Random bit 0 trigger rate for HSI not updated!",                           ///< Message
                   ERS_EMPTY)                                                                    //< Message parameters
+
+ERS_DECLARE_ISSUE(timing,                                          ///< Namespace
+                  ControlSocketError,                              ///< Issue class name
+                  "Control socket " << path << ": " << reason,     ///< Message
+                  ((std::string)path)((std::string)reason)         ///< Message parameters
+)
+
+ERS_DECLARE_ISSUE(timing,                                          ///< Namespace
+                  InvalidControlRequest,                           ///< Issue class name
+                  "Invalid control request: " << reason,           ///< Message
+                  ((std::string)reason)                            ///< Message parameters
+)
 } // namespace dunedaq
 
 #endif // TIMING_INCLUDE_TIMING_TIMINGISSUES_HPP_
\ No newline at end of file
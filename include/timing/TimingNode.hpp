@@ -14,7 +14,9 @@
 
 // timing Headers
 #include "TimingIssues.hpp"
+#include "timing/IPbusProfiler.hpp"
 #include "timing/definitions.hpp"
+#include "timing/MonitoringPlan.hpp"
 #include "timing/toolbox.hpp"
 
 // uHal Headers
@@ -24,12 +26,71 @@
 
 // C++ Headers
 #include <chrono>
+#include <functional>
 #include <map>
+#include <mutex>
 #include <string>
 #include <typeinfo>
+#include <vector>
 
 namespace dunedaq {
 namespace timing {
+
+/**
+ * @brief      Polling schedule of a register wait.
+ *
+ * The first poll is issued straight away; the interval between polls starts at first_interval
+ * and is multiplied by backoff_factor after each poll, up to max_interval. The wait gives up
+ * once the deadline has passed or max_polls polls were issued; 0 disables either limit.
+ */
+struct WaitSchedule
+{
+  std::chrono::microseconds first_interval;
+  std::chrono::microseconds max_interval;
+  std::chrono::microseconds deadline;
+  uint32_t backoff_factor; // NOLINT(build/unsigned)
+  uint32_t max_polls;      // NOLINT(build/unsigned)
+
+  WaitSchedule(std::chrono::microseconds aFirstInterval,
+               std::chrono::microseconds aMaxInterval,
+               std::chrono::microseconds aDeadline,
+               uint32_t aBackoffFactor = 2, // NOLINT(build/unsigned)
+               uint32_t aMaxPolls = 0)      // NOLINT(build/unsigned)
+    : first_interval(aFirstInterval)
+    , max_interval(aMaxInterval)
+    , deadline(aDeadline)
+    , backoff_factor(aBackoffFactor)
+    , max_polls(aMaxPolls)
+  {}
+};
+
+/**
+ * @brief      Outcome of a register wait.
+ */
+struct WaitResult
+{
+  bool satisfied;
+  uint32_t polls;                // NOLINT(build/unsigned)
+  double elapsed;                // seconds
+  std::vector<uint32_t> values;  // NOLINT(build/unsigned) last values read, in register order
+};
+
+/**
+ * @brief      Latency distribution of the waits sharing a label.
+ *
+ * buckets[i] counts the waits that lasted less than kWaitLatencyBucketEdges[i]; the last
+ * bucket counts the longer ones.
+ */
+struct WaitLatencyHistogram
+{
+  uint64_t waits;                // NOLINT(build/unsigned)
+  uint64_t timeouts;             // NOLINT(build/unsigned)
+  uint64_t polls;                // NOLINT(build/unsigned)
+  double total_latency;          // seconds
+  double max_latency;            // seconds
+  std::vector<uint64_t> buckets; // NOLINT(build/unsigned)
+};
+
 /**
  * @brief      Base class for timing nodes.
  */
@@ -47,9 +108,18 @@ public:
 
   /**
    * @brief     Read subnodes.
+   *
+   * Fresh reads may be served by the register snapshot cache; polling loops must pass
+   * use_cache = false to always read the hardware.
    */
   std::map<std::string, uhal::ValWord<uint32_t>> read_sub_nodes(const uhal::Node& node, // NOLINT(build/unsigned)
-                                                                bool dispatch = true) const;
+                                                                bool dispatch = true,
+                                                                bool use_cache = true) const;
+
+  /**
+   * @brief     Drop the cached register reads of this node subtree, to be called after writing to it.
+   */
+  void invalidate_snapshots() const;
 
   /**
    * @brief     Reset subnodes.
@@ -58,10 +128,67 @@ public:
                        uint32_t aValue = 0x0, // NOLINT(build/unsigned)
                        bool dispatch = true) const;
 
+  typedef std::function<bool(const std::vector<uint32_t>&)> WaitPredicate; // NOLINT(build/unsigned)
+
+  /**
+   * @brief     Poll registers of this node until a condition holds.
+   *
+   * All the registers are read in a single dispatch per poll, and the predicate is evaluated
+   * on their values. The wait does not throw on timeout: callers check the result and
+   * raise their own issue. The wait latency is recorded in the histogram of the label.
+   *
+   * @param[in]  registers  Register paths, relative to this node
+   * @param[in]  predicate  Condition on the register values, in register order
+   * @param[in]  schedule   Polling intervals and limits
+   * @param[in]  label      Latency histogram to record the wait in
+   */
+  WaitResult wait_for(const std::vector<std::string>& registers,
+                      const WaitPredicate& predicate,
+                      const WaitSchedule& schedule,
+                      const std::string& label) const;
+
+  /**
+   * @brief     Poll registers of any node until a condition holds, for nodes outside the TimingNode hierarchy.
+   */
+  static WaitResult wait_for(const uhal::Node& node,
+                             const std::vector<std::string>& registers,
+                             const WaitPredicate& predicate,
+                             const WaitSchedule& schedule,
+                             const std::string& label);
+
+  /**
+   * @brief     Snapshot of the wait latency histograms, by label.
+   */
+  static std::map<std::string, WaitLatencyHistogram> get_wait_latency_histograms();
+
+  static void reset_wait_latency_histograms();
+
+  /**
+   * @brief     Format the wait latency histograms as a table.
+   */
+  static std::string format_wait_latency_histograms(bool print_out = false);
+
+  //! Upper edges of the wait latency histogram buckets
+  static const std::vector<std::chrono::microseconds> kWaitLatencyBucketEdges;
+
   /**
    * @brief    Give info to collector.
    */
   virtual void get_info(opmonlib::InfoCollector&, int) const {}
+
+  /**
+   * @brief    Add the monitoring information of the node to a monitoring plan.
+   *
+   * By default, get_info is run as a plan step. Nodes whose information is made of
+   * register reads override it to add them to the plan dispatch.
+   */
+  virtual void add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const;
+
+private:
+  static void record_wait(const std::string& label, const WaitResult& result);
+
+  static std::map<std::string, WaitLatencyHistogram> s_wait_latency_histograms;
+  static std::mutex s_wait_latency_mutex;
 };
 
 } // namespace timing
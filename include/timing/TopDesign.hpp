@@ -14,6 +14,7 @@
 
 // PDT Headers
 #include "TimingIssues.hpp"
+#include "timing/IPbusProfiler.hpp"
 #include "timing/TopDesignInterface.hpp"
 
 // uHal Headers
@@ -82,6 +83,46 @@ public:
       TLOG() << info;
     return info;
   }
+
+  /**
+   * @brief    Give info to collector, through the monitoring plan of the level.
+   *
+   * The plan is built on the first collection at a given level and reused afterwards,
+   * so that each collection reads the design registers in a single dispatch.
+   */
+  void get_info(opmonlib::InfoCollector& ci, int level) const override
+  {
+    auto plan = m_monitoring_plans.get(
+      *this, level, [this](MonitoringPlan& new_plan, int plan_level) { this->add_to_monitoring_plan(new_plan, {}, plan_level); });
+    plan->collect(ci);
+
+    if (IPbusProfiler::is_enabled()) {
+      opmonlib::InfoCollector ipbus_ic;
+      IPbusProfiler::get_info(ipbus_ic);
+      ci.add("ipbus_operations", ipbus_ic);
+    }
+  }
+
+  /**
+   * @brief    Add the monitoring information of the design sub-nodes to a monitoring plan.
+   */
+  void add_to_monitoring_plan(MonitoringPlan& /*plan*/, const MonitoringPlan::Path& /*path*/, int /*level*/) const override {}
+
+  /**
+   * @brief    Set the cadence of a tier of monitoring data sampled in the background (e.g. MonitoringPlan::kI2CTier).
+   *
+   * @param[in]  interval  Time between two samplings of the tier data
+   * @param[in]  budget    Time the tier sampling may take at once, before letting other tiers run
+   */
+  void set_monitoring_tier(const std::string& name,
+                           std::chrono::milliseconds interval,
+                           std::chrono::milliseconds budget) const
+  {
+    m_monitoring_plans.set_tier(name, { interval, budget });
+  }
+
+private:
+  mutable MonitoringPlanCache m_monitoring_plans;
 };
 
 } // namespace timing
@@ -24,6 +24,7 @@
 
 // C++ Headers
 #include <chrono>
+#include <functional>
 #include <sstream>
 #include <string>
 
@@ -92,6 +93,40 @@ public:
    */
   virtual void validate_firmware_version() const = 0;
 
+  /**
+   * @brief      Get the hardware identity of the device, firmware version and generics included.
+   *
+   * Read in a single dispatch on first use, then kept by the IO node until the next IO
+   * reset or invalidate_hardware_identity.
+   */
+  HardwareIdentity get_hardware_identity() const
+  {
+    return get_io_node_plain()->get_hardware_identity(
+      [this](HardwareIdentity& identity) { return this->queue_firmware_identity(identity); });
+  }
+
+  /**
+   * @brief      Forget the cached hardware identity, e.g. after reprogramming the FPGA.
+   */
+  void invalidate_hardware_identity() const { get_io_node_plain()->invalidate_hardware_identity(); }
+
+  /**
+   * @brief      Start the background samplers of the clock frequencies of the design, so that
+   *             the status reads serve the frequencies without waiting for the counters.
+   */
+  virtual void start_frequency_samplers() const { get_io_node_plain()->start_clock_frequency_sampler(); }
+
+protected:
+  /**
+   * @brief      Queue the reads of the firmware version and generics of the design.
+   *
+   * @return     Function filling identity once the reads are dispatched
+   */
+  virtual std::function<void()> queue_firmware_identity(HardwareIdentity& identity) const
+  {
+    // designs without queueable version register read it on their own
+    return [this, &identity]() { identity.firmware_version = this->read_firmware_version(); };
+  }
 };
 
 } // namespace timing
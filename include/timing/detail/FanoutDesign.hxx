@@ -83,12 +83,13 @@ FanoutDesign<MST>::reset_io(int32_t fanout_mode, const std::string& clock_config
 
   // temporary? 
   // TODO : discuss MIB firmware interface
-  if (convert_value_to_board_type(get_io_node_plain()->read_board_type()) == kBoardMIB)
+  if (convert_value_to_board_type(this->get_hardware_identity().board_type) == kBoardMIB)
   {
     getNode("switch.csr.ctrl.amc_out").write(0xfff);
     getNode("switch.csr.ctrl.amc_in").write(0x0);
     getNode("switch.csr.ctrl.usfp_src").write(0x0);
-    uhal::Node::getClient().dispatch();
+    IPbusProfiler::dispatch(uhal::Node::getClient());
+    this->invalidate_snapshots();
   }
 }
 //-----------------------------------------------------------------------------
@@ -107,7 +108,7 @@ uint32_t
 FanoutDesign<MST>::measure_endpoint_rtt(uint32_t address, bool control_sfp, int sfp_mux) const
 {
   auto fanout_mode = uhal::Node::getNode("switch.csr.ctrl.master_src").read();
-  uhal::Node::getClient().dispatch();
+  IPbusProfiler::dispatch(uhal::Node::getClient());
 
   if (!fanout_mode.value()) {
     std::ostringstream message;
@@ -131,7 +132,7 @@ FanoutDesign<MST>::apply_endpoint_delay(uint32_t address,
                                             int sfp_mux) const
 {
   auto fanout_mode = uhal::Node::getNode("switch.csr.ctrl.master_src").read();
-  uhal::Node::getClient().dispatch();
+  IPbusProfiler::dispatch(uhal::Node::getClient());
 
   if (!fanout_mode.value()) {
     std::ostringstream message;
@@ -147,15 +148,10 @@ FanoutDesign<MST>::apply_endpoint_delay(uint32_t address,
 //-----------------------------------------------------------------------------
 template<class MST>
 void
-FanoutDesign<MST>::get_info(opmonlib::InfoCollector& ci, int level) const
-{ 
-  opmonlib::InfoCollector master_collector;
-  this->get_master_node().get_info(master_collector, level);
-  ci.add("master", master_collector);
-
-  opmonlib::InfoCollector hardware_collector;
-  this->get_io_node_plain()->get_info(hardware_collector, level);
-  ci.add("io", hardware_collector);
+FanoutDesign<MST>::add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const
+{
+  this->get_master_node().add_to_monitoring_plan(plan, MonitoringPlan::extend(path, "master"), level);
+  this->get_io_node_plain()->add_to_monitoring_plan(plan, MonitoringPlan::extend(path, "io"), level);
 }
 //-----------------------------------------------------------------------------
 
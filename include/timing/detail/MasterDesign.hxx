@@ -70,7 +70,7 @@ template<class MST>
 void
 MasterDesign<MST>::sync_timestamp() const
 {
-  auto dts_clock_frequency = this->get_io_node_plain()->read_firmware_frequency();
+  auto dts_clock_frequency = this->get_hardware_identity().firmware_frequency;
   get_master_node().sync_timestamp(dts_clock_frequency);
 }
 //-----------------------------------------------------------------------------
@@ -115,7 +115,7 @@ template<class MST>
 void
 MasterDesign<MST>::enable_fake_trigger(uint32_t channel, double rate, bool poisson) const // NOLINT(build/unsigned)
 {
-  auto dts_clock_frequency = this->get_io_node_plain()->read_firmware_frequency();
+  auto dts_clock_frequency = this->get_hardware_identity().firmware_frequency;
   get_master_node().enable_fake_trigger(channel, rate, poisson, dts_clock_frequency);
 }
 //-----------------------------------------------------------------------------
@@ -126,7 +126,7 @@ uint32_t
 MasterDesign<MST>::read_firmware_version() const // NOLINT(build/unsigned)
 {
   auto firmware_version = this->get_master_node().getNode("global.version").read();
-  uhal::Node::getClient().dispatch();
+  IPbusProfiler::dispatch(uhal::Node::getClient());
 
   return firmware_version.value();
 }
@@ -137,7 +137,7 @@ template<class MST>
 void
 MasterDesign<MST>::validate_firmware_version() const
 {
-  auto firmware_version = read_firmware_version();
+  auto firmware_version = this->get_hardware_identity().firmware_version;
 
   int major_firmware_version = (firmware_version >> 16) & 0xff;
   int minor_firmware_version = (firmware_version >> 8) & 0xff;
@@ -152,18 +152,30 @@ MasterDesign<MST>::validate_firmware_version() const
 }
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+template<class MST>
+std::function<void()>
+MasterDesign<MST>::queue_firmware_identity(HardwareIdentity& identity) const
+{
+  auto firmware_version = this->get_master_node().getNode("global.version").read();
+  auto generics = this->read_sub_nodes(this->get_master_node().getNode("global.config"), false);
+
+  return [&identity, firmware_version, generics]() {
+    identity.firmware_version = firmware_version.value();
+    identity.generics.clear();
+    for (auto& generic : generics)
+      identity.generics[generic.first] = generic.second.value();
+  };
+}
+//-----------------------------------------------------------------------------
+
 //-----------------------------------------------------------------------------
 template<class MST>
 void
-MasterDesign<MST>::get_info(opmonlib::InfoCollector& ci, int level) const
-{ 
-  opmonlib::InfoCollector master_collector;
-  this->get_master_node().get_info(master_collector, level);
-  ci.add("master", master_collector);
-
-  opmonlib::InfoCollector hardware_collector;
-  this->get_io_node_plain()->get_info(hardware_collector, level);
-  ci.add("io", hardware_collector);
+MasterDesign<MST>::add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const
+{
+  this->get_master_node().add_to_monitoring_plan(plan, MonitoringPlan::extend(path, "master"), level);
+  this->get_io_node_plain()->add_to_monitoring_plan(plan, MonitoringPlan::extend(path, "io"), level);
 }
 //-----------------------------------------------------------------------------
 }
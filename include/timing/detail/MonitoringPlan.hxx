@@ -0,0 +1,21 @@
+namespace dunedaq {
+namespace timing {
+
+//-----------------------------------------------------------------------------
+template<class DATA, class QUEUE>
+void
+MonitoringPlan::add_data(const Path& path, QUEUE queue)
+{
+  add_reads(path, [queue]() -> FillFunction {
+    auto data = std::make_shared<DATA>();
+    std::function<void()> fill = queue(*data);
+    return [data, fill](opmonlib::InfoCollector& ic) {
+      fill();
+      ic.add(*data);
+    };
+  });
+}
+//-----------------------------------------------------------------------------
+
+} // namespace timing
+} // namespace dunedaq
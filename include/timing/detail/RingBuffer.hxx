@@ -0,0 +1,54 @@
+namespace dunedaq::timing {
+
+//-----------------------------------------------------------------------------
+template<typename T>
+RingBuffer<T>::RingBuffer(size_t capacity)
+  : m_buffer(capacity < 2 ? 2 : size_t(1) << (64 - __builtin_clzll(capacity - 1)))
+  , m_mask(m_buffer.size() - 1)
+  , m_head(0)
+  , m_tail(0)
+{}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+template<typename T>
+bool
+RingBuffer<T>::push(const T& element)
+{
+  const size_t tail = m_tail.load(std::memory_order_relaxed);
+  if (tail - m_head.load(std::memory_order_acquire) == m_buffer.size())
+    return false;
+
+  m_buffer[tail & m_mask] = element;
+  m_tail.store(tail + 1, std::memory_order_release);
+  return true;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+template<typename T>
+bool
+RingBuffer<T>::pop(T& element)
+{
+  const size_t head = m_head.load(std::memory_order_relaxed);
+  if (head == m_tail.load(std::memory_order_acquire))
+    return false;
+
+  element = m_buffer[head & m_mask];
+  m_head.store(head + 1, std::memory_order_release);
+  return true;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+template<typename T>
+size_t
+RingBuffer<T>::size() const
+{
+  // load the head first, the tail can only have moved further away from it
+  const size_t head = m_head.load(std::memory_order_acquire);
+  return m_tail.load(std::memory_order_acquire) - head;
+}
+//-----------------------------------------------------------------------------
+
+} // namespace dunedaq::timing
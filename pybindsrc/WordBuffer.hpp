@@ -0,0 +1,54 @@
+/**
+ * @file WordBuffer.hpp
+ *
+ * WordBuffer is a block of 32-bit words handed over to Python
+ * through the buffer protocol.
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#ifndef TIMING_PYBINDSRC_WORDBUFFER_HPP_
+#define TIMING_PYBINDSRC_WORDBUFFER_HPP_
+
+#include "uhal/ValMem.hpp"
+
+#include <utility>
+#include <vector>
+
+namespace dunedaq {
+namespace timing {
+namespace python {
+
+/**
+ * @brief      Owner of a block of words read from the hardware.
+ *
+ * Exposed to Python as a read-only sequence implementing the buffer protocol, so that
+ * numpy.asarray and memoryview access the words without copying them.
+ */
+class WordBuffer
+{
+public:
+  WordBuffer() {}
+  explicit WordBuffer(std::vector<uint32_t>&& words) // NOLINT(build/unsigned)
+    : m_words(std::move(words))
+  {}
+  explicit WordBuffer(uhal::ValVector<uint32_t> words) // NOLINT(build/unsigned)
+  {
+    // reads skipped on error leave the vector unvalidated
+    if (words.valid())
+      m_words.assign(words.begin(), words.end());
+  }
+
+  const std::vector<uint32_t>& words() const { return m_words; } // NOLINT(build/unsigned)
+
+private:
+  std::vector<uint32_t> m_words; // NOLINT(build/unsigned)
+};
+
+} // namespace python
+} // namespace timing
+} // namespace dunedaq
+
+#endif // TIMING_PYBINDSRC_WORDBUFFER_HPP_
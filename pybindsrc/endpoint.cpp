@@ -6,13 +6,21 @@
  * received with this code.
  */
 
+#include "WordBuffer.hpp"
+
 #include "timing/CRTNode.hpp"
 #include "timing/EndpointNode.hpp"
 #include "timing/HSINode.hpp"
+#include "timing/HSIStreamReader.hpp"
 
+#include <pybind11/chrono.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
+#include <chrono>
+#include <sstream>
+#include <vector>
+
 namespace py = pybind11;
 
 namespace dunedaq {
@@ -24,32 +32,37 @@ register_endpoint(py::module& m)
 {
   py::class_<timing::EndpointNode, uhal::Node>(m, "EndpointNode")
     .def(py::init<const uhal::Node&>())
-    .def("disable", &timing::EndpointNode::disable)
-    .def("enable", &timing::EndpointNode::enable, py::arg("partition") = 0, py::arg("address") = 0)
-    .def("reset", &timing::EndpointNode::reset, py::arg("partition") = 0, py::arg("address") = 0)
-    .def("read_buffer_count", &timing::EndpointNode::read_buffer_count)
-    .def("read_data_buffer", &timing::EndpointNode::read_data_buffer, py::arg("read_all") = false)
+    .def("disable", &timing::EndpointNode::disable, py::call_guard<py::gil_scoped_release>())
+    .def("enable", &timing::EndpointNode::enable, py::arg("partition") = 0, py::arg("address") = 0, py::call_guard<py::gil_scoped_release>())
+    .def("reset", &timing::EndpointNode::reset, py::arg("partition") = 0, py::arg("address") = 0, py::call_guard<py::gil_scoped_release>())
+    .def("read_buffer_count", &timing::EndpointNode::read_buffer_count, py::call_guard<py::gil_scoped_release>())
+    .def(
+      "read_data_buffer",
+      [](const timing::EndpointNode& node, bool read_all) { return WordBuffer(node.read_data_buffer(read_all)); },
+      py::arg("read_all") = false, py::call_guard<py::gil_scoped_release>())
     .def("get_data_buffer_table",
          &timing::EndpointNode::get_data_buffer_table,
          py::arg("read_all") = false,
-         py::arg("print_out") = false)
-    .def("read_version", &timing::EndpointNode::read_version)
-    .def("read_timestamp", &timing::EndpointNode::read_timestamp)
-    .def("read_clock_frequency", &timing::EndpointNode::read_clock_frequency);
+         py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("read_version", &timing::EndpointNode::read_version, py::call_guard<py::gil_scoped_release>())
+    .def("read_timestamp", &timing::EndpointNode::read_timestamp, py::call_guard<py::gil_scoped_release>())
+    .def("read_clock_frequency", &timing::EndpointNode::read_clock_frequency, py::call_guard<py::gil_scoped_release>())
+    .def("measure_clock_frequency", &timing::EndpointNode::measure_clock_frequency, py::call_guard<py::gil_scoped_release>())
+    .def("start_clock_frequency_sampler", &timing::EndpointNode::start_clock_frequency_sampler, py::call_guard<py::gil_scoped_release>());
 
   py::class_<timing::CRTNode, uhal::Node>(m, "CRTNode")
     .def(py::init<const uhal::Node&>())
-    .def("disable", &timing::CRTNode::disable)
-    .def("enable", py::overload_cast<uint32_t, FixedLengthCommandType>(&timing::CRTNode::enable, py::const_)) // NOLINT(build/unsigned)
-    .def("get_status", &timing::CRTNode::get_status, py::arg("print_out") = false)
-    .def("read_last_pulse_timestamp", &timing::CRTNode::read_last_pulse_timestamp);
+    .def("disable", &timing::CRTNode::disable, py::call_guard<py::gil_scoped_release>())
+    .def("enable", py::overload_cast<uint32_t, FixedLengthCommandType>(&timing::CRTNode::enable, py::const_), py::call_guard<py::gil_scoped_release>()) // NOLINT(build/unsigned)
+    .def("get_status", &timing::CRTNode::get_status, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("read_last_pulse_timestamp", &timing::CRTNode::read_last_pulse_timestamp, py::call_guard<py::gil_scoped_release>());
 
   py::class_<timing::HSINode, uhal::Node>(m, "HSINode")
     .def(py::init<const uhal::Node&>())
-    .def("disable", &timing::HSINode::disable)
-    .def("enable", &timing::HSINode::enable)
-    .def("reset", &timing::HSINode::reset, py::arg("partition") = 0, py::arg("address") = 0)
-    .def("get_status", &timing::HSINode::get_status, py::arg("print_out") = false)
+    .def("disable", &timing::HSINode::disable, py::call_guard<py::gil_scoped_release>())
+    .def("enable", &timing::HSINode::enable, py::call_guard<py::gil_scoped_release>())
+    .def("reset", &timing::HSINode::reset, py::arg("partition") = 0, py::arg("address") = 0, py::call_guard<py::gil_scoped_release>())
+    .def("get_status", &timing::HSINode::get_status, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
     .def("configure_hsi",
          &timing::HSINode::configure_hsi,
          py::arg("src"),
@@ -58,16 +71,86 @@ register_endpoint(py::module& m)
          py::arg("inv_mask"),
          py::arg("rate"),
          py::arg("clock_frequency_hz"),
-         py::arg("dispatch") = true)
-    .def("start_hsi", &timing::HSINode::start_hsi, py::arg("dispatch") = true)
-    .def("stop_hsi", &timing::HSINode::stop_hsi, py::arg("dispatch") = true)
-    .def("reset_hsi", &timing::HSINode::reset_hsi, py::arg("dispatch") = true)
+         py::arg("dispatch") = true, py::call_guard<py::gil_scoped_release>())
+    .def("start_hsi", &timing::HSINode::start_hsi, py::arg("dispatch") = true, py::call_guard<py::gil_scoped_release>())
+    .def("stop_hsi", &timing::HSINode::stop_hsi, py::arg("dispatch") = true, py::call_guard<py::gil_scoped_release>())
+    .def("reset_hsi", &timing::HSINode::reset_hsi, py::arg("dispatch") = true, py::call_guard<py::gil_scoped_release>())
+    .def("read_buffer_count", &timing::HSINode::read_buffer_count, py::call_guard<py::gil_scoped_release>())
+    .def(
+      "read_data_buffer",
+      [](const timing::HSINode& node, bool read_all, bool fail_on_error) {
+        return WordBuffer(node.read_data_buffer(read_all, fail_on_error));
+      },
+      py::arg("read_all") = false,
+      py::arg("fail_on_error") = false, py::call_guard<py::gil_scoped_release>())
     .def("get_data_buffer_table",
          &timing::HSINode::get_data_buffer_table,
          py::arg("read_all") = false,
-         py::arg("print_out") = false)
-    .def("read_buffer_warning", &timing::HSINode::reset_hsi)
-    .def("read_buffer_error", &timing::HSINode::reset_hsi);
+         py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("read_buffer_warning", &timing::HSINode::reset_hsi, py::call_guard<py::gil_scoped_release>())
+    .def("read_buffer_error", &timing::HSINode::reset_hsi, py::call_guard<py::gil_scoped_release>());
+
+  py::class_<timing::HSIEvent>(m, "HSIEvent")
+    .def_readonly("header", &timing::HSIEvent::header)
+    .def_readonly("timestamp", &timing::HSIEvent::timestamp)
+    .def_readonly("signal_map", &timing::HSIEvent::signal_map)
+    .def_readonly("counter", &timing::HSIEvent::counter)
+    .def("__repr__", [](const timing::HSIEvent& event) {
+      std::stringstream repr;
+      repr << "HSIEvent(header=0x" << std::hex << event.header << ", timestamp=0x" << event.timestamp
+           << ", signal_map=0x" << event.signal_map << ", counter=" << std::dec << event.counter << ")";
+      return repr.str();
+    });
+
+  py::class_<timing::HSIStreamStats>(m, "HSIStreamStats")
+    .def_readonly("events", &timing::HSIStreamStats::events)
+    .def_readonly("words", &timing::HSIStreamStats::words)
+    .def_readonly("dispatches", &timing::HSIStreamStats::dispatches)
+    .def_readonly("empty_polls", &timing::HSIStreamStats::empty_polls)
+    .def_readonly("buffer_warnings", &timing::HSIStreamStats::buffer_warnings)
+    .def_readonly("buffer_errors", &timing::HSIStreamStats::buffer_errors)
+    .def_readonly("buffer_overflows", &timing::HSIStreamStats::buffer_overflows)
+    .def_readonly("dropped_events", &timing::HSIStreamStats::dropped_events)
+    .def_readonly("read_failures", &timing::HSIStreamStats::read_failures);
+
+  py::class_<timing::HSIStreamReader>(m, "HSIStreamReader")
+    .def(py::init<const timing::HSINode&, size_t>(),
+         py::arg("node"),
+         py::arg("capacity") = timing::HSIStreamReader::kDefaultCapacity,
+         py::keep_alive<1, 2>())
+    .def("start", [](timing::HSIStreamReader& reader) { reader.start(); }, py::call_guard<py::gil_scoped_release>())
+    .def("stop", &timing::HSIStreamReader::stop, py::call_guard<py::gil_scoped_release>())
+    .def("is_running", &timing::HSIStreamReader::is_running)
+    .def("size", &timing::HSIStreamReader::size)
+    .def("get_stats", &timing::HSIStreamReader::get_stats)
+    .def(
+      "pop_events",
+      [](timing::HSIStreamReader& reader, size_t max_events) {
+        std::vector<timing::HSIEvent> events;
+        reader.pop_events(events, max_events);
+        return events;
+      },
+      py::arg("max_events") = 0)
+    .def("wait_for_events",
+         &timing::HSIStreamReader::wait_for_events,
+         py::arg("timeout"),
+         py::call_guard<py::gil_scoped_release>())
+    .def("__iter__", [](timing::HSIStreamReader& reader) -> timing::HSIStreamReader& { return reader; })
+    .def("__next__", [](timing::HSIStreamReader& reader) {
+      // block until an event arrives; stop iterating once the reader is stopped and drained
+      timing::HSIEvent event;
+      while (!reader.pop(event)) {
+        if (!reader.is_running())
+          throw py::stop_iteration();
+        {
+          py::gil_scoped_release release;
+          reader.wait_for_events(std::chrono::milliseconds(100));
+        }
+        if (PyErr_CheckSignals() != 0)
+          throw py::error_already_set();
+      }
+      return event;
+    });
 }
 
 } // namespace python
@@ -7,16 +7,20 @@
  */
 
 #include "timing/I2CMasterNode.hpp"
+#include "timing/I2CMultiBusExecutor.hpp"
 #include "timing/I2CSlave.hpp"
 #include "timing/SIChipSlave.hpp"
 // #include "timing/MiniPODMasterNode.hpp"
 #include "timing/DACNode.hpp"
 #include "timing/I2CExpanderNode.hpp"
+#include "timing/SI534xConfig.hpp"
 #include "timing/SI534xNode.hpp"
 
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
+#include <memory>
+#include <thread>
 #include <vector>
 
 namespace py = pybind11;
@@ -25,6 +29,48 @@ namespace dunedaq {
 namespace timing {
 namespace python {
 
+namespace {
+
+/**
+ * @brief      Python context manager around an I2CBusSession.
+ *
+ * The session is opened by __enter__ and closed by __exit__, which must run on the same
+ * thread as the session holds the lock of the bus.
+ */
+class PyI2CBusSession
+{
+public:
+  explicit PyI2CBusSession(const timing::I2CMasterNode& i2c_master)
+    : m_i2c_master(i2c_master)
+  {}
+
+  void enter()
+  {
+    if (m_session)
+      throw std::runtime_error("I2C bus session already entered");
+    m_session.reset(new timing::I2CBusSession(m_i2c_master));
+    m_owner = std::this_thread::get_id();
+  }
+
+  void exit()
+  {
+    if (!m_session)
+      return;
+    if (std::this_thread::get_id() != m_owner)
+      throw std::runtime_error("I2C bus session exited by a thread other than the one which entered it");
+    m_session.reset();
+  }
+
+  bool is_open() const { return m_session && m_session->is_open(); }
+
+private:
+  const timing::I2CMasterNode& m_i2c_master;
+  std::unique_ptr<timing::I2CBusSession> m_session;
+  std::thread::id m_owner;
+};
+
+} // namespace
+
 void
 register_i2c(py::module& m)
 {
@@ -34,91 +80,154 @@ register_i2c(py::module& m)
   py::class_<timing::I2CMasterNode, uhal::Node>(m, "I2CMasterNode")
     .def(py::init<const uhal::Node&>())
     .def("get_i2c_clock_prescale", &timing::I2CMasterNode::get_i2c_clock_prescale)
-    .def("read_i2c", &timing::I2CMasterNode::read_i2c)
+    .def("read_i2c", &timing::I2CMasterNode::read_i2c, py::call_guard<py::gil_scoped_release>())
     .def("write_i2c",
          &timing::I2CMasterNode::write_i2c,
          py::arg("i2c_device_address"),
          py::arg("i2c_reg_address"),
          py::arg("data"),
-         py::arg("send_stop") = true)
-    .def("read_i2cArray", &timing::I2CMasterNode::read_i2cArray)
+         py::arg("send_stop") = true, py::call_guard<py::gil_scoped_release>())
+    .def("read_i2cArray", &timing::I2CMasterNode::read_i2cArray, py::call_guard<py::gil_scoped_release>())
     .def("write_i2cArray",
          &timing::I2CMasterNode::write_i2cArray,
          py::arg("i2c_device_address"),
          py::arg("i2c_reg_address"),
          py::arg("data"),
-         py::arg("send_stop") = true)
-    .def("read_i2cPrimitive", &timing::I2CMasterNode::read_i2cPrimitive)
+         py::arg("send_stop") = true, py::call_guard<py::gil_scoped_release>())
+    .def("read_i2cPrimitive", &timing::I2CMasterNode::read_i2cPrimitive, py::call_guard<py::gil_scoped_release>())
     .def("write_i2cPrimitive",
          &timing::I2CMasterNode::write_i2cPrimitive,
          py::arg("i2c_device_address"),
          py::arg("data"),
-         py::arg("send_stop") = true)
+         py::arg("send_stop") = true, py::call_guard<py::gil_scoped_release>())
     .def("get_slaves", &timing::I2CMasterNode::get_slaves)
     .def("get_slave", &timing::I2CMasterNode::get_slave, py::return_value_policy::reference_internal)
     .def("get_slave_address", &timing::I2CMasterNode::get_slave_address)
-    .def("ping", &timing::I2CMasterNode::ping)
-    .def("scan", &timing::I2CMasterNode::scan)
-    .def("reset", &timing::I2CMasterNode::reset);
+    .def("ping", &timing::I2CMasterNode::ping, py::call_guard<py::gil_scoped_release>())
+    .def("scan", &timing::I2CMasterNode::scan, py::call_guard<py::gil_scoped_release>())
+    .def("reset", &timing::I2CMasterNode::reset, py::call_guard<py::gil_scoped_release>())
+    .def("in_session", &timing::I2CMasterNode::in_session);
+
+  // Wrap timing::I2CBusSession as a context manager, the bus is locked between __enter__ and __exit__
+  py::class_<PyI2CBusSession>(m, "I2CBusSession")
+    .def(py::init<const timing::I2CMasterNode&>(), py::keep_alive<1, 2>())
+    .def("is_open", &PyI2CBusSession::is_open)
+    .def("__enter__",
+         [](PyI2CBusSession& session) -> PyI2CBusSession& {
+           py::gil_scoped_release release;
+           session.enter();
+           return session;
+         },
+         py::return_value_policy::reference)
+    .def("__exit__",
+         [](PyI2CBusSession& session, py::object /*exc_type*/, py::object /*exc_value*/, py::object /*traceback*/) {
+           session.exit();
+         });
+
+  // Wrap timing::I2CMultiBusExecutor
+  py::class_<timing::I2CMultiBusExecutor>(m, "I2CMultiBusExecutor")
+    .def(py::init<>())
+    .def<size_t (timing::I2CMultiBusExecutor::*)(const timing::I2CMasterNode&, uint8_t, uint32_t, uint32_t)>( // NOLINT(build/unsigned)
+      "add_read",
+      &timing::I2CMultiBusExecutor::add_read,
+      py::keep_alive<1, 2>())
+    .def<size_t (timing::I2CMultiBusExecutor::*)(const timing::I2CSlave&, uint32_t, uint32_t)>( // NOLINT(build/unsigned)
+      "add_read",
+      &timing::I2CMultiBusExecutor::add_read,
+      py::keep_alive<1, 2>())
+    .def<size_t (timing::I2CMultiBusExecutor::*)(const timing::I2CMasterNode&, uint8_t, const timing::I2CMasterNode::RegisterWriteList&)>( // NOLINT(build/unsigned)
+      "add_writes",
+      &timing::I2CMultiBusExecutor::add_writes,
+      py::keep_alive<1, 2>())
+    .def<size_t (timing::I2CMultiBusExecutor::*)(const timing::I2CSlave&, const timing::I2CMasterNode::RegisterWriteList&)>(
+      "add_writes",
+      &timing::I2CMultiBusExecutor::add_writes,
+      py::keep_alive<1, 2>())
+    .def("execute", &timing::I2CMultiBusExecutor::execute, py::call_guard<py::gil_scoped_release>())
+    .def("clear", &timing::I2CMultiBusExecutor::clear)
+    .def("get_number_of_jobs", &timing::I2CMultiBusExecutor::get_number_of_jobs)
+    .def("succeeded", &timing::I2CMultiBusExecutor::succeeded)
+    .def("get_error", &timing::I2CMultiBusExecutor::get_error)
+    .def("get_data", &timing::I2CMultiBusExecutor::get_data)
+    .def("get_number_of_dispatches", &timing::I2CMultiBusExecutor::get_number_of_dispatches);
 
   // Wrap timing::I2CSlave
   py::class_<timing::I2CSlave>(m, "I2CSlave")
     .def("get_i2c_address", &timing::I2CSlave::get_i2c_address)
     .def<uint8_t (timing::I2CSlave::*)(uint32_t) const>("read_i2c", // NOLINT(build/unsigned)
-                                                        &timing::I2CSlave::read_i2c)
+                                                        &timing::I2CSlave::read_i2c, py::call_guard<py::gil_scoped_release>())
     .def<uint8_t (timing::I2CSlave::*)(uint32_t, uint32_t) const>("read_i2c", // NOLINT(build/unsigned)
-                                                                  &timing::I2CSlave::read_i2c)
+                                                                  &timing::I2CSlave::read_i2c, py::call_guard<py::gil_scoped_release>())
     .def<void (timing::I2CSlave::*)(uint32_t, uint8_t, bool) const>("write_i2c", // NOLINT(build/unsigned)
                                                                     &timing::I2CSlave::write_i2c,
                                                                     py::arg("i2c_reg_address"),
                                                                     py::arg("data"),
-                                                                    py::arg("send_stop") = true)
+                                                                    py::arg("send_stop") = true, py::call_guard<py::gil_scoped_release>())
     .def<void (timing::I2CSlave::*)(uint32_t, uint32_t, uint8_t, bool) const>("write_i2c", // NOLINT(build/unsigned)
                                                                               &timing::I2CSlave::write_i2c,
                                                                               py::arg("i2c_device_address"),
                                                                               py::arg("i2c_reg_address"),
                                                                               py::arg("data"),
-                                                                              py::arg("send_stop") = true)
+                                                                              py::arg("send_stop") = true, py::call_guard<py::gil_scoped_release>())
     .def<std::vector<uint8_t> (timing::I2CSlave::*)(uint32_t, uint32_t) const>( // NOLINT(build/unsigned)
       "read_i2cArray",
-      &timing::I2CSlave::read_i2cArray)
+      &timing::I2CSlave::read_i2cArray,
+      py::call_guard<py::gil_scoped_release>())
     .def<std::vector<uint8_t> (timing::I2CSlave::*)(uint32_t, uint32_t, uint32_t) const>( // NOLINT(build/unsigned)
       "read_i2cArray",
-      &timing::I2CSlave::read_i2cArray)
+      &timing::I2CSlave::read_i2cArray,
+      py::call_guard<py::gil_scoped_release>())
     .def<void (timing::I2CSlave::*)(uint32_t, std::vector<uint8_t>, bool) const>( // NOLINT(build/unsigned)
       "write_i2cArray",
       &timing::I2CSlave::write_i2cArray,
       py::arg("i2c_reg_address"),
       py::arg("data"),
-      py::arg("send_stop") = true)
+      py::arg("send_stop") = true, py::call_guard<py::gil_scoped_release>())
     .def<void (timing::I2CSlave::*)(uint32_t, uint32_t, std::vector<uint8_t>, bool) const>( // NOLINT(build/unsigned)
       "write_i2cArray",
       &timing::I2CSlave::write_i2cArray,
       py::arg("i2c_device_address"),
       py::arg("i2c_reg_address"),
       py::arg("data"),
-      py::arg("send_stop") = true)
-    .def("read_i2cPrimitive", &timing::I2CSlave::read_i2cPrimitive)
-    .def("write_i2cPrimitive", &timing::I2CSlave::write_i2cPrimitive, py::arg("data"), py::arg("send_stop") = true)
-    .def("ping", &timing::I2CSlave::ping);
+      py::arg("send_stop") = true, py::call_guard<py::gil_scoped_release>())
+    .def("read_i2cPrimitive", &timing::I2CSlave::read_i2cPrimitive, py::call_guard<py::gil_scoped_release>())
+    .def("write_i2cPrimitive", &timing::I2CSlave::write_i2cPrimitive, py::arg("data"), py::arg("send_stop") = true, py::call_guard<py::gil_scoped_release>())
+    .def("ping", &timing::I2CSlave::ping, py::call_guard<py::gil_scoped_release>());
 
   // Wrap SIChipSlave
   py::class_<timing::SIChipSlave, timing::I2CSlave>(m, "SIChipSlave")
     .def(py::init<const timing::I2CMasterNode*, uint8_t>()) // NOLINT(build/unsigned)
-    .def("read_page", &timing::SIChipSlave::read_page)
-    .def("switch_page", &timing::SIChipSlave::switch_page)
-    .def("read_device_version", &timing::SIChipSlave::read_device_version)
-    .def("read_clock_register", &timing::SIChipSlave::read_clock_register)
-    .def("write_clock_register", &timing::SIChipSlave::write_clock_register);
+    .def("read_page", &timing::SIChipSlave::read_page, py::call_guard<py::gil_scoped_release>())
+    .def("switch_page", &timing::SIChipSlave::switch_page, py::call_guard<py::gil_scoped_release>())
+    .def("read_device_version", &timing::SIChipSlave::read_device_version, py::call_guard<py::gil_scoped_release>())
+    .def("read_clock_register", &timing::SIChipSlave::read_clock_register, py::call_guard<py::gil_scoped_release>())
+    .def("write_clock_register", &timing::SIChipSlave::write_clock_register, py::call_guard<py::gil_scoped_release>())
+    .def("write_clock_registers",
+         [](const timing::SIChipSlave& slave, const std::vector<std::pair<uint16_t, uint8_t>>& settings) { // NOLINT(build/unsigned)
+           slave.write_clock_registers(settings);
+         },
+         py::call_guard<py::gil_scoped_release>())
+    .def("invalidate_page_cache", &timing::SIChipSlave::invalidate_page_cache);
 
   // Wrap SI534xSlave
   py::class_<timing::SI534xSlave, timing::SIChipSlave>(m, "SI534xSlave")
     .def(py::init<const timing::I2CMasterNode*, uint8_t>()) // NOLINT(build/unsigned)
-    .def("configure", &timing::SI534xSlave::configure)
-    .def("read_config_id", &timing::SI534xSlave::read_config_id)
+    .def("configure", &timing::SI534xSlave::configure, py::arg("filename"), py::arg("incremental") = false, py::call_guard<py::gil_scoped_release>())
+    .def("is_configured", &timing::SI534xSlave::is_configured, py::call_guard<py::gil_scoped_release>())
+    .def("read_config_id", &timing::SI534xSlave::read_config_id, py::call_guard<py::gil_scoped_release>())
+    .def("read_clock_registers", &timing::SI534xSlave::read_clock_registers, py::call_guard<py::gil_scoped_release>())
     // .def("registers", &timing::SI534xSlave::registers)
     ;
 
+  // Wrap SI534xConfig
+  py::class_<timing::SI534xConfig>(m, "SI534xConfig")
+    .def_static("load", &timing::SI534xConfig::load, py::arg("filename"), py::arg("use_cache") = true, py::call_guard<py::gil_scoped_release>())
+    .def_static("compile", &timing::SI534xConfig::compile, py::call_guard<py::gil_scoped_release>())
+    .def_static("get_cache_path", &timing::SI534xConfig::get_cache_path)
+    .def_static("get_cache_directory", &timing::SI534xConfig::get_cache_directory)
+    .def("get_design_id", &timing::SI534xConfig::get_design_id)
+    .def("get_content_hash", &timing::SI534xConfig::get_content_hash);
+
   // Wrap SI534xNode
   py::class_<timing::SI534xNode, timing::SI534xSlave, timing::I2CMasterNode>(m, "SI534xNode")
     .def(py::init<const uhal::Node&>());
@@ -126,11 +235,11 @@ register_i2c(py::module& m)
   // Wrap I2CExpanderSlave
   py::class_<timing::I2CExpanderSlave, timing::I2CSlave>(m, "I2CExpanderSlave")
     .def(py::init<const timing::I2CMasterNode*, uint8_t>()) // NOLINT(build/unsigned)
-    .def("set_io", &timing::I2CExpanderSlave::set_io)
-    .def("set_inversion", &timing::I2CExpanderSlave::set_inversion)
-    .def("set_outputs", &timing::I2CExpanderSlave::set_outputs)
-    .def("read_inputs", &timing::I2CExpanderSlave::read_inputs)
-    .def("debug", &timing::I2CExpanderSlave::debug);
+    .def("set_io", &timing::I2CExpanderSlave::set_io, py::call_guard<py::gil_scoped_release>())
+    .def("set_inversion", &timing::I2CExpanderSlave::set_inversion, py::call_guard<py::gil_scoped_release>())
+    .def("set_outputs", &timing::I2CExpanderSlave::set_outputs, py::call_guard<py::gil_scoped_release>())
+    .def("read_inputs", &timing::I2CExpanderSlave::read_inputs, py::call_guard<py::gil_scoped_release>())
+    .def("debug", &timing::I2CExpanderSlave::debug, py::call_guard<py::gil_scoped_release>());
 
 //  // Wrap I2CExpanderNode
 //  py::class_<timing::I2CExpanderNode, timing::I2CExpanderSlave, timing::I2CMasterNode>(m, "I2CExpanderNode")
@@ -139,8 +248,8 @@ register_i2c(py::module& m)
   // Wrap DACSlave
   py::class_<timing::DACSlave, timing::I2CSlave>(m, "DACSlave")
     .def(py::init<const timing::I2CMasterNode*, uint8_t>()) // NOLINT(build/unsigned)
-    .def("set_interal_ref", &timing::DACSlave::set_interal_ref)
-    .def("set_dac", &timing::DACSlave::set_dac);
+    .def("set_interal_ref", &timing::DACSlave::set_interal_ref, py::call_guard<py::gil_scoped_release>())
+    .def("set_dac", &timing::DACSlave::set_dac, py::call_guard<py::gil_scoped_release>());
 
   // Wrap DACNode
   py::class_<timing::DACNode, timing::DACSlave, timing::I2CMasterNode>(m, "DACNode").def(py::init<const uhal::Node&>());
@@ -7,6 +7,8 @@
  */
 
 #include "timing/FMCIONode.hpp"
+#include "timing/FrequencyCounterNode.hpp"
+#include "timing/FanoutIONode.hpp"
 #include "timing/IONode.hpp"
 #include "timing/PC059IONode.hpp"
 #include "timing/FIBIONode.hpp"
@@ -30,106 +32,176 @@ void
 register_io(py::module& m)
 {
 
-  py::class_<timing::IONode, uhal::Node>(m, "IONode");
+  py::class_<timing::HardwareIdentity>(m, "HardwareIdentity")
+    .def_readonly("board_type", &timing::HardwareIdentity::board_type)
+    .def_readonly("carrier_type", &timing::HardwareIdentity::carrier_type)
+    .def_readonly("design_type", &timing::HardwareIdentity::design_type)
+    .def_readonly("firmware_frequency", &timing::HardwareIdentity::firmware_frequency)
+    .def_readonly("board_uid_valid", &timing::HardwareIdentity::board_uid_valid)
+    .def_readonly("board_uid", &timing::HardwareIdentity::board_uid)
+    .def_readonly("firmware_info_valid", &timing::HardwareIdentity::firmware_info_valid)
+    .def_readonly("firmware_version", &timing::HardwareIdentity::firmware_version)
+    .def_readonly("generics", &timing::HardwareIdentity::generics);
+
+  py::class_<timing::FrequencyCounterNode, uhal::Node>(m, "FrequencyCounterNode")
+    .def(py::init<const uhal::Node&>())
+    .def("measure_frequencies", &timing::FrequencyCounterNode::measure_frequencies, py::call_guard<py::gil_scoped_release>())
+    .def("read_frequencies",
+         &timing::FrequencyCounterNode::read_frequencies,
+         py::arg("number_of_clocks"),
+         py::arg("max_age") = 0, py::call_guard<py::gil_scoped_release>())
+    .def("start_sampler", &timing::FrequencyCounterNode::start_sampler, py::call_guard<py::gil_scoped_release>())
+    .def("stop_sampler", &timing::FrequencyCounterNode::stop_sampler, py::call_guard<py::gil_scoped_release>())
+    .def("is_sampler_running", &timing::FrequencyCounterNode::is_sampler_running);
+
+  py::class_<timing::IONode, uhal::Node>(m, "IONode")
+    .def("get_hardware_identity", [](const timing::IONode& io) { return io.get_hardware_identity(); }, py::call_guard<py::gil_scoped_release>())
+    .def("invalidate_hardware_identity", &timing::IONode::invalidate_hardware_identity)
+    .def("read_board_uid", &timing::IONode::read_board_uid, py::call_guard<py::gil_scoped_release>())
+    .def("start_clock_frequency_sampler", &timing::IONode::start_clock_frequency_sampler, py::call_guard<py::gil_scoped_release>());
+
+  py::class_<timing::SFPStaticInfo>(m, "SFPStaticInfo")
+    .def_readonly("vendor_name", &timing::SFPStaticInfo::vendor_name)
+    .def_readonly("vendor_pn", &timing::SFPStaticInfo::vendor_pn)
+    .def_readonly("serial_number", &timing::SFPStaticInfo::serial_number)
+    .def_readonly("ddm_supported", &timing::SFPStaticInfo::ddm_supported)
+    .def_readonly("address_swap_required", &timing::SFPStaticInfo::address_swap_required)
+    .def_readonly("soft_tx_control_supported", &timing::SFPStaticInfo::soft_tx_control_supported);
+
+  py::class_<timing::SFPDDMSnapshot>(m, "SFPDDMSnapshot")
+    .def_readonly("temperature", &timing::SFPDDMSnapshot::temperature)
+    .def_readonly("voltage", &timing::SFPDDMSnapshot::voltage)
+    .def_readonly("current", &timing::SFPDDMSnapshot::current)
+    .def_readonly("tx_power", &timing::SFPDDMSnapshot::tx_power)
+    .def_readonly("rx_power", &timing::SFPDDMSnapshot::rx_power)
+    .def_readonly("tx_disable_sw", &timing::SFPDDMSnapshot::tx_disable_sw)
+    .def_readonly("tx_disable_hw", &timing::SFPDDMSnapshot::tx_disable_hw);
+
+  py::class_<timing::SFPSweepResult>(m, "SFPSweepResult")
+    .def_readonly("sfp_id", &timing::SFPSweepResult::sfp_id)
+    .def_readonly("label", &timing::SFPSweepResult::label)
+    .def_readonly("los", &timing::SFPSweepResult::los)
+    .def_readonly("read", &timing::SFPSweepResult::read)
+    .def_readonly("reachable", &timing::SFPSweepResult::reachable)
+    .def_readonly("ddm_valid", &timing::SFPSweepResult::ddm_valid)
+    .def_readonly("static_info", &timing::SFPSweepResult::static_info)
+    .def_readonly("ddm", &timing::SFPSweepResult::ddm)
+    .def_readonly("error", &timing::SFPSweepResult::error);
 
   py::class_<timing::FMCIONode, timing::IONode, uhal::Node>(m, "FMCIONode")
     .def(py::init<const uhal::Node&>())
     .def<void (timing::FMCIONode::*)(const std::string&) const>(
-      "reset", &timing::FMCIONode::reset, py::arg("clock_config_file") = "")
-    .def("soft_reset", &timing::FMCIONode::soft_reset)
-    .def("read_firmware_frequency", &timing::FMCIONode::read_firmware_frequency)
-    .def("get_clock_frequencies_table", &timing::FMCIONode::get_clock_frequencies_table, py::arg("print_out") = false)
-    .def("get_status", &timing::FMCIONode::get_status, py::arg("print_out") = false)
-    .def("get_pll_status", &timing::FMCIONode::get_pll_status, py::arg("print_out") = false)
-    .def("get_hardware_info", &timing::FMCIONode::get_hardware_info, py::arg("print_out") = false)
-    .def("get_sfp_status", &timing::FMCIONode::get_sfp_status, py::arg("sfp_id"), py::arg("print_out") = false)
-    .def("switch_sfp_soft_tx_control_bit", &timing::FMCIONode::switch_sfp_soft_tx_control_bit);
+      "reset", &timing::FMCIONode::reset, py::arg("clock_config_file") = "", py::call_guard<py::gil_scoped_release>())
+    .def("soft_reset", &timing::FMCIONode::soft_reset, py::call_guard<py::gil_scoped_release>())
+    .def("read_firmware_frequency", &timing::FMCIONode::read_firmware_frequency, py::call_guard<py::gil_scoped_release>())
+    .def("get_clock_frequencies_table", &timing::FMCIONode::get_clock_frequencies_table, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("read_clock_frequencies", &timing::FMCIONode::read_clock_frequencies, py::call_guard<py::gil_scoped_release>())
+    .def("measure_clock_frequencies", &timing::FMCIONode::measure_clock_frequencies, py::call_guard<py::gil_scoped_release>())
+    .def("get_status", &timing::FMCIONode::get_status, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("get_pll_status", &timing::FMCIONode::get_pll_status, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("get_hardware_info", &timing::FMCIONode::get_hardware_info, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("get_sfp_status", &timing::FMCIONode::get_sfp_status, py::arg("sfp_id"), py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("switch_sfp_soft_tx_control_bit", &timing::FMCIONode::switch_sfp_soft_tx_control_bit, py::call_guard<py::gil_scoped_release>());
 
   py::class_<timing::PC059IONode, timing::IONode, uhal::Node>(m, "PC059IONode")
     .def(py::init<const uhal::Node&>())
     .def<void (timing::PC059IONode::*)(const std::string&) const>(
-      "reset", &timing::PC059IONode::reset, py::arg("clock_config_file") = "")
+      "reset", &timing::PC059IONode::reset, py::arg("clock_config_file") = "", py::call_guard<py::gil_scoped_release>())
     .def<void (timing::PC059IONode::*)(int32_t, const std::string&) const>(
-      "reset", &timing::PC059IONode::reset, py::arg("fanout_mode"), py::arg("clock_config_file") = "")
-    .def("soft_reset", &timing::PC059IONode::soft_reset)
-    .def("read_firmware_frequency", &timing::PC059IONode::read_firmware_frequency)
-    .def("get_clock_frequencies_table", &timing::PC059IONode::get_clock_frequencies_table, py::arg("print_out") = false)
-    .def("get_status", &timing::PC059IONode::get_status, py::arg("print_out") = false)
-    .def("get_pll_status", &timing::PC059IONode::get_pll_status, py::arg("print_out") = false)
-    .def("get_hardware_info", &timing::PC059IONode::get_hardware_info, py::arg("print_out") = false)
-    .def("get_sfp_status", &timing::PC059IONode::get_sfp_status, py::arg("sfp_id"), py::arg("print_out") = false)
-    .def("switch_sfp_soft_tx_control_bit", &timing::PC059IONode::switch_sfp_soft_tx_control_bit)
-    .def("switch_sfp_mux_channel", &timing::PC059IONode::switch_sfp_mux_channel)
-    .def("read_active_sfp_mux_channel", &timing::PC059IONode::read_active_sfp_mux_channel);
+      "reset", &timing::PC059IONode::reset, py::arg("fanout_mode"), py::arg("clock_config_file") = "", py::call_guard<py::gil_scoped_release>())
+    .def("soft_reset", &timing::PC059IONode::soft_reset, py::call_guard<py::gil_scoped_release>())
+    .def("read_firmware_frequency", &timing::PC059IONode::read_firmware_frequency, py::call_guard<py::gil_scoped_release>())
+    .def("get_clock_frequencies_table", &timing::PC059IONode::get_clock_frequencies_table, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("read_clock_frequencies", &timing::PC059IONode::read_clock_frequencies, py::call_guard<py::gil_scoped_release>())
+    .def("measure_clock_frequencies", &timing::PC059IONode::measure_clock_frequencies, py::call_guard<py::gil_scoped_release>())
+    .def("get_status", &timing::PC059IONode::get_status, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("get_pll_status", &timing::PC059IONode::get_pll_status, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("get_hardware_info", &timing::PC059IONode::get_hardware_info, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("get_sfp_status", &timing::PC059IONode::get_sfp_status, py::arg("sfp_id"), py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("switch_sfp_soft_tx_control_bit", &timing::PC059IONode::switch_sfp_soft_tx_control_bit, py::call_guard<py::gil_scoped_release>())
+    .def("sweep_sfps", &timing::PC059IONode::sweep_sfps, py::arg("skip_lost") = true, py::call_guard<py::gil_scoped_release>())
+    .def("get_sfp_sweep_status", &timing::PC059IONode::get_sfp_sweep_status, py::arg("skip_lost") = true, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("switch_sfp_mux_channel", &timing::PC059IONode::switch_sfp_mux_channel, py::call_guard<py::gil_scoped_release>())
+    .def("read_active_sfp_mux_channel", &timing::PC059IONode::read_active_sfp_mux_channel, py::call_guard<py::gil_scoped_release>());
 
     py::class_<timing::FIBIONode, timing::IONode, uhal::Node>(m, "FIBIONode")
     .def(py::init<const uhal::Node&>())
     .def<void (timing::FIBIONode::*)(const std::string&) const>(
-      "reset", &timing::FIBIONode::reset, py::arg("clock_config_file") = "")
+      "reset", &timing::FIBIONode::reset, py::arg("clock_config_file") = "", py::call_guard<py::gil_scoped_release>())
     .def<void (timing::FIBIONode::*)(int32_t, const std::string&) const>(
-      "reset", &timing::FIBIONode::reset, py::arg("fanout_mode"), py::arg("clock_config_file") = "")
-    .def("soft_reset", &timing::FIBIONode::soft_reset)
-    .def("read_firmware_frequency", &timing::FIBIONode::read_firmware_frequency)
-    .def("get_clock_frequencies_table", &timing::FIBIONode::get_clock_frequencies_table, py::arg("print_out") = false)
-    .def("get_status", &timing::FIBIONode::get_status, py::arg("print_out") = false)
-    .def("get_pll_status", &timing::FIBIONode::get_pll_status, py::arg("print_out") = false)
-    .def("get_hardware_info", &timing::FIBIONode::get_hardware_info, py::arg("print_out") = false)
-    .def("get_sfp_status", &timing::FIBIONode::get_sfp_status, py::arg("sfp_id"), py::arg("print_out") = false)
-    .def("switch_sfp_soft_tx_control_bit", &timing::FIBIONode::switch_sfp_soft_tx_control_bit)
-    .def("switch_sfp_mux_channel", &timing::FIBIONode::switch_sfp_mux_channel)
-    .def("read_active_sfp_mux_channel", &timing::FIBIONode::read_active_sfp_mux_channel);
+      "reset", &timing::FIBIONode::reset, py::arg("fanout_mode"), py::arg("clock_config_file") = "", py::call_guard<py::gil_scoped_release>())
+    .def("soft_reset", &timing::FIBIONode::soft_reset, py::call_guard<py::gil_scoped_release>())
+    .def("read_firmware_frequency", &timing::FIBIONode::read_firmware_frequency, py::call_guard<py::gil_scoped_release>())
+    .def("get_clock_frequencies_table", &timing::FIBIONode::get_clock_frequencies_table, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("read_clock_frequencies", &timing::FIBIONode::read_clock_frequencies, py::call_guard<py::gil_scoped_release>())
+    .def("measure_clock_frequencies", &timing::FIBIONode::measure_clock_frequencies, py::call_guard<py::gil_scoped_release>())
+    .def("get_status", &timing::FIBIONode::get_status, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("get_pll_status", &timing::FIBIONode::get_pll_status, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("get_hardware_info", &timing::FIBIONode::get_hardware_info, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("get_sfp_status", &timing::FIBIONode::get_sfp_status, py::arg("sfp_id"), py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("switch_sfp_soft_tx_control_bit", &timing::FIBIONode::switch_sfp_soft_tx_control_bit, py::call_guard<py::gil_scoped_release>())
+    .def("sweep_sfps", &timing::FIBIONode::sweep_sfps, py::arg("skip_lost") = true, py::call_guard<py::gil_scoped_release>())
+    .def("get_sfp_sweep_status", &timing::FIBIONode::get_sfp_sweep_status, py::arg("skip_lost") = true, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("switch_sfp_mux_channel", &timing::FIBIONode::switch_sfp_mux_channel, py::call_guard<py::gil_scoped_release>())
+    .def("read_active_sfp_mux_channel", &timing::FIBIONode::read_active_sfp_mux_channel, py::call_guard<py::gil_scoped_release>());
 
   py::class_<timing::TLUIONode, timing::IONode, uhal::Node>(m, "TLUIONode")
     .def(py::init<const uhal::Node&>())
     .def<void (timing::TLUIONode::*)(const std::string&) const>(
-      "reset", &timing::TLUIONode::reset, py::arg("clock_config_file") = "")
-    .def("soft_reset", &timing::TLUIONode::soft_reset)
-    .def("read_firmware_frequency", &timing::TLUIONode::read_firmware_frequency)
-    .def("get_clock_frequencies_table", &timing::TLUIONode::get_clock_frequencies_table, py::arg("print_out") = false)
-    .def("get_status", &timing::TLUIONode::get_status, py::arg("print_out") = false)
-    .def("get_pll_status", &timing::TLUIONode::get_pll_status, py::arg("print_out") = false)
-    .def("get_hardware_info", &timing::TLUIONode::get_hardware_info, py::arg("print_out") = false)
-    .def("get_sfp_status", &timing::TLUIONode::get_sfp_status, py::arg("sfp_id"), py::arg("print_out") = false)
-    .def("switch_sfp_soft_tx_control_bit", &timing::TLUIONode::switch_sfp_soft_tx_control_bit)
+      "reset", &timing::TLUIONode::reset, py::arg("clock_config_file") = "", py::call_guard<py::gil_scoped_release>())
+    .def("soft_reset", &timing::TLUIONode::soft_reset, py::call_guard<py::gil_scoped_release>())
+    .def("read_firmware_frequency", &timing::TLUIONode::read_firmware_frequency, py::call_guard<py::gil_scoped_release>())
+    .def("get_clock_frequencies_table", &timing::TLUIONode::get_clock_frequencies_table, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("read_clock_frequencies", &timing::TLUIONode::read_clock_frequencies, py::call_guard<py::gil_scoped_release>())
+    .def("measure_clock_frequencies", &timing::TLUIONode::measure_clock_frequencies, py::call_guard<py::gil_scoped_release>())
+    .def("get_status", &timing::TLUIONode::get_status, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("get_pll_status", &timing::TLUIONode::get_pll_status, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("get_hardware_info", &timing::TLUIONode::get_hardware_info, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("get_sfp_status", &timing::TLUIONode::get_sfp_status, py::arg("sfp_id"), py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("switch_sfp_soft_tx_control_bit", &timing::TLUIONode::switch_sfp_soft_tx_control_bit, py::call_guard<py::gil_scoped_release>())
     .def("configure_dac",
          &timing::TLUIONode::configure_dac,
          py::arg("dac_id"),
          py::arg("dac_value"),
-         py::arg("internal_ref") = false);
+         py::arg("internal_ref") = false, py::call_guard<py::gil_scoped_release>());
 
   py::class_<timing::SIMIONode, timing::IONode, uhal::Node>(m, "SIMIONode")
     .def(py::init<const uhal::Node&>())
     .def<void (timing::SIMIONode::*)(const std::string&) const>(
-      "reset", &timing::SIMIONode::reset, py::arg("clock_config_file") = "")
-    .def("soft_reset", &timing::SIMIONode::soft_reset)
-    .def("read_firmware_frequency", &timing::SIMIONode::read_firmware_frequency)
-    .def("get_clock_frequencies_table", &timing::SIMIONode::get_clock_frequencies_table, py::arg("print_out") = false)
-    .def("get_status", &timing::SIMIONode::get_status, py::arg("print_out") = false)
-    .def("get_pll_status", &timing::SIMIONode::get_pll_status, py::arg("print_out") = false)
-    .def("get_hardware_info", &timing::SIMIONode::get_hardware_info, py::arg("print_out") = false)
-    .def("get_sfp_status", &timing::SIMIONode::get_sfp_status, py::arg("sfp_id"), py::arg("print_out") = false)
-    .def("switch_sfp_soft_tx_control_bit", &timing::SIMIONode::switch_sfp_soft_tx_control_bit);
+      "reset", &timing::SIMIONode::reset, py::arg("clock_config_file") = "", py::call_guard<py::gil_scoped_release>())
+    .def("soft_reset", &timing::SIMIONode::soft_reset, py::call_guard<py::gil_scoped_release>())
+    .def("read_firmware_frequency", &timing::SIMIONode::read_firmware_frequency, py::call_guard<py::gil_scoped_release>())
+    .def("get_clock_frequencies_table", &timing::SIMIONode::get_clock_frequencies_table, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("read_clock_frequencies", &timing::SIMIONode::read_clock_frequencies, py::call_guard<py::gil_scoped_release>())
+    .def("measure_clock_frequencies", &timing::SIMIONode::measure_clock_frequencies, py::call_guard<py::gil_scoped_release>())
+    .def("get_status", &timing::SIMIONode::get_status, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("get_pll_status", &timing::SIMIONode::get_pll_status, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("get_hardware_info", &timing::SIMIONode::get_hardware_info, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("get_sfp_status", &timing::SIMIONode::get_sfp_status, py::arg("sfp_id"), py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("switch_sfp_soft_tx_control_bit", &timing::SIMIONode::switch_sfp_soft_tx_control_bit, py::call_guard<py::gil_scoped_release>());
 
   py::class_<timing::MIBIONode, timing::IONode, uhal::Node>(m, "MIBIONode")
     .def(py::init<const uhal::Node&>())
     .def<void (timing::MIBIONode::*)(const std::string&) const>(
-      "reset", &timing::MIBIONode::reset, py::arg("clock_config_file") = "")
+      "reset", &timing::MIBIONode::reset, py::arg("clock_config_file") = "", py::call_guard<py::gil_scoped_release>())
     .def<void (timing::MIBIONode::*)(int32_t, const std::string&) const>(
-      "reset", &timing::MIBIONode::reset, py::arg("fanout_mode"), py::arg("clock_config_file") = "")
-    .def("soft_reset", &timing::MIBIONode::soft_reset)
-    .def("read_firmware_frequency", &timing::MIBIONode::read_firmware_frequency)
-    .def("get_clock_frequencies_table", &timing::MIBIONode::get_clock_frequencies_table, py::arg("print_out") = false)
-    .def("get_status", &timing::MIBIONode::get_status, py::arg("print_out") = false)
-    .def("get_pll_status", &timing::MIBIONode::get_pll_status, py::arg("print_out") = false)
+      "reset", &timing::MIBIONode::reset, py::arg("fanout_mode"), py::arg("clock_config_file") = "", py::call_guard<py::gil_scoped_release>())
+    .def("soft_reset", &timing::MIBIONode::soft_reset, py::call_guard<py::gil_scoped_release>())
+    .def("read_firmware_frequency", &timing::MIBIONode::read_firmware_frequency, py::call_guard<py::gil_scoped_release>())
+    .def("get_clock_frequencies_table", &timing::MIBIONode::get_clock_frequencies_table, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("read_clock_frequencies", &timing::MIBIONode::read_clock_frequencies, py::call_guard<py::gil_scoped_release>())
+    .def("measure_clock_frequencies", &timing::MIBIONode::measure_clock_frequencies, py::call_guard<py::gil_scoped_release>())
+    .def("get_status", &timing::MIBIONode::get_status, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("get_pll_status", &timing::MIBIONode::get_pll_status, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
     .def("get_pll", &timing::MIBIONode::get_pll)
-    .def("get_hardware_info", &timing::MIBIONode::get_hardware_info, py::arg("print_out") = false)
-    .def("get_sfp_status", &timing::MIBIONode::get_sfp_status, py::arg("sfp_id"), py::arg("print_out") = false)
-    .def("switch_sfp_soft_tx_control_bit", &timing::MIBIONode::switch_sfp_soft_tx_control_bit);
+    .def("get_hardware_info", &timing::MIBIONode::get_hardware_info, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("get_sfp_status", &timing::MIBIONode::get_sfp_status, py::arg("sfp_id"), py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("switch_sfp_soft_tx_control_bit", &timing::MIBIONode::switch_sfp_soft_tx_control_bit, py::call_guard<py::gil_scoped_release>());
 
     py::class_<timing::SwitchyardNode, uhal::Node>(m, "SwitchyardNode")
-      .def("get_status", &timing::SwitchyardNode::get_status, py::arg("print_out") = false)
-      .def("configure_master_source", &timing::SwitchyardNode::configure_master_source, py::arg("master_source"), py::arg("dispatch") = true)
-      .def("configure_endpoint_source", &timing::SwitchyardNode::configure_endpoint_source, py::arg("endpoint_source"), py::arg("dispatch") = true);
+      .def("get_status", &timing::SwitchyardNode::get_status, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+      .def("configure_master_source", &timing::SwitchyardNode::configure_master_source, py::arg("master_source"), py::arg("dispatch") = true, py::call_guard<py::gil_scoped_release>())
+      .def("configure_endpoint_source", &timing::SwitchyardNode::configure_endpoint_source, py::arg("endpoint_source"), py::arg("dispatch") = true, py::call_guard<py::gil_scoped_release>());
 
 } // NOLINT
 
@@ -6,9 +6,11 @@
  * received with this code.
  */
 
+#include "timing/EndpointRTTScanner.hpp"
 #include "timing/PDIMasterNode.hpp"
 #include "timing/TriggerReceiverNode.hpp"
 
+#include <pybind11/chrono.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
@@ -31,42 +33,96 @@ register_master(py::module& m)
                 py::arg("fine_delay"),
                 py::arg("phase_delay"),
                 py::arg("measure_rtt") = false,
-                py::arg("control_sfp") = true)
+                py::arg("control_sfp") = true, py::call_guard<py::gil_scoped_release>())
     .def("measure_endpoint_rtt",
          &timing::PDIMasterNode::measure_endpoint_rtt,
          py::arg("address"),
-         py::arg("control_sfp") = true)
-    .def("switch_endpoint_sfp", &timing::PDIMasterNode::switch_endpoint_sfp)
-    .def("enable_upstream_endpoint", &timing::PDIMasterNode::enable_upstream_endpoint)
+         py::arg("control_sfp") = true, py::call_guard<py::gil_scoped_release>())
+    .def("switch_endpoint_sfp", &timing::PDIMasterNode::switch_endpoint_sfp, py::call_guard<py::gil_scoped_release>())
+    .def("enable_upstream_endpoint", &timing::PDIMasterNode::enable_upstream_endpoint, py::call_guard<py::gil_scoped_release>())
     .def("send_fl_cmd",
          &timing::PDIMasterNode::send_fl_cmd,
          py::arg("command"),
          py::arg("channel"),
-         py::arg("number_of_commands") = 1)
+         py::arg("number_of_commands") = 1, py::call_guard<py::gil_scoped_release>())
     .def("enable_fake_trigger",
          &timing::PDIMasterNode::enable_fake_trigger,
          py::arg("channel"),
          py::arg("rate"),
          py::arg("poisson"),
-         py::arg("clock_frequency_hz"))
-    .def("disable_fake_trigger", &timing::PDIMasterNode::disable_fake_trigger)
-    .def("enable_spill_interface", &timing::PDIMasterNode::enable_spill_interface)
+         py::arg("clock_frequency_hz"), py::call_guard<py::gil_scoped_release>())
+    .def("disable_fake_trigger", &timing::PDIMasterNode::disable_fake_trigger, py::call_guard<py::gil_scoped_release>())
+    .def("enable_spill_interface", &timing::PDIMasterNode::enable_spill_interface, py::call_guard<py::gil_scoped_release>())
     .def("enable_fake_spills",
          &timing::PDIMasterNode::enable_fake_spills,
          py::arg("cycle_length") = 16,
-         py::arg("spill_length") = 8)
-    .def("get_status", &timing::PDIMasterNode::get_status, py::arg("print_out") = false)
-    .def("get_status_with_date", &timing::PDIMasterNode::get_status_with_date, py::arg("clock_frequency_hz"), py::arg("print_out") = false)
-    .def("sync_timestamp", &timing::PDIMasterNode::sync_timestamp);
+         py::arg("spill_length") = 8, py::call_guard<py::gil_scoped_release>())
+    .def("get_status", &timing::PDIMasterNode::get_status, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("get_status_with_date", &timing::PDIMasterNode::get_status_with_date, py::arg("clock_frequency_hz"), py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>())
+    .def("sync_timestamp", &timing::PDIMasterNode::sync_timestamp, py::call_guard<py::gil_scoped_release>());
+
+  py::class_<timing::EndpointRTTTarget>(m, "EndpointRTTTarget")
+    .def(py::init<uint32_t, int>(), py::arg("address"), py::arg("sfp_mux") = -1) // NOLINT(build/unsigned)
+    .def_readwrite("address", &timing::EndpointRTTTarget::address)
+    .def_readwrite("sfp_mux", &timing::EndpointRTTTarget::sfp_mux);
+
+  py::class_<timing::EndpointRTTScanConfig>(m, "EndpointRTTScanConfig")
+    .def(py::init<>())
+    .def_readwrite("first_poll_interval", &timing::EndpointRTTScanConfig::first_poll_interval)
+    .def_readwrite("max_poll_interval", &timing::EndpointRTTScanConfig::max_poll_interval)
+    .def_readwrite("lock_timeout", &timing::EndpointRTTScanConfig::lock_timeout)
+    .def_readwrite("echo_timeout", &timing::EndpointRTTScanConfig::echo_timeout)
+    .def_readwrite("max_attempts", &timing::EndpointRTTScanConfig::max_attempts)
+    .def_readwrite("control_sfp", &timing::EndpointRTTScanConfig::control_sfp);
+
+  py::class_<timing::EndpointRTTMeasurement>(m, "EndpointRTTMeasurement")
+    .def_readonly("address", &timing::EndpointRTTMeasurement::address)
+    .def_readonly("sfp_mux", &timing::EndpointRTTMeasurement::sfp_mux)
+    .def_readonly("success", &timing::EndpointRTTMeasurement::success)
+    .def_readonly("rtt", &timing::EndpointRTTMeasurement::rtt)
+    .def_readonly("attempts", &timing::EndpointRTTMeasurement::attempts)
+    .def_readonly("lock_polls", &timing::EndpointRTTMeasurement::lock_polls)
+    .def_readonly("echo_polls", &timing::EndpointRTTMeasurement::echo_polls)
+    .def_readonly("lock_time", &timing::EndpointRTTMeasurement::lock_time)
+    .def_readonly("echo_time", &timing::EndpointRTTMeasurement::echo_time)
+    .def_readonly("total_time", &timing::EndpointRTTMeasurement::total_time)
+    .def_readonly("error", &timing::EndpointRTTMeasurement::error);
+
+  py::class_<timing::EndpointRTTScanReport>(m, "EndpointRTTScanReport")
+    .def_readonly("measurements", &timing::EndpointRTTScanReport::measurements)
+    .def_readonly("succeeded", &timing::EndpointRTTScanReport::succeeded)
+    .def_readonly("failed", &timing::EndpointRTTScanReport::failed)
+    .def_readonly("retries", &timing::EndpointRTTScanReport::retries)
+    .def_readonly("mux_switches", &timing::EndpointRTTScanReport::mux_switches)
+    .def_readonly("min_rtt", &timing::EndpointRTTScanReport::min_rtt)
+    .def_readonly("max_rtt", &timing::EndpointRTTScanReport::max_rtt)
+    .def_readonly("mean_rtt", &timing::EndpointRTTScanReport::mean_rtt)
+    .def_readonly("elapsed", &timing::EndpointRTTScanReport::elapsed)
+    .def_readonly("mean_lock_time", &timing::EndpointRTTScanReport::mean_lock_time)
+    .def_readonly("max_lock_time", &timing::EndpointRTTScanReport::max_lock_time)
+    .def_readonly("mean_echo_time", &timing::EndpointRTTScanReport::mean_echo_time)
+    .def_readonly("max_echo_time", &timing::EndpointRTTScanReport::max_echo_time)
+    .def_readonly("mean_endpoint_time", &timing::EndpointRTTScanReport::mean_endpoint_time)
+    .def_readonly("max_endpoint_time", &timing::EndpointRTTScanReport::max_endpoint_time)
+    .def("format",
+         [](const timing::EndpointRTTScanReport& report, bool print_out) {
+           return timing::EndpointRTTScanner::format_report(report, print_out);
+         },
+         py::arg("print_out") = false);
+
+  m.def("order_endpoint_rtt_targets",
+        &timing::EndpointRTTScanner::order_targets,
+        py::arg("targets"),
+        py::arg("active_sfp_mux") = -1);
 
   py::class_<timing::TriggerReceiverNode, uhal::Node>(m, "TriggerReceiverNode")
     .def(py::init<const uhal::Node&>())
-    .def("enable", &timing::TriggerReceiverNode::enable)
-    .def("disable", &timing::TriggerReceiverNode::disable)
-    .def("reset", &timing::TriggerReceiverNode::reset)
-    .def("enable_triggers", &timing::TriggerReceiverNode::enable_triggers)
-    .def("disable_triggers", &timing::TriggerReceiverNode::disable_triggers)
-    .def("get_status", &timing::TriggerReceiverNode::get_status, py::arg("print_out") = false);
+    .def("enable", &timing::TriggerReceiverNode::enable, py::call_guard<py::gil_scoped_release>())
+    .def("disable", &timing::TriggerReceiverNode::disable, py::call_guard<py::gil_scoped_release>())
+    .def("reset", &timing::TriggerReceiverNode::reset, py::call_guard<py::gil_scoped_release>())
+    .def("enable_triggers", &timing::TriggerReceiverNode::enable_triggers, py::call_guard<py::gil_scoped_release>())
+    .def("disable_triggers", &timing::TriggerReceiverNode::disable_triggers, py::call_guard<py::gil_scoped_release>())
+    .def("get_status", &timing::TriggerReceiverNode::get_status, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>());
 }
 
 } // namespace python
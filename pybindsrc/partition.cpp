@@ -6,11 +6,19 @@
  * received with this code.
  */
 
+#include "WordBuffer.hpp"
+
+#include "timing/PartitionEventReader.hpp"
 #include "timing/PartitionNode.hpp"
 
+#include <pybind11/chrono.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
+#include <chrono>
+#include <utility>
+#include <vector>
+
 // Namespace resolution
 namespace py = pybind11;
 
@@ -23,25 +31,99 @@ register_partition(py::module& m)
 {
   py::class_<timing::PartitionNode, uhal::Node>(m, "PartitionNode")
     .def(py::init<const uhal::Node&>())
-    .def("read_trigger_mask", &timing::PartitionNode::read_trigger_mask)
+    .def("read_trigger_mask", &timing::PartitionNode::read_trigger_mask, py::call_guard<py::gil_scoped_release>())
     // .def("writeTriggerMask", &timing::PartitionNode::writeTriggerMask)
     .def("configure",
          &timing::PartitionNode::configure,
          py::arg("trigger_mask"),
          py::arg("enableSpillGate"),
-         py::arg("rate_control_enabled") = 1)
-    .def("enable_triggers", &timing::PartitionNode::enable_triggers, py::arg("enable") = true)
-    .def("read_buffer_word_count", &timing::PartitionNode::read_buffer_word_count)
-    .def("num_events_in_buffer", &timing::PartitionNode::num_events_in_buffer)
-    .def("read_rob_warning_overflow", &timing::PartitionNode::read_rob_warning_overflow)
-    .def("read_rob_error", &timing::PartitionNode::read_rob_error)
-    .def("read_events", &timing::PartitionNode::read_events, py::arg("number_of_events") = 0)
-    .def("enable", &timing::PartitionNode::enable, py::arg("enable") = true, py::arg("dispatch") = true)
-    .def("reset", &timing::PartitionNode::reset)
-    .def("start", &timing::PartitionNode::start, py::arg("timeout") = 5000)
-    .def("stop", &timing::PartitionNode::stop, py::arg("timeout") = 5000)
-    .def("configure_rate_ctrl", &timing::PartitionNode::configure_rate_ctrl)
-    .def("get_status", &timing::PartitionNode::get_status, py::arg("print_out") = false);
+         py::arg("rate_control_enabled") = 1, py::call_guard<py::gil_scoped_release>())
+    .def("enable_triggers", &timing::PartitionNode::enable_triggers, py::arg("enable") = true, py::call_guard<py::gil_scoped_release>())
+    .def("read_buffer_word_count", &timing::PartitionNode::read_buffer_word_count, py::call_guard<py::gil_scoped_release>())
+    .def("num_events_in_buffer", &timing::PartitionNode::num_events_in_buffer, py::call_guard<py::gil_scoped_release>())
+    .def("read_rob_warning_overflow", &timing::PartitionNode::read_rob_warning_overflow, py::call_guard<py::gil_scoped_release>())
+    .def("read_rob_error", &timing::PartitionNode::read_rob_error, py::call_guard<py::gil_scoped_release>())
+    .def(
+      "read_events",
+      [](const timing::PartitionNode& node, size_t number_of_events) {
+        return WordBuffer(node.read_events(number_of_events));
+      },
+      py::arg("number_of_events") = 0,
+      py::call_guard<py::gil_scoped_release>())
+    .def(
+      "read_buffer_and_word_count",
+      [](const timing::PartitionNode& node, uint32_t n_words) { // NOLINT(build/unsigned)
+        std::vector<uint32_t> data;                              // NOLINT(build/unsigned)
+        uint32_t words_left = node.read_buffer_and_word_count(data, n_words); // NOLINT(build/unsigned)
+        return std::make_pair(WordBuffer(std::move(data)), words_left);
+      },
+      py::arg("n_words"),
+      py::call_guard<py::gil_scoped_release>())
+    .def("read_command_counts",
+         [](const timing::PartitionNode& node) {
+           auto counts = node.read_command_counts();
+           return std::make_pair(WordBuffer(std::move(counts.accepted)), WordBuffer(std::move(counts.rejected)));
+         }, py::call_guard<py::gil_scoped_release>())
+    .def("enable", &timing::PartitionNode::enable, py::arg("enable") = true, py::arg("dispatch") = true, py::call_guard<py::gil_scoped_release>())
+    .def("reset", &timing::PartitionNode::reset, py::call_guard<py::gil_scoped_release>())
+    .def("start", &timing::PartitionNode::start, py::arg("timeout") = 5000, py::call_guard<py::gil_scoped_release>())
+    .def("stop", &timing::PartitionNode::stop, py::arg("timeout") = 5000, py::call_guard<py::gil_scoped_release>())
+    .def("configure_rate_ctrl", &timing::PartitionNode::configure_rate_ctrl, py::call_guard<py::gil_scoped_release>())
+    .def("get_status", &timing::PartitionNode::get_status, py::arg("print_out") = false, py::call_guard<py::gil_scoped_release>());
+
+  py::class_<timing::PartitionEvent>(m, "PartitionEvent")
+    .def_readonly("scmd", &timing::PartitionEvent::scmd)
+    .def_readonly("timestamp", &timing::PartitionEvent::timestamp)
+    .def_readonly("counter", &timing::PartitionEvent::counter);
+
+  py::class_<timing::PartitionReadoutReport>(m, "PartitionReadoutReport")
+    .def_readonly("events", &timing::PartitionReadoutReport::events)
+    .def_readonly("words", &timing::PartitionReadoutReport::words)
+    .def_readonly("dispatches", &timing::PartitionReadoutReport::dispatches)
+    .def_readonly("empty_reads", &timing::PartitionReadoutReport::empty_reads)
+    .def_readonly("invalid_events", &timing::PartitionReadoutReport::invalid_events)
+    .def_readonly("skipped_words", &timing::PartitionReadoutReport::skipped_words)
+    .def_readonly("counter_gaps", &timing::PartitionReadoutReport::counter_gaps)
+    .def_readonly("max_occupancy", &timing::PartitionReadoutReport::max_occupancy)
+    .def_readonly("elapsed", &timing::PartitionReadoutReport::elapsed)
+    .def_readonly("event_rate", &timing::PartitionReadoutReport::event_rate)
+    .def_readonly("mean_latency", &timing::PartitionReadoutReport::mean_latency)
+    .def_readonly("max_latency", &timing::PartitionReadoutReport::max_latency);
+
+  py::class_<timing::PartitionEventReader>(m, "PartitionEventReader")
+    .def(py::init<const timing::PartitionNode&, uint32_t, bool>(), // NOLINT(build/unsigned)
+         py::arg("node"),
+         py::arg("max_batch_events") = timing::PartitionEventReader::kDefaultMaxBatchEvents,
+         py::arg("read_all") = false,
+         py::keep_alive<1, 2>())
+    .def("read_batch", &timing::PartitionEventReader::read_batch, py::call_guard<py::gil_scoped_release>())
+    .def("next_batch",
+         &timing::PartitionEventReader::next_batch,
+         py::arg("timeout"),
+         py::arg("poll_interval") = timing::PartitionEventReader::kDefaultPollInterval, py::call_guard<py::gil_scoped_release>())
+    .def("get_raw_words",
+         [](const timing::PartitionEventReader& reader) {
+           std::vector<uint32_t> words(reader.get_raw_words()); // NOLINT(build/unsigned)
+           return WordBuffer(std::move(words));
+         })
+    .def("get_report", &timing::PartitionEventReader::get_report)
+    .def("get_report_table", &timing::PartitionEventReader::get_report_table, py::arg("print_out") = false)
+    .def("reset_report", &timing::PartitionEventReader::reset_report)
+    .def("__iter__", [](timing::PartitionEventReader& reader) -> timing::PartitionEventReader& { return reader; })
+    .def("__next__", [](timing::PartitionEventReader& reader) {
+      // yields non-empty batches; waits in short slices so that Ctrl-C is not blocked
+      while (true) {
+        const std::vector<timing::PartitionEvent>* events;
+        {
+          py::gil_scoped_release release;
+          events = &reader.next_batch(std::chrono::milliseconds(100));
+        }
+        if (!events->empty())
+          return *events;
+        if (PyErr_CheckSignals() != 0)
+          throw py::error_already_set();
+      }
+    });
 }
 
 } // namespace python
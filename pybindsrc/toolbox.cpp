@@ -6,11 +6,21 @@
  * received with this code.
  */
 
+#include "WordBuffer.hpp"
+
+#include "timing/AddressTableCache.hpp"
+#include "timing/IPbusProfiler.hpp"
+#include "timing/RegisterSnapshotCache.hpp"
+#include "timing/TimingNode.hpp"
 #include "timing/toolbox.hpp"
 
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
+#include <chrono>
+#include <sstream>
+#include <vector>
+
 namespace py = pybind11;
 
 namespace dunedaq {
@@ -21,6 +31,124 @@ void
 register_toolbox(py::module& m)
 {
   m.def("format_firmware_version", &timing::format_firmware_version);	
+
+  py::class_<WordBuffer>(m, "WordBuffer", py::buffer_protocol())
+    .def_buffer([](WordBuffer& buffer) -> py::buffer_info {
+      return py::buffer_info(const_cast<uint32_t*>(buffer.words().data()), // NOLINT(build/unsigned)
+                             sizeof(uint32_t),                              // NOLINT(build/unsigned)
+                             py::format_descriptor<uint32_t>::format(),     // NOLINT(build/unsigned)
+                             1,
+                             { buffer.words().size() },
+                             { sizeof(uint32_t) }, // NOLINT(build/unsigned)
+                             true);
+    })
+    .def("__len__", [](const WordBuffer& buffer) { return buffer.words().size(); })
+    .def("__getitem__",
+         [](const WordBuffer& buffer, py::ssize_t index) {
+           py::ssize_t size = buffer.words().size();
+           if (index < 0)
+             index += size;
+           if (index < 0 || index >= size)
+             throw py::index_error();
+           return buffer.words().at(index);
+         })
+    .def("__getitem__",
+         [](const WordBuffer& buffer, py::slice slice) {
+           size_t start, stop, step, length;
+           if (!slice.compute(buffer.words().size(), &start, &stop, &step, &length))
+             throw py::error_already_set();
+           std::vector<uint32_t> words; // NOLINT(build/unsigned)
+           words.reserve(length);
+           for (size_t i = 0; i < length; ++i, start += step)
+             words.push_back(buffer.words().at(start));
+           return words;
+         })
+    .def(
+      "__iter__",
+      [](const WordBuffer& buffer) { return py::make_iterator(buffer.words().begin(), buffer.words().end()); },
+      py::keep_alive<0, 1>())
+    .def("tolist", [](const WordBuffer& buffer) { return buffer.words(); })
+    .def("__eq__", [](const WordBuffer& buffer, const std::vector<uint32_t>& words) { return buffer.words() == words; }) // NOLINT
+    .def("__repr__", [](const WordBuffer& buffer) {
+      std::stringstream repr;
+      repr << "WordBuffer(" << buffer.words().size() << " words)";
+      return repr.str();
+    });
+
+  py::class_<timing::RegisterSnapshotCacheStats>(m, "RegisterSnapshotCacheStats")
+    .def_readonly("hits", &timing::RegisterSnapshotCacheStats::hits)
+    .def_readonly("misses", &timing::RegisterSnapshotCacheStats::misses)
+    .def_readonly("invalidations", &timing::RegisterSnapshotCacheStats::invalidations)
+    .def_readonly("entries", &timing::RegisterSnapshotCacheStats::entries);
+
+  // time-to-live values in milliseconds
+  py::class_<timing::RegisterSnapshotCache>(m, "RegisterSnapshotCache")
+    .def_static(
+      "enable",
+      [](const uhal::Node& node, uint32_t ttl) { timing::RegisterSnapshotCache::enable(node, std::chrono::milliseconds(ttl)); }, // NOLINT(build/unsigned)
+      py::arg("node"),
+      py::arg("ttl"))
+    .def_static(
+      "enable_all",
+      [](uint32_t ttl) { timing::RegisterSnapshotCache::enable_all(std::chrono::milliseconds(ttl)); }, // NOLINT(build/unsigned)
+      py::arg("ttl"))
+    .def_static("disable", &timing::RegisterSnapshotCache::disable)
+    .def_static("disable_all", &timing::RegisterSnapshotCache::disable_all)
+    .def_static("get_ttl", [](const uhal::Node& node) { return timing::RegisterSnapshotCache::get_ttl(node).count(); })
+    .def_static("invalidate", &timing::RegisterSnapshotCache::invalidate)
+    .def_static("get_stats", &timing::RegisterSnapshotCache::get_stats);
+
+  py::class_<timing::WaitLatencyHistogram>(m, "WaitLatencyHistogram")
+    .def_readonly("waits", &timing::WaitLatencyHistogram::waits)
+    .def_readonly("timeouts", &timing::WaitLatencyHistogram::timeouts)
+    .def_readonly("polls", &timing::WaitLatencyHistogram::polls)
+    .def_readonly("total_latency", &timing::WaitLatencyHistogram::total_latency)
+    .def_readonly("max_latency", &timing::WaitLatencyHistogram::max_latency)
+    .def_readonly("buckets", &timing::WaitLatencyHistogram::buckets);
+
+  // bucket edges in microseconds
+  m.def("get_wait_latency_bucket_edges", []() {
+    std::vector<int64_t> edges;
+    for (auto& edge : timing::TimingNode::kWaitLatencyBucketEdges)
+      edges.push_back(edge.count());
+    return edges;
+  });
+  m.def("get_wait_latency_histograms", &timing::TimingNode::get_wait_latency_histograms);
+  m.def("reset_wait_latency_histograms", &timing::TimingNode::reset_wait_latency_histograms);
+  m.def("format_wait_latency_histograms",
+        &timing::TimingNode::format_wait_latency_histograms,
+        py::arg("print_out") = false);
+
+  py::class_<timing::IPbusOperationStats>(m, "IPbusOperationStats")
+    .def_readonly("calls", &timing::IPbusOperationStats::calls)
+    .def_readonly("failures", &timing::IPbusOperationStats::failures)
+    .def_readonly("dispatches", &timing::IPbusOperationStats::dispatches)
+    .def_readonly("words_read", &timing::IPbusOperationStats::words_read)
+    .def_readonly("words_written", &timing::IPbusOperationStats::words_written)
+    .def_readonly("total_time", &timing::IPbusOperationStats::total_time)
+    .def_readonly("dispatch_time", &timing::IPbusOperationStats::dispatch_time)
+    .def_readonly("max_time", &timing::IPbusOperationStats::max_time)
+    .def_readonly("buckets", &timing::IPbusOperationStats::buckets);
+
+  py::class_<timing::IPbusProfiler>(m, "IPbusProfiler")
+    .def_static("enable", &timing::IPbusProfiler::enable, py::arg("enable") = true)
+    .def_static("is_enabled", &timing::IPbusProfiler::is_enabled)
+    .def_static("get_operation_stats", &timing::IPbusProfiler::get_operation_stats)
+    .def_static("reset", &timing::IPbusProfiler::reset)
+    .def_static("format_operation_stats", &timing::IPbusProfiler::format_operation_stats, py::arg("print_out") = false)
+    // bucket edges in microseconds
+    .def_static("get_latency_bucket_edges", []() {
+      std::vector<int64_t> edges;
+      for (auto& edge : timing::IPbusProfiler::kLatencyBucketEdges)
+        edges.push_back(edge.count());
+      return edges;
+    });
+
+  py::class_<timing::AddressTableCache>(m, "AddressTableCache")
+    .def_static("compile", &timing::AddressTableCache::compile, py::call_guard<py::gil_scoped_release>())
+    .def_static("compile_connections", &timing::AddressTableCache::compile_connections, py::call_guard<py::gil_scoped_release>())
+    .def_static("get_cache_directory", &timing::AddressTableCache::get_cache_directory)
+    .def_property_readonly_static("kFormatVersion", [](py::object) { return timing::AddressTableCache::kFormatVersion; });
 }
 
 } // namespace python
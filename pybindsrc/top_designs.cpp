@@ -17,30 +17,53 @@
 #include "timing/OverlordDesign.hpp"
 #include "timing/EndpointDesign.hpp"
 
+#include "opmonlib/InfoCollector.hpp"
+
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
+#include <vector>
+
 namespace py = pybind11;
 
 namespace dunedaq {
 namespace timing {
 namespace python {
 
+namespace {
+
+/**
+ * @brief      Collect the monitoring information of a design, as a JSON string.
+ */
+std::string
+collect_info(const timing::TimingNode& design, int level)
+{
+  opmonlib::InfoCollector collector;
+  design.get_info(collector, level);
+  return collector.get_collected_infos().dump();
+}
+
+} // namespace
+
 void
 register_top_designs(py::module& m)
 {
 
   // Overlord
   py::class_<timing::OverlordDesign, uhal::Node>(m, "OverlordDesign")
-    .def("read_firmware_version", &timing::OverlordDesign::read_firmware_version)
-    .def("validate_firmware_version", &timing::OverlordDesign::validate_firmware_version)
-    .def("sync_timestamp", &timing::OverlordDesign::sync_timestamp)
-    .def("get_status", &timing::OverlordDesign::get_status)
+    .def("read_firmware_version", &timing::OverlordDesign::read_firmware_version, py::call_guard<py::gil_scoped_release>())
+    .def("validate_firmware_version", &timing::OverlordDesign::validate_firmware_version, py::call_guard<py::gil_scoped_release>())
+    .def("get_hardware_identity",
+         [](const timing::OverlordDesign& design) { return design.get_hardware_identity(); }, py::call_guard<py::gil_scoped_release>())
+    .def("invalidate_hardware_identity",
+         [](const timing::OverlordDesign& design) { design.invalidate_hardware_identity(); })
+    .def("sync_timestamp", &timing::OverlordDesign::sync_timestamp, py::call_guard<py::gil_scoped_release>())
+    .def("get_status", &timing::OverlordDesign::get_status, py::call_guard<py::gil_scoped_release>())
     .def("enable_fake_trigger",
          &timing::OverlordDesign::enable_fake_trigger,
          py::arg("channel"),
          py::arg("rate"),
-         py::arg("poisson"))
+         py::arg("poisson"), py::call_guard<py::gil_scoped_release>())
     .def("apply_endpoint_delay", 
           &timing::OverlordDesign::apply_endpoint_delay,
           py::arg("address"),
@@ -49,27 +72,37 @@ register_top_designs(py::module& m)
           py::arg("phase_delay"),
           py::arg("measure_rtt") = false,
           py::arg("control_sfp") = true,
-          py::arg("sfp_mux") = -1)
+          py::arg("sfp_mux") = -1, py::call_guard<py::gil_scoped_release>())
     .def("measure_endpoint_rtt", 
           &timing::OverlordDesign::measure_endpoint_rtt,
           py::arg("address"),
           py::arg("control_sfp") = true,
-          py::arg("sfp_mux") = -1)
+          py::arg("sfp_mux") = -1, py::call_guard<py::gil_scoped_release>())
+    .def("scan_endpoint_rtts",
+          [](const timing::OverlordDesign& design,
+             const std::vector<timing::EndpointRTTTarget>& targets,
+             const timing::EndpointRTTScanConfig& config) { return design.scan_endpoint_rtts(targets, config); },
+          py::arg("targets"),
+          py::arg("config") = timing::EndpointRTTScanConfig(), py::call_guard<py::gil_scoped_release>())
     .def("get_external_triggers_endpoint_node",
          &timing::OverlordDesign::get_external_triggers_endpoint_node)
     .def("get_endpoint_node", &timing::OverlordDesign::get_endpoint_node);
 
   // Boreas
   py::class_<timing::BoreasDesign, uhal::Node>(m, "BoreasDesign")
-    .def("read_firmware_version", &timing::BoreasDesign::read_firmware_version)
-    .def("validate_firmware_version", &timing::BoreasDesign::validate_firmware_version)
-    .def("sync_timestamp", &timing::BoreasDesign::sync_timestamp)
-    .def("get_status", &timing::BoreasDesign::get_status)
+    .def("read_firmware_version", &timing::BoreasDesign::read_firmware_version, py::call_guard<py::gil_scoped_release>())
+    .def("validate_firmware_version", &timing::BoreasDesign::validate_firmware_version, py::call_guard<py::gil_scoped_release>())
+    .def("get_hardware_identity",
+         [](const timing::BoreasDesign& design) { return design.get_hardware_identity(); }, py::call_guard<py::gil_scoped_release>())
+    .def("invalidate_hardware_identity",
+         [](const timing::BoreasDesign& design) { design.invalidate_hardware_identity(); })
+    .def("sync_timestamp", &timing::BoreasDesign::sync_timestamp, py::call_guard<py::gil_scoped_release>())
+    .def("get_status", &timing::BoreasDesign::get_status, py::call_guard<py::gil_scoped_release>())
     .def("enable_fake_trigger",
          &timing::BoreasDesign::enable_fake_trigger,
          py::arg("channel"),
          py::arg("rate"),
-         py::arg("poisson"))
+         py::arg("poisson"), py::call_guard<py::gil_scoped_release>())
     .def("apply_endpoint_delay", 
           &timing::BoreasDesign::apply_endpoint_delay,
           py::arg("address"),
@@ -78,12 +111,18 @@ register_top_designs(py::module& m)
           py::arg("phase_delay"),
           py::arg("measure_rtt") = false,
           py::arg("control_sfp") = true,
-          py::arg("sfp_mux") = -1)
+          py::arg("sfp_mux") = -1, py::call_guard<py::gil_scoped_release>())
     .def("measure_endpoint_rtt", 
           &timing::BoreasDesign::measure_endpoint_rtt,
           py::arg("address"),
           py::arg("control_sfp") = true,
-          py::arg("sfp_mux") = -1)
+          py::arg("sfp_mux") = -1, py::call_guard<py::gil_scoped_release>())
+    .def("scan_endpoint_rtts",
+          [](const timing::BoreasDesign& design,
+             const std::vector<timing::EndpointRTTTarget>& targets,
+             const timing::EndpointRTTScanConfig& config) { return design.scan_endpoint_rtts(targets, config); },
+          py::arg("targets"),
+          py::arg("config") = timing::EndpointRTTScanConfig(), py::call_guard<py::gil_scoped_release>())
     .def("get_hsi_node", &timing::BoreasDesign::get_hsi_node)
     .def("configure_hsi", 
          &timing::BoreasDesign::configure_hsi,
@@ -92,19 +131,23 @@ register_top_designs(py::module& m)
          py::arg("fe_mask"),
          py::arg("inv_mask"),
          py::arg("rate"),
-         py::arg("dispatch") = true);
+         py::arg("dispatch") = true, py::call_guard<py::gil_scoped_release>());
 
   // PD-I fanout design on fib
   py::class_<timing::FanoutDesign<PDIMasterNode>, uhal::Node>(m, "FanoutDesign<PDIMasterNode>")
-    .def("read_firmware_version", &timing::FanoutDesign<PDIMasterNode>::read_firmware_version)
-    .def("validate_firmware_version", &timing::FanoutDesign<PDIMasterNode>::validate_firmware_version)
-    .def("sync_timestamp", &timing::FanoutDesign<PDIMasterNode>::sync_timestamp)
+    .def("read_firmware_version", &timing::FanoutDesign<PDIMasterNode>::read_firmware_version, py::call_guard<py::gil_scoped_release>())
+    .def("validate_firmware_version", &timing::FanoutDesign<PDIMasterNode>::validate_firmware_version, py::call_guard<py::gil_scoped_release>())
+    .def("get_hardware_identity",
+         [](const timing::FanoutDesign<PDIMasterNode>& design) { return design.get_hardware_identity(); }, py::call_guard<py::gil_scoped_release>())
+    .def("invalidate_hardware_identity",
+         [](const timing::FanoutDesign<PDIMasterNode>& design) { design.invalidate_hardware_identity(); })
+    .def("sync_timestamp", &timing::FanoutDesign<PDIMasterNode>::sync_timestamp, py::call_guard<py::gil_scoped_release>())
     .def("enable_fake_trigger",
          &timing::FanoutDesign<PDIMasterNode>::enable_fake_trigger,
          py::arg("channel"),
          py::arg("rate"),
-         py::arg("poisson"))
-    .def("switch_sfp_mux_channel", &timing::FanoutDesign<PDIMasterNode>::switch_sfp_mux_channel)
+         py::arg("poisson"), py::call_guard<py::gil_scoped_release>())
+    .def("switch_sfp_mux_channel", &timing::FanoutDesign<PDIMasterNode>::switch_sfp_mux_channel, py::call_guard<py::gil_scoped_release>())
     .def("apply_endpoint_delay", 
           &timing::FanoutDesign<PDIMasterNode>::apply_endpoint_delay,
           py::arg("address"),
@@ -113,26 +156,36 @@ register_top_designs(py::module& m)
           py::arg("phase_delay"),
           py::arg("measure_rtt") = false,
           py::arg("control_sfp") = true,
-          py::arg("sfp_mux") = -1)
+          py::arg("sfp_mux") = -1, py::call_guard<py::gil_scoped_release>())
     .def("measure_endpoint_rtt", 
           &timing::FanoutDesign<PDIMasterNode>::measure_endpoint_rtt,
           py::arg("address"),
           py::arg("control_sfp") = true,
-          py::arg("sfp_mux") = -1)
-    .def("scan_sfp_mux", &timing::FanoutDesign<PDIMasterNode>::scan_sfp_mux);
+          py::arg("sfp_mux") = -1, py::call_guard<py::gil_scoped_release>())
+    .def("scan_endpoint_rtts",
+          [](const timing::FanoutDesign<PDIMasterNode>& design,
+             const std::vector<timing::EndpointRTTTarget>& targets,
+             const timing::EndpointRTTScanConfig& config) { return design.scan_endpoint_rtts(targets, config); },
+          py::arg("targets"),
+          py::arg("config") = timing::EndpointRTTScanConfig(), py::call_guard<py::gil_scoped_release>())
+    .def("scan_sfp_mux", &timing::FanoutDesign<PDIMasterNode>::scan_sfp_mux, py::call_guard<py::gil_scoped_release>());
 
   // PD-I ouroboros design on fib
   py::class_<timing::OuroborosMuxDesign, uhal::Node>(
     m, "OuroborosMuxDesign")
-    .def("read_firmware_version", &timing::OuroborosMuxDesign::read_firmware_version)
-    .def("validate_firmware_version", &timing::OuroborosMuxDesign::validate_firmware_version)
-    .def("sync_timestamp", &timing::OuroborosMuxDesign::sync_timestamp)
+    .def("read_firmware_version", &timing::OuroborosMuxDesign::read_firmware_version, py::call_guard<py::gil_scoped_release>())
+    .def("validate_firmware_version", &timing::OuroborosMuxDesign::validate_firmware_version, py::call_guard<py::gil_scoped_release>())
+    .def("get_hardware_identity",
+         [](const timing::OuroborosMuxDesign& design) { return design.get_hardware_identity(); }, py::call_guard<py::gil_scoped_release>())
+    .def("invalidate_hardware_identity",
+         [](const timing::OuroborosMuxDesign& design) { design.invalidate_hardware_identity(); })
+    .def("sync_timestamp", &timing::OuroborosMuxDesign::sync_timestamp, py::call_guard<py::gil_scoped_release>())
     .def("enable_fake_trigger",
          &timing::OuroborosMuxDesign::enable_fake_trigger,
          py::arg("channel"),
          py::arg("rate"),
-         py::arg("poisson"))
-    .def("switch_sfp_mux_channel", &timing::OuroborosMuxDesign::switch_sfp_mux_channel)
+         py::arg("poisson"), py::call_guard<py::gil_scoped_release>())
+    .def("switch_sfp_mux_channel", &timing::OuroborosMuxDesign::switch_sfp_mux_channel, py::call_guard<py::gil_scoped_release>())
     .def("apply_endpoint_delay", 
           &timing::OuroborosMuxDesign::apply_endpoint_delay,
           py::arg("address"),
@@ -141,25 +194,38 @@ register_top_designs(py::module& m)
           py::arg("phase_delay"),
           py::arg("measure_rtt") = false,
           py::arg("control_sfp") = true,
-          py::arg("sfp_mux") = -1)
+          py::arg("sfp_mux") = -1, py::call_guard<py::gil_scoped_release>())
     .def("measure_endpoint_rtt", 
           &timing::OuroborosMuxDesign::measure_endpoint_rtt,
           py::arg("address"),
           py::arg("control_sfp") = true,
-          py::arg("sfp_mux") = -1)
-    .def("scan_sfp_mux", &timing::OuroborosMuxDesign::scan_sfp_mux);
+          py::arg("sfp_mux") = -1, py::call_guard<py::gil_scoped_release>())
+    .def("scan_endpoint_rtts",
+          [](const timing::OuroborosMuxDesign& design,
+             const std::vector<timing::EndpointRTTTarget>& targets,
+             const timing::EndpointRTTScanConfig& config) { return design.scan_endpoint_rtts(targets, config); },
+          py::arg("targets"),
+          py::arg("config") = timing::EndpointRTTScanConfig(), py::call_guard<py::gil_scoped_release>())
+    .def("scan_sfp_mux", &timing::OuroborosMuxDesign::scan_sfp_mux, py::call_guard<py::gil_scoped_release>());
 
   // Ouroboros on FMC
   py::class_<timing::OuroborosDesign, uhal::Node>(m, "OuroborosDesign")
-    .def("read_firmware_version", &timing::OuroborosDesign::read_firmware_version)
-    .def("validate_firmware_version", &timing::OuroborosDesign::validate_firmware_version)
-    .def("sync_timestamp", &timing::OuroborosDesign::sync_timestamp)
-    .def("get_status", &timing::OuroborosDesign::get_status)
+    .def("read_firmware_version", &timing::OuroborosDesign::read_firmware_version, py::call_guard<py::gil_scoped_release>())
+    .def("validate_firmware_version", &timing::OuroborosDesign::validate_firmware_version, py::call_guard<py::gil_scoped_release>())
+    .def("get_hardware_identity",
+         [](const timing::OuroborosDesign& design) { return design.get_hardware_identity(); }, py::call_guard<py::gil_scoped_release>())
+    .def("invalidate_hardware_identity",
+         [](const timing::OuroborosDesign& design) { design.invalidate_hardware_identity(); })
+    .def("sync_timestamp", &timing::OuroborosDesign::sync_timestamp, py::call_guard<py::gil_scoped_release>())
+    .def("get_status", &timing::OuroborosDesign::get_status, py::call_guard<py::gil_scoped_release>())
+    .def("get_info",
+         [](const timing::OuroborosDesign& design, int level) { return collect_info(design, level); },
+         py::arg("level") = 1, py::call_guard<py::gil_scoped_release>())
     .def("enable_fake_trigger",
          &timing::OuroborosDesign::enable_fake_trigger,
          py::arg("channel"),
          py::arg("rate"),
-         py::arg("poisson"))
+         py::arg("poisson"), py::call_guard<py::gil_scoped_release>())
     .def("apply_endpoint_delay", 
           &timing::OuroborosDesign::apply_endpoint_delay,
           py::arg("address"),
@@ -168,25 +234,42 @@ register_top_designs(py::module& m)
           py::arg("phase_delay"),
           py::arg("measure_rtt") = false,
           py::arg("control_sfp") = true,
-          py::arg("sfp_mux") = -1)
+          py::arg("sfp_mux") = -1, py::call_guard<py::gil_scoped_release>())
     .def("measure_endpoint_rtt", 
           &timing::OuroborosDesign::measure_endpoint_rtt,
           py::arg("address"),
           py::arg("control_sfp") = true,
-          py::arg("sfp_mux") = -1);
+          py::arg("sfp_mux") = -1, py::call_guard<py::gil_scoped_release>())
+    .def("scan_endpoint_rtts",
+          [](const timing::OuroborosDesign& design,
+             const std::vector<timing::EndpointRTTTarget>& targets,
+             const timing::EndpointRTTScanConfig& config) { return design.scan_endpoint_rtts(targets, config); },
+          py::arg("targets"),
+          py::arg("config") = timing::EndpointRTTScanConfig(), py::call_guard<py::gil_scoped_release>());
 
   // Endpoint on FMC
   py::class_<timing::EndpointDesign, uhal::Node>(m, "EndpointDesign")
-    .def("read_firmware_version", &timing::EndpointDesign::read_firmware_version)
-    .def("validate_firmware_version", &timing::EndpointDesign::validate_firmware_version)
-    .def("get_status", &timing::EndpointDesign::get_status)
+    .def("read_firmware_version", &timing::EndpointDesign::read_firmware_version, py::call_guard<py::gil_scoped_release>())
+    .def("validate_firmware_version", &timing::EndpointDesign::validate_firmware_version, py::call_guard<py::gil_scoped_release>())
+    .def("get_hardware_identity",
+         [](const timing::EndpointDesign& design) { return design.get_hardware_identity(); }, py::call_guard<py::gil_scoped_release>())
+    .def("invalidate_hardware_identity",
+         [](const timing::EndpointDesign& design) { design.invalidate_hardware_identity(); })
+    .def("get_status", &timing::EndpointDesign::get_status, py::call_guard<py::gil_scoped_release>())
+    .def("get_info",
+         [](const timing::EndpointDesign& design, int level) { return collect_info(design, level); },
+         py::arg("level") = 1, py::call_guard<py::gil_scoped_release>())
     .def("get_endpoint_node", &timing::EndpointDesign::get_endpoint_node);
 
   // Chronos on FMC
   py::class_<timing::ChronosDesign, uhal::Node>(m, "ChronosDesign")
-    .def("read_firmware_version", &timing::ChronosDesign::read_firmware_version)
-    .def("validate_firmware_version", &timing::ChronosDesign::validate_firmware_version)
-    .def("get_status", &timing::ChronosDesign::get_status)
+    .def("read_firmware_version", &timing::ChronosDesign::read_firmware_version, py::call_guard<py::gil_scoped_release>())
+    .def("validate_firmware_version", &timing::ChronosDesign::validate_firmware_version, py::call_guard<py::gil_scoped_release>())
+    .def("get_hardware_identity",
+         [](const timing::ChronosDesign& design) { return design.get_hardware_identity(); }, py::call_guard<py::gil_scoped_release>())
+    .def("invalidate_hardware_identity",
+         [](const timing::ChronosDesign& design) { design.invalidate_hardware_identity(); })
+    .def("get_status", &timing::ChronosDesign::get_status, py::call_guard<py::gil_scoped_release>())
     .def("get_hsi_node", &timing::ChronosDesign::get_hsi_node)
     .def("configure_hsi", 
          &timing::ChronosDesign::configure_hsi,
@@ -195,13 +278,17 @@ register_top_designs(py::module& m)
          py::arg("fe_mask"),
          py::arg("inv_mask"),
          py::arg("rate"),
-         py::arg("dispatch") = true);
+         py::arg("dispatch") = true, py::call_guard<py::gil_scoped_release>());
     
   // CRT on FMC
   py::class_<timing::CRTDesign, uhal::Node>(m, "CRTDesign")
-    .def("read_firmware_version", &timing::CRTDesign::read_firmware_version)
-    .def("validate_firmware_version", &timing::CRTDesign::validate_firmware_version)
-    .def("get_status", &timing::CRTDesign::get_status)
+    .def("read_firmware_version", &timing::CRTDesign::read_firmware_version, py::call_guard<py::gil_scoped_release>())
+    .def("validate_firmware_version", &timing::CRTDesign::validate_firmware_version, py::call_guard<py::gil_scoped_release>())
+    .def("get_hardware_identity",
+         [](const timing::CRTDesign& design) { return design.get_hardware_identity(); }, py::call_guard<py::gil_scoped_release>())
+    .def("invalidate_hardware_identity",
+         [](const timing::CRTDesign& design) { design.invalidate_hardware_identity(); })
+    .def("get_status", &timing::CRTDesign::get_status, py::call_guard<py::gil_scoped_release>())
     .def("get_crt_node", &timing::CRTDesign::get_crt_node);
 } // NOLINT
 
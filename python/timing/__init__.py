@@ -1 +1,2 @@
-import uhal
\ No newline at end of file
+# uhal is imported where the bindings are loaded, so that the command line
+# tools can import timing.cli without it
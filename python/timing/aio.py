@@ -0,0 +1,143 @@
+"""
+Asyncio layer over the timing bindings, to drive several boards concurrently.
+
+Each device gets a single worker thread: the calls on one device run in order,
+one at a time, while the calls on different devices run in parallel. The
+bindings release the GIL while they wait on the hardware, so that a board
+waiting for its PLL to lock does not hold the others up.
+
+    async def resetAll(aDevices, aClockFile):
+        await asyncio.gather(*(
+            aio.node(d, 'io').reset(aClockFile) for d in aDevices
+        ))
+
+    aio.runSync(resetAll(lDevices, lClockFile))
+"""
+
+import asyncio
+import functools
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+# ------------------------------------------------------------------------------
+class DeviceExecutor(object):
+    """
+    Runs the calls on a device in its own worker thread, in submission order.
+    """
+
+    def __init__(self, aDevice):
+        self.device = aDevice
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='timing-'+aDevice.id())
+
+    async def call(self, aFunction, *aArgs, **aKwargs):
+        lLoop = asyncio.get_running_loop()
+        return await lLoop.run_in_executor(self._executor, functools.partial(aFunction, *aArgs, **aKwargs))
+
+    def node(self, aPath):
+        return AsyncNode(self, aPath)
+
+    def shutdown(self, aWait=True):
+        self._executor.shutdown(wait=aWait)
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+class AsyncNode(object):
+    """
+    Node of a device whose methods are coroutines, run by the executor of the device.
+
+    The node is looked up in the worker thread, when a method is called.
+    """
+
+    def __init__(self, aExecutor, aPath):
+        self._executor = aExecutor
+        self.path = aPath
+
+    def getNode(self, aPath):
+        return AsyncNode(self._executor, self.path+'.'+aPath if self.path else aPath)
+
+    def __getattr__(self, aName):
+        if aName.startswith('_'):
+            raise AttributeError(aName)
+
+        async def method(*aArgs, **aKwargs):
+            return await self._executor.call(self._callNode, aName, aArgs, aKwargs)
+        method.__name__ = aName
+        return method
+
+    def _callNode(self, aName, aArgs, aKwargs):
+        lDevice = self._executor.device
+        lNode = lDevice.getNode(self.path) if self.path else lDevice.getNode()
+        return getattr(lNode, aName)(*aArgs, **aKwargs)
+
+    def __repr__(self):
+        return 'AsyncNode({}, {!r})'.format(self._executor.device.id(), self.path)
+# ------------------------------------------------------------------------------
+
+
+_executors = {}
+_executorsLock = threading.Lock()
+
+
+# ------------------------------------------------------------------------------
+def getExecutor(aDevice):
+    """
+    Executor of a device, shared by all the callers addressing the same device id.
+    """
+    with _executorsLock:
+        lExecutor = _executors.get(aDevice.id())
+        if lExecutor is None:
+            lExecutor = _executors[aDevice.id()] = DeviceExecutor(aDevice)
+        return lExecutor
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+async def call(aDevice, aFunction, *aArgs, **aKwargs):
+    """
+    Run aFunction(*aArgs, **aKwargs) on the executor of aDevice.
+    """
+    return await getExecutor(aDevice).call(aFunction, *aArgs, **aKwargs)
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+def node(aDevice, aPath=''):
+    """
+    Node of aDevice whose methods are coroutines.
+    """
+    return getExecutor(aDevice).node(aPath)
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+async def gather(aDevices, aFunction, *aArgs, **aKwargs):
+    """
+    Run aFunction(device, *aArgs, **aKwargs) for all devices concurrently, and return the results in order.
+    """
+    return await asyncio.gather(*(call(d, aFunction, d, *aArgs, **aKwargs) for d in aDevices))
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+def runSync(aCoroutine):
+    """
+    Run a coroutine to completion from synchronous code, e.g. a click command.
+    """
+    return asyncio.run(aCoroutine)
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+def shutdown(aWait=True):
+    """
+    Stop the worker threads of all devices.
+    """
+    with _executorsLock:
+        lExecutors = list(_executors.values())
+        _executors.clear()
+    for lExecutor in lExecutors:
+        lExecutor.shutdown(aWait)
+# ------------------------------------------------------------------------------
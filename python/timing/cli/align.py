@@ -132,3 +132,49 @@ def switchnlock(obj, mux):
     else:
         lMaster.enable_upstream_endpoint()
 # ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+@align.command('scan-rtt', short_help="Measure the round trip time of several endpoints")
+@click.argument('addrs', callback=toolbox.split_ints)
+@click.option('--mux', '-m', type=click.IntRange(0,7), help='Mux select for all endpoints (fanout only)')
+@click.option('--db-slots', is_flag=True, default=False, help='Take the mux select of each endpoint from the address database (fanout only)')
+@click.option('--sfp-control/--no-sfp-control', default=True, help='Control SFP or not')
+@click.option('--attempts', type=click.IntRange(1,10), default=3, help='Measurements per endpoint before giving up')
+@click.option('--lock-timeout', type=click.IntRange(1,10000), default=1000, help='Upstream endpoint lock timeout (ms)')
+@click.pass_obj
+def scanrtt(obj, addrs, mux, db_slots, sfp_control, attempts, lock_timeout):
+    '''
+    Measure the round trip time of a list of endpoints, e.g. 0x20-0x37,0x45.
+    '''
+    import datetime
+    import timing.common.database as database
+    from timing.core import EndpointRTTTarget, EndpointRTTScanConfig
+
+    lBoardType = obj.mBoardType
+    lTopDesign = obj.mTopDesign
+
+    lTargets = []
+    for addr in addrs:
+        lMux = -1
+        if lBoardType in [kBoardPC059, kBoardFIB]:
+            if db_slots:
+                if addr not in database.kAddressToSlot:
+                    raise click.ClickException('Address 0x{:x} is not in the address database'.format(addr))
+                lMux = database.kAddressToSlot[addr][1]
+            elif mux is not None:
+                lMux = mux
+            else:
+                raise RuntimeError('MUX board: please supply an SFP mux channel')
+        lTargets.append(EndpointRTTTarget(addr, lMux))
+
+    lConfig = EndpointRTTScanConfig()
+    lConfig.max_attempts = attempts
+    lConfig.lock_timeout = datetime.timedelta(milliseconds=lock_timeout)
+    lConfig.control_sfp = sfp_control
+
+    lReport = lTopDesign.scan_endpoint_rtts(lTargets, lConfig)
+    echo(lReport.format())
+    if lReport.failed:
+        secho('{} endpoint(s) failed'.format(lReport.failed), fg='red')
+# ------------------------------------------------------------------------------
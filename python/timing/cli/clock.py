@@ -0,0 +1,60 @@
+from __future__ import print_function
+
+# Python imports
+import click
+import os
+
+from click import echo, style, secho
+from os.path import join, expandvars
+
+
+# ------------------------------------------------------------------------------
+@click.group('clock')
+def clock():
+    '''
+    Clock chip configuration commands.
+    '''
+    pass
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+@clock.command('precompile', short_help="Pre-parse clock configuration files into the binary cache.")
+@click.argument('paths', nargs=-1, type=click.Path(exists=True))
+def precompile(paths):
+    '''
+    Parse the clock chip configuration files and store their binary image
+    in the clock configuration cache, so that they are not parsed again at reset.
+
+    PATHS: files or directories to compile (default: ${TIMING_SHARE}/config/etc/clock)
+    '''
+    # imported here, so that the help and completion of the clock commands do not load the bindings
+    from timing.core import SI534xConfig
+
+    if not paths:
+        paths = [expandvars('${TIMING_SHARE}/config/etc/clock')]
+
+    lFiles = []
+    for lPath in paths:
+        if os.path.isdir(lPath):
+            for lDir, _, lNames in sorted(os.walk(lPath)):
+                lFiles += [join(lDir, n) for n in sorted(lNames) if n.endswith('.txt')]
+        else:
+            lFiles.append(lPath)
+
+    echo('Cache directory: ' + style(SI534xConfig.get_cache_directory(), fg='blue'))
+
+    lFailed = 0
+    for lFile in lFiles:
+        try:
+            SI534xConfig.compile(lFile)
+            lConfig = SI534xConfig.load(lFile)
+            echo(' - {} {}'.format(lFile, style(lConfig.get_design_id(), fg='green')))
+        except Exception as e:
+            secho(' - {} failed: {}'.format(lFile, e), fg='red')
+            lFailed += 1
+
+    echo('{} files compiled, {} failed'.format(len(lFiles)-lFailed, lFailed))
+    if lFailed:
+        raise click.ClickException('Failed to compile {} clock configuration files'.format(lFailed))
+# ------------------------------------------------------------------------------
@@ -0,0 +1,137 @@
+"""
+Device identifiers of uhal connection files, without uhal.
+
+Used by shell completion, which must not pay for importing uhal and the timing
+bindings. The identifiers of each connection file are cached on disk, keyed by
+file path, modification time and size. The cache directory is taken from
+TIMING_CONNECTIONS_CACHE, or defaults to ~/.cache/timing/connections.
+"""
+
+from __future__ import print_function
+
+import glob
+import hashlib
+import json
+import os
+import re
+import tempfile
+import xml.etree.ElementTree as ET
+
+
+# ------------------------------------------------------------------------------
+def getCacheDirectory():
+    lCacheDir = os.environ.get('TIMING_CONNECTIONS_CACHE')
+    if lCacheDir:
+        return lCacheDir
+    return os.path.join(os.path.expanduser('~'), '.cache', 'timing', 'connections')
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+def expandConnectionPaths(aConnectionPaths):
+    """
+    Expand a uhal connection string ('file://a.xml;b*.xml') into file paths.
+
+    Returns None if any of the connections is not a file.
+    """
+    lPaths = []
+    for lConnection in aConnectionPaths.split(';'):
+        lMatch = re.match(r'^(\w+)://(.*)', lConnection)
+        if lMatch is not None:
+            if lMatch.group(1) != 'file':
+                return None
+            lConnection = lMatch.group(2)
+        lPattern = os.path.expanduser(os.path.expandvars(lConnection))
+        lPaths += sorted(glob.glob(lPattern)) if glob.has_magic(lPattern) else [lPattern]
+    return lPaths
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+def parseDeviceIds(aPath):
+    """
+    Device identifiers of a connection file, in file order.
+    """
+    return [lConnection.get('id') for lConnection in ET.parse(aPath).getroot().iter('connection') if lConnection.get('id')]
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+def getCachePath(aPath):
+    lPath = os.path.realpath(aPath)
+    lStat = os.stat(lPath)
+    lPathHash = hashlib.sha1(lPath.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(getCacheDirectory(), '{}-{}-{}.json'.format(lPathHash, lStat.st_mtime_ns, lStat.st_size))
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+def readFileDeviceIds(aPath):
+    """
+    Device identifiers of a connection file, from the cache if up to date.
+    """
+    lCachePath = getCachePath(aPath)
+    try:
+        with open(lCachePath) as lCacheFile:
+            return json.load(lCacheFile)
+    except (IOError, OSError, ValueError):
+        pass
+
+    lIds = parseDeviceIds(aPath)
+
+    # Write to a temporary file first, so concurrent shells never read a partial cache entry
+    try:
+        lCacheDir = os.path.dirname(lCachePath)
+        if not os.path.isdir(lCacheDir):
+            os.makedirs(lCacheDir)
+        lFd, lTmpPath = tempfile.mkstemp(dir=lCacheDir, suffix='.tmp')
+        with os.fdopen(lFd, 'w') as lTmpFile:
+            json.dump(lIds, lTmpFile)
+        os.rename(lTmpPath, lCachePath)
+    except (IOError, OSError):
+        pass
+
+    return lIds
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+def sanitizeConnectionPaths(aConnectionPaths):
+
+    lConnectionList = aConnectionPaths.split(';')
+    for i,c in enumerate(lConnectionList):
+        if re.match('^\w+://.*', c) is None:
+            lConnectionList[i] = 'file://'+c
+    return ';'.join(lConnectionList)
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+def completeDevices(ctx, args, incomplete):
+    root_ctx = ctx.find_root()
+    devs = readDeviceIds(sanitizeConnectionPaths(str(root_ctx.params['connections'])))
+    return [k for k in devs if incomplete in k]
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+def readDeviceIds(aConnectionPaths):
+    """
+    Device identifiers of a uhal connection string.
+
+    Falls back to a uhal ConnectionManager for connections that are not plain
+    files, or files that cannot be parsed.
+    """
+    lPaths = expandConnectionPaths(aConnectionPaths)
+    if lPaths is not None:
+        try:
+            lIds = []
+            for lPath in lPaths:
+                lIds += [lId for lId in readFileDeviceIds(lPath) if lId not in lIds]
+            return lIds
+        except (IOError, OSError, ET.ParseError):
+            pass
+
+    import uhal
+    return list(uhal.ConnectionManager(aConnectionPaths).getDevices())
+# ------------------------------------------------------------------------------
@@ -34,10 +34,9 @@ def crt(obj, device):
 
     echo('Created crt device')
     lTopDesign = lDevice.getNode('')
-    lBoardInfo = toolbox.readSubNodes(lDevice.getNode('io.config'), False)
-    lDevice.dispatch()
+    lIdentity = toolbox.readHardwareIdentity(lDevice)
 
-    if lBoardInfo['board_type'].value() in kLibrarySupportedBoards and lBoardInfo['design_type'].value() in kLibrarySupportedDesigns:        
+    if lIdentity['board_type'] in kLibrarySupportedBoards and lIdentity['design_type'] in kLibrarySupportedDesigns:        
         lTopDesign.validate_firmware_version()
         try:
             echo(lDevice.getNode('io').get_hardware_info())
@@ -38,10 +38,9 @@ def endpoint(obj, device, ids):
     echo('Created endpoint device ' + style(lDevice.id(), fg='blue'))
     lTopDesign = lDevice.getNode('')
 
-    lBoardInfo = toolbox.readSubNodes(lDevice.getNode('io.config'), False)
-    lDevice.dispatch()
+    lIdentity = toolbox.readHardwareIdentity(lDevice)
 
-    if lBoardInfo['board_type'].value() in kLibrarySupportedBoards and lBoardInfo['design_type'].value() in kLibrarySupportedDesigns:
+    if lIdentity['board_type'] in kLibrarySupportedBoards and lIdentity['design_type'] in kLibrarySupportedDesigns:
         
         lTopDesign.validate_firmware_version()
 
@@ -77,6 +76,11 @@ def endpoint(obj, device, ids):
     obj.mDevice = lDevice
     obj.mEndpoints = lEndpoints
     obj.mIO = lDevice.getNode('io')
+    obj.mFirmwareFrequency = lIdentity['clock_frequency']
+
+    if obj.mSampleFrequencies:
+        for lEndpoint in lEndpoints.values():
+            lEndpoint.start_clock_frequency_sampler()
 # ------------------------------------------------------------------------------
 
 
@@ -139,9 +143,8 @@ def status(obj, watch, period):
     lDevice = obj.mDevice
     lEndpoints = obj.mEndpoints
     lEndPointNode = lDevice.getNode('endpoint0')
-    lIO = obj.mIO
 
-    firmware_clock_frequency_hz = lIO.read_firmware_frequency()
+    firmware_clock_frequency_hz = obj.mFirmwareFrequency
 
     while(True):
         if watch:
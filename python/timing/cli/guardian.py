@@ -0,0 +1,277 @@
+"""
+Client of the pdtguardian timing control daemon, and its command line.
+
+pdtguardian keeps the devices of a connection file open, with their address
+tables, hardware identities and monitoring samplers, and serves them on a Unix
+domain socket. Requests and replies are JSON objects, one per line. The client
+only needs the standard library, so that scripts using it start fast.
+"""
+
+from __future__ import print_function
+
+import json
+import os
+import socket
+
+import click
+
+from click import echo
+
+
+# ------------------------------------------------------------------------------
+def getDefaultSocketPath():
+    lSocketPath = os.environ.get('TIMING_GUARDIAN_SOCKET')
+    if lSocketPath:
+        return lSocketPath
+    return '/tmp/pdtguardian-{}.sock'.format(os.getuid())
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+class GuardianError(RuntimeError):
+    """
+    Error replied by the daemon; type is the class of the exception it caught.
+    """
+
+    def __init__(self, aType, aMessage):
+        super(GuardianError, self).__init__('{}: {}'.format(aType, aMessage))
+        self.type = aType
+        self.message = aMessage
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+class GuardianClient(object):
+    """
+    Connection to pdtguardian. Requests are sent one at a time, or pipelined with callMany.
+    """
+
+    def __init__(self, aSocketPath=None, aTimeout=None):
+        self.socketPath = aSocketPath if aSocketPath else getDefaultSocketPath()
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(aTimeout)
+        self._socket.connect(self.socketPath)
+        self._buffer = b''
+        self._nextId = 0
+
+    def close(self):
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *aArgs):
+        self.close()
+
+    def _readReply(self):
+        while b'\n' not in self._buffer:
+            lChunk = self._socket.recv(65536)
+            if not lChunk:
+                raise GuardianError('ConnectionClosed', 'pdtguardian closed the connection')
+            self._buffer += lChunk
+        lLine, self._buffer = self._buffer.split(b'\n', 1)
+        return json.loads(lLine.decode('utf-8'))
+
+    def callMany(self, aRequests):
+        """
+        Send (method, params) requests at once and return their results, in order.
+        """
+        lIds = []
+        lLines = []
+        for lMethod, lParams in aRequests:
+            self._nextId += 1
+            lIds.append(self._nextId)
+            lLines.append(json.dumps({'id': self._nextId, 'method': lMethod, 'params': lParams}))
+        self._socket.sendall(('\n'.join(lLines) + '\n').encode('utf-8'))
+
+        lResults = []
+        for lId in lIds:
+            lReply = self._readReply()
+            if lReply.get('id') != lId:
+                raise GuardianError('ProtocolError', 'reply {} to request {}'.format(lReply.get('id'), lId))
+            if 'error' in lReply:
+                raise GuardianError(lReply['error']['type'], lReply['error']['message'])
+            lResults.append(lReply.get('result'))
+        return lResults
+
+    def call(self, aMethod, **aParams):
+        return self.callMany([(aMethod, aParams)])[0]
+
+    def ping(self):
+        return self.call('ping')
+
+    def listDevices(self):
+        return self.call('list_devices')
+
+    def open(self, aDevice, aMonitoringLevel=0, aSampleFrequencies=False):
+        return self.call('open', device=aDevice, monitoring_level=aMonitoringLevel, sample_frequencies=aSampleFrequencies)
+
+    def closeDevice(self, aDevice):
+        return self.call('close', device=aDevice)
+
+    def read(self, aDevice, aNodes):
+        """
+        Read registers in a single dispatch, as a {node: value} dict.
+        """
+        return self.call('read', device=aDevice, nodes=list(aNodes))
+
+    def write(self, aDevice, aValues):
+        """
+        Write a {node: value} dict in a single dispatch.
+        """
+        return self.call('write', device=aDevice, values=aValues)
+
+    def readBlock(self, aDevice, aNode, aSize):
+        return self.call('read_block', device=aDevice, node=aNode, size=aSize)
+
+    def batch(self, aDevice, aOperations):
+        """
+        Run {'read': node}, {'read_block': node, 'size': n} and {'write': node, 'value': v}
+        operations in a single dispatch, and return their results in order.
+        """
+        return self.call('batch', device=aDevice, operations=aOperations)
+
+    def identity(self, aDevice, aRefresh=False):
+        return self.call('identity', device=aDevice, refresh=aRefresh)
+
+    def status(self, aDevice):
+        return self.call('status', device=aDevice)
+
+    def hardwareInfo(self, aDevice):
+        return self.call('hardware_info', device=aDevice)
+
+    def info(self, aDevice, aLevel=1):
+        return self.call('info', device=aDevice, level=aLevel)
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+def completeGuardianDevices(ctx, args, incomplete):
+    # The devices are those of the connection file of the daemon
+    lSocketPath = None
+    while ctx is not None and lSocketPath is None:
+        lSocketPath = ctx.params.get('socket_path')
+        ctx = ctx.parent
+    try:
+        with GuardianClient(lSocketPath, 1.) as lClient:
+            lDevices = lClient.listDevices()
+    except (IOError, OSError, GuardianError):
+        return []
+    return [k for k in lDevices if incomplete in k]
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+@click.group('guardian')
+@click.option('-s', '--socket', 'socket_path', default=None, help='pdtguardian socket (default: $TIMING_GUARDIAN_SOCKET or /tmp/pdtguardian-<uid>.sock)')
+@click.pass_obj
+def guardian(obj, socket_path):
+    '''
+    Commands served by the pdtguardian daemon.
+    '''
+    obj.mGuardianSocket = socket_path
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+def connect(obj):
+    try:
+        return GuardianClient(obj.mGuardianSocket)
+    except (IOError, OSError) as e:
+        raise click.ClickException('Cannot connect to pdtguardian ({}): {}'.format(obj.mGuardianSocket or getDefaultSocketPath(), e))
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+@guardian.command('ping', short_help='Check that the daemon is serving.')
+@click.pass_obj
+def ping(obj):
+    with connect(obj) as lClient:
+        lReply = lClient.ping()
+    echo('pdtguardian protocol {}, up for {:.0f} s, {} client(s)'.format(lReply['protocol'], lReply['uptime'], lReply['clients']))
+    echo('Open devices: ' + (', '.join(lReply['devices']) if lReply['devices'] else 'none'))
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+@guardian.command('open', short_help='Open a device and keep it open.')
+@click.argument('device', autocompletion=completeGuardianDevices)
+@click.option('-l', '--monitoring-level', type=click.IntRange(0, None), default=0, help='Build the monitoring plan of this level, starting its samplers')
+@click.option('-F', '--sample-frequencies', is_flag=True, help='Sample the clock frequencies in the background, also without monitoring plan')
+@click.pass_obj
+def open_device(obj, device, monitoring_level, sample_frequencies):
+    with connect(obj) as lClient:
+        lIdentity = lClient.open(device, monitoring_level, sample_frequencies)
+    if lIdentity:
+        echo('{}: board {board_type}, carrier {carrier_type}, design {design_type}, firmware {firmware_version}'.format(device, **lIdentity))
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+@guardian.command('close', short_help='Close a device, e.g. after reprogramming it.')
+@click.argument('device', autocompletion=completeGuardianDevices)
+@click.pass_obj
+def close_device(obj, device):
+    with connect(obj) as lClient:
+        lClient.closeDevice(device)
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+@guardian.command('status', short_help='Print the status of a device.')
+@click.argument('device', autocompletion=completeGuardianDevices)
+@click.pass_obj
+def status(obj, device):
+    with connect(obj) as lClient:
+        echo(lClient.status(device))
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+@guardian.command('identify', short_help='Print the hardware identity of a device.')
+@click.argument('device', autocompletion=completeGuardianDevices)
+@click.option('--refresh', is_flag=True, help='Read the identity again from the device')
+@click.pass_obj
+def identify(obj, device, refresh):
+    with connect(obj) as lClient:
+        lIdentity = lClient.identity(device, refresh)
+    for lKey in sorted(lIdentity):
+        lValue = lIdentity[lKey]
+        echo('{}: {}'.format(lKey, hex(lValue) if isinstance(lValue, int) and lKey in ('board_uid', 'firmware_version') else lValue))
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+@guardian.command('read', short_help='Read registers in a single dispatch.')
+@click.argument('device', autocompletion=completeGuardianDevices)
+@click.argument('nodes', nargs=-1, required=True)
+@click.pass_obj
+def read(obj, device, nodes):
+    with connect(obj) as lClient:
+        lValues = lClient.read(device, nodes)
+    for lNode in nodes:
+        echo('{} = {}'.format(lNode, hex(lValues[lNode])))
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+@guardian.command('write', short_help='Write a register.')
+@click.argument('device', autocompletion=completeGuardianDevices)
+@click.argument('node')
+@click.argument('value')
+@click.pass_obj
+def write(obj, device, node, value):
+    with connect(obj) as lClient:
+        lClient.write(device, {node: int(value, 0)})
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+@guardian.command('info', short_help='Print the monitoring information of a device as JSON.')
+@click.argument('device', autocompletion=completeGuardianDevices)
+@click.option('-l', '--level', type=click.IntRange(0, None), default=1)
+@click.pass_obj
+def info(obj, device, level):
+    with connect(obj) as lClient:
+        echo(json.dumps(lClient.info(device, level), indent=2, sort_keys=True))
+# ------------------------------------------------------------------------------
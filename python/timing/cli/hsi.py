@@ -11,6 +11,8 @@ from click import echo, style, secho
 from .click_texttable import Texttable
 import time
 
+from timing.core import HSIStreamReader
+
 # ------------------------------------------------------------------------------
 #    ____        __          _      __ 
 #   / __/__  ___/ /__  ___  (_)__  / /_
@@ -36,10 +38,9 @@ def hsi(obj, device):
     
     echo('Created HSI device')
     lTopDesign = lDevice.getNode('')
-    lBoardInfo = toolbox.readSubNodes(lDevice.getNode('io.config'), False)
-    lDevice.dispatch()
+    lIdentity = toolbox.readHardwareIdentity(lDevice)
 
-    if lBoardInfo['board_type'].value() in kLibrarySupportedBoards and lBoardInfo['design_type'].value() in kLibrarySupportedDesigns:
+    if lIdentity['board_type'] in kLibrarySupportedBoards and lIdentity['design_type'] in kLibrarySupportedDesigns:
         lTopDesign.validate_firmware_version()
         try:
             echo(lDevice.getNode('io').get_hardware_info())
@@ -172,4 +173,53 @@ def readback(ctx, obj, readall):
     lHSIEpt = obj.mHSIEndpoint
     
     echo(lHSIEpt.get_data_buffer_table(readall,False))
-# ------------------------------------------------------------------------------
\ No newline at end of file
+# ------------------------------------------------------------------------------
+
+# ------------------------------------------------------------------------------
+@hsi.command('stream', short_help='Continuously read out and decode the hsi readout buffer.')
+@click.pass_obj
+@click.option('--duration', '-d', type=float, default=0, help='Duration of the readout [s]; 0: until interrupted.')
+@click.option('--max-events', '-n', type=int, default=0, help='Stop after this number of events; 0: no limit.')
+@click.option('--quiet', '-q', is_flag=True, default=False, help='Do not print the events, only the summary.')
+def stream(obj, duration, max_events, quiet):
+    '''
+    Stream the events of the hsi readout buffer until interrupted.
+    '''
+    lHSIEpt = obj.mHSIEndpoint
+
+    lReader = HSIStreamReader(lHSIEpt)
+    lReader.start()
+
+    lStart = time.time()
+    lEvents = 0
+    try:
+        while lReader.is_running():
+            if duration and time.time() - lStart > duration:
+                break
+            lReader.wait_for_events(0.1)
+            for lEvent in lReader.pop_events():
+                lEvents += 1
+                if not quiet:
+                    echo('{:>8}  ts: 0x{:016x}  signals: 0x{:08x}  header: 0x{:08x}'.format(lEvent.counter, lEvent.timestamp, lEvent.signal_map, lEvent.header))
+                if max_events and lEvents >= max_events:
+                    break
+            if max_events and lEvents >= max_events:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        lReader.stop()
+
+    lElapsed = time.time() - lStart
+    lStats = lReader.get_stats()
+    lSummary = Texttable(max_width=0)
+    lSummary.header(['Counter', 'Value'])
+    lSummary.set_deco(Texttable.HEADER | Texttable.BORDER)
+    for lName in ['events', 'words', 'dispatches', 'empty_polls', 'buffer_warnings', 'buffer_errors', 'buffer_overflows', 'dropped_events', 'read_failures']:
+        lSummary.add_row([lName, getattr(lStats, lName)])
+    lSummary.add_row(['rate [Hz]', '{:.1f}'.format(lStats.events / lElapsed if lElapsed else 0)])
+    echo(lSummary.draw())
+
+    if lStats.buffer_errors or lStats.buffer_overflows or lStats.dropped_events:
+        secho('Events may have been lost', fg='red')
+# ------------------------------------------------------------------------------
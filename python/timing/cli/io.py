@@ -45,24 +45,26 @@ def io(obj, device):
         
     echo('Created device ' + click.style(lDevice.id(), fg='blue'))
     lTopDesign = lDevice.getNode('')
-    lBoardInfo = toolbox.readSubNodes(lDevice.getNode('io.config'), False)
-    lDevice.dispatch()
+    lIdentity = toolbox.readHardwareIdentity(lDevice)
 
-    if lBoardInfo['board_type'].value() in kLibrarySupportedBoards and lBoardInfo['design_type'].value() in kLibrarySupportedDesigns:
+    if lIdentity['board_type'] in kLibrarySupportedBoards and lIdentity['design_type'] in kLibrarySupportedDesigns:
         lTopDesign.validate_firmware_version()
 
+        if obj.mSampleFrequencies:
+            lDevice.getNode('io').start_clock_frequency_sampler()
+
     echo("Design '{}' on board '{}' on carrier '{}' with frequency {} MHz".format(
-        style(kDesignNameMap[lBoardInfo['design_type'].value()], fg='blue'),
-        style(kBoardNamelMap[lBoardInfo['board_type'].value()], fg='blue'),
-        style(kCarrierNamelMap[lBoardInfo['carrier_type'].value()], fg='blue'),
-        style(str(lBoardInfo['clock_frequency'].value()/1e6), fg='blue')
+        style(kDesignNameMap[lIdentity['design_type']], fg='blue'),
+        style(kBoardNamelMap[lIdentity['board_type']], fg='blue'),
+        style(kCarrierNamelMap[lIdentity['carrier_type']], fg='blue'),
+        style(str(lIdentity['clock_frequency']/1e6), fg='blue')
     ))
 
     obj.mDevice = lDevice
     
-    obj.mBoardType = lBoardInfo['board_type'].value()
-    obj.mCarrierType = lBoardInfo['carrier_type'].value()
-    obj.mDesignType = lBoardInfo['design_type'].value()
+    obj.mBoardType = lIdentity['board_type']
+    obj.mCarrierType = lIdentity['carrier_type']
+    obj.mDesignType = lIdentity['design_type']
     
 # ------------------------------------------------------------------------------
 
@@ -244,7 +246,8 @@ def dacsetup(ctx, obj, value):
 @click.pass_obj
 @click.pass_context
 @click.option('--sfp-id', 'sfp_id', required=False, type=click.IntRange(0, 8), help='SFP id to query.')
-def sfpstatus(ctx, obj, sfp_id):
+@click.option('--skip-lost/--read-lost', 'skip_lost', default=True, help='Skip fanout SFPs with loss of signal; default: skip')
+def sfpstatus(ctx, obj, sfp_id, skip_lost):
     '''
     Read SFP status
     '''
@@ -264,14 +267,11 @@ def sfpstatus(ctx, obj, sfp_id):
         else:
             if lBoardType in [kBoardFMC , kBoardTLU]:
                 echo(lIO.get_sfp_status(0))
-            elif lBoardType in [ kBoardPC059, kBoardFIB, kBoardMIB ]:
-                # PC059 sfp id 0 is upstream sfp
-                if lBoardType == kBoardPC059:
-                    lSFPIDRange = 9
-                elif lBoardType == kBoardFIB:
-                    lSFPIDRange = 8
-                elif lBoardType == kBoardMIB:
-                    lSFPIDRange = 3
+            elif lBoardType in [ kBoardPC059, kBoardFIB ]:
+                # single pass over all sfps, PC059 sfp id 0 is upstream sfp
+                echo(lIO.get_sfp_sweep_status(skip_lost))
+            elif lBoardType == kBoardMIB:
+                lSFPIDRange = 3
                 for i in range(lSFPIDRange):
                     try:
                         echo(lIO.get_sfp_status(i))
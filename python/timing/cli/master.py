@@ -18,7 +18,7 @@ import timing.common.definitions as defs
 
 from click import echo, style, secho
 from os.path import join, expandvars, basename
-from timing.core import SI534xSlave, I2CExpanderSlave
+from timing.core import SI534xSlave, I2CExpanderSlave, PartitionEventReader
 
 from timing.common.definitions import kBoardSim, kBoardFMC, kBoardPC059, kBoardMicrozed, kBoardTLU
 from timing.common.definitions import kCarrierEnclustraA35, kCarrierKC705, kCarrierMicrozed
@@ -52,13 +52,12 @@ def master(obj, device):
     lTopDesign = lDevice.getNode('')
     
     lMaster = lDevice.getNode('master')    
-    lBoardInfo = toolbox.readSubNodes(lDevice.getNode('io.config'), False)
-    lGenerics = toolbox.readSubNodes(lMaster.getNode('global.config'), False)
-    lDevice.dispatch()
+    lIdentity = toolbox.readHardwareIdentity(lDevice, lMaster.getNode('global.version'), lMaster.getNode('global.config'))
+    lGenerics = lIdentity['generics']
+    lVersion = lIdentity['version']
 
-    if lBoardInfo['board_type'].value() in kLibrarySupportedBoards and lBoardInfo['design_type'].value() in kLibrarySupportedDesigns:
+    if lIdentity['board_type'] in kLibrarySupportedBoards and lIdentity['design_type'] in kLibrarySupportedDesigns:
         
-        lVersion = lTopDesign.read_firmware_version()
         lTopDesign.validate_firmware_version()
 
         try:
@@ -67,9 +66,6 @@ def master(obj, device):
             secho("Failed to retrieve hardware information I2C issue? Initial board reset needed?", fg='yellow')
             e = sys.exc_info()[0]
             secho("Error: {}".format(e), fg='red')
-    else:
-        lVersion = lMaster.getNode('global.version').read()
-        lDevice.dispatch()
 
     echo("Master FW rev: {}, partitions: {}, channels: {}".format(
         style(format_firmware_version(lVersion), fg='cyan'),
@@ -82,11 +78,12 @@ def master(obj, device):
     obj.mMaster = lMaster
     obj.mIO = lDevice.getNode('io')
 
-    obj.mGenerics = { k:v.value() for k,v in lGenerics.items()}
+    obj.mGenerics = lGenerics
     obj.mVersion = lVersion
-    obj.mBoardType = lBoardInfo['board_type'].value()
-    obj.mCarrierType = lBoardInfo['carrier_type'].value()
-    obj.mDesignType = lBoardInfo['design_type'].value()
+    obj.mBoardType = lIdentity['board_type']
+    obj.mCarrierType = lIdentity['carrier_type']
+    obj.mDesignType = lIdentity['design_type']
+    obj.mFirmwareFrequency = lIdentity['clock_frequency']
 
     # only overlord has ext trig ept
     if obj.mDesignType == kDesignOverlord:
@@ -101,8 +98,7 @@ def master(obj, device):
 def status(obj):
     
     lMaster = obj.mMaster
-    lIO = obj.mIO
-    firmware_clock_frequency_hz = lIO.read_firmware_frequency()
+    firmware_clock_frequency_hz = obj.mFirmwareFrequency
 
     echo(lMaster.get_status_with_date(firmware_clock_frequency_hz))
 # ------------------------------------------------------------------------------
@@ -150,9 +146,8 @@ def partstatus(obj, watch, period):
     # lDevice = obj.mDevice
     lMaster = obj.mMaster
     lPartNode = obj.mPartitionNode
-    lIO = obj.mIO
     
-    firmware_clock_frequency_hz = lIO.read_firmware_frequency()
+    firmware_clock_frequency_hz = obj.mFirmwareFrequency
     lTStampNode = lMaster.getNode('tstamp.ctr.val')
 
     while(True):
@@ -283,7 +278,8 @@ def stop(obj):
 @click.pass_obj
 @click.option('--all/--events', '-a/ ', 'readall', default=False, help="Buffer readout mode.\n- events: only completed events are readout.\n- all: the content of the buffer is fully read-out.")
 @click.option('--keep-reading', '-k', 'keep', is_flag=True, default=False, help='Continuous buffer readout')
-def readback(obj, readall, keep):
+@click.option('--quiet', '-q', is_flag=True, default=False, help='Continuous readout: only print the throughput report.')
+def readback(obj, readall, keep, quiet):
     '''
     Read the content of the timing master readout buffer.
     '''
@@ -295,31 +291,33 @@ def readback(obj, readall, keep):
     # lPartId = obj.mPartitionId
     lPartNode = obj.mPartitionNode
 
-    while(True):
-        lBufCount = lPartNode.read_buffer_word_count()
-
-        echo ( "Words available in readout buffer: "+hex(lBufCount))
-
-        lWordsToRead = int(lBufCount) if readall else int(lBufCount // defs.kEventSize)*defs.kEventSize
-
-        # if lWordsToRead == 0:
-            # echo("Nothing to read, goodbye!")
-
-        lBufData = lPartNode.getNode('buf.data').readBlock(lWordsToRead)
-        lPartNode.getClient().dispatch()
+    if keep:
+        # batched readout, events are validated and decoded in C++
+        lReader = PartitionEventReader(lPartNode, read_all=readall)
+        lEvents = 0
+        try:
+            for lBatch in lReader:
+                if not quiet:
+                    echo('\n'.join('ev {} - ts    : {} ({})'.format(lEvents + i, e.timestamp, hex(e.timestamp)) for i, e in enumerate(lBatch)))
+                lEvents += len(lBatch)
+        except KeyboardInterrupt:
+            pass
+        echo(lReader.get_report_table())
+        return
 
+    lBufCount = lPartNode.read_buffer_word_count()
 
+    echo ( "Words available in readout buffer: "+hex(lBufCount))
 
-        for i,c in enumerate(chunks(lBufData, 6)):
-            ts = (c[3]<<32) +c[2]
-            # print ('header:', hex(c[0]), hex(c[1]))
-            print ('ev {} - ts    : {} ({})'.format(i, ts, hex(ts)))
+    lWordsToRead = int(lBufCount) if readall else int(lBufCount // defs.kEventSize)*defs.kEventSize
 
+    lBufData = lPartNode.getNode('buf.data').readBlock(lWordsToRead)
+    lPartNode.getClient().dispatch()
 
-        # for i, lWord in enumerate(lBufData):
-            # echo ( '{:04d} {}'.format(i, hex(lWord)))
-        if not keep:
-            break
+    for i,c in enumerate(chunks(lBufData, 6)):
+        ts = (c[3]<<32) +c[2]
+        # print ('header:', hex(c[0]), hex(c[1]))
+        print ('ev {} - ts    : {} ({})'.format(i, ts, hex(ts)))
 # ------------------------------------------------------------------------------
 
 
@@ -0,0 +1,99 @@
+"""
+Lazy loading of the command line subcommands.
+
+The subcommands are registered by name, with the module and attribute that
+define them, their short help, and whether they take a device identifier as
+first argument. Their modules, and with them uhal and the timing bindings, are
+only imported when the subcommand is resolved, so that help and shell
+completion of the top level commands stay cheap. The device identifier of a
+subcommand is completed from the registry too, from the connection files.
+"""
+
+from __future__ import print_function
+
+import importlib
+
+import click
+import click_didyoumean
+
+
+# ------------------------------------------------------------------------------
+class LazyGroup(click_didyoumean.DYMGroup):
+    """
+    Group loading its registered subcommands on first use.
+
+    lazy_commands maps the command names to (import path, short help) pairs,
+    the import path being 'package.module:attribute', or to (import path,
+    short help, device argument) triples, device argument being True for the
+    commands whose first argument is a uhal device identifier.
+    """
+
+    def __init__(self, *args, **kwargs):
+        lLazyCommands = kwargs.pop('lazy_commands', {})
+        super(LazyGroup, self).__init__(*args, **kwargs)
+        self.lazy_commands = {}
+        for lName, lEntry in lLazyCommands.items():
+            self.add_lazy_command(lName, *lEntry)
+
+    def add_lazy_command(self, name, import_path, short_help='', device_argument=False):
+        self.lazy_commands[name] = (import_path, short_help, device_argument)
+
+    def list_commands(self, ctx):
+        return sorted(set(super(LazyGroup, self).list_commands(ctx)) | set(self.lazy_commands))
+
+    def get_command(self, ctx, cmd_name):
+        lCommand = super(LazyGroup, self).get_command(ctx, cmd_name)
+        if lCommand is None and cmd_name in self.lazy_commands:
+            if ctx.resilient_parsing:
+                # Completion lists the commands: describe them without loading them
+                return click.Command(cmd_name, short_help=self.lazy_commands[cmd_name][1])
+            lCommand = self.load_command(cmd_name)
+        return lCommand
+
+    def resolve_command(self, ctx, args):
+        # The command is resolved to run it, or to complete its parameters: load it,
+        # unless only its device argument is being completed
+        if args and args[0] in self.lazy_commands and args[0] not in self.commands:
+            if ctx.resilient_parsing and len(args) == 1 and self.lazy_commands[args[0]][2]:
+                return args[0], self.device_stub(args[0]), []
+            self.load_command(args[0])
+        return super(LazyGroup, self).resolve_command(ctx, args)
+
+    def device_stub(self, cmd_name):
+        """
+        Stand-in of a command not loaded yet, completing its device argument from the connection files.
+        """
+        from .connections import completeDevices
+        return click.Command(cmd_name,
+                             short_help=self.lazy_commands[cmd_name][1],
+                             params=[click.Argument(['device'], autocompletion=completeDevices)])
+
+    def load_command(self, cmd_name):
+        lModuleName, lAttrName = self.lazy_commands[cmd_name][0].split(':')
+        lCommand = getattr(importlib.import_module(lModuleName), lAttrName)
+        if not isinstance(lCommand, click.Command):
+            raise ValueError("Lazy command '{}' ({}) is not a click command".format(cmd_name, self.lazy_commands[cmd_name][0]))
+        self.add_command(lCommand, cmd_name)
+        return lCommand
+
+    def format_commands(self, ctx, formatter):
+        # Same as click's, but the short help of commands not loaded yet is taken from the registry
+        lNames = self.list_commands(ctx)
+        if not lNames:
+            return
+
+        lLimit = formatter.width - 6 - max(len(lName) for lName in lNames)
+        lRows = []
+        for lName in lNames:
+            if lName in self.commands:
+                lCommand = self.commands[lName]
+                if lCommand.hidden:
+                    continue
+                lRows.append((lName, lCommand.get_short_help_str(lLimit)))
+            else:
+                lRows.append((lName, self.lazy_commands[lName][1]))
+
+        if lRows:
+            with formatter.section('Commands'):
+                formatter.write_dl(lRows)
+# ------------------------------------------------------------------------------
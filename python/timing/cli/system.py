@@ -1,8 +1,10 @@
 from __future__ import print_function
 
+import asyncio
 import click
 import time
 import pprint
+import timing.aio as aio
 import timing.shells
 import timing.cli.toolbox as toolbox
 import timing.common.database as database
@@ -51,11 +53,18 @@ def vst(obj):
 @click.option('--soft', '-s', is_flag=True, default=False, help='Soft reset i.e. skip the clock chip configuration.')
 @click.pass_obj
 def setup(obj, soft):
+
+    # The fanouts recover their clock from the overlord: it is reset first, then the
+    # fanouts are reset concurrently, each in the thread of its device
     obj.overlord.reset(soft=soft, forcepllcfg=None)
+
+    async def resetFanouts():
+        await asyncio.gather(*(aio.call(f.device, f.reset, soft, 0, forcepllcfg=None) for f in obj.fanouts.values()))
+
     for i,f in obj.fanouts.items():
-        # print(i,vars(f))
         echo("Resetting fanout {}: {}".format(i,f.device.id()))
-        obj.fanouts[0].reset(soft, 0, forcepllcfg=None)
+    aio.runSync(resetFanouts())
+
     obj.overlord.synctime()
     obj.overlord.initPartitions()
 # ------------------------------------------------------------------------------
@@ -75,17 +84,21 @@ def synctime(obj):
 @click.pass_obj
 def scani2c(obj):
     boards = [obj.overlord] + [ obj.fanouts[k] for k in sorted(obj.fanouts)]
-    for b in boards: # + obj.fanouts.values()
+
+    # Scan all boards concurrently, then print the results board by board
+    async def scanAll():
+        return await asyncio.gather(*(aio.call(b.device, lambda b=b: (b.scanI2C(), b.pingI2CSlaves())) for b in boards))
+
+    for b, (lScan, lPings) in zip(boards, aio.runSync(scanAll())):
         echo("----"+style(b.device.id(), fg='blue')+"----")
         echo("I2C bus scan")
-        for n,adrss in b.scanI2C().items():
+        for n,adrss in lScan.items():
             echo("  {}: {}".format(
                 style(n, fg='cyan'),
                 ', '.join([hex(a) for a in adrss])
             ))
 
         echo("I2C slaves ping scan")
-        lPings = b.pingI2CSlaves()
         for n in sorted(lPings):
             s, a, ok = lPings[n]
             echo("  {}.{}: {} - {}".format(style(n, fg='cyan'), s, hex(a), style('OK', fg='green') if ok else style('Not responding', fg='red')))
@@ -106,9 +119,14 @@ def status(obj):
     print(lAllBoards)
     echo('collecting data for '+','.join(lAllBoards))
 
-    status = { n:b.status() for n,b in lAllBoards.items()}
+    # Collect from all boards concurrently
+    async def collectAll():
+        return await asyncio.gather(*(aio.call(b.device, lambda b=b: (b.status(), b.pllstatus())) for b in lAllBoards.values()))
+
+    lCollected = dict(zip(lAllBoards, aio.runSync(collectAll())))
+    status = { n:s for n,(s,p) in lCollected.items()}
     # freq = { n:b.freq() for n,b in lAllBoards.items()}
-    pllstatus = { n:b.pllstatus() for n,b in lAllBoards.items()}
+    pllstatus = { n:p for n,(s,p) in lCollected.items()}
 
     echo( "--- " + style("Overlord IO status", fg='cyan') + " ---")
     toolbox.printRegTable(status['overlord'], False)
@@ -8,6 +8,8 @@ import time
 
 from click import echo, style, secho
 from .click_texttable import Texttable
+# Shared with the shell completion of the subcommands that are not loaded yet
+from .connections import sanitizeConnectionPaths, completeDevices
 
 
 # ------------------------------------------------------------------------------
@@ -82,23 +84,6 @@ class IntRange(click.types.IntParamType):
 
 
 # ------------------------------------------------------------------------------
-def sanitizeConnectionPaths(aConnectionPaths):
-
-    lConnectionList = aConnectionPaths.split(';')
-    for i,c in enumerate(lConnectionList):
-        if re.match('^\w+://.*', c) is None:
-            lConnectionList[i] = 'file://'+c
-    return ';'.join(lConnectionList)
-# ------------------------------------------------------------------------------
-
-# ------------------------------------------------------------------------------
-def completeDevices(ctx, args, incomplete):
-    import uhal
-    root_ctx = ctx.find_root()
-    devs = uhal.ConnectionManager(sanitizeConnectionPaths(str(root_ctx.params['connections']))).getDevices()
-    return [k for k in devs if incomplete in k]
-    # return []
-# ------------------------------------------------------------------------------
 
 
 # ------------------------------------------------------------------------------
@@ -111,6 +96,43 @@ def readSubNodes(aNode, dispatch=True):
 # ------------------------------------------------------------------------------
 
 
+# ------------------------------------------------------------------------------
+def readHardwareIdentity(aDevice, aVersionNode=None, aGenericsNode=None):
+    """
+    Read the board and firmware identity of a device, as a dict.
+
+    Designs known to the library serve it from the identity cached by the top
+    design, read in a single dispatch on first use and kept until the next IO
+    reset. Other designs fall back to reading io.config, and the version and
+    generics nodes if given.
+    """
+    lTopDesign = aDevice.getNode('')
+    if hasattr(lTopDesign, 'get_hardware_identity'):
+        lIdentity = lTopDesign.get_hardware_identity()
+        return {
+            'board_type': lIdentity.board_type,
+            'carrier_type': lIdentity.carrier_type,
+            'design_type': lIdentity.design_type,
+            'clock_frequency': lIdentity.firmware_frequency,
+            'version': lIdentity.firmware_version,
+            'generics': dict(lIdentity.generics),
+        }
+
+    lBoardInfo = readSubNodes(aDevice.getNode('io.config'), False)
+    lVersion = aVersionNode.read() if aVersionNode is not None else None
+    lGenerics = readSubNodes(aGenericsNode, False) if aGenericsNode is not None else {}
+    aDevice.dispatch()
+    return {
+        'board_type': lBoardInfo['board_type'].value(),
+        'carrier_type': lBoardInfo['carrier_type'].value(),
+        'design_type': lBoardInfo['design_type'].value(),
+        'clock_frequency': lBoardInfo['clock_frequency'].value(),
+        'version': lVersion.value() if lVersion is not None else None,
+        'generics': { k:v.value() for k,v in lGenerics.items() },
+    }
+# ------------------------------------------------------------------------------
+
+
 # ------------------------------------------------------------------------------
 def resetSubNodes(aNode, aValue=0x0, dispatch=True):
     """
@@ -1 +1,76 @@
-from ..._daq_timing_py.common.toolbox import *
\ No newline at end of file
+from ..._daq_timing_py.common.toolbox import *
+
+# ------------------------------------------------------------------------------
+# NumPy views of readout buffers.
+#
+# Block reads (e.g. PartitionNode.read_events, EndpointNode.read_data_buffer,
+# HSINode.read_data_buffer) return WordBuffer objects, which implement the
+# buffer protocol. The helpers below reinterpret them, without copying, as
+# arrays of events. NumPy is only imported when they are used.
+
+kPartitionEventFields = ['header', 'scmd', 'ts', 'evtctr', 'checksum']
+kHSIEventFields = ['header', 'ts', 'signal_map', 'counter']
+
+
+def partition_event_dtype():
+    '''
+    Structured dtype of a 6-word partition/endpoint buffer event.
+    '''
+    import numpy as np
+    return np.dtype({
+        'names': kPartitionEventFields,
+        'formats': ['<u4', '<u4', '<u8', '<u4', '<u4'],
+        'offsets': [0, 4, 8, 16, 20],
+        'itemsize': 24,
+    })
+
+
+def hsi_event_dtype():
+    '''
+    Structured dtype of a 5-word HSI buffer event.
+    '''
+    import numpy as np
+    return np.dtype({
+        'names': kHSIEventFields,
+        'formats': ['<u4', '<u8', '<u4', '<u4'],
+        'offsets': [0, 4, 12, 16],
+        'itemsize': 20,
+    })
+
+
+def as_words(buffer):
+    '''
+    View a word buffer as a uint32 NumPy array, without copying.
+    '''
+    import numpy as np
+    return np.frombuffer(buffer, dtype='<u4')
+
+
+def _as_events(buffer, dtype):
+    lWords = as_words(buffer)
+    lWordsPerEvent = dtype.itemsize // 4
+    # trailing words of an incomplete event are left out
+    lWords = lWords[:(len(lWords) // lWordsPerEvent) * lWordsPerEvent]
+    return lWords.view(dtype)
+
+
+def as_partition_events(buffer):
+    '''
+    View a partition readout buffer block as an array of events, without copying.
+    '''
+    return _as_events(buffer, partition_event_dtype())
+
+
+def as_endpoint_events(buffer):
+    '''
+    View an endpoint readout buffer block as an array of events, without copying.
+    '''
+    return _as_events(buffer, partition_event_dtype())
+
+
+def as_hsi_events(buffer):
+    '''
+    View an HSI readout buffer block as an array of events, without copying.
+    '''
+    return _as_events(buffer, hsi_event_dtype())
+# ------------------------------------------------------------------------------
@@ -1 +1,3 @@
+# The bindings derive from the uhal python types
+import uhal
 from .._daq_timing_py.core import *
\ No newline at end of file
@@ -0,0 +1,380 @@
+/**
+ * @file AddressTableCache.cpp
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#include "timing/AddressTableCache.hpp"
+
+// PDT headers
+#include "ers/ers.hpp"
+#include "logging/Logging.hpp"
+#include "timing/toolbox.hpp"
+
+#include <boost/algorithm/string/predicate.hpp>
+#include <boost/filesystem/operations.hpp>
+#include <boost/filesystem/path.hpp>
+#include <boost/property_tree/exceptions.hpp>
+#include <boost/property_tree/xml_parser.hpp>
+
+#include <unistd.h>
+
+#include <algorithm>
+#include <cstdlib>
+#include <cstring>
+#include <fstream>
+#include <iterator>
+#include <map>
+#include <sstream>
+#include <string>
+#include <utility>
+#include <vector>
+
+namespace dunedaq {
+namespace timing {
+
+namespace fs = boost::filesystem;
+namespace pt = boost::property_tree;
+
+namespace {
+
+const std::string kFilePrefix = "file://";
+const std::string kAttributes = "<xmlattr>";
+
+std::vector<std::pair<std::string, std::string>>
+split_parameters(const std::string& parameters)
+{
+  std::vector<std::pair<std::string, std::string>> split;
+  std::stringstream stream(parameters);
+  std::string parameter;
+  while (std::getline(stream, parameter, ';')) {
+    if (parameter.empty())
+      continue;
+    auto separator = parameter.find('=');
+    split.push_back(std::make_pair(parameter.substr(0, separator),
+                                   separator == std::string::npos ? "" : parameter.substr(separator + 1)));
+  }
+  return split;
+}
+
+std::string
+merge_parameters(const std::string& module_parameters, const std::string& reference_parameters)
+{
+  // Parameters of the reference override those of the module top node with the same name
+  auto merged = split_parameters(module_parameters);
+  for (auto& parameter : split_parameters(reference_parameters)) {
+    auto existing = std::find_if(merged.begin(), merged.end(), [&parameter](const std::pair<std::string, std::string>& p) {
+      return p.first == parameter.first;
+    });
+    if (existing == merged.end())
+      merged.push_back(parameter);
+    else
+      existing->second = parameter.second;
+  }
+
+  std::string joined;
+  for (auto& parameter : merged)
+    joined += (joined.empty() ? "" : ";") + parameter.first + "=" + parameter.second;
+  return joined;
+}
+
+} // namespace
+
+const int AddressTableCache::kFormatVersion = 1;
+
+//-----------------------------------------------------------------------------
+std::string
+AddressTableCache::get_cache_directory()
+{
+  const char* cache_dir = std::getenv("TIMING_ADDRTAB_CACHE");
+  if (cache_dir && std::strlen(cache_dir))
+    return cache_dir;
+
+  const char* home_dir = std::getenv("HOME");
+  return (fs::path(home_dir ? home_dir : fs::temp_directory_path().string()) / ".cache" / "timing" / "addrtab").string();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::string
+AddressTableCache::resolve_path(const std::string& path, const std::string& base_directory)
+{
+  std::string stripped = boost::starts_with(path, kFilePrefix) ? path.substr(kFilePrefix.size()) : path;
+
+  auto expanded = shell_expand_paths(stripped);
+  if (expanded.size() != 1)
+    throw AddressTableCacheError(ERS_HERE, path, "does not expand to a single file");
+
+  fs::path resolved(expanded.at(0));
+  if (resolved.is_relative())
+    resolved = fs::path(base_directory) / resolved;
+
+  boost::system::error_code ec;
+  auto canonical = fs::canonical(resolved, ec);
+  if (ec)
+    throw AddressTableCacheError(ERS_HERE, resolved.string(), ec.message());
+  return canonical.string();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::string
+AddressTableCache::manifest_path(const std::string& canonical_path)
+{
+  uint64_t path_hash = 0xcbf29ce484222325; // NOLINT(build/unsigned)
+  for (char c : canonical_path) {
+    path_hash = (path_hash ^ static_cast<uint8_t>(c)) * 0x100000001b3; // NOLINT(build/unsigned)
+  }
+
+  std::stringstream manifest_name;
+  manifest_name << std::hex << path_hash << ".manifest";
+  return (fs::path(get_cache_directory()) / manifest_name.str()).string();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+bool
+AddressTableCache::read_manifest(const std::string& manifest, std::string& compiled_path)
+{
+  // Line 1: compiled table; then, per file of the set: modification time, size, path
+  std::ifstream manifest_file(manifest);
+  if (!std::getline(manifest_file, compiled_path) || !fs::exists(compiled_path))
+    return false;
+
+  std::string line;
+  size_t n_files = 0;
+  while (std::getline(manifest_file, line)) {
+    std::istringstream entry(line);
+    int64_t write_time;
+    uint64_t size; // NOLINT(build/unsigned)
+    std::string path;
+    if (!(entry >> write_time >> size) || !std::getline(entry >> std::ws, path))
+      return false;
+
+    boost::system::error_code time_ec, size_ec;
+    auto current_time = fs::last_write_time(path, time_ec);
+    auto current_size = fs::file_size(path, size_ec);
+    if (time_ec || size_ec || current_time != write_time || current_size != size)
+      return false;
+    ++n_files;
+  }
+  return n_files > 0;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+AddressTableCache::write_file(const std::string& path, const std::string& content)
+{
+  fs::create_directories(fs::path(path).parent_path());
+
+  // Write to a temporary file first, then move it in place
+  std::string tmp_path = path + ".tmp." + std::to_string(getpid());
+  {
+    std::ofstream file(tmp_path, std::ios::binary | std::ios::trunc);
+    file << content;
+    if (!file) {
+      fs::remove(tmp_path);
+      throw AddressTableCacheError(ERS_HERE, path, "write failed");
+    }
+  }
+  fs::rename(tmp_path, path);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+AddressTableCache::Tree
+AddressTableCache::read_table(const std::string& path,
+                              std::vector<std::pair<std::string, std::string>>& files,
+                              std::map<std::string, Tree>& modules)
+{
+  auto module = modules.find(path);
+  if (module != modules.end())
+    return module->second;
+
+  std::ifstream file(path, std::ios::binary);
+  std::string content((std::istreambuf_iterator<char>(file)), std::istreambuf_iterator<char>());
+  if (!file)
+    throw AddressTableCacheError(ERS_HERE, path, "cannot read file");
+  files.push_back(std::make_pair(path, content));
+
+  Tree document;
+  std::istringstream stream(content);
+  pt::read_xml(stream, document, pt::xml_parser::no_comments | pt::xml_parser::trim_whitespace);
+
+  auto top = document.get_child_optional("node");
+  if (!top)
+    throw AddressTableCacheError(ERS_HERE, path, "no top node");
+
+  return modules.emplace(path, *top).first->second;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+AddressTableCache::resolve_modules(Tree& node,
+                                   const std::string& directory,
+                                   std::vector<std::pair<std::string, std::string>>& files,
+                                   std::map<std::string, Tree>& modules,
+                                   size_t depth)
+{
+  if (depth > 64)
+    throw AddressTableCacheError(ERS_HERE, directory, "module nesting too deep, recursive modules?");
+
+  for (auto& child : node) {
+    if (child.first != "node")
+      continue;
+
+    auto module = child.second.get_optional<std::string>(kAttributes + ".module");
+    if (!module) {
+      resolve_modules(child.second, directory, files, modules, depth + 1);
+      continue;
+    }
+
+    auto module_path = resolve_path(*module, directory);
+    Tree resolved = read_table(module_path, files, modules);
+    resolve_modules(resolved, fs::path(module_path).parent_path().string(), files, modules, depth + 1);
+
+    for (auto& entry : child.second) {
+      if (entry.first != kAttributes) {
+        resolved.push_back(entry);
+        continue;
+      }
+      for (auto& attribute : entry.second) {
+        if (attribute.first == "module")
+          continue;
+        auto value = attribute.second.data();
+        if (attribute.first == "parameters")
+          value = merge_parameters(resolved.get(kAttributes + ".parameters", ""), value);
+        resolved.put(kAttributes + "." + attribute.first, value);
+      }
+    }
+    child.second.swap(resolved);
+  }
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+uint64_t // NOLINT(build/unsigned)
+AddressTableCache::hash_content(const std::vector<std::pair<std::string, std::string>>& files)
+{
+  // 64 bit FNV-1a over the file contents, in reading order
+  uint64_t hash = 0xcbf29ce484222325; // NOLINT(build/unsigned)
+  for (auto& file : files) {
+    for (char c : file.second) {
+      hash = (hash ^ static_cast<uint8_t>(c)) * 0x100000001b3; // NOLINT(build/unsigned)
+    }
+    hash = (hash ^ 0xff) * 0x100000001b3;
+  }
+  return hash;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::string
+AddressTableCache::compile(const std::string& address_table)
+{
+  auto path = resolve_path(address_table, fs::current_path().string());
+
+  auto manifest = manifest_path(path);
+  std::string compiled_path;
+  if (read_manifest(manifest, compiled_path))
+    return compiled_path;
+
+  try {
+    std::vector<std::pair<std::string, std::string>> files;
+    std::map<std::string, Tree> modules;
+
+    Tree document;
+    document.add_child("node", read_table(path, files, modules));
+    resolve_modules(document, fs::path(path).parent_path().string(), files, modules, 0);
+
+    std::stringstream compiled_name;
+    compiled_name << std::hex << hash_content(files) << std::dec << "-v" << kFormatVersion << ".xml";
+    compiled_path = (fs::path(get_cache_directory()) / compiled_name.str()).string();
+
+    if (!fs::exists(compiled_path)) {
+      std::stringstream compiled;
+      pt::write_xml(compiled, document, pt::xml_writer_make_settings<std::string>(' ', 2));
+      write_file(compiled_path, compiled.str());
+      TLOG_DEBUG(2) << "Compiled address table " << path << " (" << files.size() << " files) into " << compiled_path;
+    }
+
+    std::stringstream manifest_content;
+    manifest_content << compiled_path << "\n";
+    for (auto& file : files)
+      manifest_content << fs::last_write_time(file.first) << " " << file.second.size() << " " << file.first << "\n";
+    write_file(manifest, manifest_content.str());
+  } catch (const pt::ptree_error& e) {
+    throw AddressTableCacheError(ERS_HERE, path, e.what());
+  } catch (const fs::filesystem_error& e) {
+    throw AddressTableCacheError(ERS_HERE, path, e.what());
+  }
+
+  return compiled_path;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::string
+AddressTableCache::compile_connections(const std::string& connections)
+{
+  std::vector<std::string> compiled_connections;
+
+  std::stringstream connection_list(connections);
+  std::string connection;
+  while (std::getline(connection_list, connection, ';')) {
+    if (connection.find("://") != std::string::npos && !boost::starts_with(connection, kFilePrefix)) {
+      // not a file: left to uhal
+      compiled_connections.push_back(connection);
+      continue;
+    }
+
+    std::string stripped = boost::starts_with(connection, kFilePrefix) ? connection.substr(kFilePrefix.size()) : connection;
+    for (auto& path : shell_expand_paths(stripped)) {
+      auto canonical = resolve_path(path, fs::current_path().string());
+      auto directory = fs::path(canonical).parent_path().string();
+
+      std::stringstream compiled;
+      try {
+        Tree document;
+        pt::read_xml(canonical, document, pt::xml_parser::no_comments | pt::xml_parser::trim_whitespace);
+
+        // Address tables shared by several connections are compiled once
+        std::map<std::string, std::string> compiled_tables;
+        for (auto& entry : document.get_child("connections")) {
+          if (entry.first != "connection")
+            continue;
+          auto address_table = entry.second.get_optional<std::string>(kAttributes + ".address_table");
+          if (!address_table)
+            continue;
+          auto& compiled_table = compiled_tables[*address_table];
+          if (compiled_table.empty())
+            compiled_table = compile(resolve_path(*address_table, directory));
+          entry.second.put(kAttributes + ".address_table", kFilePrefix + compiled_table);
+        }
+
+        pt::write_xml(compiled, document, pt::xml_writer_make_settings<std::string>(' ', 2));
+      } catch (const pt::ptree_error& e) {
+        throw AddressTableCacheError(ERS_HERE, canonical, e.what());
+      }
+
+      std::vector<std::pair<std::string, std::string>> content(1, std::make_pair(canonical, compiled.str()));
+      std::stringstream compiled_name;
+      compiled_name << "connections-" << std::hex << hash_content(content) << std::dec << "-v" << kFormatVersion << ".xml";
+      auto compiled_path = (fs::path(get_cache_directory()) / compiled_name.str()).string();
+      if (!fs::exists(compiled_path))
+        write_file(compiled_path, compiled.str());
+
+      compiled_connections.push_back(kFilePrefix + compiled_path);
+    }
+  }
+
+  return join(compiled_connections, ";");
+}
+//-----------------------------------------------------------------------------
+
+} // namespace timing
+} // namespace dunedaq
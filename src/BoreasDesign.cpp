@@ -62,19 +62,11 @@ BoreasDesign::configure() const
 
 //-----------------------------------------------------------------------------
 void
-BoreasDesign::get_info(opmonlib::InfoCollector& ci, int level) const
-{ 
-  opmonlib::InfoCollector master_collector;
-  get_master_node().get_info(master_collector, level);
-  ci.add("master", master_collector);
-
-  opmonlib::InfoCollector hardware_collector;
-  get_io_node_plain()->get_info(hardware_collector, level);
-  ci.add("io", hardware_collector);
-
-  opmonlib::InfoCollector hsi_collector;
-  get_hsi_node().get_info(hsi_collector, level);
-  ci.add("hsi", hsi_collector);
+BoreasDesign::add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const
+{
+  get_master_node().add_to_monitoring_plan(plan, MonitoringPlan::extend(path, "master"), level);
+  get_io_node_plain()->add_to_monitoring_plan(plan, MonitoringPlan::extend(path, "io"), level);
+  get_hsi_node().add_to_monitoring_plan(plan, MonitoringPlan::extend(path, "hsi"), level);
 }
 //-----------------------------------------------------------------------------
 } // namespace dunedaq::timing
\ No newline at end of file
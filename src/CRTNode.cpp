@@ -34,7 +34,8 @@ CRTNode::enable(uint32_t partition, uint32_t /*address*/) const // NOLINT(build/
 {
   getNode("csr.ctrl.tgrp").write(partition);
   getNode("pulse.ctrl.en").write(0x1);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 }
 //-----------------------------------------------------------------------------
 
@@ -46,7 +47,8 @@ CRTNode::enable(uint32_t partition, FixedLengthCommandType command) const // NOL
   getNode("csr.ctrl.tgrp").write(partition);
   getNode("pulse.ctrl.cmd").write(command);
   getNode("pulse.ctrl.en").write(0x1);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 }
 //-----------------------------------------------------------------------------
 
@@ -55,7 +57,8 @@ void
 CRTNode::disable() const
 {
   getNode("pulse.ctrl.en").write(0x0);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 }
 //-----------------------------------------------------------------------------
 
@@ -65,7 +68,8 @@ CRTNode::reset(uint32_t partition, uint32_t address) const // NOLINT(build/unsig
 {
   getNode("pulse.ctrl.en").write(0x0);
   enable(partition, address);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 }
 //-----------------------------------------------------------------------------
 
@@ -75,7 +79,8 @@ CRTNode::reset(uint32_t partition, FixedLengthCommandType command) const // NOLI
 {
   getNode("pulse.ctrl.en").write(0x0);
   enable(partition, command);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 }
 //-----------------------------------------------------------------------------
 
@@ -104,7 +109,7 @@ CRTNode::read_last_pulse_timestamp() const
 
   auto timestamp_reg_low = getNode("pulse.ts_l").read();
   auto timestamp_reg_high = getNode("pulse.ts_h").read();
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
 
   return ((uint64_t)timestamp_reg_high.value() << 32) + timestamp_reg_low.value(); // NOLINT(build/unsigned)
 }
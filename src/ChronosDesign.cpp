@@ -53,15 +53,10 @@ ChronosDesign::configure() const
 
 //-----------------------------------------------------------------------------
 void
-ChronosDesign::get_info(opmonlib::InfoCollector& ci, int level) const
-{  
-  opmonlib::InfoCollector hardware_collector;
-  get_io_node_plain()->get_info(hardware_collector, level);
-  ci.add("io", hardware_collector);
-
-  opmonlib::InfoCollector hsi_collector;
-  get_hsi_node().get_info(hsi_collector, level);
-  ci.add("hsi", hsi_collector);
+ChronosDesign::add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const
+{
+  get_io_node_plain()->add_to_monitoring_plan(plan, MonitoringPlan::extend(path, "io"), level);
+  get_hsi_node().add_to_monitoring_plan(plan, MonitoringPlan::extend(path, "hsi"), level);
 }
 //-----------------------------------------------------------------------------
 } // namespace dunedaq::timing
\ No newline at end of file
@@ -0,0 +1,515 @@
+/**
+ * @file ControlServer.cpp
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#include "timing/ControlServer.hpp"
+
+#include "timing/RegisterSnapshotCache.hpp"
+
+#include "logging/Logging.hpp"
+#include "opmonlib/InfoCollector.hpp"
+
+#include <boost/core/demangle.hpp>
+
+#include <fcntl.h>
+#include <poll.h>
+#include <sys/socket.h>
+#include <sys/stat.h>
+#include <sys/un.h>
+#include <unistd.h>
+
+#include <cerrno>
+#include <cstdlib>
+#include <cstring>
+#include <sstream>
+#include <string>
+#include <typeinfo>
+#include <utility>
+#include <vector>
+
+namespace dunedaq {
+namespace timing {
+
+const int ControlServer::kProtocolVersion = 1;
+const size_t ControlServer::kMaxRequestSize = 16 * 1024 * 1024;
+
+//-----------------------------------------------------------------------------
+ControlServer::ControlServer(const std::string& connections, const std::string& socket_path)
+  : m_socket_path(socket_path)
+  , m_timeout(0)
+  , m_sample_frequencies(false)
+  , m_start_time(std::chrono::steady_clock::now())
+  , m_connection_manager(connections)
+  , m_listen_fd(-1)
+  , m_stop_requested(false)
+{
+  if (::pipe2(m_wake_fds, O_CLOEXEC | O_NONBLOCK) < 0)
+    throw ControlSocketError(ERS_HERE, m_socket_path, std::string("cannot create wake-up pipe, ") + std::strerror(errno));
+
+  register_methods();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+ControlServer::~ControlServer()
+{
+  close_socket();
+  ::close(m_wake_fds[0]);
+  ::close(m_wake_fds[1]);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::string
+ControlServer::get_default_socket_path()
+{
+  const char* socket_path = std::getenv("TIMING_GUARDIAN_SOCKET");
+  if (socket_path && std::strlen(socket_path))
+    return socket_path;
+
+  std::stringstream default_path;
+  default_path << "/tmp/pdtguardian-" << ::getuid() << ".sock";
+  return default_path.str();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+ControlServer::register_methods()
+{
+  m_methods["ping"] = [this](const nlohmann::json& /*params*/) {
+    nlohmann::json result;
+    result["protocol"] = kProtocolVersion;
+    result["uptime"] = std::chrono::duration<double>(std::chrono::steady_clock::now() - m_start_time).count();
+    {
+      std::lock_guard<std::mutex> lock(m_devices_mutex);
+      result["devices"] = nlohmann::json::array();
+      for (auto& device : m_devices)
+        result["devices"].push_back(device.first);
+    }
+    {
+      std::lock_guard<std::mutex> lock(m_clients_mutex);
+      result["clients"] = m_clients.size();
+    }
+    return result;
+  };
+
+  m_methods["list_devices"] = [this](const nlohmann::json& /*params*/) {
+    std::lock_guard<std::mutex> lock(m_devices_mutex);
+    return nlohmann::json(m_connection_manager.getDevices());
+  };
+
+  m_methods["open"] = [this](const nlohmann::json& params) {
+    auto device_id = params.at("device").get<std::string>();
+    open_device(device_id, params.value("monitoring_level", 0), params.value("sample_frequencies", false));
+
+    auto device = get_device(device_id);
+    std::lock_guard<std::mutex> lock(device->mutex);
+    auto design = dynamic_cast<const TopDesignInterface*>(&device->hw.getNode());
+    return design ? format_identity(design->get_hardware_identity()) : nlohmann::json();
+  };
+
+  m_methods["close"] = [this](const nlohmann::json& params) {
+    close_device(params.at("device").get<std::string>());
+    return nlohmann::json();
+  };
+
+  add_device_method("read", [](Device& device, const nlohmann::json& params) {
+    auto node_names = params.at("nodes").get<std::vector<std::string>>();
+
+    std::vector<uhal::ValWord<uint32_t>> values; // NOLINT(build/unsigned)
+    for (auto& node_name : node_names)
+      values.push_back(device.hw.getNode(node_name).read());
+    IPbusProfiler::dispatch(device.hw.getClient());
+
+    nlohmann::json result = nlohmann::json::object();
+    for (size_t i = 0; i < node_names.size(); ++i)
+      result[node_names.at(i)] = values.at(i).value();
+    return result;
+  });
+
+  add_device_method("write", [](Device& device, const nlohmann::json& params) {
+    for (auto& value : params.at("values").items())
+      device.hw.getNode(value.key()).write(value.value().get<uint32_t>()); // NOLINT(build/unsigned)
+    IPbusProfiler::dispatch(device.hw.getClient());
+    RegisterSnapshotCache::invalidate(device.hw.getNode());
+    return nlohmann::json();
+  });
+
+  add_device_method("read_block", [](Device& device, const nlohmann::json& params) {
+    auto block = device.hw.getNode(params.at("node").get<std::string>()).readBlock(params.at("size").get<uint32_t>()); // NOLINT(build/unsigned)
+    IPbusProfiler::dispatch(device.hw.getClient());
+    return nlohmann::json(std::vector<uint32_t>(block.begin(), block.end())); // NOLINT(build/unsigned)
+  });
+
+  // Reads, writes and block reads queued in order and sent in a single dispatch
+  add_device_method("batch", [](Device& device, const nlohmann::json& params) {
+    std::vector<std::function<nlohmann::json()>> fill_results;
+    bool written = false;
+    for (auto& operation : params.at("operations")) {
+      if (operation.contains("read")) {
+        auto value = device.hw.getNode(operation.at("read").get<std::string>()).read();
+        fill_results.push_back([value]() { return nlohmann::json(value.value()); });
+      } else if (operation.contains("read_block")) {
+        auto block = device.hw.getNode(operation.at("read_block").get<std::string>())
+                       .readBlock(operation.at("size").get<uint32_t>()); // NOLINT(build/unsigned)
+        fill_results.push_back(
+          [block]() { return nlohmann::json(std::vector<uint32_t>(block.begin(), block.end())); }); // NOLINT(build/unsigned)
+      } else if (operation.contains("write")) {
+        device.hw.getNode(operation.at("write").get<std::string>()).write(operation.at("value").get<uint32_t>()); // NOLINT(build/unsigned)
+        fill_results.push_back([]() { return nlohmann::json(); });
+        written = true;
+      } else {
+        throw InvalidControlRequest(ERS_HERE, "batch operations must be read, read_block or write: " + operation.dump());
+      }
+    }
+    IPbusProfiler::dispatch(device.hw.getClient());
+    if (written)
+      RegisterSnapshotCache::invalidate(device.hw.getNode());
+
+    nlohmann::json result = nlohmann::json::array();
+    for (auto& fill_result : fill_results)
+      result.push_back(fill_result());
+    return result;
+  });
+
+  add_device_method("identity", [](Device& device, const nlohmann::json& params) {
+    auto& design = get_top_design(device);
+    if (params.value("refresh", false))
+      design.invalidate_hardware_identity();
+    return format_identity(design.get_hardware_identity());
+  });
+
+  add_device_method("status", [](Device& device, const nlohmann::json& /*params*/) {
+    return nlohmann::json(get_top_design(device).get_status());
+  });
+
+  add_device_method("hardware_info", [](Device& device, const nlohmann::json& /*params*/) {
+    return nlohmann::json(get_top_design(device).get_hardware_info());
+  });
+
+  add_device_method("info", [](Device& device, const nlohmann::json& params) {
+    opmonlib::InfoCollector collector;
+    get_top_design(device).get_info(collector, params.value("level", 1));
+    return collector.get_collected_infos();
+  });
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+ControlServer::add_device_method(const std::string& name,
+                                 std::function<nlohmann::json(Device&, const nlohmann::json&)> method)
+{
+  m_methods[name] = [this, method](const nlohmann::json& params) {
+    auto device = get_device(params.at("device").get<std::string>());
+    std::lock_guard<std::mutex> lock(device->mutex);
+    return method(*device, params);
+  };
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::shared_ptr<ControlServer::Device>
+ControlServer::get_device(const std::string& id)
+{
+  std::lock_guard<std::mutex> lock(m_devices_mutex);
+
+  auto device = m_devices.find(id);
+  if (device != m_devices.end())
+    return device->second;
+
+  auto hw = m_connection_manager.getDevice(id);
+  if (m_timeout.count())
+    hw.setTimeoutPeriod(m_timeout.count());
+
+  TLOG() << "Opened " << id << " (" << hw.uri() << ")";
+  return m_devices.emplace(id, std::make_shared<Device>(hw)).first->second;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+ControlServer::close_device(const std::string& id)
+{
+  // Requests already holding the device finish with it
+  std::lock_guard<std::mutex> lock(m_devices_mutex);
+  if (m_devices.erase(id))
+    TLOG() << "Closed " << id;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+ControlServer::open_device(const std::string& id, int monitoring_level, bool sample_frequencies)
+{
+  auto device = get_device(id);
+  std::lock_guard<std::mutex> lock(device->mutex);
+
+  auto design = dynamic_cast<const TopDesignInterface*>(&device->hw.getNode());
+  if (!design)
+    return;
+
+  design->get_hardware_identity();
+
+  // Building the plan starts the background sampling of its slow data
+  if (monitoring_level > 0) {
+    opmonlib::InfoCollector collector;
+    design->get_info(collector, monitoring_level);
+  }
+
+  if (monitoring_level > 0 || sample_frequencies || m_sample_frequencies)
+    design->start_frequency_samplers();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+const TopDesignInterface&
+ControlServer::get_top_design(Device& device)
+{
+  auto design = dynamic_cast<const TopDesignInterface*>(&device.hw.getNode());
+  if (!design)
+    throw InvalidControlRequest(ERS_HERE, device.hw.id() + " is not a timing top design");
+  return *design;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+nlohmann::json
+ControlServer::format_identity(const HardwareIdentity& identity)
+{
+  nlohmann::json result;
+  result["board_type"] = identity.board_type;
+  result["carrier_type"] = identity.carrier_type;
+  result["design_type"] = identity.design_type;
+  result["firmware_frequency"] = identity.firmware_frequency;
+  result["board_uid"] = identity.board_uid_valid ? nlohmann::json(identity.board_uid) : nlohmann::json();
+  result["firmware_version"] =
+    identity.firmware_info_valid ? nlohmann::json(identity.firmware_version) : nlohmann::json();
+  result["generics"] = identity.generics;
+  return result;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+nlohmann::json
+ControlServer::handle_request(const nlohmann::json& request)
+{
+  nlohmann::json reply;
+  reply["id"] = request.is_object() ? request.value("id", nlohmann::json()) : nlohmann::json();
+
+  try {
+    if (!request.is_object() || !request.contains("method") || !request.at("method").is_string())
+      throw InvalidControlRequest(ERS_HERE, "requests must be objects with a method name");
+
+    auto method_name = request.at("method").get<std::string>();
+    auto method = m_methods.find(method_name);
+    if (method == m_methods.end())
+      throw InvalidControlRequest(ERS_HERE, "unknown method " + method_name);
+
+    reply["result"] = method->second(request.value("params", nlohmann::json::object()));
+  } catch (const ers::Issue& e) {
+    reply["error"] = { { "type", e.get_class_name() }, { "message", e.message() } };
+  } catch (const std::exception& e) {
+    reply["error"] = { { "type", boost::core::demangle(typeid(e).name()) }, { "message", e.what() } };
+  }
+  return reply;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+ControlServer::open_socket()
+{
+  sockaddr_un address;
+  std::memset(&address, 0, sizeof(address));
+  address.sun_family = AF_UNIX;
+  if (m_socket_path.size() >= sizeof(address.sun_path))
+    throw ControlSocketError(ERS_HERE, m_socket_path, "path too long");
+  std::strncpy(address.sun_path, m_socket_path.c_str(), sizeof(address.sun_path) - 1);
+
+  // A socket file left by a server that is gone is replaced, a live one is not
+  struct stat socket_stat;
+  if (::lstat(m_socket_path.c_str(), &socket_stat) == 0) {
+    if (!S_ISSOCK(socket_stat.st_mode))
+      throw ControlSocketError(ERS_HERE, m_socket_path, "exists and is not a socket");
+
+    int probe_fd = ::socket(AF_UNIX, SOCK_STREAM | SOCK_CLOEXEC, 0);
+    bool live = probe_fd >= 0 && ::connect(probe_fd, reinterpret_cast<sockaddr*>(&address), sizeof(address)) == 0;
+    if (probe_fd >= 0)
+      ::close(probe_fd);
+    if (live)
+      throw ControlSocketError(ERS_HERE, m_socket_path, "already served by another process");
+    ::unlink(m_socket_path.c_str());
+  }
+
+  m_listen_fd = ::socket(AF_UNIX, SOCK_STREAM | SOCK_CLOEXEC, 0);
+  if (m_listen_fd < 0)
+    throw ControlSocketError(ERS_HERE, m_socket_path, std::string("cannot create socket, ") + std::strerror(errno));
+
+  if (::bind(m_listen_fd, reinterpret_cast<sockaddr*>(&address), sizeof(address)) < 0 || ::listen(m_listen_fd, 16) < 0) {
+    std::string reason = std::strerror(errno);
+    ::close(m_listen_fd);
+    m_listen_fd = -1;
+    throw ControlSocketError(ERS_HERE, m_socket_path, "cannot listen, " + reason);
+  }
+
+  // Operators of the same group share the server
+  ::chmod(m_socket_path.c_str(), 0660);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+ControlServer::close_socket()
+{
+  if (m_listen_fd < 0)
+    return;
+
+  ::close(m_listen_fd);
+  m_listen_fd = -1;
+  ::unlink(m_socket_path.c_str());
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+ControlServer::run()
+{
+  open_socket();
+  TLOG() << "Serving timing devices on " << m_socket_path;
+
+  while (!m_stop_requested) {
+    pollfd fds[2] = { { m_listen_fd, POLLIN, 0 }, { m_wake_fds[0], POLLIN, 0 } };
+    // Wake up regularly to join the threads of the clients gone
+    int ready = ::poll(fds, 2, 1000);
+    if (ready < 0 && errno != EINTR)
+      throw ControlSocketError(ERS_HERE, m_socket_path, std::string("poll failed, ") + std::strerror(errno));
+
+    if (ready > 0 && (fds[0].revents & POLLIN)) {
+      int client_fd = ::accept4(m_listen_fd, nullptr, nullptr, SOCK_CLOEXEC);
+      if (client_fd >= 0) {
+        std::lock_guard<std::mutex> lock(m_clients_mutex);
+        m_clients.emplace_back(new Client());
+        auto& client = *m_clients.back();
+        client.fd = client_fd;
+        client.done = false;
+        client.thread = std::thread(&ControlServer::serve_client, this, std::ref(client));
+      }
+    }
+    reap_clients(false);
+  }
+
+  close_socket();
+  reap_clients(true);
+  m_stop_requested = false;
+
+  char wake;
+  while (::read(m_wake_fds[0], &wake, 1) > 0) {
+  }
+  TLOG() << "Stopped serving on " << m_socket_path;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+ControlServer::stop()
+{
+  m_stop_requested = true;
+  char wake = 0;
+  if (::write(m_wake_fds[1], &wake, 1) < 0) {
+    // the pipe is full: a wake-up is already pending
+  }
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+ControlServer::serve_client(Client& client)
+{
+  std::string buffer;
+  char chunk[4096];
+
+  while (true) {
+    ssize_t received = ::recv(client.fd, chunk, sizeof(chunk), 0);
+    if (received < 0 && errno == EINTR)
+      continue;
+    if (received <= 0)
+      break;
+    buffer.append(chunk, received);
+
+    size_t line_start = 0;
+    size_t line_end;
+    std::string replies;
+    while ((line_end = buffer.find('\n', line_start)) != std::string::npos) {
+      auto line = buffer.substr(line_start, line_end - line_start);
+      line_start = line_end + 1;
+      if (line.find_first_not_of(" \t\r") == std::string::npos)
+        continue;
+
+      nlohmann::json reply;
+      try {
+        reply = handle_request(nlohmann::json::parse(line));
+      } catch (const nlohmann::json::exception& e) {
+        reply = { { "id", nullptr }, { "error", { { "type", "ParseError" }, { "message", e.what() } } } };
+      }
+      replies += reply.dump() + "\n";
+    }
+    buffer.erase(0, line_start);
+
+    if (buffer.size() > kMaxRequestSize) {
+      nlohmann::json reply = { { "id", nullptr },
+                               { "error", { { "type", "RequestTooLarge" }, { "message", "request exceeds the size limit" } } } };
+      replies += reply.dump() + "\n";
+    }
+
+    // Replies of the complete requests received, sent at once
+    size_t sent = 0;
+    while (sent < replies.size()) {
+      ssize_t written = ::send(client.fd, replies.data() + sent, replies.size() - sent, MSG_NOSIGNAL);
+      if (written < 0 && errno == EINTR)
+        continue;
+      if (written <= 0)
+        break;
+      sent += written;
+    }
+    if (sent < replies.size() || buffer.size() > kMaxRequestSize)
+      break;
+  }
+
+  client.done = true;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+ControlServer::reap_clients(bool all)
+{
+  std::vector<std::unique_ptr<Client>> gone;
+  {
+    std::lock_guard<std::mutex> lock(m_clients_mutex);
+    for (auto client = m_clients.begin(); client != m_clients.end();) {
+      if (all || (*client)->done) {
+        // Unblock the client thread if still receiving
+        ::shutdown((*client)->fd, SHUT_RDWR);
+        gone.push_back(std::move(*client));
+        client = m_clients.erase(client);
+      } else {
+        ++client;
+      }
+    }
+  }
+
+  for (auto& client : gone) {
+    client->thread.join();
+    ::close(client->fd);
+  }
+}
+//-----------------------------------------------------------------------------
+
+} // namespace timing
+} // namespace dunedaq
@@ -10,13 +10,18 @@
 
 #include "logging/Logging.hpp"
 
+#include <chrono>
 #include <string>
+#include <vector>
 
 namespace dunedaq {
 namespace timing {
 
 UHAL_REGISTER_DERIVED_NODE(EchoMonitorNode)
 
+const std::chrono::microseconds EchoMonitorNode::kEchoFirstInterval(20);
+const std::chrono::microseconds EchoMonitorNode::kEchoMaxInterval(20000);
+
 //-----------------------------------------------------------------------------
 EchoMonitorNode::EchoMonitorNode(const uhal::Node& node)
   : TimingNode(node)
@@ -46,44 +51,25 @@ EchoMonitorNode::send_echo_and_measure_delay(int64_t timeout) const
 {
 
   getNode("csr.ctrl.go").write(0x1);
-  getClient().dispatch();
-
-  auto start = std::chrono::high_resolution_clock::now();
-
-  std::chrono::milliseconds ms_since_start(0);
-
-  uhal::ValWord<uint32_t> done; // NOLINT(build/unsigned)
-
-  while (ms_since_start.count() < timeout) {
-
-    auto now = std::chrono::high_resolution_clock::now();
-    ms_since_start = std::chrono::duration_cast<std::chrono::milliseconds>(now - start);
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 
-    millisleep(100);
+  // the timestamps come with the status, a prompt echo takes a single poll
+  auto result = wait_for({ "csr.stat.rx_done", "csr.rx_l", "csr.rx_h", "csr.tx_l", "csr.tx_h" },
+                         [](const std::vector<uint32_t>& values) { // NOLINT(build/unsigned)
+                           return values.at(0) != 0;
+                         },
+                         WaitSchedule(kEchoFirstInterval, kEchoMaxInterval, std::chrono::milliseconds(timeout)),
+                         "EchoMonitorNode::send_echo_and_measure_delay");
 
-    done = getNode("csr.stat.rx_done").read();
-    getClient().dispatch();
+  TLOG_DEBUG(0) << "rx done: " << std::hex << result.values.at(0) << std::dec << " after " << result.polls << " polls";
 
-    TLOG_DEBUG(0) << "rx done: " << std::hex << done.value();
-
-    if (done.value())
-      break;
-  }
-
-  if (!done.value()) {
+  if (!result.satisfied) {
     throw EchoTimeout(ERS_HERE, timeout);
   }
 
-  auto time_rx_l = getNode("csr.rx_l").read();
-  auto time_rx_h = getNode("csr.rx_h").read();
-
-  auto time_tx_l = getNode("csr.tx_l").read();
-  auto time_tx_h = getNode("csr.tx_h").read();
-
-  getClient().dispatch();
-
-  uint64_t time_rx = ((uint64_t)time_rx_h.value() << 32) + time_rx_l.value(); // NOLINT(build/unsigned)
-  uint64_t time_tx = ((uint64_t)time_tx_h.value() << 32) + time_tx_l.value(); // NOLINT(build/unsigned)
+  uint64_t time_rx = ((uint64_t)result.values.at(2) << 32) + result.values.at(1); // NOLINT(build/unsigned)
+  uint64_t time_tx = ((uint64_t)result.values.at(4) << 32) + result.values.at(3); // NOLINT(build/unsigned)
 
   TLOG_DEBUG(0) << "tx ts: " << format_reg_value(time_tx);
   TLOG_DEBUG(0) << "rx ts: " << format_reg_value(time_rx);
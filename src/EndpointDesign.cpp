@@ -57,15 +57,10 @@ EndpointDesign::configure() const
 
 //-----------------------------------------------------------------------------
 void
-EndpointDesign::get_info(opmonlib::InfoCollector& ci, int level) const
-{ 
-  opmonlib::InfoCollector endpoint_collector;
-  get_endpoint_node(0).get_info(endpoint_collector, level);
-  ci.add("endpoint", endpoint_collector);
-
-  opmonlib::InfoCollector hardware_collector;
-  get_io_node_plain()->get_info(hardware_collector, level);
-  ci.add("io", hardware_collector);
+EndpointDesign::add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const
+{
+  get_endpoint_node(0).add_to_monitoring_plan(plan, MonitoringPlan::extend(path, "endpoint"), level);
+  get_io_node_plain()->add_to_monitoring_plan(plan, MonitoringPlan::extend(path, "io"), level);
 }
 //-----------------------------------------------------------------------------
 
@@ -81,7 +76,7 @@ EndpointDesign::read_firmware_version() const
 void
 EndpointDesign::validate_firmware_version() const
 {
-  auto firmware_version = read_firmware_version();
+  auto firmware_version = get_hardware_identity().firmware_version;
   
   int major_firmware_version = (firmware_version >> 16) & 0xff;
   int minor_firmware_version = (firmware_version >> 8) & 0xff;
@@ -95,4 +90,13 @@ EndpointDesign::validate_firmware_version() const
     ers::warning(IncompatiblePatchEndpointFirmwareVersion(ERS_HERE, patch_firmware_version, g_required_patch_endpoint_firmware_version));
 }
 //-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::function<void()>
+EndpointDesign::queue_firmware_identity(HardwareIdentity& identity) const
+{
+  auto firmware_version = get_endpoint_node(0).getNode("version").read();
+  return [&identity, firmware_version]() { identity.firmware_version = firmware_version.value(); };
+}
+//-----------------------------------------------------------------------------
 } // namespace dunedaq::timing  
@@ -33,6 +33,8 @@ EndpointNode::~EndpointNode() {}
 void
 EndpointNode::enable(uint32_t partition, uint32_t address) const // NOLINT(build/unsigned)
 {
+  IPbusProfiler::Scope scope("EndpointNode::enable");
+
   getNode("csr.ctrl.tgrp").write(partition);
 
   if (address) {
@@ -46,7 +48,8 @@ EndpointNode::enable(uint32_t partition, uint32_t address) const // NOLINT(build
   getNode("csr.ctrl.ctr_rst").write(0x0);
   getNode("csr.ctrl.ep_en").write(0x1);
   getNode("csr.ctrl.buf_en").write(0x1);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 }
 //-----------------------------------------------------------------------------
 
@@ -54,9 +57,12 @@ EndpointNode::enable(uint32_t partition, uint32_t address) const // NOLINT(build
 void
 EndpointNode::disable() const
 {
+  IPbusProfiler::Scope scope("EndpointNode::disable");
+
   getNode("csr.ctrl.ep_en").write(0x0);
   getNode("csr.ctrl.buf_en").write(0x0);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 }
 //-----------------------------------------------------------------------------
 
@@ -64,6 +70,7 @@ EndpointNode::disable() const
 void
 EndpointNode::reset(uint32_t partition, uint32_t address) const // NOLINT(build/unsigned)
 {
+  IPbusProfiler::Scope scope("EndpointNode::reset");
 
   getNode("csr.ctrl.ep_en").write(0x0);
   getNode("csr.ctrl.buf_en").write(0x0);
@@ -76,6 +83,7 @@ EndpointNode::reset(uint32_t partition, uint32_t address) const // NOLINT(build/
 std::string
 EndpointNode::get_status(bool print_out) const
 {
+  IPbusProfiler::Scope scope("EndpointNode::get_status");
 
   std::stringstream status;
 
@@ -87,7 +95,7 @@ EndpointNode::get_status(bool print_out) const
   auto ept_control = read_sub_nodes(getNode("csr.ctrl"), false);
   auto ept_state = read_sub_nodes(getNode("csr.stat"), false);
   auto ept_counters = getNode("ctrs").readBlock(g_command_number);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
 
   ept_summary.push_back(std::make_pair("State", g_endpoint_state_map.at(ept_state.find("ep_stat")->second.value())));
   ept_summary.push_back(std::make_pair("Partition", std::to_string(ept_control.find("tgrp")->second.value())));
@@ -131,7 +139,7 @@ uint64_t // NOLINT(build/unsigned)
 EndpointNode::read_timestamp() const
 {
   auto timestamp = getNode("tstamp").readBlock(2);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
   return tstamp2int(timestamp);
 }
 //-----------------------------------------------------------------------------
@@ -141,7 +149,7 @@ uint32_t // NOLINT(build/unsigned)
 EndpointNode::read_buffer_count() const
 {
   auto buffer_count = getNode("buf.count").read();
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
   return buffer_count.value();
 }
 //-----------------------------------------------------------------------------
@@ -150,9 +158,10 @@ EndpointNode::read_buffer_count() const
 uhal::ValVector<uint32_t> // NOLINT(build/unsigned)
 EndpointNode::read_data_buffer(bool read_all) const
 {
+  IPbusProfiler::Scope scope("EndpointNode::read_data_buffer");
 
   auto buffer_count = getNode("buf.count").read();
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
 
   TLOG_DEBUG(0) << "Words available in readout buffer:      " << format_reg_value(buffer_count);
 
@@ -169,7 +178,8 @@ EndpointNode::read_data_buffer(bool read_all) const
   }
 
   auto buffer_data = getNode("buf.data").readBlock(words_to_read);
-  getClient().dispatch();
+  IPbusProfiler::count_words(words_to_read, 0);
+  IPbusProfiler::dispatch(getClient());
 
   return buffer_data;
 }
@@ -202,71 +212,110 @@ EndpointNode::get_data_buffer_table(bool read_all, bool print_out) const
 //-----------------------------------------------------------------------------
 double
 EndpointNode::read_clock_frequency() const
+{
+  std::vector<double> frequencies = getNode<FrequencyCounterNode>("freq").read_frequencies(1);
+  return frequencies.at(0);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+double
+EndpointNode::measure_clock_frequency() const
 {
   std::vector<double> frequencies = getNode<FrequencyCounterNode>("freq").measure_frequencies(1);
   return frequencies.at(0);
 }
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+void
+EndpointNode::start_clock_frequency_sampler() const
+{
+  getNode<FrequencyCounterNode>("freq").start_sampler(1);
+}
+//-----------------------------------------------------------------------------
+
 //-----------------------------------------------------------------------------
 uint32_t // NOLINT(build/unsigned)
 EndpointNode::read_version() const
 {
   auto buffer_version = getNode("version").read();
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
   return buffer_version.value();
 }
 //-----------------------------------------------------------------------------
 
 //-----------------------------------------------------------------------------
-void
-EndpointNode::get_info(timingendpointinfo::TimingEndpointInfo& mon_data) const
+std::function<void()>
+EndpointNode::queue_info(timingendpointinfo::TimingEndpointInfo& mon_data) const
 {
-
   auto timestamp = getNode("tstamp").readBlock(2);
   auto event_counter = getNode("evtctr").read();
   auto buffer_count = getNode("buf.count").read();
   auto endpoint_control = read_sub_nodes(getNode("csr.ctrl"), false);
   auto endpoint_state = read_sub_nodes(getNode("csr.stat"), false);
-  getClient().dispatch();
-
-  mon_data.state = endpoint_state.at("ep_stat").value();
-  mon_data.ready = endpoint_state.at("ep_rdy").value();
-  mon_data.partition = endpoint_control.at("tgrp").value();
-  mon_data.address = endpoint_control.at("addr").value();
-  mon_data.timestamp = tstamp2int(timestamp);
-  mon_data.in_run = endpoint_state.at("in_run").value();
-  mon_data.in_spill = endpoint_state.at("in_spill").value();
-  mon_data.buffer_warning = endpoint_state.at("buf_warn").value();
-  mon_data.buffer_error = endpoint_state.at("buf_err").value();
-  mon_data.buffer_occupancy = buffer_count.value();
-  mon_data.event_counter = event_counter.value();
-  mon_data.reset_out = endpoint_state.at("ep_rsto").value();
-  mon_data.sfp_tx_disable = endpoint_state.at("sfp_tx_dis").value();
-  mon_data.coarse_delay = endpoint_state.at("cdelay").value();
-  mon_data.fine_delay = endpoint_state.at("fdelay").value();
+
+  return [&mon_data, timestamp, event_counter, buffer_count, endpoint_control, endpoint_state]() {
+    mon_data.state = endpoint_state.at("ep_stat").value();
+    mon_data.ready = endpoint_state.at("ep_rdy").value();
+    mon_data.partition = endpoint_control.at("tgrp").value();
+    mon_data.address = endpoint_control.at("addr").value();
+    mon_data.timestamp = tstamp2int(timestamp);
+    mon_data.in_run = endpoint_state.at("in_run").value();
+    mon_data.in_spill = endpoint_state.at("in_spill").value();
+    mon_data.buffer_warning = endpoint_state.at("buf_warn").value();
+    mon_data.buffer_error = endpoint_state.at("buf_err").value();
+    mon_data.buffer_occupancy = buffer_count.value();
+    mon_data.event_counter = event_counter.value();
+    mon_data.reset_out = endpoint_state.at("ep_rsto").value();
+    mon_data.sfp_tx_disable = endpoint_state.at("sfp_tx_dis").value();
+    mon_data.coarse_delay = endpoint_state.at("cdelay").value();
+    mon_data.fine_delay = endpoint_state.at("fdelay").value();
+  };
 }
 //-----------------------------------------------------------------------------
 
 //-----------------------------------------------------------------------------
 void
-EndpointNode::get_info(opmonlib::InfoCollector& ci, int /*level*/) const
+EndpointNode::get_info(timingendpointinfo::TimingEndpointInfo& mon_data) const
 {
-  timingendpointinfo::TimingEndpointInfo mon_data;
-  this->get_info(mon_data);
-  ci.add(mon_data);
+  auto fill = queue_info(mon_data);
+  IPbusProfiler::dispatch(getClient());
+  fill();
+}
+//-----------------------------------------------------------------------------
 
-  nlohmann::json cmd_data;
-  timingendpointinfo::TimingFLCmdCounters received_fl_commands_counters;
-  
-  auto counters = getNode("ctrs").readBlock(g_command_number);
-  getClient().dispatch();
-  
-  for (auto& cmd:  g_command_map) {
-    cmd_data[cmd.second] = counters.at(cmd.first);
-  }
-  timingendpointinfo::from_json(cmd_data, received_fl_commands_counters);
-  ci.add(received_fl_commands_counters);
+//-----------------------------------------------------------------------------
+void
+EndpointNode::get_info(opmonlib::InfoCollector& ci, int level) const
+{
+  MonitoringPlan plan(*this);
+  add_to_monitoring_plan(plan, {}, level);
+  plan.collect(ci);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+EndpointNode::add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int /*level*/) const
+{
+  plan.add_data<timingendpointinfo::TimingEndpointInfo>(
+    path, [this](timingendpointinfo::TimingEndpointInfo& mon_data) { return queue_info(mon_data); });
+
+  plan.add_reads(path, [this]() -> MonitoringPlan::FillFunction {
+    auto counters = getNode("ctrs").readBlock(g_command_number);
+
+    return [counters](opmonlib::InfoCollector& ci) {
+      nlohmann::json cmd_data;
+      timingendpointinfo::TimingFLCmdCounters received_fl_commands_counters;
+
+      for (auto& cmd:  g_command_map) {
+        cmd_data[cmd.second] = counters.at(cmd.first);
+      }
+      timingendpointinfo::from_json(cmd_data, received_fl_commands_counters);
+      ci.add(received_fl_commands_counters);
+    };
+  });
 }
 //-----------------------------------------------------------------------------
 
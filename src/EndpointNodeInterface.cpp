@@ -30,7 +30,7 @@ bool
 EndpointNodeInterface::endpoint_ready() const
 {
   auto ready_flag = getNode("csr.stat.ep_rdy").read();
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
   return ready_flag.value();
 }
 //-----------------------------------------------------------------------------
@@ -40,7 +40,7 @@ uint32_t
 EndpointNodeInterface::read_endpoint_state() const
 {
   auto endpoint_state = getNode("csr.stat.ep_stat").read();
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
   return endpoint_state.value();
 }
 //-----------------------------------------------------------------------------
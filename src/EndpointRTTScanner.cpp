@@ -0,0 +1,321 @@
+/**
+ * @file EndpointRTTScanner.cpp
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#include "timing/EndpointRTTScanner.hpp"
+
+#include "timing/MasterDesignInterface.hpp"
+#include "timing/MuxDesignInterface.hpp"
+#include "timing/TimingIssues.hpp"
+#include "timing/toolbox.hpp"
+
+#include "logging/Logging.hpp"
+
+#include <algorithm>
+#include <iomanip>
+#include <sstream>
+#include <string>
+#include <utility>
+#include <vector>
+
+namespace dunedaq {
+namespace timing {
+
+namespace {
+
+double
+seconds_since(const std::chrono::steady_clock::time_point& start)
+{
+  return std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+}
+
+} // namespace
+
+//-----------------------------------------------------------------------------
+EndpointRTTScanner::EndpointRTTScanner(const MasterDesignInterface& design, const EndpointRTTScanConfig& config)
+  : m_design(design)
+  , m_mux_design(dynamic_cast<const MuxDesignInterface*>(&design))
+  , m_config(config)
+  , m_global(design.get_master_node_plain()->getNode<GlobalNode>("global"))
+  , m_echo(design.get_master_node_plain()->getNode<EchoMonitorNode>("echo"))
+{}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+EndpointRTTScanner::~EndpointRTTScanner() {}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::vector<EndpointRTTTarget>
+EndpointRTTScanner::order_targets(const std::vector<EndpointRTTTarget>& targets, int active_sfp_mux)
+{
+  std::vector<EndpointRTTTarget> ordered(targets);
+
+  // targets without mux channel first, as they do not care which channel is selected,
+  // then the active channel, then the others in increasing order
+  auto rank = [active_sfp_mux](const EndpointRTTTarget& target) {
+    if (target.sfp_mux < 0)
+      return -2;
+    if (target.sfp_mux == active_sfp_mux)
+      return -1;
+    return target.sfp_mux;
+  };
+  std::stable_sort(ordered.begin(), ordered.end(), [&rank](const EndpointRTTTarget& a, const EndpointRTTTarget& b) {
+    return rank(a) < rank(b);
+  });
+  return ordered;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+EndpointRTTScanReport
+EndpointRTTScanner::scan(const std::vector<EndpointRTTTarget>& targets) const
+{
+  IPbusProfiler::Scope scope("EndpointRTTScanner::scan");
+
+  const auto scan_start = std::chrono::steady_clock::now();
+
+  EndpointRTTScanReport report = EndpointRTTScanReport();
+  report.measurements.reserve(targets.size());
+
+  int active_sfp_mux = -1;
+  if (m_mux_design)
+    active_sfp_mux = m_mux_design->read_active_sfp_mux_channel();
+
+  // endpoints are switched off one by one after their measurement, all of them once here
+  if (m_config.control_sfp)
+    m_design.get_master_node_plain()->switch_endpoint_sfp(0x0, false);
+
+  for (auto& target : order_targets(targets, active_sfp_mux)) {
+    const auto endpoint_start = std::chrono::steady_clock::now();
+
+    EndpointRTTMeasurement measurement = EndpointRTTMeasurement();
+    measurement.address = target.address;
+    measurement.sfp_mux = target.sfp_mux;
+
+    try {
+      if (m_mux_design && target.sfp_mux >= 0 && target.sfp_mux != active_sfp_mux) {
+        // the upstream endpoint lock is waited for by the measurement
+        m_mux_design->switch_sfp_mux_channel(target.sfp_mux, false);
+        active_sfp_mux = target.sfp_mux;
+        ++report.mux_switches;
+      }
+      measure(target, measurement);
+    } catch (const std::exception& e) {
+      measurement.success = false;
+      measurement.error = e.what();
+    }
+    measurement.total_time = seconds_since(endpoint_start);
+
+    if (!measurement.success) {
+      TLOG() << "Endpoint 0x" << std::hex << target.address << std::dec << " (mux: " << target.sfp_mux
+             << ") RTT measurement failed after " << measurement.attempts << " attempt(s): " << measurement.error;
+    }
+    report.measurements.push_back(measurement);
+  }
+
+  double total_rtt = 0;
+  double total_lock_time = 0;
+  double total_echo_time = 0;
+  double total_endpoint_time = 0;
+  for (auto& measurement : report.measurements) {
+    if (measurement.attempts > 1)
+      report.retries += measurement.attempts - 1;
+
+    total_endpoint_time += measurement.total_time;
+    report.max_endpoint_time = std::max(report.max_endpoint_time, measurement.total_time);
+
+    if (!measurement.success) {
+      ++report.failed;
+      continue;
+    }
+
+    report.min_rtt = report.succeeded ? std::min(report.min_rtt, measurement.rtt) : measurement.rtt;
+    report.max_rtt = std::max(report.max_rtt, measurement.rtt);
+    ++report.succeeded;
+
+    total_rtt += measurement.rtt;
+    total_lock_time += measurement.lock_time;
+    total_echo_time += measurement.echo_time;
+    report.max_lock_time = std::max(report.max_lock_time, measurement.lock_time);
+    report.max_echo_time = std::max(report.max_echo_time, measurement.echo_time);
+  }
+
+  if (report.succeeded) {
+    report.mean_rtt = total_rtt / report.succeeded;
+    report.mean_lock_time = total_lock_time / report.succeeded;
+    report.mean_echo_time = total_echo_time / report.succeeded;
+  }
+  if (!report.measurements.empty())
+    report.mean_endpoint_time = total_endpoint_time / report.measurements.size();
+
+  report.elapsed = seconds_since(scan_start);
+  return report;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+EndpointRTTScanner::measure(const EndpointRTTTarget& target, EndpointRTTMeasurement& measurement) const
+{
+  const MasterNode* master = m_design.get_master_node_plain();
+
+  if (m_config.control_sfp)
+    master->switch_endpoint_sfp(target.address, true);
+
+  const uint32_t max_attempts = std::max<uint32_t>(m_config.max_attempts, 1); // NOLINT(build/unsigned)
+  while (measurement.attempts < max_attempts) {
+    ++measurement.attempts;
+    measurement.lock_polls = 0;
+    measurement.echo_polls = 0;
+    measurement.lock_time = 0;
+    measurement.echo_time = 0;
+    try {
+      wait_for_lock(measurement);
+      send_echo(measurement);
+      measurement.success = true;
+      measurement.error.clear();
+      break;
+    } catch (const std::exception& e) {
+      measurement.error = e.what();
+      TLOG_DEBUG(1) << "Endpoint 0x" << std::hex << target.address << std::dec << " attempt " << measurement.attempts
+                    << " failed: " << e.what();
+    }
+  }
+
+  if (m_config.control_sfp)
+    master->switch_endpoint_sfp(target.address, false);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+EndpointRTTScanner::wait_for_lock(EndpointRTTMeasurement& measurement) const
+{
+  const auto start = std::chrono::steady_clock::now();
+
+  m_global.getNode("csr.ctrl.ep_en").write(0x0);
+  IPbusProfiler::dispatch(m_global.getClient());
+  m_global.getNode("csr.ctrl.ep_en").write(0x1);
+  IPbusProfiler::dispatch(m_global.getClient());
+  m_global.invalidate_snapshots();
+
+  auto result = m_global.wait_for({ "csr.stat.ep_stat", "csr.stat.ep_rdy" },
+                                  [](const std::vector<uint32_t>& values) { // NOLINT(build/unsigned)
+                                    return values.at(1) && values.at(0) == 0x8;
+                                  },
+                                  WaitSchedule(m_config.first_poll_interval,
+                                               m_config.max_poll_interval,
+                                               m_config.lock_timeout),
+                                  "EndpointRTTScanner::wait_for_lock");
+  measurement.lock_polls = result.polls;
+  measurement.lock_time = seconds_since(start);
+
+  if (!result.satisfied) {
+    throw EndpointNotReady(ERS_HERE, "Master upstream", result.values.at(0));
+  }
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+EndpointRTTScanner::send_echo(EndpointRTTMeasurement& measurement) const
+{
+  const auto start = std::chrono::steady_clock::now();
+
+  m_echo.getNode("csr.ctrl.go").write(0x1);
+  IPbusProfiler::dispatch(m_echo.getClient());
+  m_echo.invalidate_snapshots();
+
+  // the timestamps come with the status, a prompt echo takes a single poll
+  auto result = m_echo.wait_for({ "csr.stat.rx_done", "csr.rx_l", "csr.rx_h", "csr.tx_l", "csr.tx_h" },
+                                [](const std::vector<uint32_t>& values) { // NOLINT(build/unsigned)
+                                  return values.at(0) != 0;
+                                },
+                                WaitSchedule(m_config.first_poll_interval,
+                                             m_config.max_poll_interval,
+                                             m_config.echo_timeout),
+                                "EndpointRTTScanner::send_echo");
+  measurement.echo_polls = result.polls;
+  measurement.echo_time = seconds_since(start);
+
+  if (!result.satisfied) {
+    throw EchoTimeout(ERS_HERE, m_config.echo_timeout.count());
+  }
+
+  uint64_t time_rx = ((uint64_t)result.values.at(2) << 32) + result.values.at(1); // NOLINT(build/unsigned)
+  uint64_t time_tx = ((uint64_t)result.values.at(4) << 32) + result.values.at(3); // NOLINT(build/unsigned)
+  measurement.rtt = time_rx - time_tx;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::string
+EndpointRTTScanner::format_report(const EndpointRTTScanReport& report, bool print_out)
+{
+  std::stringstream table;
+
+  std::vector<std::pair<std::string, std::string>> endpoints;
+  for (auto& measurement : report.measurements) {
+    std::stringstream endpoint;
+    endpoint << format_reg_value(measurement.address);
+    if (measurement.sfp_mux >= 0)
+      endpoint << " (mux " << measurement.sfp_mux << ")";
+
+    std::stringstream result;
+    if (measurement.success)
+      result << "RTT " << measurement.rtt;
+    else
+      result << "failed";
+    result << ", attempts " << measurement.attempts << ", polls " << measurement.lock_polls << "/"
+           << measurement.echo_polls << ", " << std::fixed << std::setprecision(2) << measurement.total_time * 1e3
+           << " ms";
+    if (!measurement.success)
+      result << ": " << measurement.error;
+    endpoints.push_back(std::make_pair(endpoint.str(), result.str()));
+  }
+  table << format_reg_table(endpoints, "Endpoint RTT", { "Endpoint", "Result" }) << std::endl;
+
+  std::vector<std::pair<std::string, std::string>> summary;
+  summary.push_back(std::make_pair("Endpoints", std::to_string(report.measurements.size())));
+  summary.push_back(std::make_pair("Succeeded", std::to_string(report.succeeded)));
+  summary.push_back(std::make_pair("Failed", std::to_string(report.failed)));
+  summary.push_back(std::make_pair("Retries", std::to_string(report.retries)));
+  summary.push_back(std::make_pair("Mux switches", std::to_string(report.mux_switches)));
+
+  std::stringstream figure;
+  if (report.succeeded) {
+    summary.push_back(std::make_pair("Min RTT", std::to_string(report.min_rtt)));
+    summary.push_back(std::make_pair("Max RTT", std::to_string(report.max_rtt)));
+    figure << std::fixed << std::setprecision(1) << report.mean_rtt;
+    summary.push_back(std::make_pair("Mean RTT", figure.str()));
+  }
+  figure.str("");
+  figure << std::fixed << std::setprecision(3) << report.elapsed;
+  summary.push_back(std::make_pair("Elapsed [s]", figure.str()));
+
+  const std::vector<std::pair<std::string, double>> times = {
+    { "Mean lock time [ms]", report.mean_lock_time },         { "Max lock time [ms]", report.max_lock_time },
+    { "Mean echo time [ms]", report.mean_echo_time },         { "Max echo time [ms]", report.max_echo_time },
+    { "Mean endpoint time [ms]", report.mean_endpoint_time }, { "Max endpoint time [ms]", report.max_endpoint_time }
+  };
+  for (auto& time : times) {
+    figure.str("");
+    figure << std::setprecision(2) << time.second * 1e3;
+    summary.push_back(std::make_pair(time.first, figure.str()));
+  }
+
+  table << format_reg_table(summary, "Endpoint RTT scan", { "", "" });
+
+  if (print_out)
+    TLOG() << table.str();
+  return table.str();
+}
+//-----------------------------------------------------------------------------
+
+} // namespace timing
+} // namespace dunedaq
@@ -65,7 +65,8 @@ FIBIONode::get_status(bool print_out) const {
 //-----------------------------------------------------------------------------
 void
 FIBIONode::reset(int32_t fanout_mode, const std::string& clock_config_file) const {
-	
+	IPbusProfiler::Scope scope("FIBIONode::reset");
+
 	// Soft reset
 	write_soft_reset_register();
 	
@@ -74,7 +75,8 @@ FIBIONode::reset(int32_t fanout_mode, const std::string& clock_config_file) cons
 	// Reset I2C
 	getNode("csr.ctrl.rstb_i2c").write(0x1);
 	getNode("csr.ctrl.rstb_i2c").write(0x0);
-	getClient().dispatch();
+	IPbusProfiler::dispatch(getClient());
+	invalidate_snapshots();
 
 	const CarrierType carrier_type = convert_value_to_carrier_type(read_carrier_type());
 
@@ -128,7 +130,8 @@ FIBIONode::reset(int32_t fanout_mode, const std::string& clock_config_file) cons
 	// Reset mmcm
   getNode("csr.ctrl.rst").write(0x1);
   getNode("csr.ctrl.rst").write(0x0);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 
   // TODO
 	//getNode("csr.ctrl.inmux").write(0);
@@ -157,7 +160,8 @@ void
 FIBIONode::switch_sfp_mux_channel(uint32_t sfp_id) const { // NOLINT(build/unsigned)
 	validate_sfp_id(sfp_id);
 	getNode("csr.ctrl.inmux").write(sfp_id);
-	getClient().dispatch();	
+	IPbusProfiler::dispatch(getClient());	
+	invalidate_snapshots();
 	TLOG_DEBUG(0) << "SFP input mux set to " << read_active_sfp_mux_channel();
 }
 //-----------------------------------------------------------------------------
@@ -167,7 +171,7 @@ FIBIONode::switch_sfp_mux_channel(uint32_t sfp_id) const { // NOLINT(build/unsig
 uint32_t // NOLINT(build/unsigned)
 FIBIONode::read_active_sfp_mux_channel() const {
 	auto active_sfp_mux_channel = getNode("csr.ctrl.inmux").read();
-	getClient().dispatch();
+	IPbusProfiler::dispatch(getClient());
 	return active_sfp_mux_channel.value();
 }
 //-----------------------------------------------------------------------------
@@ -205,6 +209,35 @@ FIBIONode::switch_sfp_soft_tx_control_bit(uint32_t sfp_id, bool turn_on) const {
 }
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+std::vector<SFPSweepResult>
+FIBIONode::sweep_sfps(bool skip_lost) const {
+	uint8_t sfp_los_flags = read_sfp_los_flags(); // NOLINT(build/unsigned)
+
+	std::vector<SFPSweepResult> results(8);
+	std::vector<std::string> sfp_i2c_buses;
+	std::vector<SFPSweepResult*> sfp_results;
+	for (uint32_t sfp_id = 0; sfp_id < results.size(); ++sfp_id) { // NOLINT(build/unsigned)
+		auto& result = results.at(sfp_id);
+		result.sfp_id = sfp_id;
+		result.label = "Fanout SFP " + std::to_string(sfp_id);
+		result.los = sfp_los_flags & (1UL << sfp_id);
+		result.read = false;
+		result.reachable = false;
+		result.ddm_valid = false;
+
+		if (result.los && skip_lost)
+			continue;
+
+		// on this board the 8 downstream sfps have their own i2c bus, read concurrently
+		sfp_i2c_buses.push_back("i2c_sfp" + std::to_string(sfp_id));
+		sfp_results.push_back(&result);
+	}
+	read_sfp_sweep_entries(sfp_i2c_buses, sfp_results);
+	return results;
+}
+//-----------------------------------------------------------------------------
+
 
 //-----------------------------------------------------------------------------
 void
@@ -55,10 +55,12 @@ FLCmdGeneratorNode::send_fl_cmd(FixedLengthCommandType command,
   getNode("chan_ctrl.force").write(0x1);
   auto timestamp = timestamp_gen_node.read_raw_timestamp(false);
 
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 
   getNode("chan_ctrl.force").write(0x0);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
   TLOG() << "Command sent " << g_command_map.at(command) << "(" << format_reg_value(command) << ") from generator "
          << format_reg_value(channel) << " @time " << std::hex << std::showbase << tstamp2int(timestamp);
 }
@@ -80,7 +82,8 @@ FLCmdGeneratorNode::enable_fake_trigger(uint32_t channel,  // NOLINT(build/unsig
   getNode("chan_ctrl.rate_div_p").write(prescale);
   getNode("chan_ctrl.patt").write(poisson);
   getNode("chan_ctrl.en").write(1); // Start the command stream
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 }
 //-----------------------------------------------------------------------------
 
@@ -102,7 +105,7 @@ FLCmdGeneratorNode::get_cmd_counters_table(bool print_out) const
   std::stringstream counters_table;
   auto accepted_counters = getNode("actrs").readBlock(getNode("actrs").getSize());
   auto rejected_counters = getNode("rctrs").readBlock(getNode("actrs").getSize());
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
 
   std::vector<uhal::ValVector<uint32_t>> counters_container = { accepted_counters, rejected_counters }; // NOLINT(build/unsigned)
 
@@ -120,27 +123,40 @@ FLCmdGeneratorNode::get_cmd_counters_table(bool print_out) const
 
 //-----------------------------------------------------------------------------
 void
-FLCmdGeneratorNode::get_info(opmonlib::InfoCollector& ic, int /*level*/) const
+FLCmdGeneratorNode::get_info(opmonlib::InfoCollector& ic, int level) const
 {
-  auto accepted_counters = getNode("actrs").readBlock(getNode("actrs").getSize());
-  auto rejected_counters = getNode("rctrs").readBlock(getNode("actrs").getSize());
-  getClient().dispatch();
+  MonitoringPlan plan(*this);
+  add_to_monitoring_plan(plan, {}, level);
+  plan.collect(ic);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+FLCmdGeneratorNode::add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int /*level*/) const
+{
+  plan.add_reads(path, [this]() -> MonitoringPlan::FillFunction {
+    auto accepted_counters = getNode("actrs").readBlock(getNode("actrs").getSize());
+    auto rejected_counters = getNode("rctrs").readBlock(getNode("actrs").getSize());
 
-  uint number_of_channels = 5;
+    return [accepted_counters, rejected_counters](opmonlib::InfoCollector& ic) {
+      uint number_of_channels = 5;
 
-  for (uint i = 0; i < number_of_channels; ++i) { // NOLINT(build/unsigned)
+      for (uint i = 0; i < number_of_channels; ++i) { // NOLINT(build/unsigned)
 
-    timingfirmwareinfo::TimingFLCmdCounter cmd_counter;
-    opmonlib::InfoCollector cmd_counter_ic;
+        timingfirmwareinfo::TimingFLCmdCounter cmd_counter;
+        opmonlib::InfoCollector cmd_counter_ic;
 
-    cmd_counter.accepted = accepted_counters.at(i);
-    cmd_counter.rejected = rejected_counters.at(i);
+        cmd_counter.accepted = accepted_counters.at(i);
+        cmd_counter.rejected = rejected_counters.at(i);
 
-    std::string channel = "fl_cmd_channel_" + std::to_string(i);
+        std::string channel = "fl_cmd_channel_" + std::to_string(i);
 
-    cmd_counter_ic.add(cmd_counter);
-    ic.add(channel, cmd_counter_ic);
-  }
+        cmd_counter_ic.add(cmd_counter);
+        ic.add(channel, cmd_counter_ic);
+      }
+    };
+  });
 }
 //-----------------------------------------------------------------------------
 
@@ -59,16 +59,12 @@ FMCIONode::get_status(bool print_out) const
 void
 FMCIONode::reset(const std::string& clock_config_file) const
 {
+  IPbusProfiler::Scope scope("FMCIONode::reset");
 
   write_soft_reset_register();
 
   millisleep(1000);
 
-  // Reset PLL
-  getNode("csr.ctrl.pll_rst").write(0x1);
-  getNode("csr.ctrl.pll_rst").write(0x0);
-  getClient().dispatch();
-
   CarrierType carrier_type = convert_value_to_carrier_type(read_carrier_type());
 
   // enclustra i2c switch stuff
@@ -84,13 +80,27 @@ FMCIONode::reset(const std::string& clock_config_file) const
   std::string clock_config_path = get_full_clock_config_file_path(clock_config_file);
   TLOG() << "PLL configuration file : " << clock_config_path;
 
-  // Upload config file to PLL
-  configure_pll(clock_config_path);
+  if (is_pll_configured(clock_config_path)) {
+    // Keep the PLL running, only apply the differences
+    TLOG() << "PLL already configured, applying incremental update";
+    configure_pll_incremental(clock_config_path);
+  } else {
+    // Reset PLL
+    getNode("csr.ctrl.pll_rst").write(0x1);
+    getNode("csr.ctrl.pll_rst").write(0x0);
+    IPbusProfiler::dispatch(getClient());
+    invalidate_snapshots();
+    invalidate_pll_state();
+
+    // Upload config file to PLL
+    configure_pll(clock_config_path);
+  }
 
   // Reset mmcm
   getNode("csr.ctrl.rst").write(0x1);
   getNode("csr.ctrl.rst").write(0x0);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 
   // Enable sfp tx laser
   getNode("csr.ctrl.sfp_tx_dis").write(0x0);
@@ -113,7 +123,8 @@ FMCIONode::reset(const std::string& clock_config_file) const
   getNode("csr.ctrl.sfp_tx_edge").write(sfp_tx_edge);
   getNode("csr.ctrl.rj45_tx_edge").write(rj45_tx_edge);
 
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 
   TLOG() << "Reset done";
 }
@@ -148,25 +159,26 @@ FMCIONode::get_info(timinghardwareinfo::TimingFMCMonitorData& mon_data) const
 void
 FMCIONode::get_info(opmonlib::InfoCollector& ci, int level) const
 {
-  if (level >= 2) {
-    timinghardwareinfo::TimingPLLMonitorData pll_mon_data;
-    this->get_pll()->get_info(pll_mon_data);
-    ci.add(pll_mon_data);
+  MonitoringPlan plan(*this);
+  add_to_monitoring_plan(plan, {}, level);
+  plan.collect(ci);
+}
+//-----------------------------------------------------------------------------
 
-    timinghardwareinfo::TimingSFPMonitorData sfp_mon_data;
-    auto sfp = this->get_i2c_device<I2CSFPSlave>(m_sfp_i2c_buses.at(0), "SFP_EEProm");
-    try {
-      sfp->get_info(sfp_mon_data);
-      ci.add(sfp_mon_data);
-    } catch (timing::SFPUnreachable& e) {
-      // It is valid that an SFP may not be installed, currently no good way of knowing whether they it should be
-      TLOG_DEBUG(2) << "Failed to communicate with SFP on i2c bus" << m_sfp_i2c_buses.at(0);
-    }
+//-----------------------------------------------------------------------------
+void
+FMCIONode::add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const
+{
+  if (level >= 2) {
+    plan.add_sampled_step(path, MonitoringPlan::kI2CTier, [this]() { return sample_pll_info(); });
+    plan.add_sampled_step(path, MonitoringPlan::kI2CTier, [this]() { return sample_sfp_info(m_sfp_i2c_buses.at(0)); });
   }
   if (level >= 1) {
-    timinghardwareinfo::TimingFMCMonitorData mon_data;
-    this->get_info(mon_data);
-    ci.add(mon_data);
+    plan.add_step(path, [this](opmonlib::InfoCollector& ci) {
+      timinghardwareinfo::TimingFMCMonitorData mon_data;
+      this->get_info(mon_data);
+      ci.add(mon_data);
+    });
   }
 }
 //-----------------------------------------------------------------------------
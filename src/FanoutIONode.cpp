@@ -8,7 +8,14 @@
 
 #include "timing/FanoutIONode.hpp"
 
+#include "logging/Logging.hpp"
+
+#include <iomanip>
+#include <map>
+#include <memory>
+#include <sstream>
 #include <string>
+#include <utility>
 #include <vector>
 
 namespace dunedaq {
@@ -29,5 +36,201 @@ FanoutIONode::FanoutIONode(const uhal::Node& node,
 FanoutIONode::~FanoutIONode() {}
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+void
+FanoutIONode::read_sfp_sweep_entry(const std::string& i2c_bus_name, SFPSweepResult& result) const
+{
+  result.read = true;
+  result.reachable = false;
+  result.ddm_valid = false;
+
+  auto sfp = get_i2c_device<I2CSFPSlave>(i2c_bus_name, "SFP_EEProm");
+  try {
+    // Reset the bus once for the whole readout
+    I2CBusSession session(sfp->get_master());
+
+    result.static_info = sfp->read_static_info();
+    result.reachable = true;
+
+    if (!result.static_info.ddm_supported) {
+      result.error = "DDM not supported";
+    } else if (result.static_info.address_swap_required) {
+      result.error = "DDM I2C address swap not supported";
+    } else {
+      result.ddm = sfp->read_ddm_snapshot(result.static_info);
+      result.ddm_valid = true;
+    }
+  } catch (timing::SFPUnreachable& e) {
+    // It is valid that an SFP may not be installed, currently no good way of knowing whether they it should be
+    TLOG_DEBUG(2) << "Failed to communicate with SFP " << result.label << " on i2c bus " << i2c_bus_name;
+    result.error = "unreachable";
+  }
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+FanoutIONode::read_sfp_sweep_entries(const std::vector<std::string>& i2c_bus_names,
+                                     const std::vector<SFPSweepResult*>& results) const
+{
+  // Same readout as read_sfp_sweep_entry, in three steps each running on all the buses at once:
+  // serial numbers, ID blocks of the SFPs not in the static data cache, then calibration
+  // constants and DDM values
+  std::vector<std::unique_ptr<const I2CSFPSlave>> sfps;
+  for (size_t i = 0; i < i2c_bus_names.size(); ++i) {
+    sfps.push_back(get_i2c_device<I2CSFPSlave>(i2c_bus_names.at(i), "SFP_EEProm"));
+    results.at(i)->read = true;
+    results.at(i)->reachable = false;
+    results.at(i)->ddm_valid = false;
+  }
+
+  I2CMultiBusExecutor serial_reads;
+  std::vector<I2CMultiBusExecutor::JobId> serial_jobs;
+  for (auto& sfp : sfps) {
+    serial_jobs.push_back(serial_reads.add_read(*sfp, I2CSFPSlave::kSerialNumberAddress, I2CSFPSlave::kSerialNumberSize));
+  }
+  serial_reads.execute();
+
+  I2CMultiBusExecutor id_reads;
+  std::map<size_t, I2CMultiBusExecutor::JobId> id_jobs;
+  for (size_t i = 0; i < sfps.size(); ++i) {
+    auto& result = *results.at(i);
+    if (!serial_reads.succeeded(serial_jobs.at(i))) {
+      // It is valid that an SFP may not be installed, currently no good way of knowing whether they it should be
+      TLOG_DEBUG(2) << "Failed to communicate with SFP " << result.label << " on i2c bus " << i2c_bus_names.at(i);
+      result.error = "unreachable";
+      continue;
+    }
+    result.reachable = true;
+
+    auto& serial_data = serial_reads.get_data(serial_jobs.at(i));
+    if (!I2CSFPSlave::find_static_info(std::string(serial_data.begin(), serial_data.end()), result.static_info)) {
+      id_jobs[i] = id_reads.add_read(*sfps.at(i), I2CSFPSlave::kIDBlockAddress, I2CSFPSlave::kIDBlockSize);
+    }
+  }
+  id_reads.execute();
+
+  for (auto& id_job : id_jobs) {
+    auto& result = *results.at(id_job.first);
+    if (!id_reads.succeeded(id_job.second)) {
+      result.error = id_reads.get_error(id_job.second);
+      result.reachable = false;
+      continue;
+    }
+    result.static_info = I2CSFPSlave::decode_id_block(id_reads.get_data(id_job.second));
+  }
+
+  I2CMultiBusExecutor ddm_reads;
+  std::map<size_t, I2CMultiBusExecutor::JobId> calibration_jobs;
+  std::map<size_t, I2CMultiBusExecutor::JobId> ddm_jobs;
+  for (size_t i = 0; i < sfps.size(); ++i) {
+    auto& result = *results.at(i);
+    if (!result.reachable)
+      continue;
+
+    if (!result.static_info.ddm_supported) {
+      result.error = "DDM not supported";
+    } else if (result.static_info.address_swap_required) {
+      result.error = "DDM I2C address swap not supported";
+    } else {
+      const I2CMasterNode& master = sfps.at(i)->get_master();
+      if (id_jobs.count(i)) {
+        calibration_jobs[i] = ddm_reads.add_read(master,
+                                                 I2CSFPSlave::kDDMI2CAddress,
+                                                 I2CSFPSlave::kCalibrationBlockAddress,
+                                                 I2CSFPSlave::kCalibrationBlockSize);
+      }
+      ddm_jobs[i] = ddm_reads.add_read(master,
+                                       I2CSFPSlave::kDDMI2CAddress,
+                                       I2CSFPSlave::kDDMValuesAddress,
+                                       I2CSFPSlave::kDDMValuesSize);
+    }
+  }
+  ddm_reads.execute();
+
+  for (auto& ddm_job : ddm_jobs) {
+    auto& result = *results.at(ddm_job.first);
+    auto calibration_job = calibration_jobs.find(ddm_job.first);
+    if (calibration_job != calibration_jobs.end()) {
+      if (!ddm_reads.succeeded(calibration_job->second)) {
+        result.error = ddm_reads.get_error(calibration_job->second);
+        continue;
+      }
+      sfps.at(ddm_job.first)->decode_calibration_block(ddm_reads.get_data(calibration_job->second), result.static_info);
+    }
+    if (!ddm_reads.succeeded(ddm_job.second)) {
+      result.error = ddm_reads.get_error(ddm_job.second);
+      continue;
+    }
+    result.ddm = I2CSFPSlave::decode_ddm_snapshot(ddm_reads.get_data(ddm_job.second), result.static_info);
+    result.ddm_valid = true;
+  }
+
+  // complete static data only
+  for (auto& id_job : id_jobs) {
+    auto& result = *results.at(id_job.first);
+    if (result.reachable && (calibration_jobs.count(id_job.first) == 0 || result.ddm_valid))
+      I2CSFPSlave::store_static_info(result.static_info);
+  }
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::string
+FanoutIONode::format_sfp_sweep(const std::vector<SFPSweepResult>& results)
+{
+  auto format_value = [](double value, const std::string& unit) {
+    std::stringstream value_stream;
+    value_stream << std::dec << std::fixed << std::setprecision(2) << value << " " << unit;
+    return value_stream.str();
+  };
+
+  std::stringstream status;
+  for (auto& result : results) {
+    std::vector<std::pair<std::string, std::string>> sfp_info;
+    sfp_info.push_back(std::make_pair("LOS", std::to_string(result.los)));
+
+    if (!result.read) {
+      sfp_info.push_back(std::make_pair("Status", "Not read"));
+    } else if (!result.reachable) {
+      sfp_info.push_back(std::make_pair("Status", result.error));
+    } else {
+      sfp_info.push_back(std::make_pair("Vendor", result.static_info.vendor_name));
+      sfp_info.push_back(std::make_pair("Part number", result.static_info.vendor_pn));
+      sfp_info.push_back(std::make_pair("Serial number", result.static_info.serial_number));
+
+      if (!result.ddm_valid) {
+        sfp_info.push_back(std::make_pair("Status", result.error));
+      } else {
+        sfp_info.push_back(std::make_pair("Temperature", format_value(result.ddm.temperature, "C")));
+        sfp_info.push_back(std::make_pair("Supply voltage", format_value(result.ddm.voltage, "V")));
+        sfp_info.push_back(std::make_pair("Rx power", format_value(result.ddm.rx_power, "uW")));
+        sfp_info.push_back(std::make_pair("Tx power", format_value(result.ddm.tx_power, "uW")));
+        sfp_info.push_back(std::make_pair("Tx current", format_value(result.ddm.current, "uA")));
+        if (result.static_info.soft_tx_control_supported) {
+          sfp_info.push_back(std::make_pair("Tx disable bit", std::to_string(result.ddm.tx_disable_sw)));
+        } else {
+          sfp_info.push_back(std::make_pair("Soft Tx disbale supported", "False"));
+        }
+        sfp_info.push_back(std::make_pair("Tx disable pin", std::to_string(result.ddm.tx_disable_hw)));
+      }
+    }
+    status << format_reg_table(sfp_info, result.label + " status", { "", "" }) << std::endl;
+  }
+  return status.str();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::string
+FanoutIONode::get_sfp_sweep_status(bool skip_lost, bool print_out) const
+{
+  auto status = format_sfp_sweep(sweep_sfps(skip_lost));
+  if (print_out)
+    TLOG() << status;
+  return status;
+}
+//-----------------------------------------------------------------------------
+
 } // namespace timing
 } // namespace dunedaq
\ No newline at end of file
@@ -10,7 +10,10 @@
 
 #include "logging/Logging.hpp"
 
+#include <algorithm>
+#include <exception>
 #include <string>
+#include <utility>
 #include <vector>
 
 namespace dunedaq {
@@ -18,14 +21,28 @@ namespace timing {
 
 UHAL_REGISTER_DERIVED_NODE(FrequencyCounterNode)
 
+const std::chrono::milliseconds FrequencyCounterNode::kMeasurementTime(2000);
+const std::chrono::milliseconds FrequencyCounterNode::kMeasurementRetryInterval(10);
+
 //-----------------------------------------------------------------------------
 FrequencyCounterNode::FrequencyCounterNode(const uhal::Node& node)
   : TimingNode(node)
+  , m_sampler(new SamplerState)
 {}
 //-----------------------------------------------------------------------------
 
 //-----------------------------------------------------------------------------
-FrequencyCounterNode::~FrequencyCounterNode() {}
+FrequencyCounterNode::FrequencyCounterNode(const FrequencyCounterNode& node)
+  : TimingNode(node)
+  , m_sampler(new SamplerState)
+{}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+FrequencyCounterNode::~FrequencyCounterNode()
+{
+  stop_sampler();
+}
 //-----------------------------------------------------------------------------
 
 //-----------------------------------------------------------------------------
@@ -48,26 +65,255 @@ FrequencyCounterNode::measure_frequencies(uint8_t number_of_clocks) const // NOL
   std::vector<double> frequencies;
 
   for (uint8_t i = 0; i < number_of_clocks; ++i) { // NOLINT(build/unsigned)
-    getNode("ctrl.chan_sel").write(i);
-    getNode("ctrl.en_crap_mode").write(0);
-    getClient().dispatch();
+    start_measurement(i);
+    millisleep(kMeasurementTime.count());
+    double frequency = finish_measurement();
+
+    // refresh the sampler cache with the measurement while we are at it
+    std::lock_guard<std::mutex> lock(m_sampler->mutex);
+    if (i < m_sampler->samples.size() && frequency >= 0) {
+      m_sampler->samples.at(i).frequency = frequency;
+      m_sampler->samples.at(i).timestamp = std::chrono::steady_clock::now();
+      m_sampler->samples.at(i).valid = true;
+    }
+
+    frequencies.push_back(frequency);
+  }
+  return frequencies;
+}
+//-----------------------------------------------------------------------------
 
-    millisleep(2000);
+//-----------------------------------------------------------------------------
+std::vector<double>
+FrequencyCounterNode::read_frequencies(uint8_t number_of_clocks, uint32_t max_age) const // NOLINT(build/unsigned)
+{
+  if (!is_sampler_running())
+    return measure_frequencies(number_of_clocks);
 
-    uhal::ValWord<uint32_t> frequency = getNode("freq.count").read();      // NOLINT(build/unsigned)
-    uhal::ValWord<uint32_t> frequency_valid = getNode("freq.valid").read(); // NOLINT(build/unsigned)
-    getClient().dispatch();
+  std::lock_guard<std::mutex> lock(m_sampler->mutex);
 
-    if (frequency_valid.value()) {
-      double freq = frequency.value() * 119.20928 / 1000000;
-      frequencies.push_back(freq);
-    } else {
-      frequencies.push_back(-1);
-    }
+  const auto cycle_time = kMeasurementTime * m_sampler->number_of_clocks;
+  const auto max_sample_age = max_age ? std::chrono::milliseconds(max_age) : 2 * cycle_time;
+  const auto now = std::chrono::steady_clock::now();
+
+  std::vector<double> frequencies;
+  for (uint8_t i = 0; i < number_of_clocks; ++i) { // NOLINT(build/unsigned)
+    bool fresh = i < m_sampler->samples.size() && m_sampler->samples.at(i).valid &&
+                 now - m_sampler->samples.at(i).timestamp <= max_sample_age;
+    frequencies.push_back(fresh ? m_sampler->samples.at(i).frequency : -1);
   }
   return frequencies;
 }
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+void
+FrequencyCounterNode::start_sampler(uint8_t number_of_clocks) const // NOLINT(build/unsigned)
+{
+  std::lock_guard<std::mutex> lock(m_sampler->mutex);
+
+  if (number_of_clocks > m_sampler->number_of_clocks) {
+    m_sampler->number_of_clocks = number_of_clocks;
+    m_sampler->samples.resize(number_of_clocks);
+  }
+
+  if (m_sampler->running)
+    return;
+
+  TLOG_DEBUG(3) << "Starting frequency counter sampler, " << static_cast<uint32_t>(m_sampler->number_of_clocks) // NOLINT
+                << " channels";
+
+  m_sampler->running = true;
+  m_sampler->stop_requested = false;
+  m_sampler->thread = std::thread(&FrequencyCounterNode::run_sampler, this);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+FrequencyCounterNode::stop_sampler() const
+{
+  std::thread sampler_thread;
+  {
+    std::lock_guard<std::mutex> lock(m_sampler->mutex);
+    if (!m_sampler->running)
+      return;
+    m_sampler->stop_requested = true;
+    sampler_thread = std::move(m_sampler->thread);
+  }
+  m_sampler->condition.notify_all();
+  sampler_thread.join();
+
+  std::lock_guard<std::mutex> lock(m_sampler->mutex);
+  m_sampler->running = false;
+  m_sampler->number_of_clocks = 0;
+  m_sampler->samples.clear();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+bool
+FrequencyCounterNode::is_sampler_running() const
+{
+  std::lock_guard<std::mutex> lock(m_sampler->mutex);
+  return m_sampler->running;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+FrequencyCounterNode::select_channel(uint8_t channel) const // NOLINT(build/unsigned)
+{
+  getNode("ctrl.chan_sel").write(channel);
+  getNode("ctrl.en_crap_mode").write(0);
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+double
+FrequencyCounterNode::read_selected_frequency() const
+{
+  uhal::ValWord<uint32_t> frequency = getNode("freq.count").read();      // NOLINT(build/unsigned)
+  uhal::ValWord<uint32_t> frequency_valid = getNode("freq.valid").read(); // NOLINT(build/unsigned)
+  IPbusProfiler::dispatch(getClient());
+
+  if (frequency_valid.value()) {
+    return frequency.value() * 119.20928 / 1000000;
+  } else {
+    return -1;
+  }
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+FrequencyCounterNode::start_measurement(uint8_t channel) const // NOLINT(build/unsigned)
+{
+  std::unique_lock<std::mutex> hardware_lock(m_sampler->hardware_mutex);
+
+  ++m_sampler->waiting_measurements;
+  m_sampler->hardware_condition.wait(hardware_lock, [this]() { return !m_sampler->measuring; });
+  --m_sampler->waiting_measurements;
+
+  begin_measurement(channel);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::chrono::steady_clock::duration
+FrequencyCounterNode::try_start_measurement(uint8_t channel) const // NOLINT(build/unsigned)
+{
+  std::lock_guard<std::mutex> hardware_lock(m_sampler->hardware_mutex);
+
+  if (m_sampler->measuring || m_sampler->waiting_measurements) {
+    return std::max<std::chrono::steady_clock::duration>(m_sampler->measurement_end - std::chrono::steady_clock::now(),
+                                                         kMeasurementRetryInterval);
+  }
+
+  begin_measurement(channel);
+  return std::chrono::steady_clock::duration::zero();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+FrequencyCounterNode::begin_measurement(uint8_t channel) const // NOLINT(build/unsigned)
+{
+  // called with the hardware mutex held
+  select_channel(channel);
+  m_sampler->measuring = true;
+  m_sampler->measurement_end = std::chrono::steady_clock::now() + kMeasurementTime;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+double
+FrequencyCounterNode::finish_measurement() const
+{
+  std::lock_guard<std::mutex> hardware_lock(m_sampler->hardware_mutex);
+
+  // released first, the read may throw
+  m_sampler->measuring = false;
+  m_sampler->hardware_condition.notify_all();
+  return read_selected_frequency();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+FrequencyCounterNode::cancel_measurement() const
+{
+  std::lock_guard<std::mutex> hardware_lock(m_sampler->hardware_mutex);
+  m_sampler->measuring = false;
+  m_sampler->hardware_condition.notify_all();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+FrequencyCounterNode::run_sampler() const
+{
+  uint8_t channel = 0; // NOLINT(build/unsigned)
+  auto stop_requested = [this]() { return m_sampler->stop_requested; };
+
+  while (true) {
+    {
+      std::lock_guard<std::mutex> lock(m_sampler->mutex);
+      if (m_sampler->stop_requested)
+        break;
+      if (channel >= m_sampler->number_of_clocks)
+        channel = 0;
+    }
+
+    double frequency = -1;
+    bool failed = false;
+    try {
+      auto wait = try_start_measurement(channel);
+      if (wait.count()) {
+        // another measurement is in progress, try again once it is over
+        std::unique_lock<std::mutex> lock(m_sampler->mutex);
+        if (m_sampler->condition.wait_for(lock, wait, stop_requested))
+          break;
+        continue;
+      }
+
+      bool stopped(false);
+      {
+        std::unique_lock<std::mutex> lock(m_sampler->mutex);
+        stopped = m_sampler->condition.wait_for(lock, kMeasurementTime, stop_requested);
+      }
+      if (stopped) {
+        cancel_measurement();
+        break;
+      }
+
+      frequency = finish_measurement();
+    } catch (const std::exception& e) {
+      TLOG_DEBUG(3) << "Frequency counter sampler failed on channel " << static_cast<uint32_t>(channel) // NOLINT
+                    << ": " << e.what();
+      failed = true;
+    }
+
+    std::unique_lock<std::mutex> lock(m_sampler->mutex);
+
+    // keep the last valid value of the channel if this measurement failed
+    if (frequency >= 0) {
+      auto& sample = m_sampler->samples.at(channel);
+      sample.frequency = frequency;
+      sample.timestamp = std::chrono::steady_clock::now();
+      sample.valid = true;
+    }
+
+    // back off before retrying when the hardware is not answering
+    if (failed && m_sampler->condition.wait_for(lock, kMeasurementTime, stop_requested))
+      break;
+
+    ++channel;
+  }
+}
+//-----------------------------------------------------------------------------
+
 } // namespace timing
 } // namespace dunedaq
\ No newline at end of file
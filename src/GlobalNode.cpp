@@ -10,13 +10,18 @@
 
 #include "logging/Logging.hpp"
 
+#include <chrono>
 #include <string>
+#include <vector>
 
 namespace dunedaq {
 namespace timing {
 
 UHAL_REGISTER_DERIVED_NODE(GlobalNode)
 
+const std::chrono::microseconds GlobalNode::kUpstreamLockFirstInterval(20);
+const std::chrono::microseconds GlobalNode::kUpstreamLockMaxInterval(20000);
+
 //-----------------------------------------------------------------------------
 GlobalNode::GlobalNode(const uhal::Node& node)
   : TimingNode(node)
@@ -89,47 +94,31 @@ void
 GlobalNode::enable_upstream_endpoint(uint32_t timeout) // NOLINT(build/unsigned)
 {
   getNode("csr.ctrl.ep_en").write(0x0);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
   getNode("csr.ctrl.ep_en").write(0x1);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 
   TLOG() << "Upstream endpoint reset, waiting for lock";
 
-  auto start = std::chrono::high_resolution_clock::now();
-
-  std::chrono::milliseconds ms_since_start(0);
-
-  uhal::ValWord<uint32_t> ept_state; // NOLINT(build/unsigned)
-  uhal::ValWord<uint32_t> ept_ready;  // NOLINT(build/unsigned)
-
-  // Wait for the endpoint to be happy
-  while (ms_since_start.count() < timeout) {
-    auto now = std::chrono::high_resolution_clock::now();
-    ms_since_start = std::chrono::duration_cast<std::chrono::milliseconds>(now - start);
-
-    millisleep(50);
-
-    ept_state = getNode("csr.stat.ep_stat").read();
-    ept_ready = getNode("csr.stat.ep_rdy").read();
-    
-    auto ept_edge = getNode("csr.stat.ep_edge").read();
-    auto ept_fdel = getNode("csr.stat.ep_fdel").read();
-    
-    getClient().dispatch();
-
-    TLOG_DEBUG(1) << "ept state: 0x" << std::hex << ept_state.value() << " ept ready: 0x" << ept_ready.value() << " ept edge: 0x" << ept_edge.value() << " ept fdel: 0x" << ept_fdel.value();
-
-    if (ept_ready.value() && ept_state.value() == 0x8) {
-      TLOG_DEBUG(1) << "Endpoint locked: state= " << format_reg_value(ept_state);
-      return;
-    }
-  }
-
-  if (!ept_ready.value() || ept_state.value() != 0x8) {
-    throw EndpointNotReady(ERS_HERE, "Master upstream", ept_state.value());
-  } else {
-    TLOG_DEBUG(1) << "Endpoint locked: state= " << format_reg_value(ept_state);
+  auto result = wait_for({ "csr.stat.ep_stat", "csr.stat.ep_rdy", "csr.stat.ep_edge", "csr.stat.ep_fdel" },
+                         [](const std::vector<uint32_t>& values) { // NOLINT(build/unsigned)
+                           return values.at(1) && values.at(0) == 0x8;
+                         },
+                         WaitSchedule(kUpstreamLockFirstInterval,
+                                      kUpstreamLockMaxInterval,
+                                      std::chrono::milliseconds(timeout)),
+                         "GlobalNode::enable_upstream_endpoint");
+
+  TLOG_DEBUG(1) << "ept state: 0x" << std::hex << result.values.at(0) << " ept ready: 0x" << result.values.at(1)
+                << " ept edge: 0x" << result.values.at(2) << " ept fdel: 0x" << result.values.at(3) << std::dec
+                << " after " << result.polls << " polls";
+
+  if (!result.satisfied) {
+    throw EndpointNotReady(ERS_HERE, "Master upstream", result.values.at(0));
   }
+  TLOG_DEBUG(1) << "Endpoint locked: state= " << format_reg_value(result.values.at(0));
 }
 //-----------------------------------------------------------------------------
 
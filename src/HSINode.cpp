@@ -33,10 +33,13 @@ HSINode::~HSINode() {}
 void
 HSINode::enable(uint32_t partition, uint32_t address) const // NOLINT(build/unsigned)
 {
+  IPbusProfiler::Scope scope("HSINode::enable");
+
   getNode("csr.ctrl.tgrp").write(partition);
   getNode("csr.ctrl.addr").write(address);
   getNode("csr.ctrl.ep_en").write(0x1);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 }
 //-----------------------------------------------------------------------------
 
@@ -44,8 +47,11 @@ HSINode::enable(uint32_t partition, uint32_t address) const // NOLINT(build/unsi
 void
 HSINode::disable() const
 {
+  IPbusProfiler::Scope scope("HSINode::disable");
+
   getNode("csr.ctrl.ep_en").write(0x0);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 }
 //-----------------------------------------------------------------------------
 
@@ -53,6 +59,8 @@ HSINode::disable() const
 void
 HSINode::reset(uint32_t partition, uint32_t address) const // NOLINT(build/unsigned)
 {
+  IPbusProfiler::Scope scope("HSINode::reset");
+
   getNode("csr.ctrl.ep_en").write(0x0);
   enable(partition, address);
 }
@@ -62,6 +70,7 @@ HSINode::reset(uint32_t partition, uint32_t address) const // NOLINT(build/unsig
 std::string
 HSINode::get_status(bool print_out) const
 {
+  IPbusProfiler::Scope scope("HSINode::get_status");
 
   std::stringstream status;
 
@@ -81,7 +90,7 @@ HSINode::get_status(bool print_out) const
   auto hsi_fe_mask = getNode("hsi.csr.fe_mask").read();
   auto hsi_inv_mask = getNode("hsi.csr.inv_mask").read();
 
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
 
   ept_summary.push_back(std::make_pair("Enabled", format_reg_value(ept_control.find("ep_en")->second.value(), 16)));
   ept_summary.push_back(std::make_pair("Partition", format_reg_value(ept_control.find("tgrp")->second.value(), 16)));
@@ -115,7 +124,7 @@ uint32_t // NOLINT(build/unsigned)
 HSINode::read_buffer_count() const
 {
   auto buffer_count = getNode("hsi.buf.count").read();
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
   return buffer_count.value();
 }
 //-----------------------------------------------------------------------------
@@ -124,6 +133,7 @@ HSINode::read_buffer_count() const
 uhal::ValVector<uint32_t>                                                             // NOLINT(build/unsigned)
 HSINode::read_data_buffer(uint16_t& n_words, bool read_all, bool fail_on_error) const // NOLINT(build/unsigned)
 {
+  IPbusProfiler::Scope scope("HSINode::read_data_buffer");
 
   uint32_t buffer_state = read_buffer_state(); // NOLINT(build/unsigned)
 
@@ -166,7 +176,8 @@ HSINode::read_data_buffer(uint16_t& n_words, bool read_all, bool fail_on_error)
   }
 
   buffer_data = getNode("hsi.buf.data").readBlock(words_to_read);
-  getClient().dispatch();
+  IPbusProfiler::count_words(words_to_read, 0);
+  IPbusProfiler::dispatch(getClient());
 
   return buffer_data;
 }
@@ -180,6 +191,36 @@ HSINode::read_data_buffer(bool read_all, bool fail_on_error) const
   return read_data_buffer(words, read_all, fail_on_error);
 }
 
+//-----------------------------------------------------------------------------
+uint32_t                                                                                        // NOLINT(build/unsigned)
+HSINode::read_data_buffer_and_state(std::vector<uint32_t>& data, uint32_t n_words) const // NOLINT(build/unsigned)
+{
+  IPbusProfiler::Scope scope("HSINode::read_data_buffer_and_state");
+
+  // the block is queued first so that the state reflects the buffer after the read
+  uhal::ValVector<uint32_t> buffer_data; // NOLINT(build/unsigned)
+  if (n_words)
+    buffer_data = getNode("hsi.buf.data").readBlock(n_words);
+
+  // polled by the readout loops, always read the hardware
+  auto buf_state = read_sub_nodes(getNode("hsi.csr.stat"), false, false);
+  auto hsi_buffer_count = getNode("hsi.buf.count").read();
+  IPbusProfiler::count_words(n_words + 1, 0);
+  IPbusProfiler::dispatch(getClient());
+
+  data.clear();
+  if (n_words)
+    data.assign(buffer_data.begin(), buffer_data.end());
+
+  uint8_t buffer_error = static_cast<uint8_t>(buf_state.find("buf_err")->second.value());    // NOLINT(build/unsigned)
+  uint8_t buffer_warning = static_cast<uint8_t>(buf_state.find("buf_warn")->second.value()); // NOLINT(build/unsigned)
+
+  uint32_t buffer_state = buffer_error | (buffer_warning << 1);                          // NOLINT(build/unsigned)
+  buffer_state = buffer_state | static_cast<uint32_t>(hsi_buffer_count.value()) << 0x10; // NOLINT(build/unsigned)
+  return buffer_state;
+}
+//-----------------------------------------------------------------------------
+
 //-----------------------------------------------------------------------------
 std::string
 HSINode::get_data_buffer_table(bool read_all, bool print_out) const
@@ -214,6 +255,7 @@ HSINode::configure_hsi(uint32_t src,      // NOLINT(build/unsigned)
                        uint32_t clock_frequency_hz, // NOLINT(build/unsigned)
                        bool dispatch) const
 {
+  IPbusProfiler::Scope scope("HSINode::configure_hsi");
 
   getNode("hsi.csr.ctrl.src").write(src);
   getNode("hsi.csr.re_mask").write(re_mask);
@@ -247,8 +289,10 @@ HSINode::configure_hsi(uint32_t src,      // NOLINT(build/unsigned)
     ers::error(FailedToUpdateHSIRandomRate(ERS_HERE,e));
   }
 
-  if (dispatch)
-    getClient().dispatch();
+  if (dispatch) {
+    IPbusProfiler::dispatch(getClient());
+    invalidate_snapshots();
+  }
 }
 //-----------------------------------------------------------------------------
 
@@ -257,8 +301,10 @@ void
 HSINode::start_hsi(bool dispatch) const
 {
   getNode("hsi.csr.ctrl.en").write(0x1);
-  if (dispatch)
-    getClient().dispatch();
+  if (dispatch) {
+    IPbusProfiler::dispatch(getClient());
+    invalidate_snapshots();
+  }
 }
 //-----------------------------------------------------------------------------
 
@@ -267,8 +313,10 @@ void
 HSINode::stop_hsi(bool dispatch) const
 {
   getNode("hsi.csr.ctrl.en").write(0x0);
-  if (dispatch)
-    getClient().dispatch();
+  if (dispatch) {
+    IPbusProfiler::dispatch(getClient());
+    invalidate_snapshots();
+  }
 }
 //-----------------------------------------------------------------------------
 
@@ -286,8 +334,10 @@ HSINode::reset_hsi(bool dispatch) const
   getNode("hsi.csr.inv_mask").write(0x0);
   getNode("hsi.csr.ctrl.src").write(0x0);
 
-  if (dispatch)
-    getClient().dispatch();
+  if (dispatch) {
+    IPbusProfiler::dispatch(getClient());
+    invalidate_snapshots();
+  }
 }
 //-----------------------------------------------------------------------------
 
@@ -296,7 +346,7 @@ bool
 HSINode::read_buffer_warning() const
 {
   auto buf_warning = getNode("hsi.csr.stat.buf_warn").read();
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
   return buf_warning.value();
 }
 //-----------------------------------------------------------------------------
@@ -306,7 +356,7 @@ bool
 HSINode::read_buffer_error() const
 {
   auto buf_error = getNode("hsi.csr.stat.buf_err").read();
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
   return buf_error.value();
 }
 //-----------------------------------------------------------------------------
@@ -316,9 +366,10 @@ uint32_t // NOLINT(build/unsigned)
 HSINode::read_buffer_state() const
 {
 
-  auto buf_state = read_sub_nodes(getNode("hsi.csr.stat"), false);
+  // polled by the readout loops, always read the hardware
+  auto buf_state = read_sub_nodes(getNode("hsi.csr.stat"), false, false);
   auto hsi_buffer_count = getNode("hsi.buf.count").read();
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
 
   uint8_t buffer_error = static_cast<uint8_t>(buf_state.find("buf_err")->second.value());    // NOLINT(build/unsigned)
   uint8_t buffer_warning = static_cast<uint8_t>(buf_state.find("buf_warn")->second.value()); // NOLINT(build/unsigned)
@@ -330,8 +381,8 @@ HSINode::read_buffer_state() const
 //-----------------------------------------------------------------------------
 
 //-----------------------------------------------------------------------------
-void
-HSINode::get_info(timingfirmwareinfo::HSIFirmwareMonitorData& mon_data) const
+std::function<void()>
+HSINode::queue_info(timingfirmwareinfo::HSIFirmwareMonitorData& mon_data) const
 {
 
   auto ept_control = read_sub_nodes(getNode("csr.ctrl"), false);
@@ -346,22 +397,32 @@ HSINode::get_info(timingfirmwareinfo::HSIFirmwareMonitorData& mon_data) const
   auto hsi_fe_mask = getNode("hsi.csr.fe_mask").read();
   auto hsi_inv_mask = getNode("hsi.csr.inv_mask").read();
 
-  getClient().dispatch();
-
-  mon_data.source = hsi_control.find("src")->second.value();
-  mon_data.re_mask = hsi_re_mask.value();
-  mon_data.fe_mask = hsi_fe_mask.value();
-  mon_data.inv_mask = hsi_inv_mask.value();
-  mon_data.buffer_enabled = hsi_control.find("buf_en")->second.value();
-  mon_data.buffer_error = hsi_state.find("buf_err")->second.value();
-  mon_data.buffer_warning = hsi_state.find("buf_warn")->second.value();
-  mon_data.buffer_occupancy = hsi_buffer_count.value();
-  mon_data.enabled = hsi_control.find("en")->second.value();
-
-  mon_data.endpoint_enabled = ept_control.find("ep_en")->second.value();
-  mon_data.endpoint_address = ept_control.find("addr")->second.value();
-  mon_data.endpoint_partition = ept_control.find("tgrp")->second.value();
-  mon_data.endpoint_state = ept_state.find("ep_stat")->second.value();
+  return [&mon_data, ept_control, ept_state, hsi_control, hsi_state, hsi_buffer_count, hsi_re_mask, hsi_fe_mask, hsi_inv_mask]() {
+    mon_data.source = hsi_control.find("src")->second.value();
+    mon_data.re_mask = hsi_re_mask.value();
+    mon_data.fe_mask = hsi_fe_mask.value();
+    mon_data.inv_mask = hsi_inv_mask.value();
+    mon_data.buffer_enabled = hsi_control.find("buf_en")->second.value();
+    mon_data.buffer_error = hsi_state.find("buf_err")->second.value();
+    mon_data.buffer_warning = hsi_state.find("buf_warn")->second.value();
+    mon_data.buffer_occupancy = hsi_buffer_count.value();
+    mon_data.enabled = hsi_control.find("en")->second.value();
+
+    mon_data.endpoint_enabled = ept_control.find("ep_en")->second.value();
+    mon_data.endpoint_address = ept_control.find("addr")->second.value();
+    mon_data.endpoint_partition = ept_control.find("tgrp")->second.value();
+    mon_data.endpoint_state = ept_state.find("ep_stat")->second.value();
+  };
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+HSINode::get_info(timingfirmwareinfo::HSIFirmwareMonitorData& mon_data) const
+{
+  auto fill = queue_info(mon_data);
+  IPbusProfiler::dispatch(getClient());
+  fill();
 }
 //-----------------------------------------------------------------------------
 
@@ -374,5 +435,14 @@ HSINode::get_info(opmonlib::InfoCollector& ci, int /*level*/) const
   ci.add(mon_data);
 }
 //-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+HSINode::add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int /*level*/) const
+{
+  plan.add_data<timingfirmwareinfo::HSIFirmwareMonitorData>(
+    path, [this](timingfirmwareinfo::HSIFirmwareMonitorData& mon_data) { return queue_info(mon_data); });
+}
+//-----------------------------------------------------------------------------
 } // namespace timing
 } // namespace dunedaq
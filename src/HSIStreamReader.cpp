@@ -0,0 +1,280 @@
+/**
+ * @file HSIStreamReader.cpp
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#include "timing/HSIStreamReader.hpp"
+
+#include "logging/Logging.hpp"
+
+#include <algorithm>
+#include <exception>
+#include <vector>
+
+namespace dunedaq {
+namespace timing {
+
+const size_t HSIStreamReader::kDefaultCapacity = 1 << 16;
+const uint32_t HSIStreamReader::kBufferDepth = 1024; // NOLINT(build/unsigned)
+const std::chrono::microseconds HSIStreamReader::kMinPollInterval(100);
+const std::chrono::microseconds HSIStreamReader::kMaxPollInterval(100000);
+
+//-----------------------------------------------------------------------------
+HSIStreamReader::HSIStreamReader(const HSINode& node, size_t capacity)
+  : m_node(node)
+  , m_events(capacity)
+  , m_running(false)
+  , m_stop_requested(false)
+  , m_reader_done(false)
+  , m_n_events(0)
+  , m_n_words(0)
+  , m_n_dispatches(0)
+  , m_n_empty_polls(0)
+  , m_n_buffer_warnings(0)
+  , m_n_buffer_errors(0)
+  , m_n_buffer_overflows(0)
+  , m_n_dropped_events(0)
+  , m_n_read_failures(0)
+{}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+HSIStreamReader::~HSIStreamReader()
+{
+  stop();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+HSIStreamReader::start(EventCallback callback)
+{
+  if (m_running)
+    return;
+
+  TLOG_DEBUG(3) << "Starting HSI stream reader";
+
+  m_stop_requested = false;
+  m_reader_done = false;
+  m_running = true;
+  m_reader_thread = std::thread(&HSIStreamReader::run_reader, this);
+  if (callback)
+    m_consumer_thread = std::thread(&HSIStreamReader::run_consumer, this, callback);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+HSIStreamReader::stop()
+{
+  if (!m_running)
+    return;
+
+  {
+    std::lock_guard<std::mutex> lock(m_wait_mutex);
+    m_stop_requested = true;
+  }
+  m_stop_condition.notify_all();
+
+  if (m_reader_thread.joinable())
+    m_reader_thread.join();
+  notify_consumers();
+  if (m_consumer_thread.joinable())
+    m_consumer_thread.join();
+
+  m_running = false;
+  notify_consumers();
+
+  TLOG_DEBUG(3) << "Stopped HSI stream reader, " << m_n_events << " events read";
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+bool
+HSIStreamReader::pop(HSIEvent& event)
+{
+  std::lock_guard<std::mutex> lock(m_consumer_mutex);
+  return m_events.pop(event);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+size_t
+HSIStreamReader::pop_events(std::vector<HSIEvent>& events, size_t max_events)
+{
+  std::lock_guard<std::mutex> lock(m_consumer_mutex);
+
+  size_t n_events = 0;
+  HSIEvent event;
+  while ((!max_events || n_events < max_events) && m_events.pop(event)) {
+    events.push_back(event);
+    ++n_events;
+  }
+  return n_events;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+bool
+HSIStreamReader::wait_for_events(std::chrono::milliseconds timeout)
+{
+  std::unique_lock<std::mutex> lock(m_wait_mutex);
+  m_events_condition.wait_for(
+    lock, timeout, [this]() { return !m_events.empty() || m_stop_requested || !m_running; });
+  return !m_events.empty();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+HSIStreamStats
+HSIStreamReader::get_stats() const
+{
+  HSIStreamStats stats;
+  stats.events = m_n_events;
+  stats.words = m_n_words;
+  stats.dispatches = m_n_dispatches;
+  stats.empty_polls = m_n_empty_polls;
+  stats.buffer_warnings = m_n_buffer_warnings;
+  stats.buffer_errors = m_n_buffer_errors;
+  stats.buffer_overflows = m_n_buffer_overflows;
+  stats.dropped_events = m_n_dropped_events;
+  stats.read_failures = m_n_read_failures;
+  return stats;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+HSIEvent
+HSIStreamReader::decode_event(const uint32_t* words) // NOLINT(build/unsigned)
+{
+  HSIEvent event;
+  event.header = words[0];
+  event.timestamp = (static_cast<uint64_t>(words[2]) << 32) | words[1]; // NOLINT(build/unsigned)
+  event.signal_map = words[3];
+  event.counter = words[4];
+  return event;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+HSIStreamReader::notify_consumers()
+{
+  {
+    std::lock_guard<std::mutex> lock(m_wait_mutex);
+  }
+  m_events_condition.notify_all();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+HSIStreamReader::run_reader()
+{
+  std::vector<uint32_t> words; // NOLINT(build/unsigned)
+  uint32_t words_available = 0; // NOLINT(build/unsigned)
+  auto poll_interval = kMinPollInterval;
+
+  while (!m_stop_requested) {
+
+    // only read complete events, which are known to be in the buffer already
+    uint32_t words_to_read = std::min(words_available, kBufferDepth); // NOLINT(build/unsigned)
+    words_to_read -= words_to_read % g_hsi_event_size;
+
+    uint32_t buffer_state = 0; // NOLINT(build/unsigned)
+    bool read_failed = false;
+    try {
+      buffer_state = m_node.read_data_buffer_and_state(words, words_to_read);
+      ++m_n_dispatches;
+    } catch (const std::exception& e) {
+      TLOG_DEBUG(5) << "HSI stream read failed: " << e.what();
+      ++m_n_read_failures;
+      read_failed = true;
+    }
+
+    if (read_failed) {
+      // the buffer state is unknown, start again from a fresh state read after a back-off
+      words_available = 0;
+      poll_interval = kMaxPollInterval;
+    } else {
+      if (buffer_state & 0x2)
+        ++m_n_buffer_warnings;
+      if (buffer_state & 0x1)
+        ++m_n_buffer_errors;
+
+      words_available = buffer_state >> 0x10;
+      if (words_available > kBufferDepth)
+        ++m_n_buffer_overflows;
+
+      size_t n_pushed = 0;
+      for (size_t i = 0; i + g_hsi_event_size <= words.size(); i += g_hsi_event_size) {
+        if (m_events.push(decode_event(&words.at(i))))
+          ++n_pushed;
+        else
+          ++m_n_dropped_events;
+      }
+      m_n_words += words.size();
+      m_n_events += n_pushed;
+      if (n_pushed)
+        notify_consumers();
+
+      // complete events are already waiting, read them straight away
+      if (words_available >= g_hsi_event_size) {
+        poll_interval = kMinPollInterval;
+        continue;
+      }
+
+      if (words.empty()) {
+        ++m_n_empty_polls;
+        poll_interval = std::min(poll_interval * 2, kMaxPollInterval);
+      } else {
+        poll_interval = kMinPollInterval;
+      }
+    }
+
+    std::unique_lock<std::mutex> lock(m_wait_mutex);
+    m_stop_condition.wait_for(lock, poll_interval, [this]() { return m_stop_requested.load(); });
+  }
+
+  m_reader_done = true;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+HSIStreamReader::run_consumer(EventCallback callback)
+{
+  std::vector<HSIEvent> events;
+
+  while (true) {
+    // checked before draining, so that nothing pushed by the reader is left behind
+    bool reader_done = m_reader_done;
+
+    events.clear();
+    pop_events(events);
+    for (auto& event : events) {
+      try {
+        callback(event);
+      } catch (const std::exception& e) {
+        TLOG() << "HSI stream callback failed: " << e.what();
+      }
+    }
+
+    if (reader_done)
+      break;
+
+    if (events.empty()) {
+      std::unique_lock<std::mutex> lock(m_wait_mutex);
+      m_events_condition.wait_for(lock, std::chrono::milliseconds(100), [this]() {
+        return !m_events.empty() || m_reader_done;
+      });
+    }
+  }
+}
+//-----------------------------------------------------------------------------
+
+} // namespace timing
+} // namespace dunedaq
@@ -0,0 +1,46 @@
+/**
+ * @file HardwareIdentity.cpp
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#include "timing/HardwareIdentity.hpp"
+
+#include <memory>
+#include <mutex>
+#include <utility>
+
+namespace dunedaq {
+namespace timing {
+
+//-----------------------------------------------------------------------------
+std::shared_ptr<const HardwareIdentity>
+HardwareIdentityCache::get() const
+{
+  std::lock_guard<std::mutex> lock(m_mutex);
+  return m_identity;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+HardwareIdentityCache::store(std::shared_ptr<const HardwareIdentity> identity)
+{
+  std::lock_guard<std::mutex> lock(m_mutex);
+  m_identity = std::move(identity);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+HardwareIdentityCache::clear()
+{
+  std::lock_guard<std::mutex> lock(m_mutex);
+  m_identity.reset();
+}
+//-----------------------------------------------------------------------------
+
+} // namespace timing
+} // namespace dunedaq
@@ -23,7 +23,10 @@
 #include <boost/range/algorithm/copy.hpp>
 
 #include <algorithm>
+#include <chrono>
+#include <map>
 #include <string>
+#include <thread>
 #include <unordered_map>
 #include <utility>
 #include <vector>
@@ -55,6 +58,12 @@ const uint8_t I2CMasterNode::kArbitrationLostBit = 0x20; // arblost = 0x1 << 5
 const uint8_t I2CMasterNode::kInProgressBit = 0x2;       // inprogress = 0x1 << 1 // NOLINT(build/unsigned)
 const uint8_t I2CMasterNode::kInterruptBit = 0x1;        // interrupt = 0x1       // NOLINT(build/unsigned)
 
+const uint32_t I2CMasterNode::kCoreClockFrequency = 31250000; // NOLINT(build/unsigned)
+
+const std::chrono::microseconds I2CMasterNode::kTransferWaitFirstInterval(10);
+const std::chrono::microseconds I2CMasterNode::kTransferWaitMaxInterval(100);
+const uint32_t I2CMasterNode::kTransferWaitMaxPolls = 20; // NOLINT(build/unsigned)
+
 //-----------------------------------------------------------------------------
 I2CMasterNode::I2CMasterNode(const uhal::Node& node)
   : uhal::Node(node)
@@ -82,14 +91,16 @@ I2CMasterNode::constructor()
   m_clock_prescale = 0x40;
   // m_clock_prescale = 0x100;
 
+  // Batched transactions are on by default.
+  m_batched_transactions = true;
+
   // Build the list of slaves
-  // Loop over node parameters. Each parameter becomes a slave node.
+  // Loop over node parameters. Each parameter becomes a slave node, created when first requested.
   const std::unordered_map<std::string, std::string>& parameters = this->getParameters();
   std::unordered_map<std::string, std::string>::const_iterator it;
   for (it = parameters.begin(); it != parameters.end(); ++it) {
     uint32_t slave_addr = (boost::lexical_cast<timing::stoul<uint32_t>>(it->second) & 0x7f); // NOLINT(build/unsigned)
     m_i2c_device_addresses.insert(std::make_pair(it->first, slave_addr));
-    m_i2c_devices.insert(std::make_pair(it->first, new I2CSlave(this, slave_addr)));
   }
 }
 //-----------------------------------------------------------------------------
@@ -105,6 +116,49 @@ I2CMasterNode::~I2CMasterNode()
 }
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+I2CMasterNode::BusState&
+I2CMasterNode::get_bus_state() const
+{
+  std::call_once(m_bus_state_flag, [this]() {
+    static std::mutex s_bus_states_mutex;
+    static std::map<std::string, std::weak_ptr<BusState>> s_bus_states;
+
+    std::lock_guard<std::mutex> lock(s_bus_states_mutex);
+    std::weak_ptr<BusState>& entry = s_bus_states[getClient().uri() + "#" + getPath()];
+    m_bus_state = entry.lock();
+    if (!m_bus_state) {
+      m_bus_state = std::make_shared<BusState>();
+      m_bus_state->session_depth = 0;
+      m_bus_state->reset_pending = false;
+      m_bus_state->generation = 0;
+      entry = m_bus_state;
+    }
+  });
+  return *m_bus_state;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+uint64_t // NOLINT(build/unsigned)
+I2CMasterNode::get_bus_generation() const
+{
+  BusState& bus_state = get_bus_state();
+  std::lock_guard<std::recursive_mutex> lock(bus_state.mutex);
+  return bus_state.generation;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+I2CMasterNode::invalidate_device_state() const
+{
+  BusState& bus_state = get_bus_state();
+  std::lock_guard<std::recursive_mutex> lock(bus_state.mutex);
+  ++bus_state.generation;
+}
+//-----------------------------------------------------------------------------
+
 //-----------------------------------------------------------------------------
 std::vector<std::string>
 I2CMasterNode::get_slaves() const
@@ -133,9 +187,11 @@ I2CMasterNode::get_slave_address(const std::string& name) const
 const I2CSlave&
 I2CMasterNode::get_slave(const std::string& name) const
 {
+  std::lock_guard<std::mutex> lock(m_i2c_devices_mutex);
+
   std::unordered_map<std::string, I2CSlave*>::const_iterator it = m_i2c_devices.find(name);
   if (it == m_i2c_devices.end()) {
-    throw I2CDeviceNotFound(ERS_HERE, getId(), name);
+    it = m_i2c_devices.insert(std::make_pair(name, new I2CSlave(this, get_slave_address(name)))).first;
   }
   return *(it->second);
 }
@@ -176,11 +232,30 @@ I2CMasterNode::read_i2cArray(uint8_t i2c_device_address,     // NOLINT(build/uns
                              uint32_t i2c_reg_address,       // NOLINT(build/unsigned)
                              uint32_t number_of_words) const // NOLINT(build/unsigned)
 {
+  // address write and read must not be interleaved with other transfers
+  I2CBusSession session(*this);
+  prepare_bus();
+
   // write one word containing the address
   std::vector<uint8_t> lArray{ (uint8_t)(i2c_reg_address & 0xff) }; // NOLINT(build/unsigned)
-  this->write_block_i2c(i2c_device_address, lArray);
+
+  if (m_batched_transactions) {
+    std::vector<std::vector<uint8_t>> read_data; // NOLINT(build/unsigned)
+    if (execute_batched_transfers({ build_write_transfer(i2c_device_address, lArray, true),
+                                    build_read_transfer(i2c_device_address, number_of_words) },
+                                  read_data) == 2)
+      return read_data.back();
+
+    TLOG_DEBUG(4) << getId() << ": batched read from " << format_reg_value((uint32_t)i2c_device_address) // NOLINT(build/unsigned)
+                  << " failed, falling back to step-by-step mode";
+    reset();
+  }
+
+  // The bytes read before a failure moved the register pointer of the device on:
+  // restart from the address write
+  this->write_block_i2c_stepwise(i2c_device_address, lArray, true);
   // request the content at the specific address
-  return this->read_block_i2c(i2c_device_address, number_of_words);
+  return this->read_block_i2c_stepwise(i2c_device_address, number_of_words);
 }
 //-----------------------------------------------------------------------------
 
@@ -221,11 +296,117 @@ I2CMasterNode::write_i2cPrimitive(uint8_t i2c_device_address,       // NOLINT(bu
 }
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+void
+I2CMasterNode::write_i2cArrays(uint8_t i2c_device_address, // NOLINT(build/unsigned)
+                               const RegisterWriteList& writes,
+                               size_t* n_written) const
+{
+  size_t written(0);
+  if (n_written)
+    *n_written = written;
+
+  if (writes.empty())
+    return;
+
+  std::vector<std::vector<uint8_t>> blocks; // NOLINT(build/unsigned)
+  std::vector<I2CTransfer> transfers;
+  blocks.reserve(writes.size());
+  transfers.reserve(writes.size());
+  for (auto& write : writes) {
+    std::vector<uint8_t> block(write.second.size() + 1); // NOLINT(build/unsigned)
+    block[0] = (write.first & 0xff);
+    std::copy(write.second.begin(), write.second.end(), block.begin() + 1);
+    transfers.push_back(build_write_transfer(i2c_device_address, block, true));
+    blocks.push_back(block);
+  }
+
+  // Reset bus before beginning
+  I2CBusSession session(*this);
+  prepare_bus();
+
+  if (!m_batched_transactions) {
+    for (auto& block : blocks) {
+      write_block_i2c_stepwise(i2c_device_address, block, true);
+      if (n_written)
+        *n_written = ++written;
+    }
+    return;
+  }
+
+  for (size_t first = 0; first < transfers.size();) {
+    std::vector<I2CTransfer> remaining(transfers.begin() + first, transfers.end());
+    std::vector<std::vector<uint8_t>> read_data; // NOLINT(build/unsigned)
+    size_t failed = first + execute_batched_transfers(remaining, read_data);
+    if (n_written)
+      *n_written = failed;
+    if (failed == transfers.size())
+      break;
+
+    TLOG_DEBUG(4) << getId() << ": batched write to " << format_reg_value((uint32_t)i2c_device_address) // NOLINT(build/unsigned)
+                  << " failed at transfer " << failed << ", replaying it in step-by-step mode";
+    reset();
+
+    // Replay the failed transfer one operation at a time, then carry on with the others
+    write_block_i2c_stepwise(i2c_device_address, blocks[failed], true);
+    first = failed + 1;
+    if (n_written)
+      *n_written = first;
+  }
+}
+//-----------------------------------------------------------------------------
+
 //-----------------------------------------------------------------------------
 void
 I2CMasterNode::write_block_i2c(uint8_t i2c_device_address,         // NOLINT(build/unsigned)
                                const std::vector<uint8_t>& data, // NOLINT(build/unsigned)
                                bool send_stop) const
+{
+  // Reset bus before beginning
+  I2CBusSession session(*this);
+  prepare_bus();
+
+  if (m_batched_transactions) {
+    std::vector<std::vector<uint8_t>> read_data; // NOLINT(build/unsigned)
+    if (execute_batched_transfers({ build_write_transfer(i2c_device_address, data, send_stop) }, read_data) == 1)
+      return;
+
+    TLOG_DEBUG(4) << getId() << ": batched write to " << format_reg_value((uint32_t)i2c_device_address) // NOLINT(build/unsigned)
+                  << " failed, falling back to step-by-step mode";
+    reset();
+  }
+
+  write_block_i2c_stepwise(i2c_device_address, data, send_stop);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::vector<uint8_t>                                                                      // NOLINT(build/unsigned)
+I2CMasterNode::read_block_i2c(uint8_t i2c_device_address, uint32_t number_of_bytes) const // NOLINT(build/unsigned)
+{
+  // Reset bus before beginning
+  I2CBusSession session(*this);
+  prepare_bus();
+
+  if (m_batched_transactions) {
+    std::vector<std::vector<uint8_t>> read_data; // NOLINT(build/unsigned)
+    if (execute_batched_transfers({ build_read_transfer(i2c_device_address, number_of_bytes) }, read_data) == 1)
+      return read_data.front();
+
+    TLOG_DEBUG(4) << getId() << ": batched read from " << format_reg_value((uint32_t)i2c_device_address) // NOLINT(build/unsigned)
+                  << " failed, falling back to step-by-step mode";
+    reset();
+  }
+
+  return read_block_i2c_stepwise(i2c_device_address, number_of_bytes);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+I2CMasterNode::write_block_i2c_stepwise(uint8_t i2c_device_address,       // NOLINT(build/unsigned)
+                                        const std::vector<uint8_t>& data, // NOLINT(build/unsigned)
+                                        bool send_stop) const
 {
   // transmit reg definitions
   // bits 7-1: 7-bit slave address during address transfer
@@ -242,9 +423,6 @@ I2CMasterNode::write_block_i2c(uint8_t i2c_device_address,         // NOLINT(bui
   // bit 2:1: Reserved
   // bit 0: Interrupt acknowledge. When set, clears a pending interrupt
 
-  // Reset bus before beginning
-  reset();
-
   // Open the connection and send the slave address, bit 0 set to zero
   send_i2c_command_and_write_data(kStartCmd, (i2c_device_address << 1) & 0xfe);
 
@@ -260,8 +438,8 @@ I2CMasterNode::write_block_i2c(uint8_t i2c_device_address,         // NOLINT(bui
 //-----------------------------------------------------------------------------
 
 //-----------------------------------------------------------------------------
-std::vector<uint8_t>                                                                // NOLINT(build/unsigned)
-I2CMasterNode::read_block_i2c(uint8_t i2c_device_address, uint32_t number_of_bytes) const // NOLINT(build/unsigned)
+std::vector<uint8_t>                                                                               // NOLINT(build/unsigned)
+I2CMasterNode::read_block_i2c_stepwise(uint8_t i2c_device_address, uint32_t number_of_bytes) const // NOLINT(build/unsigned)
 {
   // transmit reg definitions
   // bits 7-1: 7-bit slave address during address transfer
@@ -278,9 +456,6 @@ I2CMasterNode::read_block_i2c(uint8_t i2c_device_address, uint32_t number_of_byt
   // bit 2:1: Reserved
   // bit 0:   Interrupt acknowledge. When set, clears a pending interrupt
 
-  // Reset bus before beginning
-  reset();
-
   // Open the connection & send the target i2c address. Bit 0 set to 1 (read)
   send_i2c_command_and_write_data(kStartCmd, (i2c_device_address << 1) | 0x01);
 
@@ -296,12 +471,160 @@ I2CMasterNode::read_block_i2c(uint8_t i2c_device_address, uint32_t number_of_byt
 }
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+I2CMasterNode::I2CTransfer
+I2CMasterNode::build_write_transfer(uint8_t i2c_device_address,       // NOLINT(build/unsigned)
+                                    const std::vector<uint8_t>& data, // NOLINT(build/unsigned)
+                                    bool send_stop) const
+{
+  I2CTransfer transfer;
+  transfer.reserve(data.size() + 1);
+
+  // Slave address, bit 0 set to zero
+  transfer.push_back({ (uint8_t)(kStartCmd | kWriteToSlaveCmd), (uint8_t)((i2c_device_address << 1) & 0xfe) }); // NOLINT(build/unsigned)
+
+  for (unsigned ibyte = 0; ibyte < data.size(); ibyte++) {
+    uint8_t cmd = (((ibyte == data.size() - 1) && send_stop) ? kStopCmd : 0x0); // NOLINT(build/unsigned)
+    transfer.push_back({ (uint8_t)(cmd | kWriteToSlaveCmd), data[ibyte] });     // NOLINT(build/unsigned)
+  }
+  return transfer;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+I2CMasterNode::I2CTransfer
+I2CMasterNode::build_read_transfer(uint8_t i2c_device_address, uint32_t number_of_bytes) const // NOLINT(build/unsigned)
+{
+  I2CTransfer transfer;
+  transfer.reserve(number_of_bytes + 1);
+
+  // Slave address, bit 0 set to 1 (read)
+  transfer.push_back({ (uint8_t)(kStartCmd | kWriteToSlaveCmd), (uint8_t)((i2c_device_address << 1) | 0x01) }); // NOLINT(build/unsigned)
+
+  for (unsigned ibyte = 0; ibyte < number_of_bytes; ibyte++) {
+    uint8_t cmd = ((ibyte == number_of_bytes - 1) ? (kStopCmd | kAckCmd) : 0x0); // NOLINT(build/unsigned)
+    transfer.push_back({ (uint8_t)(cmd | kReadFromSlaveCmd), 0x0 });           // NOLINT(build/unsigned)
+  }
+  return transfer;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+uint64_t // NOLINT(build/unsigned)
+I2CMasterNode::get_operation_cycles(const I2CByteOp& op) const
+{
+  // 8 data bits and the acknowledge bit, plus the start and stop conditions,
+  // each bit lasting 5 x (prescale + 1) core clock cycles
+  uint64_t bits = 9 + ((op.command & kStartCmd) ? 1 : 0) + ((op.command & kStopCmd) ? 1 : 0); // NOLINT(build/unsigned)
+  return 5 * (m_clock_prescale + 1) * bits;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::chrono::microseconds
+I2CMasterNode::get_operation_duration(const I2CByteOp& op) const
+{
+  uint64_t cycles = get_operation_cycles(op); // NOLINT(build/unsigned)
+  return std::chrono::microseconds((cycles * 1000000 + kCoreClockFrequency - 1) / kCoreClockFrequency);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+uint32_t // NOLINT(build/unsigned)
+I2CMasterNode::get_status_train_length(const I2CByteOp& op) const
+{
+  return get_operation_cycles(op) + 1;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+size_t
+I2CMasterNode::execute_batched_transfers(const std::vector<I2CTransfer>& transfers,
+                                         std::vector<std::vector<uint8_t>>& read_data) const // NOLINT(build/unsigned)
+{
+  // The core ignores the commands written while a transfer is in progress, so each bus
+  // operation must only be issued once the previous one is complete. A whole transfer is
+  // queued in a single dispatch: the tx and cmd writes of each operation are followed by a
+  // train of status reads, lasting at least the time the operation takes on the bus, and by
+  // the rx read of the read operations. The last status of each train tells whether the
+  // operation was complete and successful before the next one was written.
+  const uhal::Node& tx_node = getNode(kTxNode);
+  const uhal::Node& cmd_node = getNode(kCmdNode);
+  const uhal::Node& rx_node = getNode(kRxNode);
+  const uint32_t status_address = getNode(kStatusNode).getAddress(); // NOLINT(build/unsigned)
+
+  read_data.clear();
+
+  for (size_t i = 0; i < transfers.size(); ++i) {
+    const I2CTransfer& transfer = transfers[i];
+    std::vector<uhal::ValVector<uint32_t>> status_trains; // NOLINT(build/unsigned)
+    std::vector<uhal::ValWord<uint32_t>> rx_words;        // NOLINT(build/unsigned)
+    status_trains.reserve(transfer.size());
+
+    uint64_t words_read(0), words_written(0); // NOLINT(build/unsigned)
+    for (auto& op : transfer) {
+      if (op.command & kWriteToSlaveCmd) {
+        tx_node.write(op.data);
+        ++words_written;
+      }
+      cmd_node.write(op.command);
+      ++words_written;
+
+      uint32_t train_length = get_status_train_length(op); // NOLINT(build/unsigned)
+      status_trains.push_back(getClient().readBlock(status_address, train_length, uhal::defs::NON_INCREMENTAL));
+      words_read += train_length;
+
+      if (op.command & kReadFromSlaveCmd) {
+        rx_words.push_back(rx_node.read());
+        ++words_read;
+      }
+    }
+    IPbusProfiler::count_words(words_read, words_written);
+    IPbusProfiler::dispatch(getClient());
+
+    std::vector<uint8_t> data; // NOLINT(build/unsigned)
+    auto rx = rx_words.begin();
+    for (size_t j = 0; j < transfer.size(); ++j) {
+      const I2CByteOp& op = transfer[j];
+      const auto& train = status_trains[j];
+      uint32_t i2c_status = train.at(train.size() - 1); // NOLINT(build/unsigned)
+
+      std::string error;
+      if (i2c_status & kArbitrationLostBit) {
+        error = "arbitration lost";
+      } else if (i2c_status & kInProgressBit) {
+        error = "operation still in progress at the end of its status train";
+      } else if ((op.command & kWriteToSlaveCmd) && (i2c_status & kReceivedAckBit)) {
+        error = "no acknowledge received";
+      } else if ((op.command & kStopCmd) && (i2c_status & kBusyBit)) {
+        error = "transfer finished but bus still busy";
+      }
+
+      if (!error.empty()) {
+        TLOG_DEBUG(4) << getId() << ": batched transfer " << i << " failed at operation " << j << ": " << error;
+        mark_bus_error();
+        return i;
+      }
+
+      if (op.command & kReadFromSlaveCmd) {
+        data.push_back(rx->value() & 0xff);
+        ++rx;
+      }
+    }
+    read_data.push_back(data);
+  }
+
+  return transfers.size();
+}
+//-----------------------------------------------------------------------------
+
 //-----------------------------------------------------------------------------
 bool
 I2CMasterNode::ping(uint8_t i2c_device_address) const // NOLINT(build/unsigned)
 {
   // Reset bus before beginning
-  reset();
+  I2CBusSession session(*this);
+  prepare_bus();
 
   try {
     send_i2c_command_and_write_data(kStartCmd, (i2c_device_address << 1) | 0x01);
@@ -321,7 +644,8 @@ I2CMasterNode::scan() const
   std::vector<uint8_t> address_vector; // NOLINT(build/unsigned)
 
   // Reset bus before beginning
-  reset();
+  I2CBusSession session(*this);
+  prepare_bus();
 
   for (uint8_t iaddr(0); iaddr < 0x7f; ++iaddr) { // NOLINT(build/unsigned)
     // Open the connection & send the target i2c address. Bit 0 set to 1 (read)
@@ -352,10 +676,12 @@ I2CMasterNode::reset() const
   //        3) Enables the I2C core
   //        4) Sets all writable bus-master registers to default values
 
+  std::lock_guard<std::recursive_mutex> lock(get_bus_state().mutex);
+
   auto ctrl = getNode(kCtrlNode).read();
   auto pre_hi = getNode(kPreHiNode).read();
   auto pre_lo = getNode(kPreLoNode).read();
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
 
   bool full_reset(false);
 
@@ -364,7 +690,7 @@ I2CMasterNode::reset() const
   if (full_reset) {
     // disable the I2C core
     getNode(kCtrlNode).write(0x00);
-    getClient().dispatch();
+    IPbusProfiler::dispatch(getClient());
     // set the clock prescale
     getNode(kPreHiNode).write((m_clock_prescale & 0xff00) >> 8);
     // getClient().dispatch();
@@ -373,20 +699,47 @@ I2CMasterNode::reset() const
     // set all writable bus-master registers to default values
     getNode(kTxNode).write(0x00);
     getNode(kCmdNode).write(0x00);
-    getClient().dispatch();
+    IPbusProfiler::dispatch(getClient());
 
     // enable the I2C core
     getNode(kCtrlNode).write(0x80);
-    getClient().dispatch();
+    IPbusProfiler::dispatch(getClient());
   } else {
     // set all writable bus-master registers to default values
     getNode(kTxNode).write(0x00);
     getNode(kCmdNode).write(0x00);
-    getClient().dispatch();
+    IPbusProfiler::dispatch(getClient());
+  }
+
+  // A bus error already started a new generation. Otherwise only a reconfiguration of the
+  // core, e.g. after the firmware was reloaded, can have disturbed the devices.
+  get_bus_state().reset_pending = false;
+  if (full_reset)
+    ++get_bus_state().generation;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+I2CMasterNode::prepare_bus() const
+{
+  if (get_bus_state().reset_pending) {
+    reset();
   }
 }
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+void
+I2CMasterNode::mark_bus_error() const
+{
+  // the devices may have been left in any state, e.g. half way through a page switch
+  BusState& bus_state = get_bus_state();
+  bus_state.reset_pending = true;
+  ++bus_state.generation;
+}
+//-----------------------------------------------------------------------------
+
 //-----------------------------------------------------------------------------
 uint8_t                                                              // NOLINT(build/unsigned)
 I2CMasterNode::send_i2c_command_and_read_data(uint8_t command) const // NOLINT(build/unsigned)
@@ -399,14 +752,14 @@ I2CMasterNode::send_i2c_command_and_read_data(uint8_t command) const // NOLINT(b
 
   // Force the read bit high and set them cmd bits
   getNode(kCmdNode).write(full_cmd);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
 
   // Wait for transaction to finish. Require idle bus at the end if stop bit is high)
   wait_until_finished(/*req ack*/ false, command & kStopCmd);
 
   // Pull the data out of the rx register.
   uhal::ValWord<uint32_t> result = getNode(kRxNode).read(); // NOLINT(build/unsigned)
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
 
   TLOG_DEBUG(4) << "<< receive data      = " << format_reg_value((uint32_t)result); // NOLINT(build/unsigned)v
 
@@ -430,13 +783,13 @@ I2CMasterNode::send_i2c_command_and_write_data(uint8_t command, uint8_t data) co
 
   // write the payload
   getNode(kTxNode).write(data);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
 
   // Force the write bit high and set them cmd bits
   getNode(kCmdNode).write(full_cmd);
 
   // Run the commands and wait for transaction to finish
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
 
   // Wait for transaction to finish. Require idle bus at the end if stop bit is high
   // wait_until_finished(req_hack, requ_idle)
@@ -454,54 +807,95 @@ I2CMasterNode::wait_until_finished(bool require_acknowledgement, bool require_bu
   // and will not allow execution to continue until the
   // I2C bus has completed properly.  It will throw an exception
   // if it picks up bus problems or a bus timeout occurs.
-  const unsigned max_retry = 20;
-  unsigned attempt = 1;
-  bool received_acknowledge, busy;
-
-  const uhal::Node& status_node = getNode(kStatusNode);
-
-  while (attempt <= max_retry) {
-    usleep(10);
-    // Get the status
-    uhal::ValWord<uint32_t> i2c_status = status_node.read(); // NOLINT(build/unsigned)
-    getClient().dispatch();
-
-    received_acknowledge = !(i2c_status & kReceivedAckBit);
-    busy = (i2c_status & kBusyBit);
-    bool arbitration_lost = (i2c_status & kArbitrationLostBit);
-    bool transfer_in_progress = (i2c_status & kInProgressBit);
-
-    if (arbitration_lost) {
-      // This is an instant error at any time
-      throw I2CBusArbitrationLost(ERS_HERE, getId());
-    }
-
-    if (!transfer_in_progress) {
-      // The transfer looks to have completed successfully,
-      // pending further checks
-      break;
-    }
-
-    attempt += 1;
+  auto result = TimingNode::wait_for(*this,
+                                     { kStatusNode },
+                                     [](const std::vector<uint32_t>& values) { // NOLINT(build/unsigned)
+                                       // arbitration lost is an instant error at any time
+                                       return (values.at(0) & kArbitrationLostBit) || !(values.at(0) & kInProgressBit);
+                                     },
+                                     WaitSchedule(kTransferWaitFirstInterval,
+                                                  kTransferWaitMaxInterval,
+                                                  std::chrono::microseconds(0),
+                                                  2,
+                                                  kTransferWaitMaxPolls),
+                                     "I2CMasterNode::wait_until_finished");
+  uint32_t i2c_status = result.values.at(0); // NOLINT(build/unsigned)
+
+  if (i2c_status & kArbitrationLostBit) {
+    mark_bus_error();
+    throw I2CBusArbitrationLost(ERS_HERE, getId());
   }
 
-  // At this point, we've either had too many retries, or the
+  // At this point, we've either had too many polls, or the
   // Transfer in Progress (TIP) bit went low.  If the TIP bit
   // did go low, then we do a couple of other checks to see if
   // the bus operated as expected:
 
-  if (attempt > max_retry) {
+  if (!result.satisfied) {
+    mark_bus_error();
     throw I2CTransactionTimeout(ERS_HERE, getId());
   }
 
+  bool received_acknowledge = !(i2c_status & kReceivedAckBit);
+  bool busy = (i2c_status & kBusyBit);
+
   if (require_acknowledgement && !received_acknowledge) {
+    mark_bus_error();
     throw I2CNoAcknowledgeReceived(ERS_HERE, getId());
   }
 
   if (require_bus_idle_at_end && busy) {
+    mark_bus_error();
     throw I2CTransferFinishedBusStillBusy(ERS_HERE, getId());
   }
 }
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+I2CBusSession::I2CBusSession(const I2CMasterNode& i2c_master)
+  : m_i2c_master(i2c_master)
+  , m_lock(i2c_master.get_bus_state().mutex)
+  , m_owner(std::this_thread::get_id())
+  , m_open(false)
+{
+  // Validate and configure the core once for the whole session
+  I2CMasterNode::BusState& bus_state = m_i2c_master.get_bus_state();
+  if (bus_state.session_depth == 0) {
+    m_i2c_master.reset();
+  }
+  ++bus_state.session_depth;
+  m_open = true;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+I2CBusSession::~I2CBusSession()
+{
+  if (m_open && std::this_thread::get_id() != m_owner) {
+    // Unlocking a mutex owned by another thread is undefined, keep the bus locked
+    ers::error(I2CBusSessionWrongThread(ERS_HERE, m_i2c_master.getId()));
+    m_lock.release();
+    return;
+  }
+  close();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+I2CBusSession::close()
+{
+  if (!m_open)
+    return;
+
+  if (std::this_thread::get_id() != m_owner)
+    throw I2CBusSessionWrongThread(ERS_HERE, m_i2c_master.getId());
+
+  --m_i2c_master.get_bus_state().session_depth;
+  m_open = false;
+  m_lock.unlock();
+}
+//-----------------------------------------------------------------------------
 
 } // namespace timing
 } // namespace dunedaq
\ No newline at end of file
@@ -0,0 +1,396 @@
+/**
+ * @file I2CMultiBusExecutor.cpp
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#include "timing/I2CMultiBusExecutor.hpp"
+
+#include "logging/Logging.hpp"
+
+#include <algorithm>
+#include <chrono>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <utility>
+#include <vector>
+
+namespace dunedaq {
+namespace timing {
+
+//-----------------------------------------------------------------------------
+// Jobs of a single I2C core, run in order
+struct I2CMultiBusExecutor::Lane
+{
+  const I2CMasterNode* master;
+  I2CMasterNode::BusState* bus;
+  std::vector<JobId> jobs;
+  size_t job_index;
+  size_t transfer_index;
+  size_t op_index;
+  //! bytes read so far by the current transfer
+  std::vector<uint8_t> transfer_data; // NOLINT(build/unsigned)
+
+  bool finished() const { return job_index >= jobs.size(); }
+};
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+I2CMultiBusExecutor::I2CMultiBusExecutor()
+  : m_dispatches(0)
+{}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+I2CMultiBusExecutor::~I2CMultiBusExecutor() {}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+I2CMultiBusExecutor::JobId
+I2CMultiBusExecutor::add_read(const I2CMasterNode& master,
+                              uint8_t i2c_device_address, // NOLINT(build/unsigned)
+                              uint32_t i2c_reg_address,   // NOLINT(build/unsigned)
+                              uint32_t number_of_bytes)   // NOLINT(build/unsigned)
+{
+  Job job;
+  job.master = &master;
+  job.i2c_device_address = i2c_device_address;
+
+  // write one word containing the address, then request the content at the specific address
+  std::vector<uint8_t> address_block{ (uint8_t)(i2c_reg_address & 0xff) }; // NOLINT(build/unsigned)
+  job.transfers.push_back(master.build_write_transfer(i2c_device_address, address_block, true));
+  job.write_blocks.push_back(address_block);
+  job.read_sizes.push_back(0);
+
+  job.transfers.push_back(master.build_read_transfer(i2c_device_address, number_of_bytes));
+  job.write_blocks.push_back({});
+  job.read_sizes.push_back(number_of_bytes);
+
+  return add_job(std::move(job));
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+I2CMultiBusExecutor::JobId
+I2CMultiBusExecutor::add_read(const I2CSlave& slave,
+                              uint32_t i2c_reg_address, // NOLINT(build/unsigned)
+                              uint32_t number_of_bytes) // NOLINT(build/unsigned)
+{
+  return add_read(slave.get_master(), slave.get_i2c_address(), i2c_reg_address, number_of_bytes);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+I2CMultiBusExecutor::JobId
+I2CMultiBusExecutor::add_writes(const I2CMasterNode& master,
+                                uint8_t i2c_device_address, // NOLINT(build/unsigned)
+                                const I2CMasterNode::RegisterWriteList& writes)
+{
+  Job job;
+  job.master = &master;
+  job.i2c_device_address = i2c_device_address;
+
+  for (auto& write : writes) {
+    std::vector<uint8_t> block(write.second.size() + 1); // NOLINT(build/unsigned)
+    block[0] = (write.first & 0xff);
+    std::copy(write.second.begin(), write.second.end(), block.begin() + 1);
+    job.transfers.push_back(master.build_write_transfer(i2c_device_address, block, true));
+    job.write_blocks.push_back(block);
+    job.read_sizes.push_back(0);
+  }
+
+  return add_job(std::move(job));
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+I2CMultiBusExecutor::JobId
+I2CMultiBusExecutor::add_writes(const I2CSlave& slave, const I2CMasterNode::RegisterWriteList& writes)
+{
+  return add_writes(slave.get_master(), slave.get_i2c_address(), writes);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+I2CMultiBusExecutor::JobId
+I2CMultiBusExecutor::add_job(Job&& job)
+{
+  if (!m_jobs.empty() && &m_jobs.front().master->getClient() != &job.master->getClient()) {
+    throw I2CMultiBusClientMismatch(ERS_HERE, job.master->getId());
+  }
+
+  job.done = false;
+  m_jobs.push_back(std::move(job));
+  return m_jobs.size() - 1;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+I2CMultiBusExecutor::clear()
+{
+  m_jobs.clear();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+I2CMultiBusExecutor::run_step_by_step(Job& job, size_t first_transfer) const
+{
+  try {
+    for (size_t i = first_transfer; i < job.transfers.size(); ++i) {
+      if (job.read_sizes.at(i)) {
+        auto transfer_data = job.master->read_block_i2c_stepwise(job.i2c_device_address, job.read_sizes.at(i));
+        job.data.insert(job.data.end(), transfer_data.begin(), transfer_data.end());
+      } else {
+        job.master->write_block_i2c_stepwise(job.i2c_device_address, job.write_blocks.at(i), true);
+      }
+    }
+  } catch (const I2CException& e) {
+    job.error = e.what();
+    // leave the bus in a clean state for the next job
+    job.master->reset();
+  }
+  job.done = true;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+I2CMultiBusExecutor::reset_buses(const std::vector<Lane>& lanes) const
+{
+  // Same as I2CMasterNode::prepare_bus, with the register accesses of all the buses sharing dispatches
+  struct Prescale
+  {
+    const I2CMasterNode* master;
+    uhal::ValWord<uint32_t> pre_hi; // NOLINT(build/unsigned)
+    uhal::ValWord<uint32_t> pre_lo; // NOLINT(build/unsigned)
+  };
+
+  std::vector<Prescale> prescales;
+  for (auto& lane : lanes) {
+    if (lane.bus->session_depth == 0 || lane.bus->reset_pending) {
+      prescales.push_back({ lane.master,
+                            lane.master->getNode(I2CMasterNode::kPreHiNode).read(),
+                            lane.master->getNode(I2CMasterNode::kPreLoNode).read() });
+    }
+  }
+  if (prescales.empty())
+    return;
+  IPbusProfiler::dispatch(prescales.front().master->getClient());
+
+  bool soft_resets(false);
+  for (auto& prescale : prescales) {
+    if (prescale.master->m_clock_prescale != (prescale.pre_hi << 8) + prescale.pre_lo) {
+      // the core needs to be configured
+      prescale.master->reset();
+    } else {
+      // set all writable bus-master registers to default values
+      prescale.master->getNode(I2CMasterNode::kTxNode).write(0x00);
+      prescale.master->getNode(I2CMasterNode::kCmdNode).write(0x00);
+      prescale.master->get_bus_state().reset_pending = false;
+      soft_resets = true;
+    }
+  }
+  if (soft_resets)
+    IPbusProfiler::dispatch(prescales.front().master->getClient());
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+I2CMultiBusExecutor::execute()
+{
+  IPbusProfiler::Scope scope("I2CMultiBusExecutor::execute");
+
+  // A bus operation is only issued once the previous operation of its bus has been seen
+  // complete, as the core ignores the commands written while a transfer is in progress.
+  // Each dispatch issues the next operation of every bus, so that the buses work in parallel
+  // and a dispatch lasts about one operation on the bus; the statuses of all the buses are
+  // then polled together until all the operations are complete.
+  struct IssuedOp
+  {
+    Lane* lane;
+    const I2CMasterNode::I2CByteOp* op;
+    uhal::ValWord<uint32_t> status; // NOLINT(build/unsigned)
+    uhal::ValWord<uint32_t> rx;     // NOLINT(build/unsigned)
+  };
+
+  m_dispatches = 0;
+
+  std::vector<Lane> lanes;
+  for (JobId id = 0; id < m_jobs.size(); ++id) {
+    Job& job = m_jobs.at(id);
+    job.done = false;
+    job.error.clear();
+    job.data.clear();
+
+    // copies of a master drive the same core, and share its lane
+    I2CMasterNode::BusState* bus = &job.master->get_bus_state();
+    auto lane = std::find_if(lanes.begin(), lanes.end(), [bus](const Lane& l) { return l.bus == bus; });
+    if (lane == lanes.end()) {
+      lanes.push_back({ job.master, bus, {}, 0, 0, 0, {} });
+      lane = lanes.end() - 1;
+    }
+    lane->jobs.push_back(id);
+  }
+
+  // Hold all the buses for the whole execution, locked in a fixed order
+  std::vector<I2CMasterNode::BusState*> buses;
+  for (auto& lane : lanes)
+    buses.push_back(lane.bus);
+  std::sort(buses.begin(), buses.end());
+  std::vector<std::unique_lock<std::recursive_mutex>> bus_locks;
+  for (auto bus : buses)
+    bus_locks.emplace_back(bus->mutex);
+
+  // Reset buses before beginning
+  reset_buses(lanes);
+
+  for (auto& lane : lanes) {
+    // buses not in batched mode run their jobs step by step
+    if (!lane.master->get_batched_transactions()) {
+      for (auto id : lane.jobs)
+        run_step_by_step(m_jobs.at(id), 0);
+      lane.job_index = lane.jobs.size();
+    }
+  }
+
+  // all the buses share the same client, checked when adding the jobs
+  const uhal::Node* client_node = lanes.empty() ? nullptr : lanes.front().master;
+
+  while (true) {
+    // Move on to the next job of the lanes whose job is complete
+    for (auto& lane : lanes) {
+      while (!lane.finished() && lane.transfer_index >= m_jobs.at(lane.jobs.at(lane.job_index)).transfers.size()) {
+        m_jobs.at(lane.jobs.at(lane.job_index)).done = true;
+        ++lane.job_index;
+        lane.transfer_index = 0;
+        lane.op_index = 0;
+      }
+    }
+    if (std::all_of(lanes.begin(), lanes.end(), [](const Lane& l) { return l.finished(); }))
+      break;
+
+    // Issue the next operation of the current job of every lane
+    std::vector<IssuedOp> issued;
+    std::chrono::microseconds duration(0);
+    for (auto& lane : lanes) {
+      if (lane.finished())
+        continue;
+
+      const Job& job = m_jobs.at(lane.jobs.at(lane.job_index));
+      const I2CMasterNode::I2CByteOp& op = job.transfers.at(lane.transfer_index).at(lane.op_index);
+      if (op.command & I2CMasterNode::kWriteToSlaveCmd) {
+        lane.master->getNode(I2CMasterNode::kTxNode).write(op.data);
+      }
+      lane.master->getNode(I2CMasterNode::kCmdNode).write(op.command);
+
+      issued.push_back({ &lane, &op, uhal::ValWord<uint32_t>(), uhal::ValWord<uint32_t>() }); // NOLINT(build/unsigned)
+      duration = std::max(duration, lane.master->get_operation_duration(op));
+    }
+
+    IPbusProfiler::dispatch(client_node->getClient());
+    ++m_dispatches;
+    std::this_thread::sleep_until(std::chrono::steady_clock::now() + duration);
+
+    // Poll the buses until their operation is complete, reading the received byte with the status
+    std::vector<IssuedOp*> in_progress;
+    for (auto& result : issued)
+      in_progress.push_back(&result);
+
+    std::vector<Lane*> failed_lanes;
+    std::chrono::microseconds interval = I2CMasterNode::kTransferWaitFirstInterval;
+    for (uint32_t poll = 0; !in_progress.empty(); ++poll) { // NOLINT(build/unsigned)
+      if (poll == I2CMasterNode::kTransferWaitMaxPolls) {
+        for (auto result : in_progress) {
+          TLOG_DEBUG(4) << result->lane->master->getId() << ": multi-bus transfer did not complete within " << poll
+                        << " status polls";
+          failed_lanes.push_back(result->lane);
+        }
+        break;
+      }
+      if (poll) {
+        std::this_thread::sleep_for(interval);
+        interval = std::min(2 * interval, I2CMasterNode::kTransferWaitMaxInterval);
+      }
+
+      for (auto result : in_progress) {
+        result->status = result->lane->master->getNode(I2CMasterNode::kStatusNode).read();
+        if (result->op->command & I2CMasterNode::kReadFromSlaveCmd) {
+          result->rx = result->lane->master->getNode(I2CMasterNode::kRxNode).read();
+        }
+      }
+      IPbusProfiler::dispatch(client_node->getClient());
+      ++m_dispatches;
+
+      std::vector<IssuedOp*> still_in_progress;
+      for (auto result : in_progress) {
+        Lane& lane = *result->lane;
+        uint32_t i2c_status = result->status.value(); // NOLINT(build/unsigned)
+
+        bool failed(false);
+        if (i2c_status & I2CMasterNode::kArbitrationLostBit) {
+          TLOG_DEBUG(4) << lane.master->getId() << ": arbitration lost in multi-bus transfer";
+          failed = true;
+        } else if (i2c_status & I2CMasterNode::kInProgressBit) {
+          still_in_progress.push_back(result);
+          continue;
+        } else if ((result->op->command & I2CMasterNode::kWriteToSlaveCmd) && (i2c_status & I2CMasterNode::kReceivedAckBit)) {
+          TLOG_DEBUG(4) << lane.master->getId() << ": no acknowledge received in multi-bus transfer";
+          failed = true;
+        } else if ((result->op->command & I2CMasterNode::kStopCmd) && (i2c_status & I2CMasterNode::kBusyBit)) {
+          TLOG_DEBUG(4) << lane.master->getId() << ": bus still busy at the end of multi-bus transfer";
+          failed = true;
+        }
+
+        if (failed) {
+          failed_lanes.push_back(&lane);
+          continue;
+        }
+
+        Job& job = m_jobs.at(lane.jobs.at(lane.job_index));
+        if (result->op->command & I2CMasterNode::kReadFromSlaveCmd) {
+          lane.transfer_data.push_back(result->rx.value() & 0xff);
+        }
+        if (++lane.op_index == job.transfers.at(lane.transfer_index).size()) {
+          job.data.insert(job.data.end(), lane.transfer_data.begin(), lane.transfer_data.end());
+          lane.transfer_data.clear();
+          lane.op_index = 0;
+          ++lane.transfer_index;
+        }
+      }
+      in_progress.swap(still_in_progress);
+    }
+
+    // Replay the failed jobs step by step. A read transfer depends on the register address
+    // written before it, so the replay starts from the last write transfer before the failure.
+    for (auto lane : failed_lanes) {
+      Job& job = m_jobs.at(lane->jobs.at(lane->job_index));
+
+      size_t first_transfer = lane->transfer_index;
+      while (first_transfer > 0 && job.read_sizes.at(first_transfer))
+        --first_transfer;
+
+      size_t kept_bytes(0);
+      for (size_t i = 0; i < first_transfer; ++i)
+        kept_bytes += job.read_sizes.at(i);
+      job.data.resize(kept_bytes);
+
+      TLOG_DEBUG(4) << lane->master->getId() << ": multi-bus transfer failed, replaying the job step by step from transfer "
+                    << first_transfer;
+      lane->master->reset();
+      lane->transfer_data.clear();
+      lane->op_index = 0;
+      run_step_by_step(job, first_transfer);
+      lane->transfer_index = job.transfers.size();
+    }
+  }
+}
+//-----------------------------------------------------------------------------
+
+} // namespace timing
+} // namespace dunedaq
@@ -10,6 +10,8 @@
 
 #include "logging/Logging.hpp"
 
+#include <algorithm>
+#include <map>
 #include <string>
 #include <utility>
 #include <vector>
@@ -17,6 +19,28 @@
 namespace dunedaq {
 namespace timing {
 
+// I2C address of the A2h diagnostics page
+const uint8_t I2CSFPSlave::kDDMI2CAddress = 0x51; // NOLINT(build/unsigned)
+
+// A0h serial number
+const uint32_t I2CSFPSlave::kSerialNumberAddress = 0x44; // NOLINT(build/unsigned)
+const uint32_t I2CSFPSlave::kSerialNumberSize = 0x10;    // NOLINT(build/unsigned)
+
+// A0h ID fields, vendor name (0x14) up to enhanced options (0x5D)
+const uint32_t I2CSFPSlave::kIDBlockAddress = 0x14; // NOLINT(build/unsigned)
+const uint32_t I2CSFPSlave::kIDBlockSize = 0x4A;    // NOLINT(build/unsigned)
+
+// A2h external calibration constants, rx power coefficients (0x38) up to voltage offset (0x5B)
+const uint32_t I2CSFPSlave::kCalibrationBlockAddress = 0x38; // NOLINT(build/unsigned)
+const uint32_t I2CSFPSlave::kCalibrationBlockSize = 0x24;    // NOLINT(build/unsigned)
+
+// A2h DDM values, temperature (0x60) up to optional status/control (0x6E)
+const uint32_t I2CSFPSlave::kDDMValuesAddress = 0x60; // NOLINT(build/unsigned)
+const uint32_t I2CSFPSlave::kDDMValuesSize = 0xF;     // NOLINT(build/unsigned)
+
+std::map<std::string, SFPStaticInfo> I2CSFPSlave::s_static_info_cache;
+std::mutex I2CSFPSlave::s_static_info_mutex;
+
 //-----------------------------------------------------------------------------
 I2CSFPSlave::I2CSFPSlave(const I2CMasterNode* i2c_master, uint8_t address) // NOLINT(build/unsigned)
   : I2CSlave(i2c_master, address)
@@ -60,16 +84,7 @@ I2CSFPSlave::read_calibration_parameter_pair(uint32_t calib_parameter_id) const
   ddm_available();
 
   auto parameter_array = this->read_i2cArray(0x51, m_calibration_parameter_start_addresses.at(calib_parameter_id), 0x4);
-
-  // slope
-  double slope = parameter_array.at(0) + (parameter_array.at(1) / 256.0);
-
-  uint32_t offset_raw = (parameter_array.at(2) & 0x7f) << 8 | parameter_array.at(3); // NOLINT(build/unsigned)
-
-  // eighth bit corresponds to sign
-  double offset = parameter_array.at(2) & (1UL << 7) ? offset_raw - 0x8000 : offset_raw;
-
-  return std::make_pair(slope, offset);
+  return decode_calibration_pair(parameter_array.data());
 }
 //-----------------------------------------------------------------------------
 
@@ -135,15 +150,8 @@ I2CSFPSlave::read_rx_ower() const
   std::vector<uint32_t> rx_param_start_adr = { 0x48, 0x44, 0x40, 0x3C, 0x38 }; // NOLINT(build/unsigned)
   std::vector<double> rx_parameters;
   for (auto it = rx_param_start_adr.begin(); it != rx_param_start_adr.end(); ++it) {
-    uint32_t parameter_bits = 0; // NOLINT(build/unsigned)
     auto parameter_array = this->read_i2cArray(0x51, *it, 0x4);
-
-    for (auto jt = parameter_array.begin(); jt != parameter_array.end(); ++jt)
-      parameter_bits = (parameter_bits << 8) | *jt;
-
-    // convert the 32 bits to a float according IEEE 754
-    double parameter = convert_bits_to_float(parameter_bits);
-    rx_parameters.push_back(parameter);
+    rx_parameters.push_back(decode_float(parameter_array.data()));
   }
 
   double rx_power_calib = 0;
@@ -302,6 +310,9 @@ I2CSFPSlave::read_i2c_reg_addressSwapBit() const
 void
 I2CSFPSlave::switch_soft_tx_control_bit(bool turn_on) const
 {
+  // Read-modify-write of the control byte, without other accesses in between
+  I2CBusSession session(get_master());
+
   ddm_available();
 
   if (!read_soft_tx_control_support_bit()) {
@@ -322,33 +333,229 @@ I2CSFPSlave::switch_soft_tx_control_bit(bool turn_on) const
 }
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+SFPStaticInfo
+I2CSFPSlave::read_static_info() const
+{
+  sfp_reachable();
+
+  SFPStaticInfo static_info;
+  auto serial_number = decode_text(this->read_i2cArray(kSerialNumberAddress, kSerialNumberSize), 0, kSerialNumberSize);
+  if (find_static_info(serial_number, static_info))
+    return static_info;
+
+  static_info = decode_id_block(this->read_i2cArray(kIDBlockAddress, kIDBlockSize));
+
+  if (static_info.ddm_supported && !static_info.address_swap_required) {
+    decode_calibration_block(this->read_i2cArray(kDDMI2CAddress, kCalibrationBlockAddress, kCalibrationBlockSize), static_info);
+  }
+
+  store_static_info(static_info);
+  return static_info;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+SFPStaticInfo
+I2CSFPSlave::decode_id_block(const std::vector<uint8_t>& id_block) // NOLINT(build/unsigned)
+{
+  SFPStaticInfo static_info;
+  static_info.vendor_name = decode_text(id_block, 0x14 - kIDBlockAddress, 0x10);
+  static_info.vendor_pn = decode_text(id_block, 0x28 - kIDBlockAddress, 0x10);
+  static_info.serial_number = decode_text(id_block, kSerialNumberAddress - kIDBlockAddress, kSerialNumberSize);
+
+  // Bit 6 of reg 5C: DDM supported, bit 2: special I2C address change operations needed to access the DDM area
+  // Bit 6 of reg 5D: soft tx control implemented
+  static_info.ddm_supported = id_block.at(0x5C - kIDBlockAddress) & 0x40;
+  static_info.address_swap_required = id_block.at(0x5C - kIDBlockAddress) & 0x4;
+  static_info.soft_tx_control_supported = id_block.at(0x5D - kIDBlockAddress) & 0x40;
+  return static_info;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+I2CSFPSlave::decode_calibration_block(const std::vector<uint8_t>& calibration_block, // NOLINT(build/unsigned)
+                                      SFPStaticInfo& static_info) const
+{
+  static_info.calibration_pairs.clear();
+  for (auto address : m_calibration_parameter_start_addresses) {
+    static_info.calibration_pairs.push_back(
+      decode_calibration_pair(calibration_block.data() + address - kCalibrationBlockAddress));
+  }
+
+  // rx power calib constants, 5 4-byte parameters, IEEE 754 float encoding, highest order first
+  static_info.rx_power_coefficients.clear();
+  for (uint32_t address = 0x48; address >= kCalibrationBlockAddress; address -= 0x4) { // NOLINT(build/unsigned)
+    static_info.rx_power_coefficients.push_back(decode_float(calibration_block.data() + address - kCalibrationBlockAddress));
+  }
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+bool
+I2CSFPSlave::find_static_info(const std::string& serial_number, SFPStaticInfo& static_info)
+{
+  std::lock_guard<std::mutex> lock(s_static_info_mutex);
+  auto cached = s_static_info_cache.find(serial_number);
+  if (cached == s_static_info_cache.end())
+    return false;
+  static_info = cached->second;
+  return true;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+I2CSFPSlave::store_static_info(const SFPStaticInfo& static_info)
+{
+  // blank serial numbers cannot tell modules apart, their data is not cached
+  if (static_info.serial_number.find_first_not_of(std::string(" \0", 2)) == std::string::npos)
+    return;
+
+  std::lock_guard<std::mutex> lock(s_static_info_mutex);
+  s_static_info_cache[static_info.serial_number] = static_info;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+SFPDDMSnapshot
+I2CSFPSlave::read_ddm_snapshot(const SFPStaticInfo& static_info) const
+{
+  if (!static_info.ddm_supported) {
+    throw SFPDDMUnsupported(ERS_HERE, get_master_id());
+  }
+  if (static_info.address_swap_required) {
+    throw SFPDDMI2CAddressSwapUnsupported(ERS_HERE, get_master_id());
+  }
+  return decode_ddm_snapshot(this->read_i2cArray(kDDMI2CAddress, kDDMValuesAddress, kDDMValuesSize), static_info);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+SFPDDMSnapshot
+I2CSFPSlave::decode_ddm_snapshot(const std::vector<uint8_t>& ddm_values, const SFPStaticInfo& static_info) // NOLINT(build/unsigned)
+{
+  auto word = [&ddm_values](uint32_t address) -> double { // NOLINT(build/unsigned)
+    return (ddm_values.at(address - kDDMValuesAddress) << 8) | ddm_values.at(address - kDDMValuesAddress + 1);
+  };
+
+  SFPDDMSnapshot snapshot;
+
+  // bit 7 corresponds to temperature sign, 0 for pos, 1 for neg
+  uint8_t temperature_msb = ddm_values.at(0x60 - kDDMValuesAddress); // NOLINT(build/unsigned)
+  double temperature = temperature_msb & (1UL << 7) ? (temperature_msb & 0x7f) - 0xff : temperature_msb;
+  snapshot.temperature_raw = temperature + (ddm_values.at(0x61 - kDDMValuesAddress) / 256.0);
+  snapshot.voltage_raw = word(0x62);
+  snapshot.current_raw = word(0x64);
+  snapshot.tx_power_raw = word(0x66);
+  snapshot.rx_power_raw = word(0x68);
+
+  auto calibrate = [&static_info](double raw, uint32_t calib_parameter_id) { // NOLINT(build/unsigned)
+    auto& calib_pair = static_info.calibration_pairs.at(calib_parameter_id);
+    return raw * calib_pair.first + calib_pair.second;
+  };
+
+  snapshot.current = calibrate(snapshot.current_raw, 0x0) * 0.002;
+  snapshot.tx_power = calibrate(snapshot.tx_power_raw, 0x1) * 0.1;
+  snapshot.temperature = calibrate(snapshot.temperature_raw, 0x2);
+  snapshot.voltage = calibrate(snapshot.voltage_raw, 0x3) * 1e-4;
+
+  double rx_power_calib = 0;
+  for (uint32_t i = 0; i < static_info.rx_power_coefficients.size(); ++i) { // NOLINT(build/unsigned)
+    rx_power_calib = rx_power_calib + (static_info.rx_power_coefficients.at(i) * pow(snapshot.rx_power_raw, i));
+  }
+  snapshot.rx_power = rx_power_calib * 0.1;
+
+  // Bit 6 of byte 0x6e: soft tx_disable, bit 7: tx_disable pin
+  uint8_t opt_status_ctrl_byte = ddm_values.at(0x6e - kDDMValuesAddress); // NOLINT(build/unsigned)
+  snapshot.tx_disable_sw = opt_status_ctrl_byte & 0x40;
+  snapshot.tx_disable_hw = opt_status_ctrl_byte & 0x80;
+
+  return snapshot;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+I2CSFPSlave::clear_static_info_cache()
+{
+  std::lock_guard<std::mutex> lock(s_static_info_mutex);
+  s_static_info_cache.clear();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::pair<double, double>
+I2CSFPSlave::decode_calibration_pair(const uint8_t* bytes) // NOLINT(build/unsigned)
+{
+  // slope
+  double slope = bytes[0] + (bytes[1] / 256.0);
+
+  uint32_t offset_raw = (bytes[2] & 0x7f) << 8 | bytes[3]; // NOLINT(build/unsigned)
+
+  // eighth bit corresponds to sign
+  double offset = bytes[2] & (1UL << 7) ? offset_raw - 0x8000 : offset_raw;
+
+  return std::make_pair(slope, offset);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+double
+I2CSFPSlave::decode_float(const uint8_t* bytes) // NOLINT(build/unsigned)
+{
+  uint32_t parameter_bits = 0; // NOLINT(build/unsigned)
+  for (size_t i = 0; i < 4; ++i)
+    parameter_bits = (parameter_bits << 8) | bytes[i];
+
+  // convert the 32 bits to a float according IEEE 754
+  return convert_bits_to_float(parameter_bits);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::string
+I2CSFPSlave::decode_text(const std::vector<uint8_t>& bytes, size_t start, size_t length) // NOLINT(build/unsigned)
+{
+  std::stringstream text;
+  for (size_t i = start; i < start + length; ++i) {
+    text << bytes.at(i);
+  }
+  return text.str();
+}
+//-----------------------------------------------------------------------------
+
 //-----------------------------------------------------------------------------
 std::string
 I2CSFPSlave::get_status(bool print_out) const
 {
-  sfp_reachable();
+  // Reset the bus once for the whole readout
+  I2CBusSession session(get_master());
+
+  auto static_info = read_static_info();
 
   std::stringstream status;
   std::vector<std::pair<std::string, std::string>> sfp_info;
 
   // Vendor name
-  sfp_info.push_back(std::make_pair("Vendor", read_vendor_name()));
+  sfp_info.push_back(std::make_pair("Vendor", static_info.vendor_name));
 
   // Vendor part number
-  sfp_info.push_back(std::make_pair("Part number", read_vendor_part_number()));
+  sfp_info.push_back(std::make_pair("Part number", static_info.vendor_pn));
 
   // Serial number
-  sfp_info.push_back(std::make_pair("Serial number", read_serial_number()));
+  sfp_info.push_back(std::make_pair("Serial number", static_info.serial_number));
 
   // Does the SFP support DDM
-  if (!read_ddm_support_bit()) {
+  if (!static_info.ddm_supported) {
     TLOG() << "DDM not available for SFP on I2C bus: " << get_master_id();
     status << format_reg_table(sfp_info, "SFP status", { "", "" });
     if (print_out)
       TLOG() << status.str();
     return status.str();
   } else {
-    if (read_i2c_reg_addressSwapBit()) {
+    if (static_info.address_swap_required) {
       TLOG() << "SFP DDM I2C address swap not supported. SFP on I2C bus: " << get_master_id();
       status << format_reg_table(sfp_info, "SFP status", { "", "" });
       if (print_out)
@@ -357,34 +564,36 @@ I2CSFPSlave::get_status(bool print_out) const
     }
   }
 
+  auto ddm = read_ddm_snapshot(static_info);
+
   std::stringstream temperature_stream;
-  temperature_stream << std::dec << std::fixed << std::setprecision(2) << read_temperature() << " C";
+  temperature_stream << std::dec << std::fixed << std::setprecision(2) << ddm.temperature << " C";
   sfp_info.push_back(std::make_pair("Temperature", temperature_stream.str()));
 
   std::stringstream voltage_stream;
-  voltage_stream << std::dec << std::fixed << std::setprecision(2) << read_voltage() << " V";
+  voltage_stream << std::dec << std::fixed << std::setprecision(2) << ddm.voltage << " V";
   sfp_info.push_back(std::make_pair("Supply voltage", voltage_stream.str()));
 
   std::stringstream rx_power_stream;
-  rx_power_stream << std::dec << std::fixed << std::setprecision(2) << read_rx_ower() << " uW";
+  rx_power_stream << std::dec << std::fixed << std::setprecision(2) << ddm.rx_power << " uW";
   sfp_info.push_back(std::make_pair("Rx power", rx_power_stream.str()));
 
   std::stringstream tx_power_stream;
-  tx_power_stream << std::dec << std::fixed << std::setprecision(2) << read_tx_power() << " uW";
+  tx_power_stream << std::dec << std::fixed << std::setprecision(2) << ddm.tx_power << " uW";
   sfp_info.push_back(std::make_pair("Tx power", tx_power_stream.str()));
 
   std::stringstream current_stream;
-  current_stream << std::dec << std::fixed << std::setprecision(2) << read_current() << " uA";
+  current_stream << std::dec << std::fixed << std::setprecision(2) << ddm.current << " uA";
   sfp_info.push_back(std::make_pair("Tx current", current_stream.str()));
 
-  if (read_soft_tx_control_support_bit()) {
+  if (static_info.soft_tx_control_supported) {
     // sfp_info.push_back(std::make_pair("Soft Tx disbale supported",  "True"));
-    sfp_info.push_back(std::make_pair("Tx disable bit", std::to_string(read_soft_tx_control_state())));
+    sfp_info.push_back(std::make_pair("Tx disable bit", std::to_string(ddm.tx_disable_sw)));
   } else {
     sfp_info.push_back(std::make_pair("Soft Tx disbale supported", "False"));
   }
 
-  sfp_info.push_back(std::make_pair("Tx disable pin", std::to_string(read_tx_disable_pin_state())));
+  sfp_info.push_back(std::make_pair("Tx disable pin", std::to_string(ddm.tx_disable_hw)));
 
   status << format_reg_table(sfp_info, "SFP status", { "", "" });
   if (print_out)
@@ -399,45 +608,50 @@ I2CSFPSlave::get_info(timinghardwareinfo::TimingSFPMonitorData& mon_data) const
 {
   mon_data.data_valid = false;
 
-  sfp_reachable();
+  // Reset the bus once for the whole readout
+  I2CBusSession session(get_master());
+
+  auto static_info = read_static_info();
 
   // Vendor name
-  mon_data.vendor_name = this->read_vendor_name();
+  mon_data.vendor_name = static_info.vendor_name;
 
   // Vendor part number
-  mon_data.vendor_pn = this->read_vendor_part_number();
+  mon_data.vendor_pn = static_info.vendor_pn;
 
   // Serial number TP DO?
   // sfp_info.push_back(std::make_pair("Serial number", read_serial_number()));
 
   // Does the SFP support DDM
-  if (!this->read_ddm_support_bit()) {
+  if (!static_info.ddm_supported) {
     TLOG() << "DDM not available for SFP on I2C bus: " << get_master_id();
     mon_data.ddm_supported = false;
     return;
   } else {
     mon_data.ddm_supported = true;
-    if (this->read_i2c_reg_addressSwapBit()) {
+    if (static_info.address_swap_required) {
       TLOG() << "SFP DDM I2C address swap not supported. SFP on I2C bus: " << get_master_id();
       return;
     }
   }
 
-  mon_data.temperature = this->read_temperature();
+  auto ddm = read_ddm_snapshot(static_info);
+
+  mon_data.temperature = ddm.temperature;
 
-  mon_data.supply_voltage = this->read_voltage();
+  mon_data.supply_voltage = ddm.voltage;
 
-  mon_data.rx_power = this->read_rx_ower();
+  mon_data.rx_power = ddm.rx_power;
 
-  mon_data.tx_power = this->read_tx_power();
+  mon_data.tx_power = ddm.tx_power;
 
-  mon_data.laser_current = this->read_current();
+  mon_data.laser_current = ddm.current;
 
-  mon_data.tx_disable_sw_supported = this->read_soft_tx_control_support_bit();
+  mon_data.tx_disable_sw_supported = static_info.soft_tx_control_supported;
 
-  mon_data.tx_disable_sw = this->read_soft_tx_control_state();
+  mon_data.tx_disable_sw = ddm.tx_disable_sw;
 
-  mon_data.tx_disable_hw = this->read_tx_disable_pin_state();
+  mon_data.tx_disable_hw = ddm.tx_disable_hw;
 
   mon_data.data_valid = true;
 }
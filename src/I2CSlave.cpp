@@ -115,6 +115,15 @@ I2CSlave::write_i2cArray(uint32_t i2c_reg_address,  // NOLINT(build/unsigned)
 }
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+void
+I2CSlave::write_i2cArrays(const std::vector<std::pair<uint32_t, std::vector<uint8_t>>>& writes, // NOLINT(build/unsigned)
+                          size_t* n_written) const
+{
+  m_i2c_master->write_i2cArrays(m_i2c_device_address, writes, n_written);
+}
+//-----------------------------------------------------------------------------
+
 // comodity functions
 //-----------------------------------------------------------------------------
 std::vector<uint8_t>                                        // NOLINT(build/unsigned)
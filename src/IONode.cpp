@@ -10,6 +10,7 @@
 
 #include "logging/Logging.hpp"
 
+#include <functional>
 #include <map>
 #include <memory>
 #include <string>
@@ -43,13 +44,65 @@ IONode::IONode(const uhal::Node& node,
 IONode::~IONode() {}
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+HardwareIdentity
+IONode::get_hardware_identity(const FirmwareIdentityQueue& queue_firmware) const
+{
+  auto cached = m_hardware_identity.get();
+  if (cached && (cached->firmware_info_valid || !queue_firmware))
+    return *cached;
+
+  // complete the cached record rather than re-reading it, e.g. when the firmware part is
+  // first requested after the board part
+  auto identity = cached ? std::make_shared<HardwareIdentity>(*cached) : std::make_shared<HardwareIdentity>();
+
+  std::function<void()> fill_board = cached ? nullptr : queue_board_identity(*identity);
+  std::function<void()> fill_firmware = queue_firmware ? queue_firmware(*identity) : nullptr;
+  IPbusProfiler::dispatch(getClient());
+
+  if (fill_board)
+    fill_board();
+  if (fill_firmware) {
+    fill_firmware();
+    identity->firmware_info_valid = true;
+  }
+
+  m_hardware_identity.store(identity);
+  return *identity;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+IONode::invalidate_hardware_identity() const
+{
+  m_hardware_identity.clear();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::function<void()>
+IONode::queue_board_identity(HardwareIdentity& identity) const
+{
+  auto board_type = getNode("config.board_type").read();
+  auto carrier_type = getNode("config.carrier_type").read();
+  auto design_type = getNode("config.design_type").read();
+  auto firmware_frequency = getNode("config.clock_frequency").read();
+
+  return [&identity, board_type, carrier_type, design_type, firmware_frequency]() {
+    identity.board_type = board_type.value();
+    identity.carrier_type = carrier_type.value();
+    identity.design_type = design_type.value();
+    identity.firmware_frequency = firmware_frequency.value();
+  };
+}
+//-----------------------------------------------------------------------------
+
 //-----------------------------------------------------------------------------
 uint32_t // NOLINT(build/unsigned)
 IONode::read_board_type() const
 {
-  uhal::ValWord<uint32_t> board_type = getNode("config.board_type").read(); // NOLINT(build/unsigned)
-  getClient().dispatch();
-  return board_type.value();
+  return get_hardware_identity().board_type;
 }
 //-----------------------------------------------------------------------------
 
@@ -57,9 +110,7 @@ IONode::read_board_type() const
 uint32_t // NOLINT(build/unsigned)
 IONode::read_carrier_type() const
 {
-  uhal::ValWord<uint32_t> carrier_type = getNode("config.carrier_type").read(); // NOLINT(build/unsigned)
-  getClient().dispatch();
-  return carrier_type.value();
+  return get_hardware_identity().carrier_type;
 }
 //-----------------------------------------------------------------------------
 
@@ -67,9 +118,7 @@ IONode::read_carrier_type() const
 uint32_t // NOLINT(build/unsigned)
 IONode::read_design_type() const
 {
-  uhal::ValWord<uint32_t> design_type = getNode("config.design_type").read(); // NOLINT(build/unsigned)
-  getClient().dispatch();
-  return design_type.value();
+  return get_hardware_identity().design_type;
 }
 //-----------------------------------------------------------------------------
 
@@ -77,20 +126,35 @@ IONode::read_design_type() const
 uint32_t // NOLINT(build/unsigned)
 IONode::read_firmware_frequency() const
 {
-  uhal::ValWord<uint32_t> firmware_frequency = getNode("config.clock_frequency").read(); // NOLINT(build/unsigned)
-  getClient().dispatch();
-  return firmware_frequency.value();
+  return get_hardware_identity().firmware_frequency;
 }
 //-----------------------------------------------------------------------------
 
 //-----------------------------------------------------------------------------
 uint64_t // NOLINT(build/unsigned)
 IONode::read_board_uid() const
+{
+  HardwareIdentity identity = get_hardware_identity();
+  if (!identity.board_uid_valid) {
+    identity.board_uid = fetch_board_uid();
+    identity.board_uid_valid = true;
+    m_hardware_identity.store(std::make_shared<const HardwareIdentity>(identity));
+  }
+  return identity.board_uid;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+uint64_t // NOLINT(build/unsigned)
+IONode::fetch_board_uid() const
 {
 
-  uint64_t uid = 0;                // NOLINT(build/unsigned)
+  uint64_t uid = 0; // NOLINT(build/unsigned)
+  auto& uid_i2c = getNode<I2CMasterNode>(m_uid_i2c_bus);
+
+  I2CBusSession session(uid_i2c);
   std::vector<uint8_t> uid_values = // NOLINT(build/unsigned)
-    getNode<I2CMasterNode>(m_uid_i2c_bus).get_slave(get_uid_address_parameter_name()).read_i2cArray(0xfa, 6);
+    uid_i2c.get_slave(get_uid_address_parameter_name()).read_i2cArray(0xfa, 6);
 
   for (uint8_t i = 0; i < uid_values.size(); ++i) { // NOLINT(build/unsigned)
     uid = (uid << 8) | uid_values.at(i);
@@ -117,11 +181,12 @@ std::string
 IONode::get_hardware_info(bool print_out) const
 {
   std::stringstream info;
-  const BoardType board_type = convert_value_to_board_type(read_board_type());
+  const HardwareIdentity identity = get_hardware_identity();
+  const BoardType board_type = convert_value_to_board_type(identity.board_type);
   const BoardRevision board_revision = get_board_revision();
-  const CarrierType carrier_type = convert_value_to_carrier_type(read_carrier_type());
-  const DesignType design_type = convert_value_to_design_type(read_design_type());
-  const double firmware_frequency = read_firmware_frequency()/1e6;
+  const CarrierType carrier_type = convert_value_to_carrier_type(identity.carrier_type);
+  const DesignType design_type = convert_value_to_design_type(identity.design_type);
+  const double firmware_frequency = identity.firmware_frequency/1e6;
 
   std::vector<std::pair<std::string, std::string>> hardware_info;
 
@@ -175,10 +240,11 @@ IONode::get_full_clock_config_file_path(const std::string& clock_config_file, in
     std::string config_file;
     std::string clock_config_key;
 
+    const HardwareIdentity identity = get_hardware_identity();
     const BoardRevision board_revision = get_board_revision();
-//    const CarrierType carrier_type = convert_value_to_carrier_type(read_carrier_type());
-    const DesignType design_type = convert_value_to_design_type(read_design_type());
-    const uint32_t firmware_frequency = read_firmware_frequency(); // NOLINT(build/unsigned)
+//    const CarrierType carrier_type = convert_value_to_carrier_type(identity.carrier_type);
+    const DesignType design_type = convert_value_to_design_type(identity.design_type);
+    const uint32_t firmware_frequency = identity.firmware_frequency; // NOLINT(build/unsigned)
 
     try {
       clock_config_key = g_board_revision_map.at(board_revision) + "_";
@@ -250,6 +316,9 @@ IONode::configure_pll(const std::string& clock_config_file) const
 {
   auto pll = get_pll();
 
+  // Keep the PLL bus to this sequence, e.g. from the monitoring sampler
+  I2CBusSession session(pll->get_master());
+
   uint32_t si_pll_version = pll->read_device_version(); // NOLINT(build/unsigned)
   TLOG_DEBUG(0) << "Configuring PLL        : SI" << format_reg_value(si_pll_version);
 
@@ -259,14 +328,58 @@ IONode::configure_pll(const std::string& clock_config_file) const
 }
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+bool
+IONode::is_pll_configured(const std::string& clock_config_file) const
+{
+  try {
+    return get_pll()->is_configured(clock_config_file);
+  } catch (const timing::I2CException& e) {
+    TLOG_DEBUG(0) << "Failed to read PLL configuration state: " << e.what();
+    return false;
+  }
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+IONode::configure_pll_incremental(const std::string& clock_config_file) const
+{
+  auto pll = get_pll();
+
+  // Keep the PLL bus to this sequence, e.g. from the monitoring sampler
+  I2CBusSession session(pll->get_master());
+
+  pll->configure(clock_config_file, true);
+
+  TLOG_DEBUG(0) << "PLL configuration id   : " << pll->read_config_id();
+}
+//-----------------------------------------------------------------------------
+
 //-----------------------------------------------------------------------------
 std::vector<double>
 IONode::read_clock_frequencies() const
+{
+  return getNode<FrequencyCounterNode>("freq").read_frequencies(m_clock_names.size());
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::vector<double>
+IONode::measure_clock_frequencies() const
 {
   return getNode<FrequencyCounterNode>("freq").measure_frequencies(m_clock_names.size());
 }
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+void
+IONode::start_clock_frequency_sampler() const
+{
+  getNode<FrequencyCounterNode>("freq").start_sampler(m_clock_names.size());
+}
+//-----------------------------------------------------------------------------
+
 //-----------------------------------------------------------------------------
 std::string
 IONode::get_clock_frequencies_table(bool print_out) const
@@ -291,6 +404,8 @@ IONode::get_pll_status(bool print_out) const
   std::stringstream status;
 
   auto pll = get_pll();
+  I2CBusSession session(pll->get_master());
+
   status << "PLL configuration id   : " << pll->read_config_id() << std::endl;
 
   std::map<std::string, uint32_t> pll_version; // NOLINT(build/unsigned)
@@ -341,7 +456,20 @@ void
 IONode::write_soft_reset_register() const
 {
   getNode("csr.ctrl.soft_rst").write(0x1);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
+  // the reset may follow a reprogramming of the FPGA
+  invalidate_hardware_identity();
+  invalidate_pll_state();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+IONode::invalidate_pll_state() const
+{
+  if (!m_pll_i2c_bus.empty())
+    getNode<I2CMasterNode>(m_pll_i2c_bus).invalidate_device_state();
 }
 //-----------------------------------------------------------------------------
 
@@ -349,6 +477,8 @@ IONode::write_soft_reset_register() const
 void
 IONode::soft_reset() const
 {
+  IPbusProfiler::Scope scope("IONode::soft_reset");
+
   write_soft_reset_register();
   TLOG_DEBUG(0) << "Soft reset done";
 }
@@ -388,5 +518,32 @@ IONode::switch_sfp_soft_tx_control_bit(uint32_t sfp_id, bool turn_on) const // N
 }
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+MonitoringPlan::FillFunction
+IONode::sample_pll_info() const
+{
+  timinghardwareinfo::TimingPLLMonitorData pll_mon_data;
+  get_pll()->get_info(pll_mon_data);
+  return [pll_mon_data](opmonlib::InfoCollector& ci) { ci.add(pll_mon_data); };
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+MonitoringPlan::FillFunction
+IONode::sample_sfp_info(const std::string& i2c_bus_name) const
+{
+  timinghardwareinfo::TimingSFPMonitorData sfp_mon_data;
+  auto sfp = get_i2c_device<I2CSFPSlave>(i2c_bus_name, "SFP_EEProm");
+  try {
+    sfp->get_info(sfp_mon_data);
+  } catch (timing::SFPUnreachable& e) {
+    // It is valid that an SFP may not be installed, currently no good way of knowing whether they it should be
+    TLOG_DEBUG(2) << "Failed to communicate with SFP on i2c bus " << i2c_bus_name;
+    return nullptr;
+  }
+  return [sfp_mon_data](opmonlib::InfoCollector& ci) { ci.add(sfp_mon_data); };
+}
+//-----------------------------------------------------------------------------
+
 } // namespace timing
 } // namespace dunedaq
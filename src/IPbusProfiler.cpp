@@ -0,0 +1,235 @@
+/**
+ * @file IPbusProfiler.cpp
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#include "timing/IPbusProfiler.hpp"
+
+#include "timing/timingipbusinfo/InfoNljs.hpp"
+#include "timing/timingipbusinfo/InfoStructs.hpp"
+#include "timing/toolbox.hpp"
+
+#include "logging/Logging.hpp"
+
+#include <algorithm>
+#include <cstdlib>
+#include <cstring>
+#include <exception>
+#include <iomanip>
+#include <map>
+#include <sstream>
+#include <string>
+#include <utility>
+#include <vector>
+
+namespace dunedaq {
+namespace timing {
+
+namespace {
+
+bool
+profiling_requested()
+{
+  const char* setting = std::getenv("TIMING_IPBUS_PROFILING");
+  return setting && std::strcmp(setting, "1") == 0;
+}
+
+} // namespace
+
+const std::vector<std::chrono::microseconds> IPbusProfiler::kLatencyBucketEdges = {
+  std::chrono::microseconds(100),    std::chrono::microseconds(1000),   std::chrono::microseconds(10000),
+  std::chrono::microseconds(100000), std::chrono::microseconds(1000000)
+};
+
+std::atomic<bool> IPbusProfiler::s_enabled(profiling_requested());
+thread_local IPbusProfiler::Scope* IPbusProfiler::s_current_scope = nullptr;
+
+std::map<std::string, IPbusOperationStats> IPbusProfiler::s_operation_stats;
+std::mutex IPbusProfiler::s_operation_stats_mutex;
+
+//-----------------------------------------------------------------------------
+IPbusProfiler::Scope::Scope(const char* operation)
+  : m_operation(operation)
+  , m_active(IPbusProfiler::is_enabled())
+  , m_parent(nullptr)
+  , m_uncaught_exceptions(0)
+  , m_dispatches(0)
+  , m_words_read(0)
+  , m_words_written(0)
+  , m_dispatch_time(0)
+{
+  if (!m_active)
+    return;
+
+  m_parent = s_current_scope;
+  s_current_scope = this;
+  m_uncaught_exceptions = std::uncaught_exceptions();
+  m_start = std::chrono::steady_clock::now();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+IPbusProfiler::Scope::~Scope()
+{
+  if (!m_active)
+    return;
+
+  const double elapsed = std::chrono::duration<double>(std::chrono::steady_clock::now() - m_start).count();
+  s_current_scope = m_parent;
+  IPbusProfiler::record(*this, elapsed, std::uncaught_exceptions() > m_uncaught_exceptions);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+IPbusProfiler::enable(bool enable)
+{
+  s_enabled.store(enable, std::memory_order_relaxed);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+IPbusProfiler::dispatch(uhal::ClientInterface& client)
+{
+  Scope* scope = s_current_scope;
+  if (!scope) {
+    client.dispatch();
+    return;
+  }
+
+  const auto start = std::chrono::steady_clock::now();
+  client.dispatch();
+  const double elapsed = std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+
+  for (; scope; scope = scope->m_parent) {
+    ++scope->m_dispatches;
+    scope->m_dispatch_time += elapsed;
+  }
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+IPbusProfiler::count_words(uint64_t words_read, uint64_t words_written) // NOLINT(build/unsigned)
+{
+  for (Scope* scope = s_current_scope; scope; scope = scope->m_parent) {
+    scope->m_words_read += words_read;
+    scope->m_words_written += words_written;
+  }
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+IPbusProfiler::record(const Scope& scope, double elapsed, bool failed)
+{
+  std::lock_guard<std::mutex> lock(s_operation_stats_mutex);
+
+  auto& stats = s_operation_stats[scope.m_operation];
+  if (stats.buckets.empty()) {
+    stats = IPbusOperationStats();
+    stats.buckets.resize(kLatencyBucketEdges.size() + 1);
+  }
+
+  ++stats.calls;
+  if (failed)
+    ++stats.failures;
+  stats.dispatches += scope.m_dispatches;
+  stats.words_read += scope.m_words_read;
+  stats.words_written += scope.m_words_written;
+  stats.total_time += elapsed;
+  stats.dispatch_time += scope.m_dispatch_time;
+  stats.max_time = std::max(stats.max_time, elapsed);
+
+  const std::chrono::duration<double> latency(elapsed);
+  size_t bucket = 0;
+  while (bucket < kLatencyBucketEdges.size() && latency >= kLatencyBucketEdges.at(bucket))
+    ++bucket;
+  ++stats.buckets.at(bucket);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::map<std::string, IPbusOperationStats>
+IPbusProfiler::get_operation_stats()
+{
+  std::lock_guard<std::mutex> lock(s_operation_stats_mutex);
+  return s_operation_stats;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+IPbusProfiler::reset()
+{
+  std::lock_guard<std::mutex> lock(s_operation_stats_mutex);
+  s_operation_stats.clear();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::string
+IPbusProfiler::format_operation_stats(bool print_out)
+{
+  std::vector<std::pair<std::string, std::string>> rows;
+  for (auto& entry : get_operation_stats()) {
+    auto& stats = entry.second;
+
+    std::stringstream row;
+    row << "calls " << stats.calls;
+    if (stats.failures)
+      row << " (" << stats.failures << " failed)";
+    row << ", dispatches " << std::fixed << std::setprecision(1)
+        << static_cast<double>(stats.dispatches) / stats.calls << "/call"
+        << ", words r/w " << stats.words_read << "/" << stats.words_written << std::setprecision(3)
+        << ", mean " << stats.total_time / stats.calls * 1e3 << " ms"
+        << " (IPbus " << stats.dispatch_time / stats.calls * 1e3 << " ms)"
+        << ", max " << stats.max_time * 1e3 << " ms";
+    rows.push_back(std::make_pair(entry.first, row.str()));
+  }
+
+  std::stringstream table;
+  table << format_reg_table(rows, "IPbus operations", { "Operation", "Statistics" });
+
+  if (print_out)
+    TLOG() << table.str();
+  return table.str();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+IPbusProfiler::get_info(opmonlib::InfoCollector& ic)
+{
+  for (auto& entry : get_operation_stats()) {
+    auto& stats = entry.second;
+
+    timingipbusinfo::TimingIPbusOperationInfo info;
+    info.calls = stats.calls;
+    info.failures = stats.failures;
+    info.dispatches = stats.dispatches;
+    info.words_read = stats.words_read;
+    info.words_written = stats.words_written;
+    info.total_time_us = stats.total_time * 1e6;
+    info.dispatch_time_us = stats.dispatch_time * 1e6;
+    info.max_time_us = stats.max_time * 1e6;
+    info.lt_100us = stats.buckets.at(0);
+    info.lt_1ms = stats.buckets.at(1);
+    info.lt_10ms = stats.buckets.at(2);
+    info.lt_100ms = stats.buckets.at(3);
+    info.lt_1s = stats.buckets.at(4);
+    info.ge_1s = stats.buckets.at(5);
+
+    opmonlib::InfoCollector operation_ic;
+    operation_ic.add(info);
+    ic.add(entry.first, operation_ic);
+  }
+}
+//-----------------------------------------------------------------------------
+
+} // namespace timing
+} // namespace dunedaq
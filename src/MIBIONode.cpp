@@ -64,6 +64,9 @@ MIBIONode::configure_pll(const std::string& clock_config_file) const
 std::string
 MIBIONode::get_pll_status(bool print_out) const
 {
+  // the switch selection holds until the pll is read
+  I2CBusSession session(getNode<I2CMasterNode>("i2c"));
+
   // enable pll channel (#3) only
   auto i2c_switch = get_i2c_device<I2C9546SwitchSlave>("i2c", "TCA9546_Switch");
   i2c_switch->set_channels_states(8);
@@ -75,7 +78,8 @@ MIBIONode::get_pll_status(bool print_out) const
 void
 MIBIONode::reset(int32_t fanout_mode, const std::string& clock_config_file) const
 {
-  
+  IPbusProfiler::Scope scope("MIBIONode::reset");
+
   write_soft_reset_register();
 
   millisleep(1000);
@@ -90,7 +94,8 @@ MIBIONode::reset(int32_t fanout_mode, const std::string& clock_config_file) cons
   // Reset mmcm
   getNode("csr.ctrl.rst").write(0x1);
   getNode("csr.ctrl.rst").write(0x0);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 
   TLOG() << "Reset done";
 }
@@ -111,6 +116,9 @@ MIBIONode::get_sfp_status(uint32_t sfp_id, bool print_out) const { // NOLINT(bui
   
   validate_sfp_id(sfp_id);
 
+  // the switch selection holds until the sfp is read
+  I2CBusSession session(getNode<I2CMasterNode>("i2c"));
+
   // enable i2c path for sfp
   auto i2c_switch = get_i2c_device<I2C9546SwitchSlave>("i2c", "TCA9546_Switch");
   i2c_switch->set_channels_states(1UL << sfp_id);
@@ -143,6 +151,9 @@ void
 MIBIONode::switch_sfp_soft_tx_control_bit(uint32_t sfp_id, bool turn_on) const { // NOLINT(build/unsigned)
   validate_sfp_id(sfp_id);
 
+  // the switch selection holds until the sfp is written
+  I2CBusSession session(getNode<I2CMasterNode>("i2c"));
+
   auto i2c_switch = get_i2c_device<I2C9546SwitchSlave>("i2c", "TCA9546_Switch");
   i2c_switch->set_channels_states(1UL << sfp_id);
   auto sfp = get_i2c_device<I2CSFPSlave>(m_sfp_i2c_buses.at(0), "SFP_EEProm");
@@ -181,42 +192,43 @@ MIBIONode::get_info(timinghardwareinfo::TimingMIBMonitorData& mon_data) const
 void
 MIBIONode::get_info(opmonlib::InfoCollector& ci, int level) const
 {
-    auto i2c_switch = get_i2c_device<I2C9546SwitchSlave>("i2c", "TCA9546_Switch");
+  MonitoringPlan plan(*this);
+  add_to_monitoring_plan(plan, {}, level);
+  plan.collect(ci);
+}
+//-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+void
+MIBIONode::add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const
+{
   if (level >= 2) {
-    i2c_switch->set_channels_states(8);
-
-    timinghardwareinfo::TimingPLLMonitorData pll_mon_data;
-    get_pll()->get_info(pll_mon_data);
-    ci.add(pll_mon_data);
-    
-    for (uint i=0; i < 3; ++i)
-    {
-      opmonlib::InfoCollector sfp_ic;
-      
-      // enable i2c path for sfp
-      i2c_switch->set_channels_states(1UL << i);
-
-      auto sfp = this->get_i2c_device<I2CSFPSlave>(m_sfp_i2c_buses.at(0), "SFP_EEProm");
-      
-      try
-      {
-        sfp->get_info(sfp_ic, level);
-      }
-      catch (timing::SFPUnreachable& e)
-      {
-        // It is valid that an SFP may not be installed, currently no good way of knowing whether they it should be
-        TLOG_DEBUG(2) << "Failed to communicate with SFP " << i <<  " on I2C switch channel " << (1UL << i) << " on i2c bus" << m_sfp_i2c_buses.at(0);
-        continue;
-      }
-      ci.add("sfp_"+std::to_string(i),sfp_ic);
+    plan.add_sampled_step(path, MonitoringPlan::kI2CTier, [this]() {
+      I2CBusSession session(getNode<I2CMasterNode>("i2c"));
+      auto i2c_switch = get_i2c_device<I2C9546SwitchSlave>("i2c", "TCA9546_Switch");
+      i2c_switch->set_channels_states(8);
+      return sample_pll_info();
+    });
+
+    for (uint i=0; i < 3; ++i) { // NOLINT(build/unsigned)
+      plan.add_sampled_step(MonitoringPlan::extend(path, "sfp_"+std::to_string(i)), MonitoringPlan::kI2CTier, [this, i]() {
+        I2CBusSession session(getNode<I2CMasterNode>("i2c"));
+        auto i2c_switch = get_i2c_device<I2C9546SwitchSlave>("i2c", "TCA9546_Switch");
+
+        // enable i2c path for sfp
+        i2c_switch->set_channels_states(1UL << i);
+        auto fill = sample_sfp_info(m_sfp_i2c_buses.at(0));
+        i2c_switch->set_channels_states(8);
+        return fill;
+      });
     }
-    i2c_switch->set_channels_states(8);
   }
   if (level >= 1) {
-    timinghardwareinfo::TimingMIBMonitorData mon_data;
-    this->get_info(mon_data);
-    ci.add(mon_data);
+    plan.add_step(path, [this](opmonlib::InfoCollector& ci) {
+      timinghardwareinfo::TimingMIBMonitorData mon_data;
+      this->get_info(mon_data);
+      ci.add(mon_data);
+    });
   }
 }
 //-----------------------------------------------------------------------------
@@ -0,0 +1,492 @@
+/**
+ * @file MonitoringPlan.cpp
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#include "timing/MonitoringPlan.hpp"
+
+#include "timing/IPbusProfiler.hpp"
+
+#include "timing/timinghardwareinfo/InfoNljs.hpp"
+#include "timing/timinghardwareinfo/InfoStructs.hpp"
+
+#include "logging/Logging.hpp"
+
+#include <algorithm>
+#include <map>
+#include <memory>
+#include <set>
+#include <string>
+#include <utility>
+#include <vector>
+
+namespace dunedaq {
+namespace timing {
+
+const std::string MonitoringPlan::kI2CTier = "i2c";
+const MonitoringPlan::Tier MonitoringPlan::kDefaultTier = { std::chrono::milliseconds(10000),
+                                                            std::chrono::milliseconds(50) };
+const std::chrono::milliseconds MonitoringPlan::kSamplerTick(100);
+
+namespace {
+
+// nested child collectors, assembled leaves first
+struct CollectorTree
+{
+  opmonlib::InfoCollector collector;
+  std::vector<std::pair<std::string, std::unique_ptr<CollectorTree>>> children;
+
+  CollectorTree& child(const std::string& name)
+  {
+    for (auto& c : children)
+      if (c.first == name)
+        return *c.second;
+    children.emplace_back(name, std::make_unique<CollectorTree>());
+    return *children.back().second;
+  }
+
+  void assemble_into(opmonlib::InfoCollector& ic)
+  {
+    for (auto& c : children) {
+      c.second->assemble_into(c.second->collector);
+      ic.add(c.first, c.second->collector);
+    }
+  }
+};
+
+opmonlib::InfoCollector&
+collector_at(opmonlib::InfoCollector& ic, CollectorTree& tree, const MonitoringPlan::Path& path)
+{
+  if (path.empty())
+    return ic;
+
+  CollectorTree* node = &tree;
+  for (auto& name : path)
+    node = &node->child(name);
+  return node->collector;
+}
+
+} // namespace
+
+//-----------------------------------------------------------------------------
+MonitoringPlan::MonitoringPlan(const uhal::Node& node)
+  : m_node(node)
+  , m_sampler(std::make_shared<MonitoringSampler>())
+{}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+MonitoringPlan::MonitoringPlan(const uhal::Node& node, std::shared_ptr<MonitoringSampler> sampler)
+  : m_node(node)
+  , m_sampler(sampler)
+{}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+MonitoringPlan::~MonitoringPlan() {}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+MonitoringPlan::add_reads(const Path& path, QueueFunction queue)
+{
+  m_reads.push_back(std::make_pair(path, queue));
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+MonitoringPlan::add_step(const Path& path, FillFunction fill)
+{
+  m_steps.push_back(std::make_pair(path, fill));
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+MonitoringPlan::add_sampled_step(const Path& path, const std::string& tier, SampleFunction sample)
+{
+  size_t rank = m_sampled_step_ranks[path]++;
+  m_sampled_steps.push_back(m_sampler->add_step(path, rank, tier, sample));
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+MonitoringPlan::set_tier(const std::string& name, const Tier& tier)
+{
+  m_sampler->set_tier(name, tier);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+MonitoringPlan::Tier
+MonitoringPlan::get_tier(const std::string& name) const
+{
+  return m_sampler->get_tier(name);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+MonitoringPlan::start_sampling()
+{
+  m_sampler->start();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+MonitoringPlan::stop_sampling()
+{
+  m_sampler->stop();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+bool
+MonitoringPlan::is_sampling() const
+{
+  return m_sampler->is_running();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+MonitoringPlan::collect(opmonlib::InfoCollector& ic) const
+{
+  IPbusProfiler::Scope scope("MonitoringPlan::collect");
+
+  std::vector<FillFunction> fills;
+  fills.reserve(m_reads.size());
+  for (auto& read : m_reads)
+    fills.push_back(read.second());
+
+  if (!fills.empty())
+    IPbusProfiler::dispatch(m_node.getClient());
+
+  CollectorTree tree;
+  for (size_t i = 0; i < fills.size(); ++i)
+    fills.at(i)(collector_at(ic, tree, m_reads.at(i).first));
+
+  for (auto& step : m_steps)
+    step.second(collector_at(ic, tree, step.first));
+
+  const bool sampling = m_sampler->is_running();
+  const auto sampled_steps = m_sampler->get_steps(m_sampled_steps);
+
+  if (!sampling) {
+    for (auto& step : sampled_steps) {
+      auto fill = step.sample();
+      if (fill)
+        fill(collector_at(ic, tree, step.path));
+    }
+  } else {
+    const auto now = std::chrono::steady_clock::now();
+
+    // one sample info per collector, covering the collector sampled steps; collectors
+    // whose steps were all sampled without data (e.g. absent SFPs) are left out
+    std::map<Path, timinghardwareinfo::TimingMonitoringSampleInfo> sample_infos;
+    std::set<Path> reported_paths;
+    for (auto& step : sampled_steps) {
+      auto info = sample_infos.find(step.path);
+      if (info == sample_infos.end()) {
+        timinghardwareinfo::TimingMonitoringSampleInfo new_info;
+        new_info.tier = step.tier;
+        new_info.valid = true;
+        new_info.age_ms = 0;
+        new_info.interval_ms = m_sampler->get_tier(step.tier).interval.count();
+        new_info.samples = 0;
+        new_info.failures = 0;
+        info = sample_infos.emplace(step.path, new_info).first;
+      }
+
+      info->second.samples += step.samples;
+      info->second.failures += step.failures;
+      if (!step.samples) {
+        info->second.valid = false;
+        reported_paths.insert(step.path);
+        continue;
+      }
+
+      uint64_t age = std::chrono::duration_cast<std::chrono::milliseconds>(now - step.sample_time).count(); // NOLINT(build/unsigned)
+      info->second.age_ms = std::max(info->second.age_ms, age);
+      if (step.fill) {
+        step.fill(collector_at(ic, tree, step.path));
+        reported_paths.insert(step.path);
+      }
+    }
+
+    for (auto& info : sample_infos) {
+      if (reported_paths.count(info.first))
+        collector_at(ic, tree, info.first).add(info.second);
+    }
+  }
+
+  // child collectors are copied when added, so they are added once complete
+  tree.assemble_into(ic);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+MonitoringPlan::Path
+MonitoringPlan::extend(const Path& path, const std::string& name)
+{
+  Path child(path);
+  child.push_back(name);
+  return child;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+MonitoringSampler::MonitoringSampler()
+  : m_running(false)
+  , m_stop_requested(false)
+{}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+MonitoringSampler::~MonitoringSampler()
+{
+  stop();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+size_t
+MonitoringSampler::add_step(const MonitoringPlan::Path& path,
+                            size_t rank,
+                            const std::string& tier,
+                            MonitoringPlan::SampleFunction sample)
+{
+  std::lock_guard<std::mutex> lock(m_mutex);
+
+  auto index = m_step_indices.find(std::make_pair(path, rank));
+  if (index != m_step_indices.end())
+    return index->second;
+
+  Step step;
+  step.path = path;
+  step.tier = tier;
+  step.sample = sample;
+  step.samples = 0;
+  step.failures = 0;
+  m_steps.push_back(step);
+
+  const size_t new_index = m_steps.size() - 1;
+  m_step_indices[std::make_pair(path, rank)] = new_index;
+  if (m_running)
+    m_tier_states[tier].steps.push_back(new_index);
+  return new_index;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+MonitoringSampler::set_tier(const std::string& name, const MonitoringPlan::Tier& tier)
+{
+  std::lock_guard<std::mutex> lock(m_mutex);
+  m_tiers[name] = tier;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+MonitoringPlan::Tier
+MonitoringSampler::get_tier(const std::string& name) const
+{
+  std::lock_guard<std::mutex> lock(m_mutex);
+  return find_tier(name);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+MonitoringPlan::Tier
+MonitoringSampler::find_tier(const std::string& name) const
+{
+  auto tier = m_tiers.find(name);
+  return tier != m_tiers.end() ? tier->second : MonitoringPlan::kDefaultTier;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::vector<MonitoringSampler::Step>
+MonitoringSampler::get_steps(const std::vector<size_t>& indices) const
+{
+  std::lock_guard<std::mutex> lock(m_mutex);
+
+  std::vector<Step> steps;
+  steps.reserve(indices.size());
+  for (auto index : indices)
+    steps.push_back(m_steps.at(index));
+  return steps;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+size_t
+MonitoringSampler::get_number_of_steps() const
+{
+  std::lock_guard<std::mutex> lock(m_mutex);
+  return m_steps.size();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+MonitoringSampler::start()
+{
+  std::lock_guard<std::mutex> lock(m_mutex);
+
+  if (m_steps.empty() || m_running)
+    return;
+
+  m_tier_states.clear();
+  for (size_t i = 0; i < m_steps.size(); ++i) {
+    TierState& state = m_tier_states[m_steps.at(i).tier];
+    state.steps.push_back(i);
+    state.cursor = 0;
+  }
+
+  TLOG_DEBUG(3) << "Starting monitoring sampler, " << m_steps.size() << " sampled steps in "
+                << m_tier_states.size() << " tiers";
+
+  m_stop_requested = false;
+  m_running = true;
+  m_thread = std::thread(&MonitoringSampler::run, this);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+MonitoringSampler::stop()
+{
+  {
+    std::lock_guard<std::mutex> lock(m_mutex);
+    if (!m_thread.joinable())
+      return;
+    m_stop_requested = true;
+  }
+  m_condition.notify_all();
+  m_thread.join();
+  m_running = false;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+MonitoringSampler::run()
+{
+  std::unique_lock<std::mutex> lock(m_mutex);
+
+  while (!m_stop_requested) {
+    for (auto& tier_state : m_tier_states) {
+      TierState& state = tier_state.second;
+
+      const auto tick_start = std::chrono::steady_clock::now();
+      if (tick_start < state.next_round)
+        continue;
+
+      const MonitoringPlan::Tier tier = find_tier(tier_state.first);
+      if (state.cursor == 0)
+        state.round_start = tick_start;
+
+      // at least one step per tick, then as many as fit in the budget
+      do {
+        // steps may be added while sampling, the step is looked up again after the sample
+        const size_t index = state.steps.at(state.cursor);
+        MonitoringPlan::SampleFunction sample = m_steps.at(index).sample;
+
+        lock.unlock();
+        MonitoringPlan::FillFunction fill;
+        bool failed = false;
+        try {
+          fill = sample();
+        } catch (const std::exception& e) {
+          failed = true;
+          TLOG_DEBUG(3) << "Monitoring sampler failed on tier " << tier_state.first << ": " << e.what();
+        }
+        lock.lock();
+
+        Step& step = m_steps.at(index);
+        if (failed) {
+          ++step.failures;
+        } else {
+          step.fill = fill;
+          step.sample_time = std::chrono::steady_clock::now();
+          ++step.samples;
+        }
+
+        if (++state.cursor == state.steps.size()) {
+          state.cursor = 0;
+          state.next_round = state.round_start + tier.interval;
+          break;
+        }
+      } while (!m_stop_requested && std::chrono::steady_clock::now() - tick_start < tier.budget);
+
+      if (m_stop_requested)
+        break;
+    }
+    m_condition.wait_for(lock, MonitoringPlan::kSamplerTick, [this]() { return m_stop_requested; });
+  }
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::shared_ptr<const MonitoringPlan>
+MonitoringPlanCache::get(const uhal::Node& node, int level, const BuildFunction& build)
+{
+  std::lock_guard<std::mutex> lock(m_mutex);
+
+  auto plan = m_plans.find(level);
+  if (plan != m_plans.end())
+    return plan->second;
+
+  if (!m_sampler) {
+    m_sampler = std::make_shared<MonitoringSampler>();
+    for (auto& tier : m_tiers)
+      m_sampler->set_tier(tier.first, tier.second);
+  }
+
+  // plans of all levels share the sampler: their common sampled steps are sampled once,
+  // and the node is sampled by a single thread
+  auto new_plan = std::make_shared<MonitoringPlan>(node, m_sampler);
+  build(*new_plan, level);
+  TLOG_DEBUG(3) << "Built monitoring plan for level " << level << ": " << new_plan->get_number_of_reads()
+                << " planned reads, " << new_plan->get_number_of_steps() << " steps, "
+                << new_plan->get_number_of_sampled_steps() << " sampled steps, "
+                << m_sampler->get_number_of_steps() << " sampled steps for the node";
+
+  m_sampler->start();
+
+  m_plans[level] = new_plan;
+  return new_plan;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+MonitoringPlanCache::set_tier(const std::string& name, const MonitoringPlan::Tier& tier)
+{
+  std::lock_guard<std::mutex> lock(m_mutex);
+
+  m_tiers[name] = tier;
+  if (m_sampler)
+    m_sampler->set_tier(name, tier);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+MonitoringPlanCache::clear()
+{
+  std::lock_guard<std::mutex> lock(m_mutex);
+  m_plans.clear();
+  m_sampler.reset();
+}
+//-----------------------------------------------------------------------------
+
+} // namespace timing
+} // namespace dunedaq
@@ -62,19 +62,11 @@ OuroborosDesign::configure() const
 
 //-----------------------------------------------------------------------------
 void
-OuroborosDesign::get_info(opmonlib::InfoCollector& ci, int level) const
-{ 
-  opmonlib::InfoCollector master_collector;
-  this->get_master_node().get_info(master_collector, level);
-  ci.add("master", master_collector);
-
-  opmonlib::InfoCollector hardware_collector;
-  this->get_io_node_plain()->get_info(hardware_collector, level);
-  ci.add("io", hardware_collector);
-
-  opmonlib::InfoCollector endpoint_collector;
-  this->get_endpoint_node(0).get_info(endpoint_collector, level);
-  ci.add("endpoint", endpoint_collector);
+OuroborosDesign::add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const
+{
+  this->get_master_node().add_to_monitoring_plan(plan, MonitoringPlan::extend(path, "master"), level);
+  this->get_io_node_plain()->add_to_monitoring_plan(plan, MonitoringPlan::extend(path, "io"), level);
+  this->get_endpoint_node(0).add_to_monitoring_plan(plan, MonitoringPlan::extend(path, "endpoint"), level);
 }
 //-----------------------------------------------------------------------------
 } // namespace dunedaq::timing  
\ No newline at end of file
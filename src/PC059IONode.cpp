@@ -17,9 +17,12 @@ namespace timing {
 
 UHAL_REGISTER_DERIVED_NODE(PC059IONode)
 
+const int32_t PC059IONode::kUnknownSFPI2CMuxChannel = -1;
+
 //-----------------------------------------------------------------------------
 PC059IONode::PC059IONode(const uhal::Node& node)
   : FanoutIONode(node, "i2c", "i2c", "SI5345", { "PLL", "CDR" }, { "usfp_i2c", "i2c" })
+  , m_sfp_i2c_mux_channel(kUnknownSFPI2CMuxChannel)
 {}
 //-----------------------------------------------------------------------------
 
@@ -53,23 +56,27 @@ PC059IONode::get_status(bool print_out) const
 void
 PC059IONode::reset(int32_t fanout_mode, const std::string& clock_config_file) const
 {
+  IPbusProfiler::Scope scope("PC059IONode::reset");
 
   // Soft reset
   write_soft_reset_register();
 
   millisleep(1000);
 
-  // Reset PLL and I2C
-  getNode("csr.ctrl.pll_rst").write(0x1);
-  getNode("csr.ctrl.pll_rst").write(0x0);
-
+  // Reset I2C
   getNode("csr.ctrl.rst_i2c").write(0x1);
   getNode("csr.ctrl.rst_i2c").write(0x0);
 
   getNode("csr.ctrl.rst_i2cmux").write(0x1);
   getNode("csr.ctrl.rst_i2cmux").write(0x0);
 
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
+  invalidate_pll_state();
+  {
+    I2CBusSession session(getNode<I2CMasterNode>(m_pll_i2c_bus));
+    m_sfp_i2c_mux_channel = kUnknownSFPI2CMuxChannel;
+  }
 
   // enclustra i2c switch stuff
   try {
@@ -82,16 +89,31 @@ PC059IONode::reset(int32_t fanout_mode, const std::string& clock_config_file) co
   std::string clock_config_path = get_full_clock_config_file_path(clock_config_file, fanout_mode);
   TLOG() << "PLL configuration file : " << clock_config_path;
 
-  // Upload config file to PLL
-  configure_pll(clock_config_path);
+  if (is_pll_configured(clock_config_path)) {
+    // Keep the PLL running, only apply the differences
+    TLOG() << "PLL already configured, applying incremental update";
+    configure_pll_incremental(clock_config_path);
+  } else {
+    // Reset PLL
+    getNode("csr.ctrl.pll_rst").write(0x1);
+    getNode("csr.ctrl.pll_rst").write(0x0);
+    IPbusProfiler::dispatch(getClient());
+    invalidate_snapshots();
+    invalidate_pll_state();
+
+    // Upload config file to PLL
+    configure_pll(clock_config_path);
+  }
 
   // Reset mmcm
   getNode("csr.ctrl.rst").write(0x1);
   getNode("csr.ctrl.rst").write(0x0);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 
   getNode("csr.ctrl.mux").write(0);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 
   auto sfp_expander = get_i2c_device<I2CExpanderSlave>(m_uid_i2c_bus, "SFPExpander");
 
@@ -129,7 +151,8 @@ void
 PC059IONode::switch_sfp_mux_channel(uint32_t sfp_id) const // NOLINT(build/unsigned)
 {
   getNode("csr.ctrl.mux").write(sfp_id);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 
   TLOG_DEBUG(3) << "SFP input mux set to " << format_reg_value(read_active_sfp_mux_channel());
 }
@@ -140,7 +163,7 @@ uint32_t // NOLINT(build/unsigned)
 PC059IONode::read_active_sfp_mux_channel() const
 {
   auto active_sfp_mux_channel = getNode("csr.ctrl.mux").read();
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
   return active_sfp_mux_channel.value();
 }
 //-----------------------------------------------------------------------------
@@ -149,23 +172,61 @@ PC059IONode::read_active_sfp_mux_channel() const
 void
 PC059IONode::switch_sfp_i2c_mux_channel(uint32_t sfp_id) const // NOLINT(build/unsigned)
 {
+  // the mux sits on the main i2c bus, whose lock guards the tracked selection
+  I2CBusSession session(getNode<I2CMasterNode>(m_pll_i2c_bus));
+
+  m_sfp_i2c_mux_channel = kUnknownSFPI2CMuxChannel;
 
   getNode("csr.ctrl.rst_i2cmux").write(0x1);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
   getNode("csr.ctrl.rst_i2cmux").write(0x0);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
   millisleep(100);
 
   uint8_t channel_select_byte = 1UL << sfp_id; // NOLINT(build/unsigned)
   getNode<I2CMasterNode>(m_pll_i2c_bus).get_slave("SFP_Switch").write_i2cPrimitive({ channel_select_byte });
+  m_sfp_i2c_mux_channel = sfp_id;
   TLOG_DEBUG(3) << "PC059 SFP I2C mux set to " << format_reg_value(sfp_id);
 }
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+void
+PC059IONode::select_sfp_i2c_mux_channel(uint32_t sfp_id) const // NOLINT(build/unsigned)
+{
+  if (sfp_id > 7) {
+    throw InvalidSFPId(ERS_HERE, format_reg_value(sfp_id));
+  }
+
+  // the mux sits on the main i2c bus, whose lock guards the tracked selection
+  I2CBusSession session(getNode<I2CMasterNode>(m_pll_i2c_bus));
+
+  // the selection byte is written even if the channel is already selected, as the tracked selection
+  // does not see resets done outside this node; only the mux reset is skipped while it is known
+  if (m_sfp_i2c_mux_channel != kUnknownSFPI2CMuxChannel) {
+    try {
+      uint8_t channel_select_byte = 1UL << sfp_id; // NOLINT(build/unsigned)
+      getNode<I2CMasterNode>(m_pll_i2c_bus).get_slave("SFP_Switch").write_i2cPrimitive({ channel_select_byte });
+      m_sfp_i2c_mux_channel = sfp_id;
+      TLOG_DEBUG(3) << "PC059 SFP I2C mux set to " << format_reg_value(sfp_id);
+      return;
+    } catch (const I2CException& e) {
+      TLOG_DEBUG(2) << "Failed to select PC059 SFP I2C mux channel " << sfp_id << ", resetting the mux";
+    }
+  }
+  switch_sfp_i2c_mux_channel(sfp_id);
+}
+//-----------------------------------------------------------------------------
+
 //-----------------------------------------------------------------------------
 std::string
 PC059IONode::get_sfp_status(uint32_t sfp_id, bool print_out) const // NOLINT(build/unsigned)
 {
+  // the fanout sfps share the main i2c bus with their mux: the selection holds until the sfp is accessed
+  I2CBusSession session(getNode<I2CMasterNode>(m_pll_i2c_bus));
+
   // on this board the upstream sfp has its own i2c bus, and the 8 downstream sfps are muxed onto the main i2c bus
   std::stringstream status;
   uint32_t sfp_bus_index; // NOLINT(build/unsigned)
@@ -173,7 +234,7 @@ PC059IONode::get_sfp_status(uint32_t sfp_id, bool print_out) const // NOLINT(bui
     sfp_bus_index = 0;
     status << "Upstream SFP:" << std::endl;
   } else if (sfp_id > 0 && sfp_id < 9) {
-    switch_sfp_i2c_mux_channel(sfp_id - 1);
+    select_sfp_i2c_mux_channel(sfp_id - 1);
     status << "Fanout SFP " << sfp_id - 1 << ":" << std::endl;
     sfp_bus_index = 1;
   } else {
@@ -193,12 +254,15 @@ PC059IONode::get_sfp_status(uint32_t sfp_id, bool print_out) const // NOLINT(bui
 void
 PC059IONode::switch_sfp_soft_tx_control_bit(uint32_t sfp_id, bool turn_on) const // NOLINT(build/unsigned)
 {
+  // the fanout sfps share the main i2c bus with their mux: the selection holds until the sfp is accessed
+  I2CBusSession session(getNode<I2CMasterNode>(m_pll_i2c_bus));
+
   // on this board the upstream sfp has its own i2c bus, and the 8 downstream sfps are muxed onto the main i2c bus
   uint32_t sfp_bus_index; // NOLINT(build/unsigned)
   if (sfp_id == 0) {
     sfp_bus_index = 0;
   } else if (sfp_id > 0 && sfp_id < 9) {
-    switch_sfp_i2c_mux_channel(sfp_id - 1);
+    select_sfp_i2c_mux_channel(sfp_id - 1);
     sfp_bus_index = 1;
   } else {
     throw InvalidSFPId(ERS_HERE, format_reg_value(sfp_id));
@@ -208,6 +272,51 @@ PC059IONode::switch_sfp_soft_tx_control_bit(uint32_t sfp_id, bool turn_on) const
 }
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+std::vector<SFPSweepResult>
+PC059IONode::sweep_sfps(bool skip_lost) const
+{
+  auto subnodes = read_sub_nodes(getNode("csr.stat"));
+  uint32_t sfp_los_flags = subnodes.at("sfp_los").value(); // NOLINT(build/unsigned)
+
+  std::vector<SFPSweepResult> results(9);
+  for (uint32_t sfp_id = 0; sfp_id < results.size(); ++sfp_id) { // NOLINT(build/unsigned)
+    auto& result = results.at(sfp_id);
+    result.sfp_id = sfp_id;
+    result.read = false;
+    result.reachable = false;
+    result.ddm_valid = false;
+
+    // the upstream sfp has its own i2c bus, the 8 downstream sfps are muxed onto the main i2c bus
+    if (sfp_id == 0) {
+      result.label = "Upstream SFP";
+      result.los = subnodes.at("usfp_los").value();
+    } else {
+      result.label = "Fanout SFP " + std::to_string(sfp_id - 1);
+      result.los = sfp_los_flags & (1UL << (sfp_id - 1));
+    }
+
+    if (result.los && skip_lost)
+      continue;
+
+    // the fanout sfps share the main i2c bus with their mux: the selection holds until the sfp is read
+    I2CBusSession session(getNode<I2CMasterNode>(m_pll_i2c_bus));
+    try {
+      if (sfp_id > 0)
+        select_sfp_i2c_mux_channel(sfp_id - 1);
+      read_sfp_sweep_entry(m_sfp_i2c_buses.at(sfp_id ? 1 : 0), result);
+    } catch (const I2CException& e) {
+      // the mux selection is not trusted any more, it is reset on the next selection
+      m_sfp_i2c_mux_channel = kUnknownSFPI2CMuxChannel;
+      result.read = true;
+      result.error = "I2C error";
+      TLOG_DEBUG(2) << "I2C error while reading " << result.label << ": " << e.what();
+    }
+  }
+  return results;
+}
+//-----------------------------------------------------------------------------
+
 //-----------------------------------------------------------------------------
 void
 PC059IONode::get_info(timinghardwareinfo::TimingPC059MonitorData& mon_data) const
@@ -237,53 +346,41 @@ PC059IONode::get_info(timinghardwareinfo::TimingPC059MonitorData& mon_data) cons
 //-----------------------------------------------------------------------------
 void
 PC059IONode::get_info(opmonlib::InfoCollector& ci, int level) const
+{
+  MonitoringPlan plan(*this);
+  add_to_monitoring_plan(plan, {}, level);
+  plan.collect(ci);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+PC059IONode::add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const
 {
   if (level >= 2)
   {
-    timinghardwareinfo::TimingPLLMonitorData pll_mon_data;
-    this->get_pll()->get_info(pll_mon_data);
-    ci.add(pll_mon_data);
-
-    timinghardwareinfo::TimingSFPMonitorData upstream_sfp_mon_data;
-    auto upstream_sfp = get_i2c_device<I2CSFPSlave>(m_sfp_i2c_buses.at(0), "SFP_EEProm");
-    try {
-      upstream_sfp->get_info(upstream_sfp_mon_data);
-      opmonlib::InfoCollector upstream_sfp_ic;
-      upstream_sfp_ic.add(upstream_sfp_mon_data);
-      ci.add("upstream_sfp", upstream_sfp_ic);
-    }
-    catch (timing::SFPUnreachable& e) {
-      // It is valid that an SFP may not be installed, currently no good way of knowing whether they it should be
-      TLOG_DEBUG(2) << "Failed to communicate with upstream SFP on i2c bus" << m_sfp_i2c_buses.at(0);
-    }
-
-
-    for (uint sfp_id=0; sfp_id < 8; ++sfp_id) {
-      TLOG_DEBUG(5) << "checking sfp: " << sfp_id;
-      switch_sfp_i2c_mux_channel(sfp_id);
-      
-      auto sfp = get_i2c_device<I2CSFPSlave>(m_sfp_i2c_buses.at(1), "SFP_EEProm");
-      timinghardwareinfo::TimingSFPMonitorData sfp_data;
-
-      try {
-        sfp->get_info(sfp_data);
-      } catch (timing::SFPUnreachable& e) {
-        // It is valid that an SFP may not be installed, currently no good way of knowing whether they it should be
-        TLOG_DEBUG(2) << "Failed to communicate with downstream SFP: " << sfp_id << " on i2c bus" << m_sfp_i2c_buses.at(1);
-        continue;
-      }
-
-      opmonlib::InfoCollector sfp_ic;
-      sfp_ic.add(sfp_data);
-      ci.add("sfp_"+std::to_string(sfp_id), sfp_ic);
+    plan.add_sampled_step(path, MonitoringPlan::kI2CTier, [this]() { return sample_pll_info(); });
+    plan.add_sampled_step(MonitoringPlan::extend(path, "upstream_sfp"), MonitoringPlan::kI2CTier, [this]() {
+      return sample_sfp_info(m_sfp_i2c_buses.at(0));
+    });
+
+    for (uint sfp_id=0; sfp_id < 8; ++sfp_id) { // NOLINT(build/unsigned)
+      plan.add_sampled_step(MonitoringPlan::extend(path, "sfp_"+std::to_string(sfp_id)), MonitoringPlan::kI2CTier, [this, sfp_id]() {
+        TLOG_DEBUG(5) << "checking sfp: " << sfp_id;
+        I2CBusSession session(getNode<I2CMasterNode>(m_pll_i2c_bus));
+        select_sfp_i2c_mux_channel(sfp_id);
+        return sample_sfp_info(m_sfp_i2c_buses.at(1));
+      });
     }
   }
 
   if (level >= 1) {
-    timinghardwareinfo::TimingPC059MonitorData mon_data;
-    this->get_info(mon_data);
-    ci.add(mon_data);
-  }  
+    plan.add_step(path, [this](opmonlib::InfoCollector& ci) {
+      timinghardwareinfo::TimingPC059MonitorData mon_data;
+      this->get_info(mon_data);
+      ci.add(mon_data);
+    });
+  }
 }
 //-----------------------------------------------------------------------------
 
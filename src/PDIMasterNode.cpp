@@ -31,6 +31,8 @@ PDIMasterNode::~PDIMasterNode() {}
 std::string
 PDIMasterNode::get_status(bool print_out) const
 {
+  IPbusProfiler::Scope scope("PDIMasterNode::get_status");
+
   std::stringstream status;
   auto raw_timestamp = getNode<TimestampGeneratorNode>("tstamp").read_raw_timestamp();
   status << "Timestamp: 0x" << std::hex << tstamp2int(raw_timestamp) << std::endl << std::endl;
@@ -60,6 +62,8 @@ PDIMasterNode::get_status_with_date(uint32_t clock_frequency_hz, bool print_out)
 void
 PDIMasterNode::switch_endpoint_sfp(uint32_t address, bool turn_on) const // NOLINT(build/unsigned)
 {
+  IPbusProfiler::Scope scope("PDIMasterNode::switch_endpoint_sfp");
+
   auto vl_cmd_node = getNode<VLCmdGeneratorNode>("acmd");
 
   // Switch off endpoint SFP tx
@@ -71,6 +75,8 @@ PDIMasterNode::switch_endpoint_sfp(uint32_t address, bool turn_on) const // NOLI
 void
 PDIMasterNode::enable_upstream_endpoint() const
 {
+  IPbusProfiler::Scope scope("PDIMasterNode::enable_upstream_endpoint");
+
   auto global = getNode<GlobalNode>("global");
   global.enable_upstream_endpoint();
 }
@@ -80,6 +86,7 @@ PDIMasterNode::enable_upstream_endpoint() const
 uint32_t                                                                      // NOLINT(build/unsigned)
 PDIMasterNode::measure_endpoint_rtt(uint32_t address, bool control_sfp) const // NOLINT(build/unsigned)
 {
+  IPbusProfiler::Scope scope("PDIMasterNode::measure_endpoint_rtt");
 
   auto vl_cmd_node = getNode<VLCmdGeneratorNode>("acmd");
   auto global = getNode<GlobalNode>("global");
@@ -125,6 +132,7 @@ PDIMasterNode::apply_endpoint_delay(uint32_t address,      // NOLINT(build/unsig
                                     bool measure_rtt,
                                     bool control_sfp) const
 {
+  IPbusProfiler::Scope scope("PDIMasterNode::apply_endpoint_delay");
 
   auto vl_cmd_node = getNode<VLCmdGeneratorNode>("acmd");
   auto global = getNode<GlobalNode>("global");
@@ -201,6 +209,7 @@ PDIMasterNode::send_fl_cmd(FixedLengthCommandType command,
 void
 PDIMasterNode::enable_fake_trigger(uint32_t channel, double rate, bool poisson, uint32_t clock_frequency_hz) const // NOLINT(build/unsigned)
 {
+  IPbusProfiler::Scope scope("PDIMasterNode::enable_fake_trigger");
 
   // Configures the internal command generator to produce triggers at a defined frequency.
   // Rate =  (clock_frequency_hz / 2^(d+8)) / p where n in [0,15] and p in [1,256]
@@ -269,6 +278,8 @@ PDIMasterNode::read_in_spill() const
 void
 PDIMasterNode::sync_timestamp(uint32_t clock_frequency_hz) const // NOLINT(build/unsigned)
 {
+  IPbusProfiler::Scope scope("PDIMasterNode::sync_timestamp");
+
   const uint64_t old_timestamp = read_timestamp(); // NOLINT(build/unsigned)
   TLOG() << "Reading old timestamp: " << format_reg_value(old_timestamp) << ", " << format_timestamp(old_timestamp, clock_frequency_hz);
 
@@ -283,16 +294,26 @@ PDIMasterNode::sync_timestamp(uint32_t clock_frequency_hz) const // NOLINT(build
 //-----------------------------------------------------------------------------
 
 //-----------------------------------------------------------------------------
-void
-PDIMasterNode::get_info(timingfirmwareinfo::PDIMasterMonitorData& mon_data) const
+std::function<void()>
+PDIMasterNode::queue_info(timingfirmwareinfo::PDIMasterMonitorData& mon_data) const
 {
-  auto timestamp = getNode<TimestampGeneratorNode>("tstamp").read_raw_timestamp();
-  mon_data.timestamp = tstamp2int(timestamp);
-
+  auto timestamp = getNode<TimestampGeneratorNode>("tstamp").read_raw_timestamp(false);
   auto spill_interface_enabled = getNode("spill.csr.ctrl.en").read();
-  getClient().dispatch();
 
-  mon_data.spill_interface_enabled = spill_interface_enabled.value();
+  return [&mon_data, timestamp, spill_interface_enabled]() {
+    mon_data.timestamp = tstamp2int(timestamp);
+    mon_data.spill_interface_enabled = spill_interface_enabled.value();
+  };
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+PDIMasterNode::get_info(timingfirmwareinfo::PDIMasterMonitorData& mon_data) const
+{
+  auto fill = queue_info(mon_data);
+  IPbusProfiler::dispatch(getClient());
+  fill();
 }
 //-----------------------------------------------------------------------------
 
@@ -300,18 +321,23 @@ PDIMasterNode::get_info(timingfirmwareinfo::PDIMasterMonitorData& mon_data) cons
 void
 PDIMasterNode::get_info(opmonlib::InfoCollector& ic, int level) const
 {
-  timingfirmwareinfo::PDIMasterMonitorData mon_data;
-  this->get_info(mon_data);
-  ic.add(mon_data);
+  MonitoringPlan plan(*this);
+  add_to_monitoring_plan(plan, {}, level);
+  plan.collect(ic);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+PDIMasterNode::add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const
+{
+  plan.add_data<timingfirmwareinfo::PDIMasterMonitorData>(
+    path, [this](timingfirmwareinfo::PDIMasterMonitorData& mon_data) { return queue_info(mon_data); });
 
   for (int i=0; i < 4; ++i)
-  {
-    opmonlib::InfoCollector partition_ic;
-    get_partition_node(i).get_info(partition_ic, level);
-    ic.add("partition"+std::to_string(i),partition_ic);
-  }
+    get_partition_node(i).add_to_monitoring_plan(plan, MonitoringPlan::extend(path, "partition"+std::to_string(i)), level);
 
-  getNode<FLCmdGeneratorNode>("scmd_gen").get_info(ic, level);
+  getNode<FLCmdGeneratorNode>("scmd_gen").add_to_monitoring_plan(plan, path, level);
 }
 //-----------------------------------------------------------------------------
 
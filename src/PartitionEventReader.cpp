@@ -0,0 +1,217 @@
+/**
+ * @file PartitionEventReader.cpp
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#include "timing/PartitionEventReader.hpp"
+
+#include "timing/toolbox.hpp"
+
+#include "logging/Logging.hpp"
+
+#include <algorithm>
+#include <iomanip>
+#include <sstream>
+#include <string>
+#include <thread>
+#include <utility>
+#include <vector>
+
+namespace dunedaq {
+namespace timing {
+
+const uint32_t PartitionEventReader::kEventHeader = 0xaa000600;     // NOLINT(build/unsigned)
+const uint32_t PartitionEventReader::kDefaultMaxBatchEvents = 2048; // NOLINT(build/unsigned)
+const std::chrono::microseconds PartitionEventReader::kDefaultPollInterval(500);
+
+//-----------------------------------------------------------------------------
+PartitionEventReader::PartitionEventReader(const PartitionNode& node,
+                                           uint32_t max_batch_events, // NOLINT(build/unsigned)
+                                           bool read_all)
+  : m_node(node)
+  , m_max_batch_words(std::max<uint32_t>(max_batch_events, 1) * PartitionNode::kWordsPerEvent) // NOLINT
+  , m_read_all(read_all)
+  , m_words_available(0)
+  , m_has_last_counter(false)
+  , m_last_counter(0)
+{
+  m_words.reserve(m_max_batch_words);
+  m_events.reserve(m_max_batch_words / PartitionNode::kWordsPerEvent);
+  m_pending_words.reserve(m_max_batch_words + PartitionNode::kWordsPerEvent);
+  reset_report();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+PartitionEventReader::~PartitionEventReader() {}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+const std::vector<PartitionEvent>&
+PartitionEventReader::read_batch()
+{
+  // only the words already known to be in the buffer are read, and unless reading all of
+  // them, only as many as complete the events started in the last batch
+  uint32_t words_to_read = std::min(m_words_available, m_max_batch_words); // NOLINT(build/unsigned)
+  if (!m_read_all) {
+    uint32_t partial = (m_pending_words.size() + words_to_read) % PartitionNode::kWordsPerEvent; // NOLINT(build/unsigned)
+    words_to_read = (words_to_read >= partial ? words_to_read - partial : 0);
+  }
+
+  const auto read_start = std::chrono::steady_clock::now();
+  if (!m_report.dispatches)
+    m_first_read = read_start;
+
+  m_words_available = m_node.read_buffer_and_word_count(m_words, words_to_read);
+
+  const double latency = std::chrono::duration<double>(std::chrono::steady_clock::now() - read_start).count();
+  m_total_latency += latency;
+  m_report.max_latency = std::max(m_report.max_latency, latency);
+  ++m_report.dispatches;
+  m_report.max_occupancy = std::max(m_report.max_occupancy, m_words_available + words_to_read);
+
+  // the words of an event started in the last batch come first
+  const std::vector<uint32_t>* words = &m_words; // NOLINT(build/unsigned)
+  if (!m_pending_words.empty()) {
+    m_pending_words.insert(m_pending_words.end(), m_words.begin(), m_words.end());
+    words = &m_pending_words;
+  }
+
+  m_events.clear();
+  PartitionEvent event;
+  size_t i = 0;
+  while (i + PartitionNode::kWordsPerEvent <= words->size()) {
+    if (!decode_event(&words->at(i), event)) {
+      TLOG_DEBUG(5) << "Invalid partition event, header: " << format_reg_value(words->at(i));
+      ++m_report.invalid_events;
+
+      // resynchronise on the next header word
+      size_t next = i + 1;
+      while (next < words->size() && words->at(next) != kEventHeader)
+        ++next;
+      m_report.skipped_words += next - i;
+      i = next;
+      continue;
+    }
+    i += PartitionNode::kWordsPerEvent;
+
+    if (m_has_last_counter && event.counter != m_last_counter + 1)
+      ++m_report.counter_gaps;
+    m_has_last_counter = true;
+    m_last_counter = event.counter;
+
+    m_events.push_back(event);
+  }
+
+  // keep the start of an incomplete event for the next batch
+  if (words == &m_pending_words) {
+    m_pending_words.erase(m_pending_words.begin(), m_pending_words.begin() + i);
+  } else {
+    m_pending_words.assign(m_words.begin() + i, m_words.end());
+  }
+
+  m_report.words += m_words.size();
+  m_report.events += m_events.size();
+  if (m_words.empty())
+    ++m_report.empty_reads;
+
+  return m_events;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+const std::vector<PartitionEvent>&
+PartitionEventReader::next_batch(std::chrono::milliseconds timeout, std::chrono::microseconds poll_interval)
+{
+  const auto deadline = std::chrono::steady_clock::now() + timeout;
+  while (true) {
+    read_batch();
+    if (!m_events.empty() || std::chrono::steady_clock::now() >= deadline)
+      return m_events;
+    // events that arrived during the last read can be fetched straight away
+    if (m_words_available < PartitionNode::kWordsPerEvent)
+      std::this_thread::sleep_for(poll_interval);
+  }
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+PartitionReadoutReport
+PartitionEventReader::get_report() const
+{
+  PartitionReadoutReport report = m_report;
+  if (report.dispatches) {
+    report.elapsed = std::chrono::duration<double>(std::chrono::steady_clock::now() - m_first_read).count();
+    report.event_rate = report.elapsed > 0 ? report.events / report.elapsed : 0;
+    report.mean_latency = m_total_latency / report.dispatches;
+  }
+  return report;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::string
+PartitionEventReader::get_report_table(bool print_out) const
+{
+  auto report = get_report();
+
+  std::vector<std::pair<std::string, std::string>> summary;
+  summary.push_back(std::make_pair("Events", std::to_string(report.events)));
+  summary.push_back(std::make_pair("Words", std::to_string(report.words)));
+  summary.push_back(std::make_pair("Dispatches", std::to_string(report.dispatches)));
+  summary.push_back(std::make_pair("Empty reads", std::to_string(report.empty_reads)));
+  summary.push_back(std::make_pair("Invalid events", std::to_string(report.invalid_events)));
+  summary.push_back(std::make_pair("Skipped words", std::to_string(report.skipped_words)));
+  summary.push_back(std::make_pair("Counter gaps", std::to_string(report.counter_gaps)));
+  summary.push_back(std::make_pair("Max occupancy [words]", std::to_string(report.max_occupancy)));
+
+  std::stringstream figure;
+  figure << std::fixed << std::setprecision(3) << report.elapsed;
+  summary.push_back(std::make_pair("Elapsed [s]", figure.str()));
+  figure.str("");
+  figure << std::setprecision(1) << report.event_rate;
+  summary.push_back(std::make_pair("Event rate [Hz]", figure.str()));
+  figure.str("");
+  figure << std::setprecision(3) << report.mean_latency * 1e3;
+  summary.push_back(std::make_pair("Mean read latency [ms]", figure.str()));
+  figure.str("");
+  figure << report.max_latency * 1e3;
+  summary.push_back(std::make_pair("Max read latency [ms]", figure.str()));
+
+  std::string table = format_reg_table(summary, "Partition readout", { "", "" });
+  if (print_out)
+    TLOG() << table;
+  return table;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+PartitionEventReader::reset_report()
+{
+  m_report = PartitionReadoutReport();
+  m_total_latency = 0;
+  m_has_last_counter = false;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+bool
+PartitionEventReader::decode_event(const uint32_t* words, PartitionEvent& event) // NOLINT(build/unsigned)
+{
+  // word 1 carries the 4-bit scmd, zero-padded
+  if (words[0] != kEventHeader || (words[1] & 0xfffffff0))
+    return false;
+
+  event.scmd = words[1];
+  event.timestamp = (static_cast<uint64_t>(words[3]) << 32) | words[2]; // NOLINT(build/unsigned)
+  event.counter = words[4];
+  return true;
+}
+//-----------------------------------------------------------------------------
+
+} // namespace timing
+} // namespace dunedaq
@@ -12,7 +12,6 @@
 
 #include <chrono>
 #include <string>
-#include <thread>
 #include <vector>
 
 namespace dunedaq {
@@ -22,6 +21,8 @@ UHAL_REGISTER_DERIVED_NODE(PartitionNode)
 
 // Static data member initialization
 const uint32_t PartitionNode::kWordsPerEvent = 6; // NOLINT(build/unsigned)
+const std::chrono::microseconds PartitionNode::kRunWaitFirstInterval(100);
+const std::chrono::microseconds PartitionNode::kRunWaitMaxInterval(10000);
 
 //-----------------------------------------------------------------------------
 PartitionNode::PartitionNode(const uhal::Node& node)
@@ -37,10 +38,14 @@ PartitionNode::~PartitionNode() {}
 void
 PartitionNode::enable(bool enable, bool dispatch) const
 {
+  IPbusProfiler::Scope scope("PartitionNode::enable");
+
   getNode("csr.ctrl.part_en").write(enable);
 
-  if (dispatch)
-    getClient().dispatch();
+  if (dispatch) {
+    IPbusProfiler::dispatch(getClient());
+    invalidate_snapshots();
+  }
 }
 //-----------------------------------------------------------------------------
 
@@ -58,10 +63,13 @@ PartitionNode::configure(uint32_t trigger_mask, // NOLINT(build/unsigned)
                          bool enable_spill_gate,
                          bool rate_control_enabled) const
 {
+  IPbusProfiler::Scope scope("PartitionNode::configure");
+
   getNode("csr.ctrl.rate_ctrl_en").write(rate_control_enabled);
   getNode("csr.ctrl.trig_mask").write(trigger_mask);
   getNode("csr.ctrl.spill_gate_en").write(enable_spill_gate);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 }
 //-----------------------------------------------------------------------------
 
@@ -70,7 +78,8 @@ void
 PartitionNode::configure_rate_ctrl(bool rate_control_enabled) const
 {
   getNode("csr.ctrl.rate_ctrl_en").write(rate_control_enabled);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 }
 //-----------------------------------------------------------------------------
 
@@ -80,7 +89,8 @@ PartitionNode::enable_triggers(bool enable) const
 {
   // Disable the buffer
   getNode("csr.ctrl.trig_en").write(enable);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 }
 //-----------------------------------------------------------------------------
 
@@ -89,7 +99,7 @@ uint32_t // NOLINT(build/unsigned)
 PartitionNode::read_trigger_mask() const
 {
   uhal::ValWord<uint32_t> mask = getNode("csr.ctrl.trig_mask").read(); // NOLINT(build/unsigned)
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
 
   return mask;
 }
@@ -100,7 +110,7 @@ uint32_t // NOLINT(build/unsigned)
 PartitionNode::read_buffer_word_count() const
 {
   uhal::ValWord<uint32_t> words = getNode("buf.count").read(); // NOLINT(build/unsigned)
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
 
   return words;
 }
@@ -119,7 +129,7 @@ bool
 PartitionNode::read_rob_warning_overflow() const
 {
   uhal::ValWord<uint32_t> word = getNode("csr.stat.buf_warn").read(); // NOLINT(build/unsigned)
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
 
   return word.value();
 }
@@ -130,7 +140,7 @@ bool
 PartitionNode::read_rob_error() const
 {
   uhal::ValWord<uint32_t> word = getNode("csr.stat.buf_err").read(); // NOLINT(build/unsigned)
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
 
   return word.value();
 }
@@ -140,6 +150,7 @@ PartitionNode::read_rob_error() const
 std::vector<uint32_t> // NOLINT(build/unsigned)
 PartitionNode::read_events(size_t number_of_events) const
 {
+  IPbusProfiler::Scope scope("PartitionNode::read_events");
 
   uint32_t events_in_buffer = num_events_in_buffer(); // NOLINT(build/unsigned)
 
@@ -151,16 +162,41 @@ PartitionNode::read_events(size_t number_of_events) const
 
   uhal::ValVector<uint32_t> raw_events = // NOLINT(build/unsigned)
     getNode("buf.data").readBlock(events_to_read * kWordsPerEvent);
-  getClient().dispatch();
+  IPbusProfiler::count_words(events_to_read * kWordsPerEvent, 0);
+  IPbusProfiler::dispatch(getClient());
 
   return raw_events.value();
 }
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+uint32_t                                                                                           // NOLINT(build/unsigned)
+PartitionNode::read_buffer_and_word_count(std::vector<uint32_t>& data, uint32_t n_words) const // NOLINT(build/unsigned)
+{
+  IPbusProfiler::Scope scope("PartitionNode::read_buffer_and_word_count");
+
+  // the block is queued first so that the count reflects the buffer after the read
+  uhal::ValVector<uint32_t> raw_words; // NOLINT(build/unsigned)
+  if (n_words)
+    raw_words = getNode("buf.data").readBlock(n_words);
+  uhal::ValWord<uint32_t> words_left = getNode("buf.count").read(); // NOLINT(build/unsigned)
+  IPbusProfiler::count_words(n_words + 1, 0);
+  IPbusProfiler::dispatch(getClient());
+
+  data.clear();
+  if (n_words)
+    data.insert(data.end(), raw_words.begin(), raw_words.end());
+
+  return words_left.value();
+}
+//-----------------------------------------------------------------------------
+
 //-----------------------------------------------------------------------------
 void
 PartitionNode::reset() const
 {
+  IPbusProfiler::Scope scope("PartitionNode::reset");
+
   // Disable partition
   getNode("csr.ctrl.part_en").write(0);
   // disable trigger
@@ -173,7 +209,8 @@ PartitionNode::reset() const
   getNode("csr.ctrl.trig_ctr_rst").write(1);
   // Release trigger counter
   getNode("csr.ctrl.trig_ctr_rst").write(0);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 }
 //-----------------------------------------------------------------------------
 
@@ -181,34 +218,32 @@ PartitionNode::reset() const
 void
 PartitionNode::start(uint32_t timeout /*milliseconds*/) const // NOLINT(build/unsigned)
 {
+  IPbusProfiler::Scope scope("PartitionNode::start");
 
   // Disable triggers (just in case)
   getNode("csr.ctrl.trig_en").write(0);
   // Disable the buffer
   getNode("csr.ctrl.buf_en").write(0);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
   // Re-enable the buffer (flushes it)
   getNode("csr.ctrl.buf_en").write(1);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 
   // Set the run bit and wait for it to be acknowledged
   getNode("csr.ctrl.run_req").write(1);
-  getClient().dispatch();
-
-  std::chrono::steady_clock::time_point start = std::chrono::steady_clock::now();
-
-  while (true) {
-    auto in_run = getNode("csr.stat.in_run").read();
-    getClient().dispatch();
-
-    if (in_run)
-      break;
-
-    std::chrono::steady_clock::time_point end = std::chrono::steady_clock::now();
-    if ((end - start) > std::chrono::milliseconds(timeout)) {
-      throw RunRequestTimeoutExpired(ERS_HERE, timeout);
-    }
-    std::this_thread::sleep_for(std::chrono::milliseconds(100));
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
+
+  auto result = wait_for({ "csr.stat.in_run" },
+                         [](const std::vector<uint32_t>& values) { // NOLINT(build/unsigned)
+                           return values.at(0) != 0;
+                         },
+                         WaitSchedule(kRunWaitFirstInterval, kRunWaitMaxInterval, std::chrono::milliseconds(timeout)),
+                         "PartitionNode::start");
+  if (!result.satisfied) {
+    throw RunRequestTimeoutExpired(ERS_HERE, timeout);
   }
 }
 //-----------------------------------------------------------------------------
@@ -217,25 +252,20 @@ PartitionNode::start(uint32_t timeout /*milliseconds*/) const // NOLINT(build/un
 void
 PartitionNode::stop(uint32_t timeout /*milliseconds*/) const // NOLINT(build/unsigned)
 {
-  getNode("csr.ctrl.run_req").write(0);
-  getClient().dispatch();
-
-  std::chrono::steady_clock::time_point start = std::chrono::steady_clock::now();
+  IPbusProfiler::Scope scope("PartitionNode::stop");
 
-  while (true) {
-
-    auto in_run = getNode("csr.stat.in_run").read();
-    getClient().dispatch();
-
-    if (!in_run)
-      break;
-
-    std::chrono::steady_clock::time_point end = std::chrono::steady_clock::now();
-    if ((end - start) > std::chrono::milliseconds(timeout)) {
-      throw RunRequestTimeoutExpired(ERS_HERE, timeout);
-    }
-
-    std::this_thread::sleep_for(std::chrono::milliseconds(100));
+  getNode("csr.ctrl.run_req").write(0);
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
+
+  auto result = wait_for({ "csr.stat.in_run" },
+                         [](const std::vector<uint32_t>& values) { // NOLINT(build/unsigned)
+                           return values.at(0) == 0;
+                         },
+                         WaitSchedule(kRunWaitFirstInterval, kRunWaitMaxInterval, std::chrono::milliseconds(timeout)),
+                         "PartitionNode::stop");
+  if (!result.satisfied) {
+    throw RunRequestTimeoutExpired(ERS_HERE, timeout);
   }
 }
 //-----------------------------------------------------------------------------
@@ -244,13 +274,15 @@ PartitionNode::stop(uint32_t timeout /*milliseconds*/) const // NOLINT(build/uns
 PartitionCounts
 PartitionNode::read_command_counts() const
 {
+  IPbusProfiler::Scope scope("PartitionNode::read_command_counts");
 
   const uhal::Node& accepted_counters = getNode("actrs");
   const uhal::Node& rejected_counters = getNode("rctrs");
 
   uhal::ValVector<uint32_t> accepted = accepted_counters.readBlock(accepted_counters.getSize()); // NOLINT(build/unsigned)
   uhal::ValVector<uint32_t> rejected = rejected_counters.readBlock(rejected_counters.getSize()); // NOLINT(build/unsigned)
-  getClient().dispatch();
+  IPbusProfiler::count_words(accepted_counters.getSize() + rejected_counters.getSize(), 0);
+  IPbusProfiler::dispatch(getClient());
 
   return { accepted.value(), rejected.value() };
 }
@@ -260,6 +292,8 @@ PartitionNode::read_command_counts() const
 std::string
 PartitionNode::get_status(bool print_out) const
 {
+  IPbusProfiler::Scope scope("PartitionNode::get_status");
+
   std::stringstream status;
 
   auto controls = read_sub_nodes(getNode("csr.ctrl"), false);
@@ -271,7 +305,7 @@ PartitionNode::get_status(bool print_out) const
   auto accepted_counters = getNode("actrs").readBlock(getNode("actrs").getSize());
   auto rejected_counters = getNode("rctrs").readBlock(getNode("actrs").getSize());
 
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
 
   std::string partition_id = getId();
   std::string partition_number = partition_id.substr(partition_id.find("partition") + 9);
@@ -298,58 +332,77 @@ PartitionNode::get_status(bool print_out) const
   return status.str();
 }
 //-----------------------------------------------------------------------------
-void
-PartitionNode::get_info(timingfirmwareinfo::TimingPartitionMonitorData& mon_data) const
+std::function<void()>
+PartitionNode::queue_info(timingfirmwareinfo::TimingPartitionMonitorData& mon_data) const
 {
   auto controls = read_sub_nodes(getNode("csr.ctrl"), false);
   auto state = read_sub_nodes(getNode("csr.stat"), false);
 
-  auto event_counter = getNode("evtctr").read();
   auto buffer_count = getNode("buf.count").read();
 
-  getClient().dispatch();
-
-  mon_data.enabled = controls.at("part_en").value();
-  mon_data.spill_interface_enabled = controls.at("spill_gate_en").value();
-  mon_data.trig_enabled = controls.at("trig_en").value();
-  mon_data.trig_mask = controls.at("trig_mask").value();
-  mon_data.rate_ctrl_enabled = controls.at("rate_ctrl_en").value();
-  mon_data.frag_mask = controls.at("frag_mask").value();
-  mon_data.buffer_enabled = controls.at("buf_en").value();
-
-  mon_data.in_run = state.at("in_run").value();
-  mon_data.in_spill = state.at("in_spill").value();
-
-  mon_data.buffer_warning = state.at("buf_warn").value();
-  mon_data.buffer_error = state.at("buf_err").value();
-  mon_data.buffer_occupancy = buffer_count.value();
+  return [&mon_data, controls, state, buffer_count]() {
+    mon_data.enabled = controls.at("part_en").value();
+    mon_data.spill_interface_enabled = controls.at("spill_gate_en").value();
+    mon_data.trig_enabled = controls.at("trig_en").value();
+    mon_data.trig_mask = controls.at("trig_mask").value();
+    mon_data.rate_ctrl_enabled = controls.at("rate_ctrl_en").value();
+    mon_data.frag_mask = controls.at("frag_mask").value();
+    mon_data.buffer_enabled = controls.at("buf_en").value();
+
+    mon_data.in_run = state.at("in_run").value();
+    mon_data.in_spill = state.at("in_spill").value();
+
+    mon_data.buffer_warning = state.at("buf_warn").value();
+    mon_data.buffer_error = state.at("buf_err").value();
+    mon_data.buffer_occupancy = buffer_count.value();
+  };
 }
 //-----------------------------------------------------------------------------
 
 //-----------------------------------------------------------------------------
 void
-PartitionNode::get_info(opmonlib::InfoCollector& ic, int /*level*/) const
+PartitionNode::get_info(timingfirmwareinfo::TimingPartitionMonitorData& mon_data) const
 {
-  timingfirmwareinfo::TimingPartitionMonitorData mon_data;
-  this->get_info(mon_data);
-  ic.add(mon_data);
-
-  auto accepted_counters = getNode("actrs").readBlock(getNode("actrs").getSize());
-  auto rejected_counters = getNode("rctrs").readBlock(getNode("actrs").getSize());
-  getClient().dispatch();
-
-
-  for (auto& cmd: g_command_map) {
-    timingfirmwareinfo::TimingFLCmdCounter cmd_counter;
-    opmonlib::InfoCollector cmd_counter_ic;
-
-    cmd_counter.accepted = accepted_counters.at(cmd.first);
-    cmd_counter.rejected = rejected_counters.at(cmd.first);
+  auto fill = queue_info(mon_data);
+  IPbusProfiler::dispatch(getClient());
+  fill();
+}
+//-----------------------------------------------------------------------------
 
-    cmd_counter_ic.add(cmd_counter);
-    ic.add(cmd.second, cmd_counter_ic);
-  }
+//-----------------------------------------------------------------------------
+void
+PartitionNode::get_info(opmonlib::InfoCollector& ic, int level) const
+{
+  MonitoringPlan plan(*this);
+  add_to_monitoring_plan(plan, {}, level);
+  plan.collect(ic);
+}
+//-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+void
+PartitionNode::add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int /*level*/) const
+{
+  plan.add_data<timingfirmwareinfo::TimingPartitionMonitorData>(
+    path, [this](timingfirmwareinfo::TimingPartitionMonitorData& mon_data) { return queue_info(mon_data); });
+
+  plan.add_reads(path, [this]() -> MonitoringPlan::FillFunction {
+    auto accepted_counters = getNode("actrs").readBlock(getNode("actrs").getSize());
+    auto rejected_counters = getNode("rctrs").readBlock(getNode("actrs").getSize());
+
+    return [accepted_counters, rejected_counters](opmonlib::InfoCollector& ic) {
+      for (auto& cmd: g_command_map) {
+        timingfirmwareinfo::TimingFLCmdCounter cmd_counter;
+        opmonlib::InfoCollector cmd_counter_ic;
+
+        cmd_counter.accepted = accepted_counters.at(cmd.first);
+        cmd_counter.rejected = rejected_counters.at(cmd.first);
+
+        cmd_counter_ic.add(cmd_counter);
+        ic.add(cmd.second, cmd_counter_ic);
+      }
+    };
+  });
 }
 //-----------------------------------------------------------------------------
 
@@ -0,0 +1,217 @@
+/**
+ * @file RegisterSnapshotCache.cpp
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#include "timing/RegisterSnapshotCache.hpp"
+
+#include "logging/Logging.hpp"
+
+#include <map>
+#include <string>
+
+namespace dunedaq {
+namespace timing {
+
+std::map<std::string, RegisterSnapshotCache::ClientCache> RegisterSnapshotCache::s_clients;
+std::chrono::milliseconds RegisterSnapshotCache::s_default_ttl(0);
+std::mutex RegisterSnapshotCache::s_mutex;
+
+namespace {
+
+std::string
+entry_key(const std::string& path, const std::string& regex)
+{
+  return path + "|" + regex;
+}
+
+// whether one of the paths is the other one or one of its parents
+bool
+paths_overlap(const std::string& path, const std::string& other)
+{
+  const std::string& shorter = path.size() < other.size() ? path : other;
+  const std::string& longer = path.size() < other.size() ? other : path;
+  if (shorter.empty())
+    return true;
+  return longer.compare(0, shorter.size(), shorter) == 0 &&
+         (longer.size() == shorter.size() || longer.at(shorter.size()) == '.');
+}
+
+} // namespace
+
+//-----------------------------------------------------------------------------
+RegisterSnapshotCache::ClientCache*
+RegisterSnapshotCache::find_client(const uhal::Node& node, bool create)
+{
+  const std::string& uri = node.getClient().uri();
+  auto client = s_clients.find(uri);
+  if (client != s_clients.end())
+    return &client->second;
+  if (!create)
+    return nullptr;
+
+  ClientCache& new_client = s_clients[uri];
+  new_client.ttl = std::chrono::milliseconds(-1);
+  new_client.stats = RegisterSnapshotCacheStats();
+  return &new_client;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::chrono::milliseconds
+RegisterSnapshotCache::client_ttl(const ClientCache* client)
+{
+  if (client == nullptr || client->ttl.count() < 0)
+    return s_default_ttl;
+  return client->ttl;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+RegisterSnapshotCache::enable(const uhal::Node& node, std::chrono::milliseconds ttl)
+{
+  std::lock_guard<std::mutex> lock(s_mutex);
+  ClientCache* client = find_client(node, true);
+  client->ttl = ttl.count() > 0 ? ttl : std::chrono::milliseconds(0);
+  client->entries.clear();
+  TLOG_DEBUG(3) << "Register snapshot cache of " << node.getClient().uri() << ": ttl " << client->ttl.count() << " ms";
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+RegisterSnapshotCache::enable_all(std::chrono::milliseconds ttl)
+{
+  std::lock_guard<std::mutex> lock(s_mutex);
+  s_default_ttl = ttl.count() > 0 ? ttl : std::chrono::milliseconds(0);
+  for (auto& client : s_clients)
+    client.second.entries.clear();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+RegisterSnapshotCache::disable(const uhal::Node& node)
+{
+  enable(node, std::chrono::milliseconds(0));
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+RegisterSnapshotCache::disable_all()
+{
+  std::lock_guard<std::mutex> lock(s_mutex);
+  s_default_ttl = std::chrono::milliseconds(0);
+  s_clients.clear();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::chrono::milliseconds
+RegisterSnapshotCache::get_ttl(const uhal::Node& node)
+{
+  std::lock_guard<std::mutex> lock(s_mutex);
+  return client_ttl(find_client(node, false));
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+bool
+RegisterSnapshotCache::lookup(const uhal::Node& node, const std::string& regex, Registers& registers)
+{
+  std::lock_guard<std::mutex> lock(s_mutex);
+
+  ClientCache* client = find_client(node, false);
+  auto ttl = client_ttl(client);
+  if (ttl.count() == 0)
+    return false;
+  if (client == nullptr)
+    client = find_client(node, true);
+
+  auto entry = client->entries.find(entry_key(node.getPath(), regex));
+  bool fresh = entry != client->entries.end() && std::chrono::steady_clock::now() - entry->second.time < ttl;
+
+  // reads stored before their dispatch are only shared once it has happened
+  if (fresh) {
+    for (auto& reg : entry->second.registers) {
+      if (!reg.second.valid()) {
+        fresh = false;
+        break;
+      }
+    }
+  }
+
+  if (!fresh) {
+    ++client->stats.misses;
+    return false;
+  }
+
+  ++client->stats.hits;
+  registers = entry->second.registers;
+  return true;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+RegisterSnapshotCache::store(const uhal::Node& node, const std::string& regex, const Registers& registers)
+{
+  std::lock_guard<std::mutex> lock(s_mutex);
+
+  ClientCache* client = find_client(node, false);
+  if (client_ttl(client).count() == 0)
+    return;
+  if (client == nullptr)
+    client = find_client(node, true);
+
+  Entry& entry = client->entries[entry_key(node.getPath(), regex)];
+  entry.time = std::chrono::steady_clock::now();
+  entry.registers = registers;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+RegisterSnapshotCache::invalidate(const uhal::Node& node)
+{
+  std::lock_guard<std::mutex> lock(s_mutex);
+
+  ClientCache* client = find_client(node, false);
+  if (client == nullptr || client->entries.empty())
+    return;
+
+  const std::string path = node.getPath();
+  for (auto entry = client->entries.begin(); entry != client->entries.end();) {
+    if (paths_overlap(path, entry->first.substr(0, entry->first.find('|')))) {
+      entry = client->entries.erase(entry);
+      ++client->stats.invalidations;
+    } else {
+      ++entry;
+    }
+  }
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+RegisterSnapshotCacheStats
+RegisterSnapshotCache::get_stats(const uhal::Node& node)
+{
+  std::lock_guard<std::mutex> lock(s_mutex);
+
+  RegisterSnapshotCacheStats stats = RegisterSnapshotCacheStats();
+  ClientCache* client = find_client(node, false);
+  if (client != nullptr) {
+    stats = client->stats;
+    stats.entries = client->entries.size();
+  }
+  return stats;
+}
+//-----------------------------------------------------------------------------
+
+} // namespace timing
+} // namespace dunedaq
@@ -0,0 +1,430 @@
+/**
+ * @file SI534xConfig.cpp
+ *
+ * This is part of the DUNE DAQ Software Suite, copyright 2020.
+ * Licensing/copyright details are in the COPYING file that you should have
+ * received with this code.
+ */
+
+#include "timing/SI534xConfig.hpp"
+
+// PDT headers
+#include "ers/ers.hpp"
+#include "logging/Logging.hpp"
+#include "timing/toolbox.hpp"
+
+#include <boost/algorithm/string/predicate.hpp>
+#include <boost/filesystem/operations.hpp>
+#include <boost/filesystem/path.hpp>
+
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+#include <cstdlib>
+#include <cstring>
+#include <fstream>
+#include <iterator>
+#include <sstream>
+#include <string>
+#include <vector>
+
+namespace dunedaq {
+namespace timing {
+
+namespace fs = boost::filesystem;
+
+// Binary image layout: ImageHeader, ImageRun[sum(n_runs)], uint8_t data[n_data]
+struct ImageHeader
+{
+  uint32_t magic;        // NOLINT(build/unsigned)
+  uint32_t version;      // NOLINT(build/unsigned)
+  uint64_t content_hash; // NOLINT(build/unsigned)
+  char design_id[32];
+  uint32_t n_runs[3]; // NOLINT(build/unsigned)
+  uint32_t n_data;    // NOLINT(build/unsigned)
+};
+
+struct ImageRun
+{
+  uint8_t page;    // NOLINT(build/unsigned)
+  uint8_t reg;     // NOLINT(build/unsigned)
+  uint16_t length; // NOLINT(build/unsigned)
+  uint32_t offset; // NOLINT(build/unsigned)
+};
+
+const uint32_t SI534xConfig::kImageMagic = 0x43434953;  // "SICC" // NOLINT(build/unsigned)
+const uint32_t SI534xConfig::kImageVersion = 1;         // NOLINT(build/unsigned)
+
+//-----------------------------------------------------------------------------
+SI534xConfig::SI534xConfig()
+  : m_content_hash(0)
+{}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+SI534xConfig
+SI534xConfig::load(const std::string& filename, bool use_cache)
+{
+  throw_if_not_file(filename);
+
+  SI534xConfig config;
+
+  if (!use_cache) {
+    config.parse(filename);
+    return config;
+  }
+
+  std::string cache_path = get_cache_path(filename);
+  if (config.read_image(cache_path)) {
+    TLOG_DEBUG(2) << "Loaded clock configuration " << filename << " from cache " << cache_path;
+    return config;
+  }
+
+  config.parse(filename);
+  try {
+    config.write_image(cache_path);
+  } catch (const std::exception& e) {
+    ers::warning(SI534xConfigCacheError(ERS_HERE, cache_path, e.what()));
+  }
+  return config;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::string
+SI534xConfig::compile(const std::string& filename)
+{
+  throw_if_not_file(filename);
+
+  SI534xConfig config;
+  config.parse(filename);
+
+  std::string cache_path = get_cache_path(filename);
+  config.write_image(cache_path);
+  return cache_path;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::string
+SI534xConfig::get_cache_directory()
+{
+  const char* cache_dir = std::getenv("TIMING_CLOCK_CONFIG_CACHE");
+  if (cache_dir && std::strlen(cache_dir))
+    return cache_dir;
+
+  const char* home_dir = std::getenv("HOME");
+  return (fs::path(home_dir ? home_dir : fs::temp_directory_path().string()) / ".cache" / "timing" / "clock").string();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::string
+SI534xConfig::get_cache_path(const std::string& filename)
+{
+  // Key: hash of the canonical path, followed by modification time and size
+  std::string canonical_path = fs::canonical(filename).string();
+
+  uint64_t path_hash = 0xcbf29ce484222325; // NOLINT(build/unsigned)
+  for (char c : canonical_path) {
+    path_hash = (path_hash ^ static_cast<uint8_t>(c)) * 0x100000001b3; // NOLINT(build/unsigned)
+  }
+
+  std::stringstream cache_name;
+  cache_name << std::hex << path_hash << "-" << fs::last_write_time(canonical_path) << "-"
+             << fs::file_size(canonical_path) << ".sicc";
+
+  return (fs::path(get_cache_directory()) / cache_name.str()).string();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+uint64_t // NOLINT(build/unsigned)
+SI534xConfig::hash_file(const std::string& filename)
+{
+  // 64 bit FNV-1a
+  std::ifstream file(filename, std::ios::binary);
+  uint64_t hash = 0xcbf29ce484222325; // NOLINT(build/unsigned)
+  for (std::istreambuf_iterator<char> it(file), end; it != end; ++it) {
+    hash = (hash ^ static_cast<uint8_t>(*it)) * 0x100000001b3; // NOLINT(build/unsigned)
+  }
+  return hash;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+SI534xConfig::parse(const std::string& filename)
+{
+  std::ifstream config_file(filename);
+
+  // Seek the header line first
+  m_design_id = seek_header(config_file);
+  std::ifstream::pos_type header_end = config_file.tellg();
+
+  try {
+    m_preamble = read_config_section(config_file, "preamble");
+    m_registers = read_config_section(config_file, "registers");
+    m_postamble = read_config_section(config_file, "postamble");
+  } catch (SI534xMissingConfigSectionError&) {
+    config_file.seekg(header_end);
+    m_preamble.clear();
+    m_registers = read_config_section(config_file, "");
+    m_postamble.clear();
+  }
+
+  config_file.close();
+
+  m_content_hash = hash_file(filename);
+
+  TLOG_DEBUG(3) << "Preamble size = " << m_preamble.size();
+  TLOG_DEBUG(3) << "Registers size = " << m_registers.size();
+  TLOG_DEBUG(3) << "PostAmble size = " << m_postamble.size();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+bool
+SI534xConfig::read_image(const std::string& cache_path)
+{
+  int fd = open(cache_path.c_str(), O_RDONLY);
+  if (fd < 0)
+    return false;
+
+  struct stat file_stat;
+  if (fstat(fd, &file_stat) != 0 || static_cast<size_t>(file_stat.st_size) < sizeof(ImageHeader)) {
+    close(fd);
+    return false;
+  }
+
+  size_t size = file_stat.st_size;
+  void* image = mmap(nullptr, size, PROT_READ, MAP_PRIVATE, fd, 0);
+  close(fd);
+  if (image == MAP_FAILED)
+    return false;
+
+  const uint8_t* bytes = static_cast<const uint8_t*>(image); // NOLINT(build/unsigned)
+  const ImageHeader* header = reinterpret_cast<const ImageHeader*>(bytes);
+
+  size_t n_runs = static_cast<size_t>(header->n_runs[0]) + header->n_runs[1] + header->n_runs[2];
+  bool valid = (header->magic == kImageMagic && header->version == kImageVersion &&
+                size == sizeof(ImageHeader) + n_runs * sizeof(ImageRun) + header->n_data);
+
+  if (valid) {
+    const ImageRun* runs = reinterpret_cast<const ImageRun*>(bytes + sizeof(ImageHeader));
+    const uint8_t* data = bytes + sizeof(ImageHeader) + n_runs * sizeof(ImageRun); // NOLINT(build/unsigned)
+
+    m_design_id = std::string(header->design_id, strnlen(header->design_id, sizeof(header->design_id)));
+    m_content_hash = header->content_hash;
+
+    std::vector<RegisterSetting_t>* sections[3] = { &m_preamble, &m_registers, &m_postamble };
+    for (size_t i(0); i < 3 && valid; ++i) {
+      sections[i]->clear();
+      for (uint32_t j(0); j < header->n_runs[i]; ++j, ++runs) { // NOLINT(build/unsigned)
+        if (runs->offset + runs->length > header->n_data || runs->reg + runs->length > 0x100) {
+          valid = false;
+          break;
+        }
+        for (uint16_t k(0); k < runs->length; ++k) { // NOLINT(build/unsigned)
+          sections[i]->push_back(RegisterSetting_t((runs->page << 8) + runs->reg + k, data[runs->offset + k]));
+        }
+      }
+    }
+  }
+
+  munmap(image, size);
+
+  if (!valid) {
+    TLOG_DEBUG(2) << "Ignoring invalid clock configuration cache image " << cache_path;
+  }
+  return valid;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+SI534xConfig::write_image(const std::string& cache_path) const
+{
+  ImageHeader header;
+  std::memset(&header, 0, sizeof(header));
+  header.magic = kImageMagic;
+  header.version = kImageVersion;
+  header.content_hash = m_content_hash;
+  std::strncpy(header.design_id, m_design_id.c_str(), sizeof(header.design_id) - 1);
+
+  // Build runs of contiguous registers on the same page, preserving the file order
+  std::vector<ImageRun> runs;
+  std::vector<uint8_t> data; // NOLINT(build/unsigned)
+  const std::vector<RegisterSetting_t>* sections[3] = { &m_preamble, &m_registers, &m_postamble };
+  for (size_t i(0); i < 3; ++i) {
+    size_t first_run = runs.size();
+    int32_t next_address(-1);
+    for (const auto& setting : *sections[i]) {
+      uint16_t address = setting.get<0>(); // NOLINT(build/unsigned)
+      if (runs.size() == first_run || address != next_address) {
+        runs.push_back({ (uint8_t)(address >> 8), (uint8_t)(address & 0xff), 0, (uint32_t)data.size() }); // NOLINT
+      }
+      ++runs.back().length;
+      data.push_back(setting.get<1>());
+      next_address = ((address & 0xff) == 0xff ? -1 : address + 1);
+    }
+    header.n_runs[i] = runs.size() - first_run;
+  }
+  header.n_data = data.size();
+
+  fs::create_directories(fs::path(cache_path).parent_path());
+
+  // Write to a temporary file first, then move it in place
+  std::string tmp_path = cache_path + ".tmp." + std::to_string(getpid());
+  {
+    std::ofstream image(tmp_path, std::ios::binary | std::ios::trunc);
+    image.write(reinterpret_cast<const char*>(&header), sizeof(header));
+    image.write(reinterpret_cast<const char*>(runs.data()), runs.size() * sizeof(ImageRun));
+    image.write(reinterpret_cast<const char*>(data.data()), data.size());
+    if (!image) {
+      fs::remove(tmp_path);
+      throw SI534xConfigCacheError(ERS_HERE, cache_path, "write failed");
+    }
+  }
+  fs::rename(tmp_path, cache_path);
+
+  // Drop images of older versions of the same file
+  std::string key = fs::path(cache_path).filename().string();
+  key = key.substr(0, key.find('-') + 1);
+  for (fs::directory_iterator it(fs::path(cache_path).parent_path()), end; it != end; ++it) {
+    std::string name = it->path().filename().string();
+    if (boost::starts_with(name, key) && it->path() != fs::path(cache_path)) {
+      boost::system::error_code ec;
+      fs::remove(it->path(), ec);
+    }
+  }
+
+  TLOG_DEBUG(2) << "Wrote clock configuration cache " << cache_path << ": " << runs.size() << " runs, " << data.size()
+                << " registers";
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::string
+SI534xConfig::seek_header(std::ifstream& file)
+{
+
+  // std::string config_line;
+  std::string design_id;
+
+  std::string config_line;
+  uint32_t line_number; // NOLINT(build/unsigned)
+  for (line_number = 1; std::getline(file, config_line); ++line_number) {
+
+    // Gracefully deal with those damn dos-encoded files
+    if (config_line.back() == '\r')
+      config_line.pop_back();
+
+    // Section end found. Break here
+    if (boost::starts_with(config_line, "# Design ID:")) {
+      design_id = config_line.substr(13);
+    }
+
+    // Skip comments
+    if (config_line[0] == '#')
+      continue;
+
+    // Stop if the line is empty
+    if (config_line.length() == 0)
+      continue;
+
+    // OK, header found, stop here
+    if (config_line == "Address,Data")
+      break;
+
+    if (file.eof()) {
+      throw SI534xConfigError(ERS_HERE, "Incomplete file: End of file detected while seeking the header.");
+    }
+  }
+
+  TLOG_DEBUG(2) << "Found desing ID " << design_id;
+
+  return design_id;
+}
+
+//-----------------------------------------------------------------------------
+// Seek Header
+// Seek conf start
+// read data
+// Stop on conf end
+
+std::vector<SI534xConfig::RegisterSetting_t>
+SI534xConfig::read_config_section(std::ifstream& file, std::string tag)
+{
+
+  // Line buffer
+  // std::string config_line;
+
+  bool section_found(false);
+
+  std::vector<RegisterSetting_t> config;
+  std::string config_line;
+  uint32_t line_number; // NOLINT(build/unsigned)
+  for (line_number = 1; std::getline(file, config_line); ++line_number) {
+
+    // Gracefully deal with those damn dos-encoded files
+    if (config_line.back() == '\r')
+      config_line.pop_back();
+
+    // Is it a comment
+    if (config_line[0] == '#') {
+
+      if (tag.empty())
+        continue;
+
+      if (boost::starts_with(config_line, "# Start configuration " + tag)) {
+        section_found = true;
+      }
+
+      // Section end found. Break here
+      if (boost::starts_with(config_line, "# End configuration " + tag)) {
+        break;
+      }
+
+      continue;
+    }
+
+    // Oops
+    if (file.eof()) {
+      if (tag.empty())
+        return config;
+      else
+        throw SI534xConfigError(ERS_HERE,
+                                "Incomplete file: End of file detected before the end of " + tag + " section.");
+    }
+
+    // Stop if the line is empty
+    if (config_line.length() == 0)
+      continue;
+
+    // If no sec
+    if (!section_found && !tag.empty()) {
+      throw SI534xMissingConfigSectionError(ERS_HERE, tag);
+    }
+
+    uint32_t address, data; // NOLINT(build/unsigned)
+    char dummy;
+
+    std::istringstream line_stream(config_line);
+    line_stream >> std::hex >> address >> dummy >> std::hex >> data;
+
+    std::stringstream debug_stream;
+    debug_stream << std::showbase << std::hex << "Address: " << address << dummy << " Data: " << data;
+    TLOG_DEBUG(3) << debug_stream.str();
+
+    config.push_back(RegisterSetting_t(address, data));
+  }
+
+  return config;
+}
+//-----------------------------------------------------------------------------
+
+} // namespace timing
+} // namespace dunedaq
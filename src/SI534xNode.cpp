@@ -12,15 +12,14 @@
 #include "ers/ers.hpp"
 #include "timing/toolbox.hpp"
 
-#include <boost/algorithm/string/predicate.hpp>
 #include <boost/tuple/tuple.hpp>
 
 #include <chrono>
-#include <fstream>
 #include <map>
 #include <sstream>
 #include <string>
 #include <thread>
+#include <utility>
 #include <vector>
 
 namespace dunedaq {
@@ -29,6 +28,11 @@ namespace timing {
 // uHAL Node registation
 UHAL_REGISTER_DERIVED_NODE(SI534xNode)
 
+// SOFT_RST, HARD_RST/SYNC and BW_UPDATE_PLL strobes
+const std::set<uint16_t> SI534xSlave::kSelfClearingRegisters = { 0x001C, 0x001E, 0x0514 }; // NOLINT(build/unsigned)
+// Output driver configuration
+const std::set<uint8_t> SI534xSlave::kHitlessPages = { 0x01 }; // NOLINT(build/unsigned)
+
 //-----------------------------------------------------------------------------
 SI534xSlave::SI534xSlave(const I2CMasterNode* i2c_master, uint8_t address) // NOLINT(build/unsigned)
   : SIChipSlave(i2c_master, address)
@@ -53,179 +57,135 @@ SI534xSlave::read_config_id() const
 //-----------------------------------------------------------------------------
 
 //-----------------------------------------------------------------------------
-std::string
-SI534xSlave::seek_header(std::ifstream& file) const
+void
+SI534xSlave::read_config(const std::string& filename,
+                         std::string& design_id,
+                         std::vector<RegisterSetting_t>& preamble,
+                         std::vector<RegisterSetting_t>& registers,
+                         std::vector<RegisterSetting_t>& postamble) const
 {
 
-  // std::string config_line;
-  std::string design_id;
+  // Pre-parsed image from the clock configuration cache when available
+  auto config = SI534xConfig::load(filename);
 
-  std::string config_line;
-  uint32_t line_number; // NOLINT(build/unsigned)
-  for (line_number = 1; std::getline(file, config_line); ++line_number) {
+  design_id = config.get_design_id();
+  preamble = config.get_preamble();
+  registers = config.get_registers();
+  postamble = config.get_postamble();
 
-    // Gracefully deal with those damn dos-encoded files
-    if (config_line.back() == '\r')
-      config_line.pop_back();
+  TLOG_DEBUG(3) << "Preamble size = " << preamble.size();
+  TLOG_DEBUG(3) << "Registers size = " << registers.size();
+  TLOG_DEBUG(3) << "PostAmble size = " << postamble.size();
+}
+//-----------------------------------------------------------------------------
 
-    // Section end found. Break here
-    if (boost::starts_with(config_line, "# Design ID:")) {
-      design_id = config_line.substr(13);
-    }
+//-----------------------------------------------------------------------------
+bool
+SI534xSlave::read_loss_of_lock() const
+{
+  return dec_rng(read_clock_register(0xe), 1);
+}
+//-----------------------------------------------------------------------------
 
-    // Skip comments
-    if (config_line[0] == '#')
-      continue;
+//-----------------------------------------------------------------------------
+bool
+SI534xSlave::is_configured(const std::string& filename) const
+{
+  IPbusProfiler::Scope scope("SI534xSlave::is_configured");
 
-    // Stop if the line is empty
-    if (config_line.length() == 0)
-      continue;
+  std::string conf_design_id = SI534xConfig::load(filename).get_design_id();
 
-    // OK, header found, stop here
-    if (config_line == "Address,Data")
-      break;
+  I2CBusSession session(get_master());
 
-    if (file.eof()) {
-      throw SI534xConfigError(ERS_HERE, "Incomplete file: End of file detected while seeking the header.");
-    }
+  std::string chip_design_id = this->read_config_id();
+  if (conf_design_id != chip_design_id) {
+    TLOG_DEBUG(2) << "PLL design ID " << chip_design_id << " does not match the configuration design ID "
+                  << conf_design_id;
+    return false;
   }
 
-  TLOG_DEBUG(2) << "Found desing ID " << design_id;
-
-  return design_id;
+  if (read_loss_of_lock()) {
+    TLOG_DEBUG(2) << "PLL design ID " << chip_design_id << " matches, but the PLL is not locked";
+    return false;
+  }
+  return true;
 }
-
 //-----------------------------------------------------------------------------
-// Seek Header
-// Seek conf start
-// read data
-// Stop on conf end
 
-std::vector<SI534xSlave::RegisterSetting_t>
-SI534xSlave::read_config_section(std::ifstream& file, std::string tag) const
+//-----------------------------------------------------------------------------
+void
+SI534xSlave::configure(const std::string& filename, bool incremental) const
 {
+  IPbusProfiler::Scope scope("SI534xSlave::configure");
 
-  // Line buffer
-  // std::string config_line;
+  std::string conf_design_id;
+  std::vector<SI534xSlave::RegisterSetting_t> preamble, registers, postamble;
 
-  bool section_found(false);
+  read_config(filename, conf_design_id, preamble, registers, postamble);
 
-  std::vector<RegisterSetting_t> config;
-  std::string config_line;
-  uint32_t line_number; // NOLINT(build/unsigned)
-  for (line_number = 1; std::getline(file, config_line); ++line_number) {
+  I2CBusSession session(get_master());
 
-    // Gracefully deal with those damn dos-encoded files
-    if (config_line.back() == '\r')
-      config_line.pop_back();
+  if (incremental && this->read_config_id() == conf_design_id && !read_loss_of_lock()) {
 
-    // Is it a comment
-    if (config_line[0] == '#') {
+    // Read back the current register image in bulk
+    std::vector<uint16_t> addresses; // NOLINT(build/unsigned)
+    addresses.reserve(registers.size());
+    for (const auto& setting : registers) {
+      addresses.push_back(setting.get<0>());
+    }
+    auto current = this->read_clock_registers(addresses);
 
-      if (tag.empty())
+    // Diff it against the configuration
+    std::vector<SI534xSlave::RegisterSetting_t> changes;
+    bool needs_calibration(false);
+    for (const auto& setting : registers) {
+      if (kSelfClearingRegisters.count(setting.get<0>()))
+        continue;
+      if (current.at(setting.get<0>()) == setting.get<1>())
         continue;
 
-      if (boost::starts_with(config_line, "# Start configuration " + tag)) {
-        section_found = true;
-      }
-
-      // Section end found. Break here
-      if (boost::starts_with(config_line, "# End configuration " + tag)) {
-        break;
+      changes.push_back(setting);
+      if (!kHitlessPages.count((setting.get<0>() >> 8) & 0xff)) {
+        needs_calibration = true;
       }
-
-      continue;
     }
 
-    // Oops
-    if (file.eof()) {
-      if (tag.empty())
-        return config;
-      else
-        throw SI534xConfigError(ERS_HERE,
-                                "Incomplete file: End of file detected before the end of " + tag + " section.");
-    }
+    TLOG_DEBUG(2) << "Incremental configuration: " << changes.size() << " registers differ from " << filename
+                  << (needs_calibration ? ", calibration required" : "");
 
-    // Stop if the line is empty
-    if (config_line.length() == 0)
-      continue;
+    if (changes.empty())
+      return;
 
-    // If no sec
-    if (!section_found && !tag.empty()) {
-      throw SI534xMissingConfigSectionError(ERS_HERE, tag);
+    if (needs_calibration) {
+      this->upload_config(preamble);
+      std::this_thread::sleep_for(std::chrono::milliseconds(300));
+      this->upload_config(changes);
+      this->upload_config(postamble);
+    } else {
+      this->upload_config(changes);
     }
+  } else {
 
-    uint32_t address, data; // NOLINT(build/unsigned)
-    char dummy;
-
-    std::istringstream line_stream(config_line);
-    line_stream >> std::hex >> address >> dummy >> std::hex >> data;
-
-    std::stringstream debug_stream;
-    debug_stream << std::showbase << std::hex << "Address: " << address << dummy << " Data: " << data;
-    TLOG_DEBUG(3) << debug_stream.str();
-
-    config.push_back(RegisterSetting_t(address, data));
-  }
-
-  return config;
-}
-//-----------------------------------------------------------------------------
-
-//-----------------------------------------------------------------------------
-void
-SI534xSlave::configure(const std::string& filename) const
-{
-
-  throw_if_not_file(filename);
-
-  std::ifstream config_file(filename);
-  std::string config_line;
-  std::string conf_design_id;
-
-  // Seek the header line first
-  conf_design_id = seek_header(config_file);
-  std::ifstream::pos_type header_end = config_file.tellg();
-
-  // auto preamble = this->read_config_section(config_file, "preamble");
-  // TIMING_LOG(kDebug) << "Preamble size = " << preamble.size();
-  // auto registers = this->read_config_section(config_file, "registers");
-  // TIMING_LOG(kDebug) << "Registers size = " << registers.size();
-  // auto postamble = this->read_config_section(config_file, "postamble");
-  // TIMING_LOG(kDebug) << "PostAmble size = " << postamble.size();
-
-  std::vector<SI534xSlave::RegisterSetting_t> preamble, registers, postamble;
-
-  try {
-    preamble = this->read_config_section(config_file, "preamble");
-    registers = this->read_config_section(config_file, "registers");
-    postamble = this->read_config_section(config_file, "postamble");
-  } catch (SI534xMissingConfigSectionError&) {
-    config_file.seekg(header_end);
-    preamble.clear();
-    registers = this->read_config_section(config_file, "");
-    postamble.clear();
-  }
+    if (incremental) {
+      TLOG_DEBUG(2) << "PLL not running design " << conf_design_id << ", performing full configuration";
+    }
 
-  TLOG_DEBUG(3) << "Preamble size = " << preamble.size();
-  TLOG_DEBUG(3) << "Registers size = " << registers.size();
-  TLOG_DEBUG(3) << "PostAmble size = " << postamble.size();
+    try {
+      this->write_clock_register(0x1E, 0x2);
+    } catch (timing::I2CException& excp) {
+      // Do nothing.
+    }
+    // The chip reset brings the page register back to its default
+    this->invalidate_page_cache();
 
-  config_file.close();
+    std::this_thread::sleep_for(std::chrono::milliseconds(1000));
 
-  try {
-    this->write_clock_register(0x1E, 0x2);
-  } catch (timing::I2CException& excp) {
-    // Do nothing.
+    this->upload_config(preamble);
+    std::this_thread::sleep_for(std::chrono::milliseconds(300));
+    this->upload_config(registers);
+    this->upload_config(postamble);
   }
 
-  std::this_thread::sleep_for(std::chrono::milliseconds(1000));
-
-  this->upload_config(preamble);
-  std::this_thread::sleep_for(std::chrono::milliseconds(300));
-  this->upload_config(registers);
-  this->upload_config(postamble);
-
   std::string chip_design_id = this->read_config_id();
 
   if (conf_design_id != chip_design_id) {
@@ -245,7 +205,29 @@ SI534xSlave::upload_config(const std::vector<SI534xSlave::RegisterSetting_t>& co
   size_t k(0), notify_percent(10);
   size_t notify_every = (notify_percent < config.size() ? config.size() / notify_percent : 1);
 
+  // Reset the bus once for the whole upload
+  I2CBusSession session(get_master());
+
+  // Fast path: contiguous registers are written in auto-increment bursts
+  std::vector<std::pair<uint16_t, uint8_t>> settings; // NOLINT(build/unsigned)
+  settings.reserve(config.size());
   for (const auto& setting : config) {
+    settings.push_back(std::make_pair(setting.get<0>(), setting.get<1>()));
+  }
+
+  size_t n_written(0);
+  try {
+    this->write_clock_registers(settings, &n_written);
+    return;
+  } catch (const timing::I2CException& e) {
+    TLOG_DEBUG(3) << "Burst upload failed after " << n_written
+                  << " registers, resuming register-by-register: " << e.what();
+  }
+
+  // Resume from the first register of the transfer which failed
+  k = n_written;
+  for (auto it = config.begin() + n_written; it != config.end(); ++it) {
+    const auto& setting = *it;
     std::stringstream debug_stream;
     debug_stream << std::showbase << std::hex << "Writing to " << (uint32_t)setting.get<0>() // NOLINT(build/unsigned)
                  << " data " << (uint32_t)setting.get<1>();                                  // NOLINT(build/unsigned)
@@ -287,6 +269,9 @@ SI534xSlave::registers() const
   //  boost::format fmthex("%d");
   std::map<uint16_t, uint8_t> values; // NOLINT(build/unsigned)
 
+  // Keep the page selection and the reads together
+  I2CBusSession session(get_master());
+
   for (uint8_t reg_addr = 0xc; reg_addr <= 0x12; reg_addr++) { // NOLINT(build/unsigned)
     if (reg_addr > 0xf && reg_addr < 0x11) {
       continue;
@@ -331,6 +316,8 @@ SI534xSlave::registers() const
 void
 SI534xSlave::get_info(timinghardwareinfo::TimingPLLMonitorData& mon_data) const
 {
+  // Keep the page selection and the reads together
+  I2CBusSession session(get_master());
 
   mon_data.config_id = this->read_config_id();
 
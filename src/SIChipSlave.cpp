@@ -10,19 +10,30 @@
 
 // PDT headers
 #include "ers/ers.hpp"
+#include "timing/I2CMasterNode.hpp"
 #include "timing/toolbox.hpp"
 
 #include <boost/tuple/tuple.hpp>
 
+#include <algorithm>
+
 #include <fstream>
 #include <sstream>
+#include <utility>
+#include <vector>
 
 namespace dunedaq {
 namespace timing {
 
+const uint16_t SIChipSlave::kMaxBurstReadGap = 8;     // NOLINT(build/unsigned)
+const uint16_t SIChipSlave::kMaxBurstReadLength = 64; // NOLINT(build/unsigned)
+
 //-----------------------------------------------------------------------------
 SIChipSlave::SIChipSlave(const I2CMasterNode* i2c_master, uint8_t address) // NOLINT(build/unsigned)
   : I2CSlave(i2c_master, address)
+  , m_page_cache_valid(false)
+  , m_cached_page(0)
+  , m_cache_generation(0)
 {}
 //-----------------------------------------------------------------------------
 
@@ -30,6 +41,24 @@ SIChipSlave::SIChipSlave(const I2CMasterNode* i2c_master, uint8_t address) // NO
 SIChipSlave::~SIChipSlave() {}
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+bool
+SIChipSlave::is_page_cache_valid() const
+{
+  return m_page_cache_valid && m_cache_generation == get_master().get_bus_generation();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+SIChipSlave::set_cached_page(uint8_t page) const // NOLINT(build/unsigned)
+{
+  m_cached_page = page;
+  m_cache_generation = get_master().get_bus_generation();
+  m_page_cache_valid = true;
+}
+//-----------------------------------------------------------------------------
+
 //-----------------------------------------------------------------------------
 uint8_t // NOLINT(build/unsigned)
 SIChipSlave::read_page() const
@@ -37,8 +66,18 @@ SIChipSlave::read_page() const
 
   TLOG_DEBUG(7) << "<- Reading page ";
 
+  I2CBusSession session(get_master());
+
   // Read from the page address (0x1?)
-  return read_i2c(0x1);
+  uint8_t page(0); // NOLINT(build/unsigned)
+  try {
+    page = read_i2c(0x1);
+  } catch (...) {
+    m_page_cache_valid = false;
+    throw;
+  }
+  set_cached_page(page);
+  return page;
 }
 //-----------------------------------------------------------------------------
 
@@ -50,7 +89,30 @@ SIChipSlave::switch_page(uint8_t page) const // NOLINT(build/unsigned)
   // Prepare a data block with address and new page
   // std::vector<uint8_t> lData = {0x1, page};// NOLINT(build/unsigned)
   TLOG_DEBUG(7) << "-> Switching to page " << format_reg_value((uint32_t)page); // NOLINT(build/unsigned)
-  write_i2c(0x1, page);
+  I2CBusSession session(get_master());
+  try {
+    write_i2c(0x1, page);
+  } catch (...) {
+    m_page_cache_valid = false;
+    throw;
+  }
+  set_cached_page(page);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+SIChipSlave::select_page(uint8_t page) const // NOLINT(build/unsigned)
+{
+  // Change page only when required.
+  // (The SI5344 don't like to have the page register id to be written all the time.)
+  if (!is_page_cache_valid()) {
+    read_page();
+  }
+
+  if (page != m_cached_page) {
+    switch_page(page);
+  }
 }
 //-----------------------------------------------------------------------------
 
@@ -59,6 +121,8 @@ uint32_t // NOLINT(build/unsigned)
 SIChipSlave::read_device_version() const
 {
 
+  I2CBusSession session(get_master());
+
   // Go to the right page
   switch_page(0x0);
   // Read 2 words from 0x2
@@ -80,15 +144,17 @@ SIChipSlave::read_clock_register(uint16_t address) const // NOLINT(build/unsigne
                << " reg: " << (uint32_t)reg_address                                    // NOLINT(build/unsigned)
                << " page: " << (uint32_t)page_address;                                 // NOLINT(build/unsigned)
   TLOG_DEBUG(6) << debug_stream.str();
-  // Change page only when required.
-  // (The SI5344 don't like to have the page register id to be written all the time.)
-  uint8_t current_address = read_page(); // NOLINT(build/unsigned)
-  if (page_address != current_address) {
-    switch_page(page_address);
-  }
+
+  I2CBusSession session(get_master());
+  select_page(page_address);
 
   // Read the register
-  return read_i2c(reg_address);
+  try {
+    return read_i2c(reg_address);
+  } catch (...) {
+    m_page_cache_valid = false;
+    throw;
+  }
 }
 //-----------------------------------------------------------------------------
 
@@ -105,14 +171,140 @@ SIChipSlave::write_clock_register(uint16_t address, uint8_t data) const // NOLIN
                << " reg: " << (uint32_t)reg_address                                     // NOLINT(build/unsigned)
                << " page: " << (uint32_t)page_address;                                  // NOLINT(build/unsigned)
   TLOG_DEBUG(6) << debug_stream.str();
-  // Change page only when required.
-  // (The SI5344 don't like to have the page register id to be written all the time.)
-  uint8_t current_address = read_page(); // NOLINT(build/unsigned)
-  if (page_address != current_address) {
-    switch_page(page_address);
+
+  I2CBusSession session(get_master());
+
+  // Writing the page register directly is a page switch
+  if (reg_address == 0x1) {
+    return switch_page(data);
+  }
+
+  select_page(page_address);
+
+  try {
+    write_i2c(reg_address, data);
+  } catch (...) {
+    m_page_cache_valid = false;
+    throw;
+  }
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+SIChipSlave::write_clock_registers(const std::vector<std::pair<uint16_t, uint8_t>>& settings, // NOLINT(build/unsigned)
+                                   size_t* n_written) const
+{
+  // Builds the list of bus transfers first: runs of contiguous registers on the same page
+  // become one auto-increment block, page switches are inserted where needed.
+  // The whole list is then handed to the master in one go.
+  std::vector<std::pair<uint32_t, std::vector<uint8_t>>> blocks; // NOLINT(build/unsigned)
+  // number of settings fully written once each block is
+  std::vector<size_t> settings_done;
+
+  if (n_written)
+    *n_written = 0;
+
+  I2CBusSession session(get_master());
+
+  if (!is_page_cache_valid()) {
+    read_page();
+  }
+  uint8_t page = m_cached_page; // NOLINT(build/unsigned)
+
+  bool run_open(false);
+  uint16_t next_address(0); // NOLINT(build/unsigned)
+  for (size_t i = 0; i < settings.size(); ++i) {
+    const auto& setting = settings[i];
+    uint8_t reg_address = (setting.first & 0xff);       // NOLINT(build/unsigned)
+    uint8_t page_address = (setting.first >> 8) & 0xff; // NOLINT(build/unsigned)
+
+    // Explicit page register write
+    if (reg_address == 0x1) {
+      blocks.push_back({ 0x1, { setting.second } });
+      settings_done.push_back(i + 1);
+      page = setting.second;
+      run_open = false;
+      continue;
+    }
+
+    if (page_address != page) {
+      blocks.push_back({ 0x1, { page_address } });
+      settings_done.push_back(i);
+      page = page_address;
+      run_open = false;
+    }
+
+    if (run_open && setting.first == next_address) {
+      blocks.back().second.push_back(setting.second);
+      settings_done.back() = i + 1;
+    } else {
+      blocks.push_back({ reg_address, { setting.second } });
+      settings_done.push_back(i + 1);
+      run_open = true;
+    }
+    next_address = setting.first + 1;
+  }
+
+  TLOG_DEBUG(6) << "Writing " << settings.size() << " registers in " << blocks.size() << " transfers";
+
+  size_t blocks_written(0);
+  try {
+    write_i2cArrays(blocks, &blocks_written);
+  } catch (...) {
+    m_page_cache_valid = false;
+    if (n_written && blocks_written)
+      *n_written = settings_done.at(blocks_written - 1);
+    throw;
+  }
+  set_cached_page(page);
+  if (n_written)
+    *n_written = settings.size();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::map<uint16_t, uint8_t>                                                        // NOLINT(build/unsigned)
+SIChipSlave::read_clock_registers(const std::vector<uint16_t>& addresses) const // NOLINT(build/unsigned)
+{
+  std::map<uint16_t, uint8_t> values; // NOLINT(build/unsigned)
+
+  std::vector<uint16_t> sorted_addresses(addresses); // NOLINT(build/unsigned)
+  std::sort(sorted_addresses.begin(), sorted_addresses.end());
+  sorted_addresses.erase(std::unique(sorted_addresses.begin(), sorted_addresses.end()), sorted_addresses.end());
+
+  I2CBusSession session(get_master());
+
+  auto it = sorted_addresses.begin();
+  while (it != sorted_addresses.end()) {
+    uint16_t first = *it; // NOLINT(build/unsigned)
+    uint16_t last = first; // NOLINT(build/unsigned)
+
+    // Extend the run on the same page while the gaps stay small
+    auto next = it + 1;
+    while (next != sorted_addresses.end() && ((*next >> 8) == (first >> 8)) && (*next - last) <= kMaxBurstReadGap &&
+           (*next - first) < kMaxBurstReadLength) {
+      last = *next;
+      ++next;
+    }
+
+    select_page((first >> 8) & 0xff);
+
+    std::vector<uint8_t> data; // NOLINT(build/unsigned)
+    try {
+      data = read_i2cArray(first & 0xff, last - first + 1);
+    } catch (...) {
+      m_page_cache_valid = false;
+      throw;
+    }
+
+    for (; it != next; ++it) {
+      values[*it] = data.at(*it - first);
+    }
   }
 
-  return write_i2c(reg_address, data);
+  TLOG_DEBUG(6) << "Read " << values.size() << " registers";
+  return values;
 }
 //-----------------------------------------------------------------------------
 
@@ -54,7 +54,7 @@ SIMIONode::get_status(bool print_out) const
 
 //-----------------------------------------------------------------------------
 uint64_t // NOLINT(build/unsigned)
-SIMIONode::read_board_uid() const
+SIMIONode::fetch_board_uid() const
 {
   return 0;
 }
@@ -73,10 +73,11 @@ std::string
 SIMIONode::get_hardware_info(bool print_out) const
 {
   std::stringstream info;
-  const BoardType board_type = convert_value_to_board_type(read_board_type());
+  const HardwareIdentity identity = get_hardware_identity();
+  const BoardType board_type = convert_value_to_board_type(identity.board_type);
   const BoardRevision board_revision = get_board_revision();
-  const CarrierType carrier_type = convert_value_to_carrier_type(read_carrier_type());
-  const DesignType design_type = convert_value_to_design_type(read_design_type());
+  const CarrierType carrier_type = convert_value_to_carrier_type(identity.carrier_type);
+  const DesignType design_type = convert_value_to_design_type(identity.design_type);
 
   std::vector<std::pair<std::string, std::string>> hardware_info;
 
@@ -115,6 +116,7 @@ SIMIONode::get_hardware_info(bool print_out) const
 void
 SIMIONode::reset(const std::string& /*clock_config_file*/) const
 {
+  IPbusProfiler::Scope scope("SIMIONode::reset");
 
   write_soft_reset_register();
   TLOG_DEBUG(0) << "Reset done";
@@ -147,6 +149,23 @@ SIMIONode::read_clock_frequencies() const
 }
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+std::vector<double>
+SIMIONode::measure_clock_frequencies() const
+{
+  TLOG_DEBUG(0) << "Simulation does not support reading of freq";
+  return {};
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+SIMIONode::start_clock_frequency_sampler() const
+{
+  TLOG_DEBUG(0) << "Simulation does not support reading of freq";
+}
+//-----------------------------------------------------------------------------
+
 //-----------------------------------------------------------------------------
 std::string
 SIMIONode::get_clock_frequencies_table(bool /*print_out*/) const
@@ -47,7 +47,8 @@ SpillInterfaceNode::enable() const
 {
   getNode("csr.ctrl.src").write(0);
   getNode("csr.ctrl.en").write(1);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
   TLOG() << "Spill interface enabled";
 }
 //-----------------------------------------------------------------------------
@@ -57,7 +58,8 @@ void
 SpillInterfaceNode::disable() const
 {
   getNode("csr.ctrl.en").write(0);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
   TLOG() << "Spill interface disabled";
 }
 //-----------------------------------------------------------------------------
@@ -77,7 +79,8 @@ SpillInterfaceNode::enable_fake_spills(uint32_t cycle_length, uint32_t spill_len
   getNode("csr.ctrl.fake_spill_len").write(spill_length);
   getNode("csr.ctrl.src").write(1);
   getNode("csr.ctrl.en").write(1);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
   TLOG() << "Fake spills enabled";
 }
 //-----------------------------------------------------------------------------
@@ -87,7 +90,7 @@ bool
 SpillInterfaceNode::read_in_spill() const
 {
   auto in_spill = getNode("csr.stat.in_spill").read();
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
   return in_spill.value();
 }
 //------------------------------------------------------------------------------
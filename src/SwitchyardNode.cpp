@@ -46,8 +46,10 @@ void
 SwitchyardNode::configure_master_source(uint8_t master_source, bool dispatch) const // NOLINT(build/unsigned)
 {
   getNode("csr.ctrl.master_src").write(master_source);
-  if (dispatch)
-    getClient().dispatch();
+  if (dispatch) {
+    IPbusProfiler::dispatch(getClient());
+    invalidate_snapshots();
+  }
 }
 //-----------------------------------------------------------------------------
 
@@ -56,8 +58,10 @@ void
 SwitchyardNode::configure_endpoint_source(uint8_t endpoint_source, bool dispatch) const // NOLINT(build/unsigned)
 {
   getNode("csr.ctrl.ep_src").write(endpoint_source);
-  if (dispatch)
-    getClient().dispatch();
+  if (dispatch) {
+    IPbusProfiler::dispatch(getClient());
+    invalidate_snapshots();
+  }
 }
 //-----------------------------------------------------------------------------
 
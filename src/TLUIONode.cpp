@@ -52,6 +52,8 @@ TLUIONode::get_status(bool print_out) const
 void
 TLUIONode::reset(const std::string& clock_config_file) const
 {
+  IPbusProfiler::Scope scope("TLUIONode::reset");
+
   // Soft reset
   write_soft_reset_register();
 
@@ -64,7 +66,9 @@ TLUIONode::reset(const std::string& clock_config_file) const
   getNode("csr.ctrl.rst_i2c").write(0x1);
   getNode("csr.ctrl.rst_i2c").write(0x0);
 
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
+  invalidate_pll_state();
 
   // enclustra i2c switch stuff
   try {
@@ -87,7 +91,8 @@ TLUIONode::reset(const std::string& clock_config_file) const
   // Reset mmcm
   getNode("csr.ctrl.rst").write(0x1);
   getNode("csr.ctrl.rst").write(0x0);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 
   // configure tlu io expanders
   auto ic_6 = get_i2c_device<I2CExpanderSlave>(m_uid_i2c_bus, "Expander1");
@@ -194,16 +199,25 @@ TLUIONode::get_info(timinghardwareinfo::TimingTLUMonitorData& mon_data) const
 void
 TLUIONode::get_info(opmonlib::InfoCollector& ci, int level) const
 {
+  MonitoringPlan plan(*this);
+  add_to_monitoring_plan(plan, {}, level);
+  plan.collect(ci);
+}
+//-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+void
+TLUIONode::add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const
+{
   if (level >= 2) {
-    timinghardwareinfo::TimingPLLMonitorData pll_mon_data;
-    this->get_pll()->get_info(pll_mon_data);
-    ci.add(pll_mon_data);
+    plan.add_sampled_step(path, MonitoringPlan::kI2CTier, [this]() { return sample_pll_info(); });
   }
   if (level >= 1) {
-    timinghardwareinfo::TimingTLUMonitorData mon_data;
-    this->get_info(mon_data);
-    ci.add(mon_data);
+    plan.add_step(path, [this](opmonlib::InfoCollector& ci) {
+      timinghardwareinfo::TimingTLUMonitorData mon_data;
+      this->get_info(mon_data);
+      ci.add(mon_data);
+    });
   }
 }
 //-----------------------------------------------------------------------------
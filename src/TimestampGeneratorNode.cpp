@@ -45,7 +45,7 @@ TimestampGeneratorNode::read_raw_timestamp(bool dispatch) const
 {
   auto timestamp = getNode("ctr.val").readBlock(2);
   if (dispatch)
-    getClient().dispatch();
+    IPbusProfiler::dispatch(getClient());
   return timestamp;
 }
 //-----------------------------------------------------------------------------
@@ -66,7 +66,7 @@ TimestampGeneratorNode::set_timestamp(uint64_t timestamp) const // NOLINT(build/
   uint32_t now_high = (timestamp >> 32) & ((1UL << 32) - 1); // NOLINT(build/unsigned)
   uint32_t now_low = (timestamp >> 0) & ((1UL << 32) - 1);  // NOLINT(build/unsigned)
   getNode("ctr.set").writeBlock({ now_low, now_high });
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
 }
 //-----------------------------------------------------------------------------
 
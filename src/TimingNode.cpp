@@ -8,12 +8,30 @@
 
 #include "timing/TimingNode.hpp"
 
+#include "timing/RegisterSnapshotCache.hpp"
+
+#include "logging/Logging.hpp"
+
+#include <algorithm>
+#include <iomanip>
 #include <map>
+#include <sstream>
 #include <string>
+#include <thread>
+#include <utility>
+#include <vector>
 
 namespace dunedaq {
 namespace timing {
 
+const std::vector<std::chrono::microseconds> TimingNode::kWaitLatencyBucketEdges = {
+  std::chrono::microseconds(10),     std::chrono::microseconds(100),    std::chrono::microseconds(1000),
+  std::chrono::microseconds(10000),  std::chrono::microseconds(100000), std::chrono::microseconds(1000000)
+};
+
+std::map<std::string, WaitLatencyHistogram> TimingNode::s_wait_latency_histograms;
+std::mutex TimingNode::s_wait_latency_mutex;
+
 //-----------------------------------------------------------------------------
 TimingNode::TimingNode(const uhal::Node& node)
   : uhal::Node(node)
@@ -26,16 +44,21 @@ TimingNode::~TimingNode() {}
 
 //-----------------------------------------------------------------------------
 std::map<std::string, uhal::ValWord<uint32_t>> // NOLINT(build/unsigned)
-TimingNode::read_sub_nodes(const uhal::Node& node, bool dispatch) const
+TimingNode::read_sub_nodes(const uhal::Node& node, bool dispatch, bool use_cache) const
 {
-  auto node_names = node.getNodes();
-
   std::map<std::string, uhal::ValWord<uint32_t>> node_name_value_pairs; // NOLINT(build/unsigned)
+  if (use_cache && RegisterSnapshotCache::lookup(node, "", node_name_value_pairs))
+    return node_name_value_pairs;
+
+  auto node_names = node.getNodes();
 
   for (auto it = node_names.begin(); it != node_names.end(); ++it)
     node_name_value_pairs[*it] = node.getNode(*it).read();
+  RegisterSnapshotCache::store(node, "", node_name_value_pairs);
+  IPbusProfiler::count_words(node_names.size(), 0);
+
   if (dispatch)
-    getClient().dispatch();
+    IPbusProfiler::dispatch(getClient());
   return node_name_value_pairs;
 }
 //-----------------------------------------------------------------------------
@@ -49,9 +72,180 @@ TimingNode::reset_sub_nodes(const uhal::Node& node, uint32_t aValue, bool dispat
 
   for (auto it = node_names.begin(); it != node_names.end(); ++it)
     node.getNode(*it).write(aValue);
+  IPbusProfiler::count_words(0, node_names.size());
 
-  if (dispatch)
-    getClient().dispatch();
+  if (dispatch) {
+    IPbusProfiler::dispatch(getClient());
+    RegisterSnapshotCache::invalidate(node);
+  }
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+TimingNode::invalidate_snapshots() const
+{
+  RegisterSnapshotCache::invalidate(*this);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+WaitResult
+TimingNode::wait_for(const std::vector<std::string>& registers,
+                     const WaitPredicate& predicate,
+                     const WaitSchedule& schedule,
+                     const std::string& label) const
+{
+  return wait_for(*this, registers, predicate, schedule, label);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+WaitResult
+TimingNode::wait_for(const uhal::Node& node,
+                     const std::vector<std::string>& registers,
+                     const WaitPredicate& predicate,
+                     const WaitSchedule& schedule,
+                     const std::string& label)
+{
+  const auto start = std::chrono::steady_clock::now();
+
+  std::vector<const uhal::Node*> nodes;
+  for (auto& reg : registers)
+    nodes.push_back(&node.getNode(reg));
+
+  WaitResult result;
+  result.satisfied = false;
+  result.polls = 0;
+  result.values.resize(nodes.size());
+
+  std::vector<uhal::ValWord<uint32_t>> reads(nodes.size()); // NOLINT(build/unsigned)
+  auto interval = schedule.first_interval;
+  while (true) {
+    for (size_t i = 0; i < nodes.size(); ++i)
+      reads[i] = nodes[i]->read();
+    IPbusProfiler::count_words(nodes.size(), 0);
+    IPbusProfiler::dispatch(node.getClient());
+    ++result.polls;
+
+    for (size_t i = 0; i < nodes.size(); ++i)
+      result.values[i] = reads[i].value();
+
+    if (predicate(result.values)) {
+      result.satisfied = true;
+      break;
+    }
+
+    if (schedule.max_polls && result.polls >= schedule.max_polls)
+      break;
+
+    auto elapsed = std::chrono::steady_clock::now() - start;
+    if (schedule.deadline.count() && elapsed >= schedule.deadline)
+      break;
+
+    // do not sleep past the deadline, the last poll is issued on it
+    auto sleep = interval;
+    if (schedule.deadline.count())
+      sleep = std::min(sleep, std::chrono::duration_cast<std::chrono::microseconds>(schedule.deadline - elapsed));
+    std::this_thread::sleep_for(sleep);
+
+    interval = std::min(interval * std::max<uint32_t>(schedule.backoff_factor, 1), schedule.max_interval); // NOLINT
+  }
+
+  result.elapsed = std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+  record_wait(label, result);
+  return result;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+TimingNode::record_wait(const std::string& label, const WaitResult& result)
+{
+  std::lock_guard<std::mutex> lock(s_wait_latency_mutex);
+
+  auto& histogram = s_wait_latency_histograms[label];
+  if (histogram.buckets.empty()) {
+    histogram = WaitLatencyHistogram();
+    histogram.buckets.resize(kWaitLatencyBucketEdges.size() + 1);
+  }
+
+  ++histogram.waits;
+  if (!result.satisfied)
+    ++histogram.timeouts;
+  histogram.polls += result.polls;
+  histogram.total_latency += result.elapsed;
+  histogram.max_latency = std::max(histogram.max_latency, result.elapsed);
+
+  const std::chrono::duration<double> latency(result.elapsed);
+  size_t bucket = 0;
+  while (bucket < kWaitLatencyBucketEdges.size() && latency >= kWaitLatencyBucketEdges.at(bucket))
+    ++bucket;
+  ++histogram.buckets.at(bucket);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::map<std::string, WaitLatencyHistogram>
+TimingNode::get_wait_latency_histograms()
+{
+  std::lock_guard<std::mutex> lock(s_wait_latency_mutex);
+  return s_wait_latency_histograms;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+TimingNode::reset_wait_latency_histograms()
+{
+  std::lock_guard<std::mutex> lock(s_wait_latency_mutex);
+  s_wait_latency_histograms.clear();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::string
+TimingNode::format_wait_latency_histograms(bool print_out)
+{
+  std::stringstream table;
+
+  for (auto& entry : get_wait_latency_histograms()) {
+    auto& histogram = entry.second;
+
+    std::vector<std::pair<std::string, std::string>> rows;
+    rows.push_back(std::make_pair("Waits", std::to_string(histogram.waits)));
+    rows.push_back(std::make_pair("Timeouts", std::to_string(histogram.timeouts)));
+
+    std::stringstream figure;
+    figure << std::fixed << std::setprecision(1) << static_cast<double>(histogram.polls) / histogram.waits;
+    rows.push_back(std::make_pair("Mean polls", figure.str()));
+    figure.str("");
+    figure << std::setprecision(3) << histogram.total_latency / histogram.waits * 1e3;
+    rows.push_back(std::make_pair("Mean latency [ms]", figure.str()));
+    figure.str("");
+    figure << histogram.max_latency * 1e3;
+    rows.push_back(std::make_pair("Max latency [ms]", figure.str()));
+
+    for (size_t i = 0; i < histogram.buckets.size(); ++i) {
+      std::string bucket = i < kWaitLatencyBucketEdges.size()
+                             ? "< " + std::to_string(kWaitLatencyBucketEdges.at(i).count()) + " us"
+                             : ">= " + std::to_string(kWaitLatencyBucketEdges.back().count()) + " us";
+      rows.push_back(std::make_pair(bucket, std::to_string(histogram.buckets.at(i))));
+    }
+    table << format_reg_table(rows, entry.first, { "", "" }) << std::endl;
+  }
+
+  if (print_out)
+    TLOG() << table.str();
+  return table.str();
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+void
+TimingNode::add_to_monitoring_plan(MonitoringPlan& plan, const MonitoringPlan::Path& path, int level) const
+{
+  plan.add_step(path, [this, level](opmonlib::InfoCollector& ic) { this->get_info(ic, level); });
 }
 //-----------------------------------------------------------------------------
 
@@ -37,7 +37,7 @@ TriggerReceiverNode::get_status(bool print_out) const
   auto state = read_sub_nodes(getNode("csr.stat"), false);
   auto controls = read_sub_nodes(getNode("csr.ctrl"), false);
   auto counters = getNode("ctrs").readBlock(0x10);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
 
   status << format_reg_table(state, "Trigger rx state");
   status << format_reg_table(controls, "Trigger rx controls");
@@ -56,7 +56,8 @@ void
 TriggerReceiverNode::enable() const
 {
   getNode("csr.ctrl.ep_en").write(0x1);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 }
 //-----------------------------------------------------------------------------
 
@@ -65,7 +66,8 @@ void
 TriggerReceiverNode::disable() const
 {
   getNode("csr.ctrl.ep_en").write(0x0);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 }
 //-----------------------------------------------------------------------------
 
@@ -75,7 +77,8 @@ TriggerReceiverNode::reset() const
 {
   getNode("csr.ctrl.ep_en").write(0x0);
   getNode("csr.ctrl.ep_en").write(0x1);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 }
 //-----------------------------------------------------------------------------
 
@@ -84,7 +87,8 @@ void
 TriggerReceiverNode::enable_triggers() const
 {
   getNode("csr.ctrl.ext_trig_en").write(0x1);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 }
 //------------------------------------------------------------------------------
 
@@ -93,7 +97,8 @@ void
 TriggerReceiverNode::disable_triggers() const
 {
   getNode("csr.ctrl.ext_trig_en").write(0x0);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 }
 //------------------------------------------------------------------------------
 
@@ -51,7 +51,8 @@ VLCmdGeneratorNode::switch_endpoint_sfp(uint32_t address, bool enable) const //
   getNode("csr.ctrl.tx_en").write(enable);
   getNode("csr.ctrl.go").write(0x1);
   getNode("csr.ctrl.go").write(0x0);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 }
 //-----------------------------------------------------------------------------
 
@@ -71,7 +72,8 @@ VLCmdGeneratorNode::apply_endpoint_delay(uint32_t address,           // NOLINT(b
   getNode("csr.ctrl.update").write(0x1);
   getNode("csr.ctrl.go").write(0x1);
   getNode("csr.ctrl.go").write(0x0);
-  getClient().dispatch();
+  IPbusProfiler::dispatch(getClient());
+  invalidate_snapshots();
 
   TLOG_DEBUG(2) << "Coarse delay " << format_reg_value(coarse_delay) << " applied";
   TLOG_DEBUG(2) << "Fine delay   " << format_reg_value(fine_delay) << " applied";
@@ -9,6 +9,8 @@
 #include "timing/toolbox.hpp"
 
 // PDT Headers
+#include "timing/IPbusProfiler.hpp"
+#include "timing/RegisterSnapshotCache.hpp"
 #include "timing/TimingIssues.hpp"
 
 // uHAL Headers
@@ -44,10 +46,14 @@ snapshot(const uhal::Node& node)
   /// snapshot( node ) -> { subnode:value }
   std::map<string, uhal::ValWord<uint32_t>> value_words; // NOLINT(build/unsigned)
 
-  for (string n : node.getNodes()) {
-    value_words.insert(make_pair(n, node.getNode(n).read()));
+  if (!RegisterSnapshotCache::lookup(node, "", value_words)) {
+    for (string n : node.getNodes()) {
+      value_words.insert(make_pair(n, node.getNode(n).read()));
+    }
+    RegisterSnapshotCache::store(node, "", value_words);
+    IPbusProfiler::count_words(value_words.size(), 0);
+    IPbusProfiler::dispatch(node.getClient());
   }
-  node.getClient().dispatch();
 
   Snapshot vals;
   std::map<string, uhal::ValWord<uint32_t>>::iterator it; // NOLINT(build/unsigned)
@@ -64,10 +70,14 @@ snapshot(const uhal::Node& node, const std::string& regex)
 {
   std::map<string, uhal::ValWord<uint32_t>> value_words; // NOLINT(build/unsigned)
 
-  for (string n : node.getNodes(regex)) {
-    value_words.insert(make_pair(n, node.getNode(n).read()));
+  if (!RegisterSnapshotCache::lookup(node, regex, value_words)) {
+    for (string n : node.getNodes(regex)) {
+      value_words.insert(make_pair(n, node.getNode(n).read()));
+    }
+    RegisterSnapshotCache::store(node, regex, value_words);
+    IPbusProfiler::count_words(value_words.size(), 0);
+    IPbusProfiler::dispatch(node.getClient());
   }
-  node.getClient().dispatch();
 
   Snapshot vals;
   std::map<string, uhal::ValWord<uint32_t>>::iterator it; // NOLINT(build/unsigned)
@@ -6,7 +6,12 @@
  * received with this code.
  */
 
+#include "timing/AddressTableCache.hpp"
+#include "timing/ControlServer.hpp"
+
 #include <fcntl.h>
+#include <chrono>
+#include <cstdlib>
 #include <iostream>
 #include <signal.h>
 #include <stdexcept>
@@ -16,6 +21,8 @@
 #include <sys/types.h>
 #include <syslog.h>
 #include <unistd.h>
+#include <utility>
+#include <vector>
 
 int
 createFile(const std::string& filename, bool truncate)
@@ -163,22 +170,127 @@ daemonize(const std::string& out, const std::string& err)
 #endif
 }
 
+void
+usage(const char* program)
+{
+  std::cerr << "Usage: " << program << " [options]\n" // NOLINT
+            << "  -c CONNECTIONS  uhal connection file(s) (default: file://${TIMING_SHARE}/config/etc/connections.xml)\n"
+            << "  -s SOCKET       control socket (default: $TIMING_GUARDIAN_SOCKET or /tmp/pdtguardian-<uid>.sock)\n"
+            << "  -d DEVICE[:LEVEL]  open a device at startup, building its monitoring plan of LEVEL if given\n"
+            << "  -t TIMEOUT      IPbus timeout (ms)\n"
+            << "  -F              sample the clock frequencies of all the open devices in the background\n"
+            << "  -a              load the address tables compiled in $TIMING_ADDRTAB_CACHE (default: ~/.cache/timing/addrtab)\n"
+            << "  -f              stay in the foreground\n"
+            << "  -o FILE, -e FILE  stdout and stderr of the daemon (default: pdt.out, pdt.err)\n";
+}
+
+dunedaq::timing::ControlServer* s_server = nullptr;
+
+void
+stop_server(int /*signal*/)
+{
+  if (s_server)
+    s_server->stop();
+}
+
 /**
- * @brief      { function_description }
+ * @brief      Timing control daemon: serves the devices of a connection file on a Unix domain socket.
  *
  * @param[in]  argc  The argc
  * @param      argv  The argv
  *
- * @return     { description_of_the_return_value }
+ * @return     0 once stopped by SIGTERM or SIGINT
  */
 int
 main(int argc, char const* argv[])
 {
+  std::string connections;
+  const char* timing_share = std::getenv("TIMING_SHARE");
+  if (timing_share)
+    connections = std::string("file://") + timing_share + "/config/etc/connections.xml";
+  std::string socket_path = dunedaq::timing::ControlServer::get_default_socket_path();
+  std::vector<std::pair<std::string, int>> devices;
+  int timeout = 0;
+  bool foreground = false;
+  bool addrtab_cache = false;
+  bool sample_frequencies = false;
+  std::string out = "pdt.out";
+  std::string err = "pdt.err";
+
+  for (int i = 1; i < argc; ++i) {
+    std::string option = argv[i];
+    if (option == "-f") {
+      foreground = true;
+      continue;
+    }
+    if (option == "-a") {
+      addrtab_cache = true;
+      continue;
+    }
+    if (option == "-F") {
+      sample_frequencies = true;
+      continue;
+    }
+    if (option == "-h" || option == "--help" || i + 1 == argc) {
+      usage(argv[0]);
+      return option == "-h" || option == "--help" ? 0 : 1;
+    }
+
+    std::string value = argv[++i];
+    if (option == "-c") {
+      connections = value;
+    } else if (option == "-s") {
+      socket_path = value;
+    } else if (option == "-t") {
+      timeout = std::stoi(value);
+    } else if (option == "-o") {
+      out = value;
+    } else if (option == "-e") {
+      err = value;
+    } else if (option == "-d") {
+      auto separator = value.find(':');
+      if (separator == std::string::npos)
+        devices.emplace_back(value, 0);
+      else
+        devices.emplace_back(value.substr(0, separator), std::stoi(value.substr(separator + 1)));
+    } else {
+      usage(argv[0]);
+      return 1;
+    }
+  }
+
+  if (connections.empty()) {
+    std::cerr << "No connection file: TIMING_SHARE is not defined and -c is not given" << std::endl; // NOLINT
+    return 1;
+  }
+
   std::cout << "PDT Guardian" << std::endl; // NOLINT
 
-  daemonize("pdt.out", "pdt.err");
+  if (addrtab_cache)
+    connections = dunedaq::timing::AddressTableCache::compile_connections(connections);
+
+  // The connection file is parsed before leaving the working directory; devices, and with
+  // them the sampler threads, are only opened in the daemon
+  dunedaq::timing::ControlServer server(connections, socket_path);
+  server.set_timeout(std::chrono::milliseconds(timeout));
+  server.set_sample_frequencies(sample_frequencies);
 
-  std::cout << "Test stdout" << std::endl; // NOLINT
-  std::cerr << "Test stderr" << std::endl; // NOLINT
+  if (!foreground)
+    daemonize(out, err);
+
+  s_server = &server;
+  signal(SIGTERM, stop_server);
+  signal(SIGINT, stop_server);
+
+  for (auto& device : devices) {
+    try {
+      server.open_device(device.first, device.second);
+    } catch (std::exception& e) {
+      std::cerr << "Failed to open " << device.first << ": " << e.what() << std::endl; // NOLINT
+    }
+  }
+
+  server.run();
+  s_server = nullptr;
   return 0;
-}
\ No newline at end of file
+}
@@ -0,0 +1,342 @@
+"""
+IPbus 2.0 UDP target emulator.
+
+Serves read, write, non-incrementing, read-modify-write and configuration
+space transactions, as well as status and resend requests, on top of a map of
+register models (see target_models). The target runs in a child process, so
+that it keeps answering while the benchmarked software holds the interpreter,
+and counts the packets, transactions, words and bytes it handles.
+"""
+
+from __future__ import print_function
+
+import bisect
+import multiprocessing
+import select
+import socket
+import struct
+
+kProtocolVersion = 2
+kByteOrderQualifier = 0xf
+
+kControlPacket = 0x0
+kStatusPacket = 0x1
+kResendPacket = 0x2
+
+kRead, kWrite, kNonIncRead, kNonIncWrite, kRMWBits, kRMWSum, kConfigRead, kConfigWrite = range(8)
+
+kMTU = 1500
+kResponseBuffers = 16
+kWordMask = 0xffffffff
+
+
+# ------------------------------------------------------------------------------
+def packetHeader(aPacketId, aType):
+    return (kProtocolVersion << 28) | ((aPacketId & 0xffff) << 8) | (kByteOrderQualifier << 4) | aType
+
+
+def transactionHeader(aId, aWords, aType, aInfo):
+    return (kProtocolVersion << 28) | ((aId & 0xfff) << 16) | ((aWords & 0xff) << 8) | (aType << 4) | aInfo
+
+
+def nextPacketId(aPacketId):
+    # id 0 is reserved for packets without reliability
+    return 1 if aPacketId >= 0xffff else aPacketId + 1
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+class AddressMap(object):
+    """
+    Word address space: register models attached to address ranges, plain
+    memory elsewhere.
+    """
+
+    def __init__(self):
+        self.bases = []
+        self.regions = []
+        self.memory = {}
+
+    def attach(self, aBase, aModel):
+        lIndex = bisect.bisect(self.bases, aBase)
+        if lIndex and self.bases[lIndex - 1] + self.regions[lIndex - 1][1].size > aBase:
+            raise ValueError('Model at 0x%x overlaps the model at 0x%x' % (aBase, self.bases[lIndex - 1]))
+        if lIndex < len(self.bases) and aBase + aModel.size > self.bases[lIndex]:
+            raise ValueError('Model at 0x%x overlaps the model at 0x%x' % (aBase, self.bases[lIndex]))
+        self.bases.insert(lIndex, aBase)
+        self.regions.insert(lIndex, (aBase, aModel))
+
+    def find(self, aAddress):
+        lIndex = bisect.bisect(self.bases, aAddress) - 1
+        if lIndex < 0:
+            return None, 0
+        lBase, lModel = self.regions[lIndex]
+        if aAddress - lBase >= lModel.size:
+            return None, 0
+        return lModel, aAddress - lBase
+
+    def read(self, aAddress):
+        lModel, lOffset = self.find(aAddress)
+        if lModel is None:
+            return self.memory.get(aAddress, 0)
+        return lModel.read(lOffset) & kWordMask
+
+    def write(self, aAddress, aValue):
+        lModel, lOffset = self.find(aAddress)
+        if lModel is None:
+            self.memory[aAddress] = aValue & kWordMask
+        else:
+            lModel.write(lOffset, aValue & kWordMask)
+
+    def tick(self):
+        for lBase, lModel in self.regions:
+            lModel.tick()
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+class TrafficCounters(object):
+
+    kFields = ('packets', 'status_packets', 'resend_packets', 'transactions',
+               'words_read', 'words_written', 'bytes_in', 'bytes_out')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        for lField in self.kFields:
+            setattr(self, lField, 0)
+
+    def as_dict(self):
+        return {lField: getattr(self, lField) for lField in self.kFields}
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+class IPbusTarget(object):
+    """
+    Single threaded IPbus 2.0 UDP target.
+    """
+
+    def __init__(self, aAddressMap, aConfigSpace=None, aHost='127.0.0.1', aPort=0):
+        self.addressMap = aAddressMap
+        self.configSpace = list(aConfigSpace or [0] * 8)
+        self.counters = TrafficCounters()
+
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((aHost, aPort))
+        self.port = self.socket.getsockname()[1]
+
+        self.nextId = 1
+        # recent responses by packet id, for resend requests
+        self.responses = {}
+        self.responseIds = []
+
+    # --------------------------------------------------------------------------
+    def handle(self, aPacket):
+        """
+        Process a request packet, return the response packet (None if dropped).
+        """
+        if len(aPacket) < 4 or len(aPacket) % 4:
+            return None
+
+        # the byte order qualifier tells the endianness of the packet
+        lOrder = '>'
+        lHeader = struct.unpack_from('>I', aPacket)[0]
+        if (lHeader >> 28) != kProtocolVersion or ((lHeader >> 4) & 0xf) != kByteOrderQualifier:
+            lOrder = '<'
+            lHeader = struct.unpack_from('<I', aPacket)[0]
+            if (lHeader >> 28) != kProtocolVersion or ((lHeader >> 4) & 0xf) != kByteOrderQualifier:
+                return None
+
+        lWords = list(struct.unpack('%s%dI' % (lOrder, len(aPacket) // 4), aPacket))
+        lType = lHeader & 0xf
+        lId = (lHeader >> 8) & 0xffff
+
+        if lType == kStatusPacket:
+            self.counters.status_packets += 1
+            lReply = [lHeader, kMTU, kResponseBuffers, packetHeader(self.nextId, kControlPacket)] + [0] * 12
+        elif lType == kResendPacket:
+            self.counters.resend_packets += 1
+            return self.responses.get(lId)
+        elif lType == kControlPacket:
+            self.counters.packets += 1
+            self.addressMap.tick()
+            lReply = [lHeader] + self.execute(lWords[1:])
+        else:
+            return None
+
+        lResponse = struct.pack('%s%dI' % (lOrder, len(lReply)), *lReply)
+        if lType == kControlPacket and lId:
+            self.nextId = nextPacketId(lId)
+            self.responses[lId] = lResponse
+            self.responseIds.append(lId)
+            if len(self.responseIds) > kResponseBuffers:
+                del self.responses[self.responseIds.pop(0)]
+        return lResponse
+
+    # --------------------------------------------------------------------------
+    def execute(self, aWords):
+        lReply = []
+        lCounters = self.counters
+        lMap = self.addressMap
+        i = 0
+        while i < len(aWords):
+            lHeader = aWords[i]
+            lTransactionId = (lHeader >> 16) & 0xfff
+            lSize = (lHeader >> 8) & 0xff
+            lType = (lHeader >> 4) & 0xf
+            lCounters.transactions += 1
+
+            if lType in (kRead, kNonIncRead, kConfigRead):
+                lAddress = aWords[i + 1]
+                if lType == kRead:
+                    lValues = [lMap.read(lAddress + j) for j in range(lSize)]
+                elif lType == kNonIncRead:
+                    lValues = [lMap.read(lAddress) for j in range(lSize)]
+                else:
+                    lValues = [self.configSpace[(lAddress + j) % len(self.configSpace)] for j in range(lSize)]
+                lReply.append(transactionHeader(lTransactionId, lSize, lType, 0))
+                lReply.extend(lValues)
+                lCounters.words_read += lSize
+                i += 2
+            elif lType in (kWrite, kNonIncWrite, kConfigWrite):
+                lAddress = aWords[i + 1]
+                for j, lValue in enumerate(aWords[i + 2:i + 2 + lSize]):
+                    if lType == kWrite:
+                        lMap.write(lAddress + j, lValue)
+                    elif lType == kNonIncWrite:
+                        lMap.write(lAddress, lValue)
+                    else:
+                        self.configSpace[(lAddress + j) % len(self.configSpace)] = lValue
+                lReply.append(transactionHeader(lTransactionId, lSize, lType, 0))
+                lCounters.words_written += lSize
+                i += 2 + lSize
+            elif lType == kRMWBits:
+                lAddress, lAnd, lOr = aWords[i + 1:i + 4]
+                lValue = lMap.read(lAddress)
+                lMap.write(lAddress, (lValue & lAnd) | lOr)
+                lReply.extend([transactionHeader(lTransactionId, 1, lType, 0), lValue])
+                lCounters.words_read += 1
+                lCounters.words_written += 1
+                i += 4
+            elif lType == kRMWSum:
+                lAddress, lAddend = aWords[i + 1:i + 3]
+                lValue = lMap.read(lAddress)
+                lMap.write(lAddress, (lValue + lAddend) & kWordMask)
+                lReply.extend([transactionHeader(lTransactionId, 1, lType, 0), lValue])
+                lCounters.words_read += 1
+                lCounters.words_written += 1
+                i += 3
+            else:
+                # bad transaction type: report it and drop the rest of the packet
+                lReply.append(transactionHeader(lTransactionId, 0, lType, 0x3))
+                break
+        return lReply
+
+    # --------------------------------------------------------------------------
+    def serve(self, aControl):
+        """
+        Serve packets until 'stop' is received on the aControl pipe.
+
+        Pipe commands: ('stats',), ('reset_stats',), ('fill', name, words),
+        ('call', name, method, args...) and ('stop',). Every command is answered.
+        """
+        lPoll = select.poll()
+        lPoll.register(self.socket.fileno(), select.POLLIN)
+        lPoll.register(aControl.fileno(), select.POLLIN)
+        while True:
+            for lFd, lEvent in lPoll.poll():
+                if lFd == self.socket.fileno():
+                    lPacket, lSender = self.socket.recvfrom(65536)
+                    self.counters.bytes_in += len(lPacket)
+                    lResponse = self.handle(lPacket)
+                    if lResponse is not None:
+                        self.counters.bytes_out += len(lResponse)
+                        self.socket.sendto(lResponse, lSender)
+                    continue
+
+                lCommand = aControl.recv()
+                if lCommand[0] == 'stop':
+                    aControl.send(True)
+                    self.socket.close()
+                    return
+                elif lCommand[0] == 'stats':
+                    lStats = self.counters.as_dict()
+                    lStats['i2c_transfers'] = sum(getattr(lModel, 'transfers', 0) for lModel in self.models.values())
+                    lStats['i2c_busy_writes'] = sum(getattr(lModel, 'busyWrites', 0) for lModel in self.models.values())
+                    aControl.send(lStats)
+                elif lCommand[0] == 'reset_stats':
+                    self.counters.reset()
+                    for lModel in self.models.values():
+                        if hasattr(lModel, 'transfers'):
+                            lModel.transfers = 0
+                        if hasattr(lModel, 'busyWrites'):
+                            lModel.busyWrites = 0
+                    aControl.send(True)
+                elif lCommand[0] == 'fill':
+                    self.models[lCommand[1]].fill(lCommand[2])
+                    aControl.send(True)
+                elif lCommand[0] == 'call':
+                    aControl.send(getattr(self.models[lCommand[1]], lCommand[2])(*lCommand[3:]))
+                else:
+                    aControl.send(None)
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+def _run_target(aModels, aMemory, aConfigSpace, aControl):
+    lMap = AddressMap()
+    lMap.memory.update(aMemory or {})
+    for lName, (lBase, lModel) in aModels.items():
+        lMap.attach(lBase, lModel)
+    lTarget = IPbusTarget(lMap, aConfigSpace)
+    lTarget.models = {lName: lModel for lName, (lBase, lModel) in aModels.items()}
+    aControl.send(lTarget.port)
+    lTarget.serve(aControl)
+
+
+class TargetProcess(object):
+    """
+    Runs an IPbusTarget in a child process.
+
+    aModels maps a model name to (base word address, model), aMemory presets
+    plain registers by address. The models are copied to the child, and
+    accessed through fill() and call().
+    """
+
+    def __init__(self, aModels, aMemory=None, aConfigSpace=None):
+        lContext = multiprocessing.get_context('spawn')
+        self.control, lChildControl = lContext.Pipe()
+        self.process = lContext.Process(target=_run_target, args=(aModels, aMemory, aConfigSpace, lChildControl))
+        self.process.daemon = True
+        self.process.start()
+        self.port = self.control.recv()
+
+    def request(self, *aCommand):
+        self.control.send(aCommand)
+        return self.control.recv()
+
+    def stats(self):
+        return self.request('stats')
+
+    def reset_stats(self):
+        self.request('reset_stats')
+
+    def fill(self, aModel, aWords):
+        self.request('fill', aModel, list(aWords))
+
+    def call(self, aModel, aMethod, *aArgs):
+        return self.request('call', aModel, aMethod, *aArgs)
+
+    def stop(self):
+        if self.process.is_alive():
+            self.request('stop')
+        self.process.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *aExc):
+        self.stop()
+# ------------------------------------------------------------------------------
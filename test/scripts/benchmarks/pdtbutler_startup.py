@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+"""
+Startup time benchmark of pdtbutler help and shell completion.
+
+Each case runs pdtbutler in a fresh interpreter and measures its wall time.
+The top level help and the completions, including the completion of the device
+of a subcommand, must not import uhal, the timing bindings or the subcommand
+modules: their imports are checked with python -X importtime, and their median
+wall time is compared to --target. Subcommand help loads the subcommand module,
+and is only reported.
+"""
+
+from __future__ import print_function
+
+import argparse
+import collections
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import click
+
+kRepoRoot = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+kPdtButler = os.path.join(kRepoRoot, 'scripts', 'pdtbutler')
+
+# Modules whose import the top level commands must avoid
+kHeavyModules = ('uhal', 'timing._daq_timing_py', 'timing.cli.io', 'timing.cli.master', 'timing.cli.hsi',
+                 'timing.cli.clock', 'timing.cli.toolbox')
+
+# click 8 renamed the bash completion instruction
+kCompleteBash = 'bash_complete' if int(click.__version__.split('.')[0]) >= 8 else 'complete_bash'
+
+Case = collections.namedtuple('Case', ['name', 'args', 'completion', 'targeted', 'description'])
+
+kCases = [
+    Case('help', ['--help'], None, True, 'top level help'),
+    Case('complete_commands', [], 'pdtbutler ', True, 'completion of the subcommand names'),
+    Case('complete_options', [], 'pdtbutler --', True, 'completion of the top level options'),
+    Case('help_subcommand', ['clock', '--help'], None, False, 'help of a subcommand'),
+    Case('complete_devices', [], 'pdtbutler io ', True, 'completion of the device of a subcommand'),
+    Case('complete_devices_hsi', [], 'pdtbutler hsi ', True, 'completion of the device of another subcommand'),
+]
+
+
+# ------------------------------------------------------------------------------
+def caseCommand(aCase, aImportTime=False):
+    lCommand = [sys.executable] + (['-X', 'importtime'] if aImportTime else []) + [kPdtButler] + aCase.args
+    lEnv = dict(os.environ)
+    if aCase.completion is not None:
+        lWords = aCase.completion.split(' ')
+        lEnv['_PDTBUTLER_COMPLETE'] = kCompleteBash
+        lEnv['COMP_WORDS'] = aCase.completion
+        lEnv['COMP_CWORD'] = str(len(lWords) - 1)
+    return lCommand, lEnv
+
+
+def runCase(aCase, aOptions):
+    """
+    Wall times of the repeats, in seconds, and the output of the last one.
+    """
+    lCommand, lEnv = caseCommand(aCase)
+    lTimes = []
+    for i in range(aOptions.warmup + aOptions.repeats):
+        lStart = time.time()
+        lProcess = subprocess.Popen(lCommand, env=lEnv, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        lOut, lErr = lProcess.communicate()
+        lElapsed = time.time() - lStart
+        # click 7 exits with 1 after a completion
+        if lProcess.returncode not in ((0, 1) if aCase.completion is not None else (0,)):
+            raise RuntimeError('%s failed (%d): %s' % (aCase.name, lProcess.returncode, lErr.decode(errors='replace')))
+        if i >= aOptions.warmup:
+            lTimes.append(lElapsed)
+    return lTimes, lOut.decode(errors='replace')
+
+
+def findHeavyImports(aCase):
+    """
+    Heavy modules imported by a case, from the python -X importtime report.
+    """
+    lCommand, lEnv = caseCommand(aCase, True)
+    lProcess = subprocess.Popen(lCommand, env=lEnv, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    _, lErr = lProcess.communicate()
+    lImported = set()
+    for lLine in lErr.decode(errors='replace').splitlines():
+        if lLine.startswith('import time:') and '|' in lLine:
+            lImported.add(lLine.rsplit('|', 1)[1].strip())
+    return sorted(lModule for lModule in kHeavyModules if lModule in lImported)
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+def main():
+    lParser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    lParser.add_argument('cases', nargs='*', help='cases to run (name prefixes), all by default')
+    lParser.add_argument('--list', action='store_true', help='list the cases and exit')
+    lParser.add_argument('--repeats', type=int, default=10, help='measured runs per case')
+    lParser.add_argument('--warmup', type=int, default=2, help='unmeasured runs per case')
+    lParser.add_argument('--target', type=float, default=100., help='median wall time target of the top level cases (ms)')
+    lParser.add_argument('--output', '-o', help='JSON output file (default: stdout)')
+    lOptions = lParser.parse_args()
+
+    lSelected = [lCase for lCase in kCases
+                 if not lOptions.cases or any(lCase.name.startswith(p) for p in lOptions.cases)]
+    if lOptions.list:
+        for lCase in lSelected:
+            print('%-24s %s' % (lCase.name, lCase.description))
+        return 0
+
+    os.environ.setdefault('TIMING_SHARE', kRepoRoot)
+    lCacheDir = tempfile.mkdtemp(prefix='pdtbutler_startup_')
+    os.environ['TIMING_CONNECTIONS_CACHE'] = lCacheDir
+
+    # Interpreter startup, for reference
+    lBaseline = Case('python', [], None, False, 'interpreter startup')
+    lResults = collections.OrderedDict()
+    lFailures = []
+    try:
+        for lCase in [lBaseline] + lSelected:
+            print('Running %s' % lCase.name, file=sys.stderr)
+            if lCase is lBaseline:
+                lTimes = []
+                for i in range(lOptions.warmup + lOptions.repeats):
+                    lStart = time.time()
+                    subprocess.check_call([sys.executable, '-c', 'pass'])
+                    if i >= lOptions.warmup:
+                        lTimes.append(time.time() - lStart)
+                lOutput = ''
+            else:
+                lTimes, lOutput = runCase(lCase, lOptions)
+
+            lTimes.sort()
+            lResult = collections.OrderedDict()
+            lResult['wall_time'] = {'min': lTimes[0], 'median': lTimes[len(lTimes) // 2], 'max': lTimes[-1]}
+            lResult['output_lines'] = len(lOutput.splitlines())
+            if lCase.targeted:
+                lResult['heavy_imports'] = findHeavyImports(lCase)
+                if lResult['heavy_imports']:
+                    lFailures.append('%s imports %s' % (lCase.name, ', '.join(lResult['heavy_imports'])))
+                if lResult['wall_time']['median'] * 1e3 > lOptions.target:
+                    lFailures.append('%s takes %.1f ms' % (lCase.name, lResult['wall_time']['median'] * 1e3))
+            lResults[lCase.name] = lResult
+    finally:
+        shutil.rmtree(lCacheDir, ignore_errors=True)
+
+    lReport = collections.OrderedDict()
+    lReport['options'] = {lKey: lValue for lKey, lValue in vars(lOptions).items() if lKey not in ('output', 'list')}
+    lReport['results'] = lResults
+    lOutput = json.dumps(lReport, indent=2)
+    if lOptions.output:
+        with open(lOptions.output, 'w') as lFile:
+            lFile.write(lOutput + '\n')
+    else:
+        print(lOutput)
+
+    for lName, lResult in lResults.items():
+        print('%-24s %8.1f ms' % (lName, lResult['wall_time']['median'] * 1e3), file=sys.stderr)
+    for lFailure in lFailures:
+        print('Startup target missed, %s' % lFailure, file=sys.stderr)
+    return 1 if lFailures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
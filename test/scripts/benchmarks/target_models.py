@@ -0,0 +1,541 @@
+"""
+Register-level models of the firmware blocks exercised by the offline benchmarks.
+
+A model is attached to a range of word addresses of the emulated IPbus target
+and implements read(offset) and write(offset, value). Models only behave as far
+as the software needs: status bits follow their control bits, buffers drain as
+they are read, and waits complete after a fixed number of status reads, so that
+the number of IPbus round trips of an operation does not depend on timing. The
+I2C masters are the exception: their operations last the time they take on the
+bus, as the software has to wait for them before issuing the next one.
+"""
+
+from __future__ import print_function
+
+import struct
+import time
+
+kWordMask = 0xffffffff
+
+
+# ------------------------------------------------------------------------------
+class RegisterModel(object):
+    """
+    Plain read/write registers, zero unless written or preset.
+    """
+
+    def __init__(self, aSize, aPreset=None):
+        self.size = aSize
+        self.registers = {}
+        if aPreset:
+            self.registers.update(aPreset)
+
+    def read(self, aOffset):
+        return self.registers.get(aOffset, 0)
+
+    def write(self, aOffset, aValue):
+        self.registers[aOffset] = aValue & kWordMask
+
+    def tick(self):
+        """
+        Called once per control packet, before its transactions are executed.
+        """
+        pass
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+class StatusFollowsControl(RegisterModel):
+    """
+    Control/status register pair whose status bits mirror control bits.
+
+    aLinks maps a control bit mask to the status bit mask it drives; aStatic
+    status bits are always set.
+    """
+
+    def __init__(self, aCtrlOffset, aStatOffset, aLinks=None, aStatic=0x0, aSize=2):
+        super(StatusFollowsControl, self).__init__(aSize)
+        self.ctrlOffset = aCtrlOffset
+        self.statOffset = aStatOffset
+        self.links = aLinks or {}
+        self.static = aStatic
+
+    def read(self, aOffset):
+        if aOffset != self.statOffset:
+            return super(StatusFollowsControl, self).read(aOffset)
+
+        lCtrl = self.registers.get(self.ctrlOffset, 0)
+        lStat = self.static
+        for lCtrlMask, lStatMask in self.links.items():
+            if lCtrl & lCtrlMask:
+                lStat |= lStatMask
+        return lStat
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+class CounterBlock(RegisterModel):
+    """
+    Block of event counters; counter i grows by i+1 on every packet.
+    """
+
+    def __init__(self, aSize):
+        super(CounterBlock, self).__init__(aSize)
+        self.packets = 0
+
+    def read(self, aOffset):
+        return (self.packets * (aOffset + 1)) & kWordMask
+
+    def write(self, aOffset, aValue):
+        pass
+
+    def tick(self):
+        self.packets += 1
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+class TimestampSource(RegisterModel):
+    """
+    Free running 64-bit timestamp: ctr.set at offsets 0-1, ctr.val at 2-3.
+    Read-only timestamps have no set registers (aSetOffset=None).
+    """
+
+    def __init__(self, aClockFrequency, aSetOffset=0x0, aValOffset=0x2, aSize=4):
+        super(TimestampSource, self).__init__(aSize)
+        self.clockFrequency = aClockFrequency
+        self.setOffset = aSetOffset
+        self.valOffset = aValOffset
+        self.origin = time.time()
+        self.start = 0
+
+    def now(self):
+        return (self.start + int((time.time() - self.origin) * self.clockFrequency)) & 0xffffffffffffffff
+
+    def read(self, aOffset):
+        if aOffset == self.valOffset:
+            return self.now() & kWordMask
+        if aOffset == self.valOffset + 1:
+            return self.now() >> 32
+        return super(TimestampSource, self).read(aOffset)
+
+    def write(self, aOffset, aValue):
+        super(TimestampSource, self).write(aOffset, aValue)
+        if self.setOffset is not None and aOffset == self.setOffset + 1:
+            # the upper word completes a timestamp set
+            self.start = (self.registers.get(self.setOffset + 1, 0) << 32) | self.registers.get(self.setOffset, 0)
+            self.origin = time.time()
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+class FrequencyCounter(RegisterModel):
+    """
+    ipbus_freq_ctr: ctrl at 0, freq (count | valid bit) at 1.
+    """
+
+    kValid = 0x1000000
+
+    def __init__(self, aCount=524288):
+        super(FrequencyCounter, self).__init__(2)
+        self.count = aCount
+
+    def read(self, aOffset):
+        if aOffset == 0x1:
+            return self.kValid | (self.count & 0xffffff)
+        return super(FrequencyCounter, self).read(aOffset)
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+class ReadoutBuffer(RegisterModel):
+    """
+    Readout FIFO: data port at aDataOffset, word count at aCountOffset.
+
+    Reading the port pops a word (0 when empty); the parent process fills the
+    buffer with the 'fill' command of the target.
+    """
+
+    def __init__(self, aDataOffset=0x0, aCountOffset=0x1, aCountMask=0xffff, aSize=2):
+        super(ReadoutBuffer, self).__init__(aSize)
+        self.dataOffset = aDataOffset
+        self.countOffset = aCountOffset
+        self.countMask = aCountMask
+        self.words = []
+        self.head = 0
+
+    def fill(self, aWords):
+        self.words = self.words[self.head:] + list(aWords)
+        self.head = 0
+
+    def read(self, aOffset):
+        if aOffset == self.dataOffset:
+            if self.head >= len(self.words):
+                return 0
+            lWord = self.words[self.head]
+            self.head += 1
+            return lWord
+        if aOffset == self.countOffset:
+            return min(len(self.words) - self.head, self.countMask)
+        return super(ReadoutBuffer, self).read(aOffset)
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+class UpstreamEndpoint(RegisterModel):
+    """
+    Master global csr (ctrl at 0, stat at 1): the upstream endpoint is ready
+    after aLockReads status reads following a rising edge of ep_en.
+    """
+
+    kEnable = 0x1
+    kReadyState = 0x8
+    kReady = 0x10
+
+    def __init__(self, aLockReads=2):
+        super(UpstreamEndpoint, self).__init__(2)
+        self.lockReads = aLockReads
+        self.readsLeft = 0
+
+    def write(self, aOffset, aValue):
+        lPrevious = self.registers.get(0x0, 0)
+        super(UpstreamEndpoint, self).write(aOffset, aValue)
+        if aOffset == 0x0 and (aValue & self.kEnable) and not (lPrevious & self.kEnable):
+            self.readsLeft = self.lockReads
+
+    def read(self, aOffset):
+        if aOffset != 0x1:
+            return super(UpstreamEndpoint, self).read(aOffset)
+        if not (self.registers.get(0x0, 0) & self.kEnable):
+            return 0x0
+        if self.readsLeft:
+            self.readsLeft -= 1
+            return 0x6
+        return self.kReady | self.kReadyState
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+class EchoMonitor(RegisterModel):
+    """
+    pdts_echo_mon csr: go at 0, rx_done at 8, tx/rx timestamps at 9-12.
+
+    The echo returns aEchoReads status reads after go, with a round trip time
+    depending on the endpoint address last sent by the async command
+    generator (aCommandGenerator).
+    """
+
+    def __init__(self, aCommandGenerator, aEchoReads=1, aBaseRTT=0x100, aRTTPerAddress=0x10):
+        super(EchoMonitor, self).__init__(16)
+        self.commandGenerator = aCommandGenerator
+        self.echoReads = aEchoReads
+        self.baseRTT = aBaseRTT
+        self.rttPerAddress = aRTTPerAddress
+        self.readsLeft = None
+        self.txTime = 0
+
+    def write(self, aOffset, aValue):
+        super(EchoMonitor, self).write(aOffset, aValue)
+        if aOffset == 0x0 and (aValue & 0x1):
+            self.readsLeft = self.echoReads
+            self.txTime = int(time.time() * 62.5e6)
+
+    def rtt(self):
+        lAddress = (self.commandGenerator.read(0x0) >> 8) & 0xff
+        return self.baseRTT + self.rttPerAddress * lAddress
+
+    def read(self, aOffset):
+        if aOffset == 0x8:
+            if self.readsLeft is None:
+                return 0x0
+            if self.readsLeft:
+                self.readsLeft -= 1
+                return 0x0
+            return 0x1
+        lRx = self.txTime + self.rtt()
+        if aOffset == 0x9:
+            return self.txTime & kWordMask
+        if aOffset == 0xa:
+            return self.txTime >> 32
+        if aOffset == 0xb:
+            return lRx & kWordMask
+        if aOffset == 0xc:
+            return lRx >> 32
+        return super(EchoMonitor, self).read(aOffset)
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+class CommandGenerator(RegisterModel):
+    """
+    pdts_acmd_master csr: commands complete at once (stat.done always set).
+    """
+
+    def __init__(self):
+        super(CommandGenerator, self).__init__(2)
+
+    def read(self, aOffset):
+        if aOffset == 0x1:
+            return 0x1
+        return super(CommandGenerator, self).read(aOffset)
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+class I2CDevice(object):
+    """
+    I2C device with an 8-bit register pointer: the first byte written after a
+    start sets the pointer, further bytes are written from it, reads continue
+    from it; the pointer increments after each byte.
+    """
+
+    def __init__(self, aContents=None):
+        self.memory = bytearray(256)
+        for lAddress, lValue in (aContents or {}).items():
+            self.memory[lAddress] = lValue
+        self.pointer = 0
+        self.expectPointer = False
+
+    def load(self, aRegister):
+        return self.memory[aRegister]
+
+    def store(self, aRegister, aValue):
+        self.memory[aRegister] = aValue
+
+    def start(self, aRead):
+        self.expectPointer = not aRead
+
+    def write_byte(self, aValue):
+        if self.expectPointer:
+            self.pointer = aValue
+            self.expectPointer = False
+            return
+        self.store(self.pointer, aValue)
+        self.pointer = (self.pointer + 1) & 0xff
+
+    def read_byte(self):
+        lValue = self.load(self.pointer)
+        self.pointer = (self.pointer + 1) & 0xff
+        return lValue
+
+    def stop(self):
+        pass
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+class UIDPromDevice(I2CDevice):
+    """
+    24AA02E48-like UID PROM, with the 48-bit UID at 0xfa.
+    """
+
+    def __init__(self, aUID):
+        super(UIDPromDevice, self).__init__({0xfa + i: (aUID >> (8 * (5 - i))) & 0xff for i in range(6)})
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+class SI534xDevice(I2CDevice):
+    """
+    SI534x clock chip: paged registers, page register at 0x01 of every page.
+
+    Part number at 0x0002-0x0003, loss of lock at 0x000e (always locked); the
+    hard reset bit of 0x001e restores the power-up register image.
+    """
+
+    kPageRegister = 0x01
+    kResetRegister = 0x001e
+
+    def __init__(self, aPartNumber=0x5344):
+        super(SI534xDevice, self).__init__()
+        self.defaults = {0x0002: aPartNumber & 0xff, 0x0003: (aPartNumber >> 8) & 0xff}
+        self.power_up()
+
+    def power_up(self):
+        self.page = 0
+        self.registers = dict(self.defaults)
+
+    def load(self, aRegister):
+        if aRegister == self.kPageRegister:
+            return self.page
+        return self.registers.get((self.page << 8) | aRegister, 0)
+
+    def store(self, aRegister, aValue):
+        if aRegister == self.kPageRegister:
+            self.page = aValue
+            return
+        lAddress = (self.page << 8) | aRegister
+        if lAddress == self.kResetRegister and (aValue & 0x2):
+            self.power_up()
+            return
+        self.registers[lAddress] = aValue
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+def _text(aText, aSize=16):
+    return bytearray(aText.ljust(aSize)[:aSize].encode('ascii'))
+
+
+def _sfp_eeprom(aSerialNumber):
+    lContents = {}
+    for lAddress, lText in ((0x14, 'DUNE-SIM'), (0x28, 'SFP-SIM-1G'), (0x44, aSerialNumber)):
+        for i, lByte in enumerate(_text(lText)):
+            lContents[lAddress + i] = lByte
+    # DDM implemented, externally calibrated; soft tx disable implemented
+    lContents[0x5c] = 0x50
+    lContents[0x5d] = 0x40
+    return lContents
+
+
+def _sfp_diagnostics():
+    lContents = {}
+    # rx power coefficient 1 = 1.0, slopes = 1.0, offsets = 0
+    for i, lByte in enumerate(bytearray(struct.pack('>f', 1.0))):
+        lContents[0x44 + i] = lByte
+    for lAddress in (0x4c, 0x50, 0x54, 0x58):
+        lContents[lAddress] = 0x01
+    # temperature 37.5 C, 3.3 V, 6 mA, 0.5 mW tx, 0.4 mW rx
+    for lAddress, lWord in ((0x60, 0x2580), (0x62, 33000), (0x64, 3000), (0x66, 5000), (0x68, 4000)):
+        lContents[lAddress] = lWord >> 8
+        lContents[lAddress + 1] = lWord & 0xff
+    return lContents
+
+
+class SFPDevices(object):
+    """
+    The two I2C devices of an SFP: ID EEPROM (0x50) and diagnostics (0x51).
+    """
+
+    def __init__(self, aSerialNumber='SIM00000001'):
+        self.eeprom = I2CDevice(_sfp_eeprom(aSerialNumber))
+        self.diagnostics = I2CDevice(_sfp_diagnostics())
+
+    def devices(self):
+        return {0x50: self.eeprom, 0x51: self.diagnostics}
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+class OpenCoresI2C(RegisterModel):
+    """
+    OpenCores I2C master: ps_lo, ps_hi, ctrl, data (tx/rx) and cmd/status.
+
+    A bus operation keeps the transfer in progress bit up for the time it takes
+    on the bus, 5 x (prescale + 1) core clock cycles per bit, and, if aBusyReads
+    is set, for at least that many status reads. Like the core, the model ignores
+    the tx and cmd writes made while an operation is in progress; they are
+    counted in busyWrites, as the software must never issue them. Disabling the
+    core aborts the operation in progress.
+    """
+
+    kPrescaleLo, kPrescaleHi, kCtrl, kData, kCmdStat = range(5)
+
+    kCoreClockFrequency = 31250000
+    kEnableBit = 0x80
+
+    kStartCmd = 0x80
+    kStopCmd = 0x40
+    kReadCmd = 0x20
+    kWriteCmd = 0x10
+    kInterruptAck = 0x01
+
+    kNoAckBit = 0x80
+    kBusyBit = 0x40
+    kInProgressBit = 0x02
+    kInterruptBit = 0x01
+
+    def __init__(self, aDevices=None, aBusyReads=0):
+        super(OpenCoresI2C, self).__init__(8)
+        self.devices = dict(aDevices or {})
+        self.busyReads = aBusyReads
+        self.readsLeft = 0
+        self.busyUntil = 0.
+        self.busyWrites = 0
+        self.tx = 0
+        self.rx = 0
+        self.target = None
+        self.busy = False
+        self.noAck = False
+        self.interrupt = False
+        self.transfers = 0
+
+    def power_up(self):
+        """
+        Power cycle the devices on the bus that support it.
+        """
+        for lDevice in self.devices.values():
+            if hasattr(lDevice, 'power_up'):
+                lDevice.power_up()
+
+    def in_progress(self):
+        return self.readsLeft > 0 or time.time() < self.busyUntil
+
+    def operation_time(self, aCommand):
+        """
+        Time an operation takes on the bus: 8 data bits, the acknowledge bit, and the start and stop conditions.
+        """
+        lBits = 9 + bool(aCommand & self.kStartCmd) + bool(aCommand & self.kStopCmd)
+        lPrescale = (self.registers.get(self.kPrescaleHi, 0) << 8) | self.registers.get(self.kPrescaleLo, 0)
+        return 5. * (lPrescale + 1) * lBits / self.kCoreClockFrequency
+
+    def read(self, aOffset):
+        if aOffset == self.kData:
+            return self.rx
+        if aOffset == self.kCmdStat:
+            lStatus = ((self.noAck and self.kNoAckBit) |
+                       (self.busy and self.kBusyBit) |
+                       (self.interrupt and self.kInterruptBit))
+            if self.in_progress():
+                lStatus |= self.kInProgressBit
+            if self.readsLeft:
+                self.readsLeft -= 1
+            return lStatus
+        return super(OpenCoresI2C, self).read(aOffset)
+
+    def write(self, aOffset, aValue):
+        aValue &= 0xff
+        if aOffset in (self.kData, self.kCmdStat) and self.in_progress():
+            self.busyWrites += 1
+            return
+        if aOffset == self.kData:
+            self.tx = aValue
+        elif aOffset == self.kCmdStat:
+            self.command(aValue)
+        else:
+            if aOffset == self.kCtrl and not aValue & self.kEnableBit:
+                self.readsLeft = 0
+                self.busyUntil = 0.
+            super(OpenCoresI2C, self).write(aOffset, aValue)
+
+    def command(self, aCommand):
+        if aCommand & self.kInterruptAck:
+            self.interrupt = False
+
+        if aCommand & self.kStartCmd:
+            # the byte sent with a start is the device address
+            self.busy = True
+            self.target = self.devices.get(self.tx >> 1)
+            self.noAck = self.target is None
+            if self.target:
+                self.target.start(bool(self.tx & 0x1))
+        elif aCommand & self.kWriteCmd:
+            self.noAck = self.target is None
+            if self.target:
+                self.target.write_byte(self.tx)
+
+        if aCommand & self.kReadCmd:
+            self.rx = self.target.read_byte() if self.target else 0xff
+
+        if aCommand & self.kStopCmd:
+            if self.target:
+                self.target.stop()
+            self.target = None
+            self.busy = False
+
+        if aCommand & (self.kStartCmd | self.kStopCmd | self.kReadCmd | self.kWriteCmd):
+            self.transfers += 1
+            self.interrupt = True
+            self.readsLeft = self.busyReads
+            self.busyUntil = time.time() + self.operation_time(aCommand)
+# ------------------------------------------------------------------------------
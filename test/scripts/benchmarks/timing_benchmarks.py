@@ -0,0 +1,443 @@
+#!/usr/bin/env python
+"""
+Offline benchmarks of the timing software against an emulated IPbus target.
+
+The ouroboros designs are served by an IPbus 2.0 UDP target emulator built
+from the v610 address tables: ouroboros_sim for the master/endpoint operations,
+ouroboros_fmc for those going through the FMC I2C buses (IO reset, PLL
+configuration). For each operation the wall time, the number of IPbus packets
+and transactions, the words and bytes exchanged and the I2C transfers are
+recorded, and written out as JSON. The script fails if any operation wrote to an
+I2C master while its previous bus operation was still in progress.
+
+With --baseline, the packet and transaction counts are compared to those of
+a previous run, and the script fails if any of them grew: round trips are
+deterministic against the emulator, unlike wall times.
+"""
+
+from __future__ import print_function
+
+import argparse
+import collections
+import datetime
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import uhal
+
+from timing.core import EndpointRTTTarget, EndpointRTTScanConfig, PartitionEventReader
+
+from ipbus_target import TargetProcess
+from target_models import (StatusFollowsControl, CounterBlock, TimestampSource, FrequencyCounter, ReadoutBuffer,
+                           UpstreamEndpoint, EchoMonitor, CommandGenerator, OpenCoresI2C, I2CDevice, UIDPromDevice,
+                           SI534xDevice, SFPDevices)
+
+kRepoRoot = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+kAddrTab = os.path.join('config', 'etc', 'addrtab', 'v610')
+kDesigns = {
+    'sim': os.path.join(kAddrTab, 'ouroboros_sim', 'top_sim.xml'),
+    'fmc': os.path.join(kAddrTab, 'ouroboros_fmc', 'top.xml'),
+}
+kClockConfig = os.path.join('config', 'etc', 'clock', 'devel', 'Si5344-053master_312.5_mhz-Registers.txt')
+
+# io.config words, see timing/common/definitions.py
+kBoardFMC, kBoardSim = 0, 1
+kCarrierEnclustraA35 = 0
+kDesignOuroborosSim, kDesignOuroboros = 1, 2
+
+kFirmwareVersion = 0x060300
+kFirmwareFrequency = 62500000
+kBoardUID = 0xd880395e720b  # FMC rev 1
+kPartitions = 4
+kEndpoints = 4
+kEventHeader = 0xaa000600
+kWordsPerEvent = 6
+
+kCountFields = ('packets', 'transactions', 'words_read', 'words_written', 'bytes_in', 'bytes_out',
+                'i2c_transfers', 'i2c_busy_writes')
+
+
+# ------------------------------------------------------------------------------
+def ioConfigWord(aBoard, aCarrier, aDesign):
+    return (aBoard << 16) | (aCarrier << 8) | aDesign
+
+
+def address(aDevice, aPath):
+    return aDevice.getNode(aPath).getAddress()
+
+
+def buildModels(aDevice, aFlavour, aOptions):
+    """
+    Register models and preset registers of an ouroboros design.
+    """
+    lModels = {}
+    lMemory = {}
+
+    def attach(aPath, aModel):
+        lModels[aPath] = (address(aDevice, aPath), aModel)
+
+    # IO
+    if aFlavour == 'sim':
+        lMemory[address(aDevice, 'io.config')] = ioConfigWord(kBoardSim, kCarrierEnclustraA35, kDesignOuroborosSim)
+        attach('io.csr', StatusFollowsControl(0x0, 0x1, aStatic=0x10))
+    else:
+        lMemory[address(aDevice, 'io.config')] = ioConfigWord(kBoardFMC, kCarrierEnclustraA35, kDesignOuroboros)
+        attach('io.csr', StatusFollowsControl(0x0, 0x1, aStatic=0x10))
+        attach('io.uid_i2c', OpenCoresI2C({0x53: UIDPromDevice(kBoardUID), 0x21: I2CDevice()}, aOptions.i2c_busy_reads))
+        attach('io.sfp_i2c', OpenCoresI2C(SFPDevices().devices(), aOptions.i2c_busy_reads))
+        attach('io.pll_i2c', OpenCoresI2C({0x68: SI534xDevice()}, aOptions.i2c_busy_reads))
+        attach('io.freq', FrequencyCounter())
+    lMemory[address(aDevice, 'io.config.clock_frequency')] = kFirmwareFrequency
+
+    # Master
+    lMemory[address(aDevice, 'master.global.version')] = kFirmwareVersion
+    lMemory[address(aDevice, 'master.global.config')] = (kEndpoints << 4) | kPartitions
+    attach('master.global.csr', UpstreamEndpoint(aOptions.lock_reads))
+    attach('master.tstamp.ctr', TimestampSource(kFirmwareFrequency))
+    lCommandGenerator = CommandGenerator()
+    attach('master.acmd.csr', lCommandGenerator)
+    attach('master.echo.csr', EchoMonitor(lCommandGenerator, aOptions.echo_reads))
+    for lCounters in ('actrs', 'rctrs'):
+        attach('master.scmd_gen.' + lCounters, CounterBlock(16))
+
+    for i in range(kPartitions):
+        lPartition = 'master.partition%d' % i
+        # part_en -> part_up, run_req -> run_int | in_run
+        attach(lPartition + '.csr', StatusFollowsControl(0x0, 0x1, {0x1: 0x4, 0x2: 0x28}))
+        attach(lPartition + '.buf', ReadoutBuffer())
+        for lCounters in ('actrs', 'rctrs'):
+            attach(lPartition + '.' + lCounters, CounterBlock(16))
+
+    # Endpoints
+    for i in range(kEndpoints):
+        lEndpoint = 'endpoint%d' % i
+        lMemory[address(aDevice, lEndpoint + '.version')] = kFirmwareVersion
+        # ep_en -> ep_rdy, ep_stat = 0x8
+        attach(lEndpoint + '.csr', StatusFollowsControl(0x0, 0x1, {0x1: 0x88}))
+        attach(lEndpoint + '.tstamp', TimestampSource(kFirmwareFrequency, aSetOffset=None, aValOffset=0x0, aSize=2))
+        attach(lEndpoint + '.buf', ReadoutBuffer())
+        attach(lEndpoint + '.freq', FrequencyCounter())
+        attach(lEndpoint + '.ctrs', CounterBlock(16))
+
+    return lModels, lMemory
+
+
+def partitionEvents(aEvents, aFirstCounter=0):
+    lWords = []
+    for i in range(aEvents):
+        lTimestamp = 0x1000 * (aFirstCounter + i)
+        lWords += [kEventHeader, i % 16, lTimestamp & 0xffffffff, lTimestamp >> 32, aFirstCounter + i, 0x0]
+    return lWords
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+class Bench(object):
+    """
+    An emulated device: target process, uhal device and top design.
+    """
+
+    def __init__(self, aFlavour, aWorkDir, aOptions):
+        self.flavour = aFlavour
+
+        lTable = os.path.join(os.environ['TIMING_SHARE'], kDesigns[aFlavour])
+        lBuilder = uhal.ConnectionManager('file://' + self.writeConnections(aWorkDir, 0, lTable))
+        lModels, lMemory = buildModels(lBuilder.getDevice(aFlavour), aFlavour, aOptions)
+
+        self.target = TargetProcess(lModels, lMemory)
+        lManager = uhal.ConnectionManager('file://' + self.writeConnections(aWorkDir, self.target.port, lTable))
+        self.device = lManager.getDevice(aFlavour)
+        self.device.setTimeoutPeriod(aOptions.timeout)
+        self.design = self.device.getNode('')
+
+        # first contact: status request and initial packet id
+        self.design.read_firmware_version()
+
+    def writeConnections(self, aWorkDir, aPort, aTable):
+        lPath = os.path.join(aWorkDir, 'connections_%s_%d.xml' % (self.flavour, aPort))
+        with open(lPath, 'w') as lFile:
+            lFile.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            lFile.write('<connections>\n')
+            lFile.write('  <connection id="%s" uri="ipbusudp-2.0://127.0.0.1:%d" address_table="file://%s"/>\n' %
+                        (self.flavour, aPort or 50001, aTable))
+            lFile.write('</connections>\n')
+        return lPath
+
+    def stop(self):
+        self.target.stop()
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+Benchmark = collections.namedtuple('Benchmark', 'name flavour description run setup')
+
+kBenchmarks = []
+
+
+def benchmark(aName, aFlavour, aSetup=None):
+    def register(aRun):
+        kBenchmarks.append(Benchmark(aName, aFlavour, aRun.__doc__.strip(), aRun, aSetup))
+        return aRun
+    return register
+
+
+def clockConfigPath():
+    return os.path.join(os.environ['TIMING_SHARE'], kClockConfig)
+
+
+def powerUpPLL(aBench, aOptions):
+    aBench.target.call('io.pll_i2c', 'power_up')
+
+
+def fillPartition(aBench, aOptions):
+    aBench.target.fill('master.partition0.buf', partitionEvents(aOptions.events))
+
+
+def fillEndpoint(aBench, aOptions):
+    aBench.target.fill('endpoint0.buf', partitionEvents(aOptions.events))
+
+
+@benchmark('sim.io_reset', 'sim')
+def simIOReset(aBench, aOptions):
+    '''SIM IO soft reset'''
+    aBench.device.getNode('io').reset()
+
+
+@benchmark('sim.status', 'sim')
+def simStatus(aBench, aOptions):
+    '''Design status tables'''
+    aBench.design.get_status()
+
+
+@benchmark('sim.get_info', 'sim')
+def simInfo(aBench, aOptions):
+    '''Monitoring information collection'''
+    aBench.design.get_info(aOptions.info_level)
+
+
+@benchmark('sim.rtt_scan', 'sim')
+def simRTTScan(aBench, aOptions):
+    '''Round trip time scan of a list of endpoints'''
+    lReport = aBench.design.scan_endpoint_rtts([EndpointRTTTarget(i) for i in range(aOptions.rtt_endpoints)],
+                                               EndpointRTTScanConfig())
+    if lReport.failed:
+        raise RuntimeError('%d endpoint(s) failed the RTT scan' % lReport.failed)
+
+
+@benchmark('sim.partition_read_events', 'sim', fillPartition)
+def simPartitionReadEvents(aBench, aOptions):
+    '''Partition buffer readout, single read of all events'''
+    lWords = aBench.device.getNode('master.partition0').read_events(0)
+    if len(lWords) != aOptions.events * kWordsPerEvent:
+        raise RuntimeError('Read %d words, expected %d' % (len(lWords), aOptions.events * kWordsPerEvent))
+
+
+@benchmark('sim.partition_event_reader', 'sim', fillPartition)
+def simPartitionEventReader(aBench, aOptions):
+    '''Partition buffer readout, batched event reader'''
+    lReader = PartitionEventReader(aBench.device.getNode('master.partition0'))
+    for i in range(aOptions.events + 2):
+        lReader.read_batch()
+        if lReader.get_report().events >= aOptions.events:
+            return
+    raise RuntimeError('Read %d events, expected %d' % (lReader.get_report().events, aOptions.events))
+
+
+@benchmark('sim.endpoint_read_buffer', 'sim', fillEndpoint)
+def simEndpointReadBuffer(aBench, aOptions):
+    '''Endpoint buffer readout'''
+    lWords = aBench.device.getNode('endpoint0').read_data_buffer()
+    if len(lWords) != aOptions.events * kWordsPerEvent:
+        raise RuntimeError('Read %d words, expected %d' % (len(lWords), aOptions.events * kWordsPerEvent))
+
+
+@benchmark('fmc.io_reset_full', 'fmc', powerUpPLL)
+def fmcIOResetFull(aBench, aOptions):
+    '''FMC IO reset, PLL powered up unconfigured'''
+    aBench.device.getNode('io').reset()
+
+
+@benchmark('fmc.io_reset_incremental', 'fmc')
+def fmcIOResetIncremental(aBench, aOptions):
+    '''FMC IO reset, PLL already configured'''
+    aBench.device.getNode('io').reset()
+
+
+@benchmark('fmc.pll_configure_full', 'fmc', powerUpPLL)
+def fmcPLLConfigureFull(aBench, aOptions):
+    '''PLL full configuration'''
+    aBench.device.getNode('io.pll_i2c').configure(clockConfigPath(), False)
+
+
+@benchmark('fmc.pll_configure_incremental', 'fmc')
+def fmcPLLConfigureIncremental(aBench, aOptions):
+    '''PLL incremental configuration, no register changed'''
+    aBench.device.getNode('io.pll_i2c').configure(clockConfigPath(), True)
+
+
+@benchmark('fmc.status', 'fmc')
+def fmcStatus(aBench, aOptions):
+    '''Design status tables'''
+    aBench.design.get_status()
+
+
+@benchmark('fmc.get_info', 'fmc')
+def fmcInfo(aBench, aOptions):
+    '''Monitoring information collection, SFP included'''
+    aBench.design.get_info(aOptions.info_level)
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+def median(aValues):
+    lValues = sorted(aValues)
+    lMiddle = len(lValues) // 2
+    return lValues[lMiddle] if len(lValues) % 2 else 0.5 * (lValues[lMiddle - 1] + lValues[lMiddle])
+
+
+def runBenchmark(aBench, aBenchmark, aOptions):
+    lSamples = []
+    for i in range(aOptions.warmup + aOptions.repeats):
+        if aBenchmark.setup:
+            aBenchmark.setup(aBench, aOptions)
+        aBench.target.reset_stats()
+
+        lStart = time.time()
+        aBenchmark.run(aBench, aOptions)
+        lWallTime = time.time() - lStart
+
+        lSample = aBench.target.stats()
+        lSample['wall_time'] = lWallTime
+        if i >= aOptions.warmup:
+            lSamples.append(lSample)
+
+    lWallTimes = [lSample['wall_time'] for lSample in lSamples]
+    lResult = collections.OrderedDict()
+    lResult['description'] = aBenchmark.description
+    lResult['repeats'] = len(lSamples)
+    lResult['wall_time'] = collections.OrderedDict([('min', min(lWallTimes)), ('median', median(lWallTimes)),
+                                                    ('max', max(lWallTimes))])
+    # counts are expected to be the same in every repeat; the largest is kept
+    for lField in kCountFields:
+        lResult[lField] = max(lSample[lField] for lSample in lSamples)
+    lResult['stable'] = all(lSample[lField] == lSamples[0][lField] for lSample in lSamples for lField in kCountFields)
+    return lResult
+
+
+def compareToBaseline(aResults, aBaseline, aTolerance):
+    """
+    Return the regressions: packet or transaction counts above the baseline.
+    """
+    lRegressions = []
+    for lName, lResult in aResults.items():
+        lReference = aBaseline.get('results', {}).get(lName)
+        if lReference is None:
+            continue
+        for lField in ('packets', 'transactions'):
+            if lResult[lField] > lReference[lField] * (1. + aTolerance):
+                lRegressions.append('%s: %s %d > %d' % (lName, lField, lResult[lField], lReference[lField]))
+    return lRegressions
+
+
+def printTable(aResults):
+    lHeader = ('benchmark', 'median (ms)', 'packets', 'transactions', 'words r/w', 'bytes in/out', 'i2c', 'i2c busy')
+    lRows = [lHeader]
+    for lName, lResult in aResults.items():
+        lRows.append((lName,
+                      '%.2f' % (lResult['wall_time']['median'] * 1e3),
+                      str(lResult['packets']),
+                      str(lResult['transactions']),
+                      '%d/%d' % (lResult['words_read'], lResult['words_written']),
+                      '%d/%d' % (lResult['bytes_in'], lResult['bytes_out']),
+                      str(lResult['i2c_transfers']),
+                      str(lResult['i2c_busy_writes'])))
+    lWidths = [max(len(lRow[i]) for lRow in lRows) for i in range(len(lHeader))]
+    for lRow in lRows:
+        print('  '.join(lCell.ljust(lWidth) for lCell, lWidth in zip(lRow, lWidths)), file=sys.stderr)
+# ------------------------------------------------------------------------------
+
+
+# ------------------------------------------------------------------------------
+def main():
+    lParser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    lParser.add_argument('benchmarks', nargs='*', help='benchmarks to run (name prefixes), all by default')
+    lParser.add_argument('--list', action='store_true', help='list the benchmarks and exit')
+    lParser.add_argument('--repeats', type=int, default=5, help='measured runs per benchmark')
+    lParser.add_argument('--warmup', type=int, default=1, help='unmeasured runs per benchmark')
+    lParser.add_argument('--output', '-o', help='JSON output file (default: stdout)')
+    lParser.add_argument('--baseline', help='JSON output of a previous run to compare round trips to')
+    lParser.add_argument('--tolerance', type=float, default=0., help='relative round trip increase allowed')
+    lParser.add_argument('--events', type=int, default=100, help='events in the readout buffers')
+    lParser.add_argument('--rtt-endpoints', type=int, default=8, help='endpoints in the RTT scan')
+    lParser.add_argument('--info-level', type=int, default=1, help='monitoring level of get_info')
+    lParser.add_argument('--lock-reads', type=int, default=2, help='status reads before the upstream endpoint locks')
+    lParser.add_argument('--echo-reads', type=int, default=1, help='status reads before an echo returns')
+    lParser.add_argument('--i2c-busy-reads', type=int, default=0, help='status reads an I2C transfer stays busy for, at least')
+    lParser.add_argument('--timeout', type=int, default=1000, help='uhal timeout (ms)')
+    lOptions = lParser.parse_args()
+
+    lSelected = [lBench for lBench in kBenchmarks
+                 if not lOptions.benchmarks or any(lBench.name.startswith(p) for p in lOptions.benchmarks)]
+    if lOptions.list:
+        for lBench in lSelected:
+            print('%-32s %s' % (lBench.name, lBench.description))
+        return 0
+
+    uhal.setLogLevelTo(uhal.LogLevel.WARNING)
+    os.environ.setdefault('TIMING_SHARE', kRepoRoot)
+    lWorkDir = tempfile.mkdtemp(prefix='timing_benchmarks_')
+    os.environ.setdefault('TIMING_CLOCK_CONFIG_CACHE', os.path.join(lWorkDir, 'clock_cache'))
+
+    lResults = collections.OrderedDict()
+    try:
+        for lFlavour in ('sim', 'fmc'):
+            lFlavourBenchmarks = [lBench for lBench in lSelected if lBench.flavour == lFlavour]
+            if not lFlavourBenchmarks:
+                continue
+            lBench = Bench(lFlavour, lWorkDir, lOptions)
+            try:
+                for lBenchmark in lFlavourBenchmarks:
+                    print('Running %s' % lBenchmark.name, file=sys.stderr)
+                    lResults[lBenchmark.name] = runBenchmark(lBench, lBenchmark, lOptions)
+            finally:
+                lBench.stop()
+    finally:
+        shutil.rmtree(lWorkDir, ignore_errors=True)
+
+    lReport = collections.OrderedDict()
+    lReport['date'] = datetime.datetime.now().isoformat()
+    lReport['options'] = {lKey: lValue for lKey, lValue in vars(lOptions).items()
+                          if lKey not in ('output', 'baseline', 'list')}
+    lReport['results'] = lResults
+
+    lOutput = json.dumps(lReport, indent=2)
+    if lOptions.output:
+        with open(lOptions.output, 'w') as lFile:
+            lFile.write(lOutput + '\n')
+    else:
+        print(lOutput)
+    printTable(lResults)
+
+    lViolations = [(lName, lResult['i2c_busy_writes']) for lName, lResult in lResults.items() if lResult['i2c_busy_writes']]
+    for lName, lWrites in lViolations:
+        print('I2C protocol violation, %s: %d tx/cmd writes while a bus operation was in progress' % (lName, lWrites),
+              file=sys.stderr)
+    if lViolations:
+        return 1
+
+    if lOptions.baseline:
+        with open(lOptions.baseline) as lFile:
+            lRegressions = compareToBaseline(lResults, json.load(lFile), lOptions.tolerance)
+        for lRegression in lRegressions:
+            print('Round trip regression, %s' % lRegression, file=sys.stderr)
+        if lRegressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
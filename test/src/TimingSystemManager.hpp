@@ -120,6 +120,17 @@ public:
    * @brief      Adjust the endpoint delays.
    */
   void apply_endpoint_delays(uint32_t measure_rtt) const override; // NOLINT(build/unsigned)
+
+protected:
+  /**
+   * @brief      Reset stages: masters, then endpoints
+   */
+  std::vector<BringUpStage> get_reset_stages() const override;
+
+  /**
+   * @brief      Configure stages: masters
+   */
+  std::vector<BringUpStage> get_configure_stages() const override;
 };
 
 } // namespace timing
@@ -8,7 +8,17 @@
 
 #include "timing/TimingSystemManagerBase.hpp"
 
+#include "logging/Logging.hpp"
+
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <exception>
+#include <iomanip>
+#include <sstream>
 #include <string>
+#include <thread>
+#include <vector>
 
 namespace dunedaq {
 namespace timing {
@@ -47,5 +57,113 @@ TimingSystemManagerBase::getNumberOfEndpoints() const
 }
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+std::vector<DeviceBringUpResult>
+TimingSystemManagerBase::resetSystemParallel(uint32_t max_concurrency) const // NOLINT(build/unsigned)
+{
+  return run_bring_up_stages(get_reset_stages(), max_concurrency);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::vector<DeviceBringUpResult>
+TimingSystemManagerBase::configureSystemParallel(uint32_t max_concurrency) const // NOLINT(build/unsigned)
+{
+  return run_bring_up_stages(get_configure_stages(), max_concurrency);
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::vector<DeviceBringUpResult>
+TimingSystemManagerBase::run_bring_up_stages(const std::vector<BringUpStage>& stages,
+                                             uint32_t max_concurrency) const // NOLINT(build/unsigned)
+{
+  typedef std::chrono::steady_clock clock_t;
+  const auto bring_up_start = clock_t::now();
+
+  std::vector<DeviceBringUpResult> results;
+  bool previous_stage_failed = false;
+
+  for (auto& stage : stages) {
+
+    std::vector<DeviceBringUpResult> stage_results(stage.tasks.size());
+    for (size_t i = 0; i < stage.tasks.size(); ++i) {
+      stage_results.at(i).device = stage.tasks.at(i).device;
+      stage_results.at(i).stage = stage.name;
+      stage_results.at(i).success = false;
+      stage_results.at(i).skipped = previous_stage_failed;
+      stage_results.at(i).start_time = 0;
+      stage_results.at(i).duration = 0;
+    }
+
+    if (previous_stage_failed) {
+      TLOG() << "Skipping " << stage.name << " stage, previous stage failed";
+      results.insert(results.end(), stage_results.begin(), stage_results.end());
+      continue;
+    }
+
+    // each worker picks the next pending device until none is left
+    std::atomic<size_t> next_task(0);
+    auto worker = [&]() {
+      for (size_t i = next_task++; i < stage.tasks.size(); i = next_task++) {
+        auto& result = stage_results.at(i);
+        const auto task_start = clock_t::now();
+        result.start_time = std::chrono::duration<double>(task_start - bring_up_start).count();
+        try {
+          stage.tasks.at(i).action();
+          result.success = true;
+        } catch (const std::exception& e) {
+          result.error = e.what();
+        }
+        result.duration = std::chrono::duration<double>(clock_t::now() - task_start).count();
+      }
+    };
+
+    size_t n_workers = stage.tasks.size();
+    if (max_concurrency > 0)
+      n_workers = std::min<size_t>(n_workers, max_concurrency);
+
+    TLOG_DEBUG(3) << "Running " << stage.name << " stage: " << stage.tasks.size() << " devices, " << n_workers
+                  << " workers";
+
+    std::vector<std::thread> workers;
+    for (size_t i = 0; i < n_workers; ++i)
+      workers.emplace_back(worker);
+    for (auto& thread : workers)
+      thread.join();
+
+    for (auto& result : stage_results) {
+      if (!result.success) {
+        TLOG() << "Device " << result.device << " failed in " << stage.name << " stage: " << result.error;
+        previous_stage_failed = true;
+      }
+    }
+    results.insert(results.end(), stage_results.begin(), stage_results.end());
+  }
+  return results;
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+std::string
+TimingSystemManagerBase::format_bring_up_report(const std::vector<DeviceBringUpResult>& results)
+{
+  std::stringstream report;
+  report << std::left << std::setw(20) << "Device" << std::setw(12) << "Stage" << std::setw(10) << "Result"
+         << std::right << std::setw(10) << "Start [s]" << std::setw(14) << "Duration [s]" << std::endl;
+
+  for (auto& result : results) {
+    std::string status = result.skipped ? "skipped" : (result.success ? "ok" : "failed");
+    report << std::left << std::setw(20) << result.device << std::setw(12) << result.stage << std::setw(10) << status
+           << std::right << std::fixed << std::setprecision(3) << std::setw(10) << result.start_time << std::setw(14)
+           << result.duration;
+    if (!result.error.empty())
+      report << "  " << result.error;
+    report << std::endl;
+  }
+  return report.str();
+}
+//-----------------------------------------------------------------------------
+
 } // namespace timing
 } // namespace dunedaq
\ No newline at end of file
@@ -18,6 +18,7 @@
 #include "uhal/ConnectionManager.hpp"
 #include "uhal/DerivedNode.hpp"
 
+#include <functional>
 #include <map>
 #include <string>
 #include <vector>
@@ -25,6 +26,20 @@
 namespace dunedaq {
 namespace timing {
 
+/**
+ * @brief      Outcome of the reset or configuration of one device during a parallel bring-up
+ */
+struct DeviceBringUpResult
+{
+  std::string device;
+  std::string stage;
+  bool success;
+  bool skipped;
+  std::string error;
+  double start_time; // seconds since the start of the bring-up
+  double duration;   // seconds
+};
+
 class TimingSystemManagerBase : boost::noncopyable
 {
 
@@ -61,6 +76,34 @@ public:
    */
   virtual void configureSystem() const = 0;
 
+  /**
+   * @brief      Reset timing system hardware, one worker per device.
+   *
+   * Devices are reset stage by stage (masters, then fanouts, then endpoints); the devices
+   * within a stage are reset concurrently. A stage is skipped if any device of the previous
+   * stage failed.
+   *
+   * @param[in]  max_concurrency  Maximum number of devices handled at once, 0 for no limit
+   *
+   * @return     Per-device report, in stage order
+   */
+  virtual std::vector<DeviceBringUpResult> resetSystemParallel(uint32_t max_concurrency = 0) const; // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Configure timing system hardware, one worker per device.
+   *
+   * @param[in]  max_concurrency  Maximum number of devices handled at once, 0 for no limit
+   *
+   * @return     Per-device report, in stage order
+   */
+  virtual std::vector<DeviceBringUpResult> configureSystemParallel( // NOLINT(build/unsigned)
+    uint32_t max_concurrency = 0) const;                              // NOLINT(build/unsigned)
+
+  /**
+   * @brief      Format a bring-up report as a table
+   */
+  static std::string format_bring_up_report(const std::vector<DeviceBringUpResult>& results);
+
   /**
    * @brief      Reset timing system partition
    */
@@ -115,6 +158,34 @@ public:
   virtual void apply_endpoint_delays(uint32_t measure_rtt) const = 0; // NOLINT(build/unsigned)
 
 protected:
+  struct BringUpTask
+  {
+    std::string device;
+    std::function<void()> action;
+  };
+
+  struct BringUpStage
+  {
+    std::string name;
+    std::vector<BringUpTask> tasks;
+  };
+
+  /**
+   * @brief      Ordered stages of the system reset
+   */
+  virtual std::vector<BringUpStage> get_reset_stages() const = 0;
+
+  /**
+   * @brief      Ordered stages of the system configuration
+   */
+  virtual std::vector<BringUpStage> get_configure_stages() const = 0;
+
+  /**
+   * @brief      Run the tasks of each stage on a pool of workers, stage after stage.
+   */
+  std::vector<DeviceBringUpResult> run_bring_up_stages(const std::vector<BringUpStage>& stages,
+                                                       uint32_t max_concurrency) const; // NOLINT(build/unsigned)
+
   const std::string connectionsFile;
   uhal::ConnectionManager* connectionManager;
 
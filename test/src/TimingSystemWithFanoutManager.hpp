@@ -111,6 +111,16 @@ public:
   uint64_t measure_endpoint_rtt(const ActiveEndpointConfig& ept_config) const override; // NOLINT(build/unsigned)
 
 protected:
+  /**
+   * @brief      Reset stages: masters, then fanouts, then endpoints
+   */
+  std::vector<TimingSystemManagerBase::BringUpStage> get_reset_stages() const override;
+
+  /**
+   * @brief      Configure stages: masters, then fanouts
+   */
+  std::vector<TimingSystemManagerBase::BringUpStage> get_configure_stages() const override;
+
   std::vector<std::string> fanoutHardwareNames;
   std::vector<uhal::HwInterface> fanoutHardware;
 };
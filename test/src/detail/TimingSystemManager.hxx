@@ -82,6 +82,36 @@ TimingSystemManager<MST_TOP, EPT_TOP>::configureSystem() const
 }
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+template<class MST_TOP, class EPT_TOP>
+std::vector<TimingSystemManagerBase::BringUpStage>
+TimingSystemManager<MST_TOP, EPT_TOP>::get_reset_stages() const
+{
+  BringUpStage masters{ "master", {} };
+  for (uint32_t i = 0; i < getNumberOfMasters(); ++i)
+    masters.tasks.push_back({ masterHardwareNames.at(i), [this, i]() { getMaster(i).reset(); } });
+
+  BringUpStage endpoints{ "endpoint", {} };
+  for (uint32_t i = 0; i < getNumberOfEndpoints(); ++i)
+    endpoints.tasks.push_back({ endpointHardwareNames.at(i), [this, i]() { getEndpoint(i).reset(); } });
+
+  return { masters, endpoints };
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+template<class MST_TOP, class EPT_TOP>
+std::vector<TimingSystemManagerBase::BringUpStage>
+TimingSystemManager<MST_TOP, EPT_TOP>::get_configure_stages() const
+{
+  BringUpStage masters{ "master", {} };
+  for (uint32_t i = 0; i < getNumberOfMasters(); ++i)
+    masters.tasks.push_back({ masterHardwareNames.at(i), [this, i]() { getMaster(i).configure(); } });
+
+  return { masters };
+}
+//-----------------------------------------------------------------------------
+
 //-----------------------------------------------------------------------------
 template<class MST_TOP, class EPT_TOP>
 void
@@ -164,13 +194,27 @@ TimingSystemManager<MST_TOP, EPT_TOP>::performEndpointRTTScan()
 
   std::vector<EndpointRTTResult> lEndpointResults;
 
+  std::vector<EndpointRTTTarget> lTargets;
   for (auto it = this->mExpectedEndpoints.begin(); it != this->mExpectedEndpoints.end(); ++it) {
-    uint32_t lRTT = this->measure_endpoint_rtt(it->second);
+    lTargets.push_back(EndpointRTTTarget(it->second.adr));
+  }
+
+  auto lReport = getMaster(0).scan_endpoint_rtts(lTargets);
+  TLOG_DEBUG(1) << EndpointRTTScanner::format_report(lReport);
 
-    if (lRTT > this->mMaxMeasuredRTT)
-      this->mMaxMeasuredRTT = lRTT;
+  // the measurements come in target order, there is no mux to group them by
+  auto lMeasurement = lReport.measurements.begin();
+  for (auto it = this->mExpectedEndpoints.begin(); it != this->mExpectedEndpoints.end(); ++it, ++lMeasurement) {
+    EndpointRTTResult lResult(it->second, lMeasurement->rtt);
+
+    if (!lMeasurement->success) {
+      TLOG() << it->second.id << " RTT measurement failed: " << lMeasurement->error;
+      lResult.measuredRTT = -1;
+    } else if (lMeasurement->rtt > this->mMaxMeasuredRTT) {
+      this->mMaxMeasuredRTT = lMeasurement->rtt;
+    }
 
-    lEndpointResults.push_back(EndpointRTTResult(it->second, lRTT));
+    lEndpointResults.push_back(lResult);
   }
   return lEndpointResults;
 }
@@ -79,6 +79,44 @@ TimingSystemWithFanoutManager<MST_TOP, EPT_TOP, FAN_TOP>::configureSystem() cons
 }
 //-----------------------------------------------------------------------------
 
+//-----------------------------------------------------------------------------
+template<class MST_TOP, class EPT_TOP, class FAN_TOP>
+std::vector<TimingSystemManagerBase::BringUpStage>
+TimingSystemWithFanoutManager<MST_TOP, EPT_TOP, FAN_TOP>::get_reset_stages() const
+{
+  TimingSystemManagerBase::BringUpStage masters{ "master", {} };
+  for (uint32_t i = 0; i < this->getNumberOfMasters(); ++i)
+    masters.tasks.push_back({ this->masterHardwareNames.at(i), [this, i]() { this->getMaster(i).reset(); } });
+
+  TimingSystemManagerBase::BringUpStage fanouts{ "fanout", {} };
+  for (uint32_t i = 0; i < getNumberOfFanouts(); ++i)
+    fanouts.tasks.push_back({ fanoutHardwareNames.at(i), [this, i]() { getFanout(i).reset(); } });
+
+  TimingSystemManagerBase::BringUpStage endpoints{ "endpoint", {} };
+  for (uint32_t i = 0; i < this->getNumberOfEndpoints(); ++i)
+    endpoints.tasks.push_back({ this->endpointHardwareNames.at(i), [this, i]() { this->getEndpoint(i).reset(); } });
+
+  return { masters, fanouts, endpoints };
+}
+//-----------------------------------------------------------------------------
+
+//-----------------------------------------------------------------------------
+template<class MST_TOP, class EPT_TOP, class FAN_TOP>
+std::vector<TimingSystemManagerBase::BringUpStage>
+TimingSystemWithFanoutManager<MST_TOP, EPT_TOP, FAN_TOP>::get_configure_stages() const
+{
+  TimingSystemManagerBase::BringUpStage masters{ "master", {} };
+  for (uint32_t i = 0; i < this->getNumberOfMasters(); ++i)
+    masters.tasks.push_back({ this->masterHardwareNames.at(i), [this, i]() { this->getMaster(i).configure(); } });
+
+  TimingSystemManagerBase::BringUpStage fanouts{ "fanout", {} };
+  for (uint32_t i = 0; i < getNumberOfFanouts(); ++i)
+    fanouts.tasks.push_back({ fanoutHardwareNames.at(i), [this, i]() { getFanout(i).configure(); } });
+
+  return { masters, fanouts };
+}
+//-----------------------------------------------------------------------------
+
 //-----------------------------------------------------------------------------
 template<class MST_TOP, class EPT_TOP, class FAN_TOP>
 void